@@ -5,6 +5,8 @@ from syft.node.node import get_enable_warnings
 from syft.node.node import get_node_name
 from syft.node.node import get_node_side_type
 from syft.node.node import get_node_type
+from syft.store.blob_storage import OnDiskBlobStorageConfig
+from syft.store.blob_storage import S3BlobStorageConfig
 from syft.store.mongo_client import MongoStoreClientConfig
 from syft.store.mongo_document_store import MongoStoreConfig
 from syft.store.sqlite_document_store import SQLiteStoreClientConfig
@@ -23,8 +25,20 @@ mongo_client_config = MongoStoreClientConfig(
 mongo_store_config = MongoStoreConfig(client_config=mongo_client_config)
 
 
+if settings.USE_BLOB_STORAGE:
+    blob_storage_config = S3BlobStorageConfig(
+        endpoint_url=f"http://{settings.S3_ENDPOINT}:{settings.S3_PORT}",
+        access_key=settings.S3_ROOT_USER,
+        secret_key=settings.S3_ROOT_PWD,
+        region=settings.S3_REGION,
+    )
+else:
+    blob_storage_config = OnDiskBlobStorageConfig(path="/storage/blobs")
+
 client_config = SQLiteStoreClientConfig(path="/storage/")
-sql_store_config = SQLiteStoreConfig(client_config=client_config)
+sql_store_config = SQLiteStoreConfig(
+    client_config=client_config, blob_storage_config=blob_storage_config
+)
 
 node_type = get_node_type()
 node_name = get_node_name()
@@ -1,19 +1,22 @@
 __version__ = "0.8.2-beta.6"
 
 # stdlib
+import importlib
 import pathlib
 from pathlib import Path
 import sys
 from typing import Any
 from typing import Callable
+from typing import List
 
 # relative
 from . import gevent_patch  # noqa: F401
 from .abstract_node import NodeType  # noqa: F401
+from .client.async_client import AsyncSyftClient  # noqa: F401
+from .client.async_client import run_on_all  # noqa: F401
 from .client.client import connect  # noqa: F401
 from .client.client import login  # noqa: F401
 from .client.client import register  # noqa: F401
-from .client.deploy import Orchestra  # noqa: F401
 from .client.domain_client import DomainClient  # noqa: F401
 from .client.gateway_client import GatewayClient  # noqa: F401
 from .client.registry import DomainRegistry  # noqa: F401
@@ -26,12 +29,6 @@ from .client.user_settings import settings  # noqa: F401
 from .external import OBLV  # noqa: F401
 from .external import enable_external_lib  # noqa: F401
 from .node.credentials import SyftSigningKey  # noqa: F401
-from .node.domain import Domain  # noqa: F401
-from .node.enclave import Enclave  # noqa: F401
-from .node.gateway import Gateway  # noqa: F401
-from .node.server import serve_node  # noqa: F401
-from .node.server import serve_node as bind_worker  # noqa: F401
-from .node.worker import Worker  # noqa: F401
 from .serde import NOTHING  # noqa: F401
 from .serde.deserialize import _deserialize as deserialize  # noqa: F401
 from .serde.serializable import serializable  # noqa: F401
@@ -74,6 +71,34 @@ from .util.util import autocache  # noqa: F401
 from .util.util import get_root_data_path  # noqa: F401
 from .util.version_compare import make_requires
 
+# Nodes, the web server and the deployment tools are only imported when they are
+# first used, e.g. `sy.Worker` or `sy.orchestra`. Clients which only `sy.login`
+# to a running node never load them, see tests/syft/import_time_test.py.
+LAZY_ATTRIBUTES = {
+    "Domain": ("syft.node.domain", "Domain"),
+    "Enclave": ("syft.node.enclave", "Enclave"),
+    "Gateway": ("syft.node.gateway", "Gateway"),
+    "Orchestra": ("syft.client.deploy", "Orchestra"),
+    "Worker": ("syft.node.worker", "Worker"),
+    "bind_worker": ("syft.node.server", "serve_node"),
+    "serve_node": ("syft.node.server", "serve_node"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr_name = LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module_name), attr_name)
+    # later lookups don't go through __getattr__ anymore
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(LAZY_ATTRIBUTES))
+
+
 LATEST_STABLE_SYFT = "0.8.1"
 requires = make_requires(LATEST_STABLE_SYFT, __version__)
 
@@ -143,8 +168,8 @@ def _settings() -> UserSettings:
 
 
 @module_property
-def _orchestra() -> Orchestra:
-    return Orchestra
+def _orchestra() -> Any:
+    return __getattr__("Orchestra")
 
 
 def search(name: str) -> SearchResults:
@@ -3,12 +3,16 @@ from __future__ import annotations
 
 # stdlib
 from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import hashlib
 import inspect
 from inspect import signature
 import types
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -23,10 +27,12 @@ from result import Result
 from typeguard import check_type
 
 # relative
+from .. import __version__
 from ..abstract_node import AbstractNode
 from ..node.credentials import SyftSigningKey
 from ..node.credentials import SyftVerifyKey
 from ..serde.deserialize import _deserialize
+from ..serde.recursive import SERDE_WIRE_VERSION_1
 from ..serde.recursive import index_syft_by_module_name
 from ..serde.serializable import serializable
 from ..serde.serialize import _serialize
@@ -37,9 +43,11 @@ from ..service.context import AuthedServiceContext
 from ..service.context import ChangeContext
 from ..service.response import SyftAttributeError
 from ..service.response import SyftError
+from ..service.response import SyftException
 from ..service.response import SyftSuccess
 from ..service.service import UserLibConfigRegistry
 from ..service.service import UserServiceConfigRegistry
+from ..service.user.user_roles import ServiceRole
 from ..service.warnings import APIEndpointWarning
 from ..service.warnings import WarningContext
 from ..types.identity import Identity
@@ -52,6 +60,9 @@ from ..util.autoreload import autoreload_enabled
 from ..util.telemetry import instrument
 from .connection import NodeConnection
 
+# endpoints of the user code a user may call, the others only depend on the role
+USER_CODE_ENDPOINT_PREFIX = "code.call_"
+
 
 class APIRegistry:
     __api_registry__: Dict[Tuple, SyftAPI] = OrderedDict()
@@ -129,6 +140,9 @@ class SignedSyftAPICall(SyftObject):
     signature: bytes
     serialized_message: bytes
     cached_deseralized_message: Optional[SyftAPICall] = None
+    cached_validity: Optional[Tuple[bytes, bytes, Any]] = None
+    # out of band buffers referenced by serialized_message, sent as separate frames
+    buffers: Optional[List[Any]] = None
 
     @property
     def message(self) -> SyftAPICall:
@@ -138,21 +152,35 @@ class SignedSyftAPICall(SyftObject):
 
         if self.cached_deseralized_message is None:
             self.cached_deseralized_message = _deserialize(
-                blob=self.serialized_message, from_bytes=True
+                blob=self.serialized_message,
+                from_bytes=True,
+                buffers=getattr(self, "buffers", None),
             )
 
         return self.cached_deseralized_message
 
     @property
     def is_valid(self) -> Result[SyftSuccess, SyftError]:
+        # the outcome is kept for exactly this message and signature, changing
+        # either of them verifies the signature again
+        checked = getattr(self, "cached_validity", None)
+        if (
+            checked is not None
+            and checked[0] is self.serialized_message
+            and checked[1] is self.signature
+        ):
+            return checked[2]
+
         try:
             _ = self.credentials.verify_key.verify(
                 self.serialized_message, self.signature
             )
         except BadSignatureError:
-            return SyftError(message="BadSignatureError")
-
-        return SyftSuccess(message="Credentials are valid")
+            result = SyftError(message="BadSignatureError")
+        else:
+            result = SyftSuccess(message="Credentials are valid")
+        self.cached_validity = (self.serialized_message, self.signature, result)
+        return result
 
 
 @instrument
@@ -169,16 +197,75 @@ class SyftAPICall(SyftObject):
     kwargs: Dict[str, Any]
     blocking: bool = True
 
-    def sign(self, credentials: SyftSigningKey) -> SignedSyftAPICall:
-        signed_message = credentials.signing_key.sign(_serialize(self, to_bytes=True))
+    def sign(
+        self,
+        credentials: SyftSigningKey,
+        wire_version: int = SERDE_WIRE_VERSION_1,
+        buffers: Optional[List[Any]] = None,
+    ) -> SignedSyftAPICall:
+        # the signed message carries the digests of the out of band buffers
+        signed_message = credentials.signing_key.sign(
+            _serialize(self, to_bytes=True, wire_version=wire_version, buffers=buffers)
+        )
 
         return SignedSyftAPICall(
             credentials=credentials.verify_key,
             serialized_message=signed_message.message,
             signature=signed_message.signature,
+            buffers=buffers or None,
         )
 
 
+@instrument
+@serializable()
+class SyftAPICallBatch(SyftAPICall):
+    """Several calls to one node sent and signed as a single call.
+
+    The node runs the calls in order, each one sees the effects of the calls
+    before it, and answers with a list of their results.
+    """
+
+    # version
+    __canonical_name__ = "SyftAPICallBatch"
+    __version__ = SYFT_OBJECT_VERSION_1
+
+    # fields
+    path: str = "batch"
+    args: List = []
+    kwargs: Dict[str, Any] = {}
+    calls: List[SyftAPICall]
+
+
+# the calls collected by the batches open in this thread or task, by id of their
+# api. APIs are shared, the batch of one thread must not take the calls of others
+_open_batches: ContextVar[Optional[Dict[int, List["PendingAPICall"]]]] = ContextVar(
+    "open_batches", default=None
+)
+
+
+class PendingAPICall:
+    """Stands in for the result of a call made while a batch is open."""
+
+    def __init__(self, api_call: SyftAPICall) -> None:
+        self.api_call = api_call
+        self.done = False
+        self._result: Any = None
+
+    @property
+    def result(self) -> Any:
+        if not self.done:
+            return SyftError(message=f"{self.api_call.path} wasn't sent yet")
+        return self._result
+
+    def set_result(self, result: Any) -> None:
+        self._result = result
+        self.done = True
+
+    def __repr__(self) -> str:
+        status = "done" if self.done else "pending"
+        return f"<{type(self).__name__}: {self.api_call.path} ({status})>"
+
+
 @instrument
 @serializable()
 class SyftAPIData(SyftBaseObject):
@@ -189,13 +276,22 @@ class SyftAPIData(SyftBaseObject):
     # fields
     data: Any
 
-    def sign(self, credentials: SyftSigningKey) -> SignedSyftAPICall:
-        signed_message = credentials.signing_key.sign(_serialize(self, to_bytes=True))
+    def sign(
+        self,
+        credentials: SyftSigningKey,
+        wire_version: int = SERDE_WIRE_VERSION_1,
+        buffers: Optional[List[Any]] = None,
+    ) -> SignedSyftAPICall:
+        # the signed message carries the digests of the out of band buffers
+        signed_message = credentials.signing_key.sign(
+            _serialize(self, to_bytes=True, wire_version=wire_version, buffers=buffers)
+        )
 
         return SignedSyftAPICall(
             credentials=credentials.verify_key,
             serialized_message=signed_message.message,
             signature=signed_message.signature,
+            buffers=buffers or None,
         )
 
 
@@ -375,6 +471,60 @@ def debox_signed_syftapicall_response(
     return signed_result.message.data
 
 
+def endpoints_digest(
+    endpoints: Dict[str, Union[APIEndpoint, LibEndpoint]], *context: Any
+) -> str:
+    """Digest of what the client builds from `endpoints` and `context`, e.g. the
+    node the api belongs to, stable across restarts."""
+    # the endpoints get a new id whenever they are built, so it is left out
+    digest = hashlib.sha256(__version__.encode())
+    digest.update(repr(context).encode())
+    for path in sorted(endpoints):
+        endpoint = endpoints[path]
+        pre_kwargs = endpoint.pre_kwargs or {}
+        warning = getattr(endpoint, "warning", None)
+        fields = (
+            path,
+            endpoint.service_path,
+            endpoint.module_path,
+            endpoint.name,
+            endpoint.doc_string,
+            str(endpoint.signature),
+            endpoint.has_self,
+            sorted((key, str(value)) for key, value in pre_kwargs.items()),
+            None if warning is None else (warning.message, warning.enabled),
+        )
+        digest.update(repr(fields).encode())
+    return digest.hexdigest()[:32]
+
+
+def api_version(role_version: str, code_version: str) -> str:
+    """Version of the api of a user, compared with `If-None-Match` by the node."""
+    return f"{role_version}-{code_version}"
+
+
+def role_version_of(version: str) -> str:
+    return version.split("-", 1)[0]
+
+
+@serializable()
+class SyftAPIDelta(SyftObject):
+    """Answer to a client whose api only misses the latest user code endpoints.
+
+    Everything else of an api only depends on the role of the user and is
+    already known to the client.
+    """
+
+    __canonical_name__ = "SyftAPIDelta"
+    __version__ = SYFT_OBJECT_VERSION_1
+
+    version: str
+    code_endpoints: Dict[str, APIEndpoint]
+
+    def apply(self, api: SyftAPI) -> SyftAPI:
+        return api.with_code_endpoints(self.code_endpoints)
+
+
 @instrument
 @serializable(attrs=["endpoints", "node_uid", "node_name", "lib_endpoints"])
 class SyftAPI(SyftObject):
@@ -401,20 +551,25 @@ class SyftAPI(SyftObject):
     def for_user(
         node: AbstractNode, user_verify_key: Optional[SyftVerifyKey] = None
     ) -> SyftAPI:
-        # relative
-        # TODO: Maybe there is a possibility of merging ServiceConfig and APIEndpoint
-        from ..service.code.user_code_service import UserCodeService
-
         # find user role by verify_key
         # TODO: we should probably not allow empty verify keys but instead make user always register
         role = node.get_role_for_credentials(user_verify_key)
+        _, role_api = node.get_role_api(role)
+        return role_api.with_code_endpoints(
+            SyftAPI.user_code_endpoints(node, user_verify_key)
+        )
+
+    @staticmethod
+    def for_role(node: AbstractNode, role: ServiceRole) -> SyftAPI:
+        """The service endpoints of `role`, which are shared by every user with that
+        role. See `for_user` for the whole api of a user.
+
+        The lib endpoints are several MB and most sessions never use them, clients
+        fetch them from `action.lib_endpoints` when a lib is first used."""
+        # TODO: Maybe there is a possibility of merging ServiceConfig and APIEndpoint
         _user_service_config_registry = UserServiceConfigRegistry.from_role(role)
-        _user_lib_config_registry = UserLibConfigRegistry.from_user(user_verify_key)
         endpoints: Dict[str, APIEndpoint] = {}
-        lib_endpoints: Dict[str, LibEndpoint] = {}
-        warning_context = WarningContext(
-            node=node, role=role, credentials=user_verify_key
-        )
+        warning_context = WarningContext(node=node, role=role, credentials=None)
 
         for (
             path,
@@ -437,6 +592,18 @@ class SyftAPI(SyftObject):
                 )
                 endpoints[path] = endpoint
 
+        return SyftAPI(
+            node_name=node.name,
+            node_uid=node.id,
+            endpoints=endpoints,
+        )
+
+    @staticmethod
+    def lib_endpoints_for(
+        user_verify_key: Optional[SyftVerifyKey] = None,
+    ) -> Dict[str, LibEndpoint]:
+        _user_lib_config_registry = UserLibConfigRegistry.from_user(user_verify_key)
+        lib_endpoints: Dict[str, LibEndpoint] = {}
         for (
             path,
             lib_config,
@@ -451,15 +618,24 @@ class SyftAPI(SyftObject):
                 has_self=False,
             )
             lib_endpoints[path] = endpoint
+        return lib_endpoints
+
+    @staticmethod
+    def user_code_endpoints(
+        node: AbstractNode, user_verify_key: Optional[SyftVerifyKey] = None
+    ) -> Dict[str, APIEndpoint]:
+        # relative
+        from ..service.code.user_code_service import UserCodeService
 
         # 🟡 TODO 35: fix root context
         context = AuthedServiceContext(node=node, credentials=user_verify_key)
         method = node.get_method_with_context(UserCodeService.get_all_for_user, context)
         code_items = method()
 
+        endpoints: Dict[str, APIEndpoint] = {}
         for code_item in code_items:
             path = "code.call"
-            unique_path = f"code.call_{code_item.service_func_name}"
+            unique_path = f"{USER_CODE_ENDPOINT_PREFIX}{code_item.service_func_name}"
             endpoint = APIEndpoint(
                 service_path=path,
                 module_path=path,
@@ -471,20 +647,66 @@ class SyftAPI(SyftObject):
                 pre_kwargs={"uid": code_item.id},
             )
             endpoints[unique_path] = endpoint
-
+        return endpoints
+
+    def with_code_endpoints(self, code_endpoints: Dict[str, APIEndpoint]) -> SyftAPI:
+        """Copy of this api with its user code endpoints replaced"""
+        endpoints = {
+            path: endpoint
+            for path, endpoint in self.endpoints.items()
+            if not path.startswith(USER_CODE_ENDPOINT_PREFIX)
+        }
+        endpoints.update(code_endpoints)
         return SyftAPI(
-            node_name=node.name,
-            node_uid=node.id,
+            node_name=self.node_name,
+            node_uid=self.node_uid,
             endpoints=endpoints,
-            lib_endpoints=lib_endpoints,
+            lib_endpoints=self.lib_endpoints,
         )
 
+    @property
+    def pending_calls(self) -> Optional[List[PendingAPICall]]:
+        """The calls of the batch open in this thread or task, see `batch`."""
+        return (_open_batches.get() or {}).get(id(self), None)
+
     def make_call(self, api_call: SyftAPICall) -> Result:
-        signed_call = api_call.sign(credentials=self.signing_key)
+        pending_calls = self.pending_calls
+        if pending_calls is not None:
+            # a batch goes to a single node, sending the call now would reorder it
+            if (
+                pending_calls
+                and pending_calls[0].api_call.node_uid != api_call.node_uid
+            ):
+                raise SyftException(
+                    f"Can't batch a call to node {api_call.node_uid} with calls to "
+                    f"node {pending_calls[0].api_call.node_uid}"
+                )
+            pending_call = PendingAPICall(api_call)
+            pending_calls.append(pending_call)
+            return pending_call
+
+        signed_call = self._sign_call(api_call)
         signed_result = self.connection.make_call(signed_call)
 
         result = debox_signed_syftapicall_response(signed_result=signed_result)
+        return self._unwrap_result(result)
+
+    def make_wait_call(self, api_call: SyftAPICall) -> Result:
+        """`make_call` for calls the node holds open, like waiting on queue items."""
+        signed_call = self._sign_call(api_call)
+        signed_result = self.connection.make_wait_call(signed_call)
+
+        result = debox_signed_syftapicall_response(signed_result=signed_result)
+        return self._unwrap_result(result)
 
+    def _sign_call(self, api_call: SyftAPICall) -> SignedSyftAPICall:
+        return api_call.sign(
+            credentials=self.signing_key,
+            wire_version=self.connection.serde_wire_version,
+            buffers=[] if self.connection.supports_out_of_band_buffers else None,
+        )
+
+    def _unwrap_result(self, result: Any) -> Any:
         if isinstance(result, OkErr):
             if result.is_ok():
                 res = result.ok()
@@ -495,6 +717,48 @@ class SyftAPI(SyftObject):
                 return result.err()
         return result
 
+    @contextmanager
+    def batch(self) -> Iterator[List[PendingAPICall]]:
+        """Collect the calls made inside the block and send them as one call.
+
+        Calls return a PendingAPICall until the block exits, its `result` is set
+        once the batch was answered. Nothing is sent if the block raises.
+        The batch only collects the calls of the thread or task that opened it,
+        made through this api. All of them must go to the same node.
+        """
+        pending_calls = self.pending_calls
+        if pending_calls is not None:
+            # nested batches are part of the outer one
+            yield pending_calls
+            return
+
+        pending_calls = []
+        open_batches = _open_batches.get() or {}
+        token = _open_batches.set({**open_batches, id(self): pending_calls})
+        try:
+            yield pending_calls
+        finally:
+            _open_batches.reset(token)
+        self.send_batch(pending_calls)
+
+    def send_batch(self, pending_calls: List[PendingAPICall]) -> List[Any]:
+        if not pending_calls:
+            return []
+
+        batch = SyftAPICallBatch(
+            node_uid=pending_calls[0].api_call.node_uid,
+            calls=[pending_call.api_call for pending_call in pending_calls],
+        )
+        signed_result = self.connection.make_call(self._sign_call(batch))
+        results = debox_signed_syftapicall_response(signed_result=signed_result)
+        if not isinstance(results, list):
+            # the batch failed as a whole, e.g. because of its signature
+            results = [results] * len(pending_calls)
+
+        for pending_call, result in zip(pending_calls, results):
+            pending_call.set_result(self._unwrap_result(result))
+        return [pending_call.result for pending_call in pending_calls]
+
     def update_api(self, api_call_result):
         # TODO: hacky stuff with typing and imports to prevent circular imports
         # relative
@@ -525,41 +789,50 @@ class SyftAPI(SyftObject):
             _self = getattr(_self, module)
         _self._add_submodule(_last_module, endpoint_method)
 
-    def generate_endpoints(self) -> None:
-        def build_endpoint_tree(endpoints):
-            api_module = APIModule(path="")
-            for _, v in endpoints.items():
-                signature = v.signature
-                if not v.has_self:
-                    signature = signature_remove_self(signature)
-                signature = signature_remove_context(signature)
-                if isinstance(v, APIEndpoint):
-                    endpoint_function = generate_remote_function(
-                        self.node_uid,
-                        signature,
-                        v.service_path,
-                        self.make_call,
-                        pre_kwargs=v.pre_kwargs,
-                        warning=v.warning,
-                    )
-                elif isinstance(v, LibEndpoint):
-                    endpoint_function = generate_remote_lib_function(
-                        self,
-                        self.node_uid,
-                        signature,
-                        v.service_path,
-                        v.module_path,
-                        self.make_call,
-                        pre_kwargs=v.pre_kwargs,
-                    )
-
-                endpoint_function.__doc__ = v.doc_string
-                self._add_route(api_module, v, endpoint_function)
-            return api_module
+    def _build_endpoint_tree(self, endpoints: Dict[str, Any]) -> APIModule:
+        api_module = APIModule(path="")
+        for _, v in endpoints.items():
+            signature = v.signature
+            if not v.has_self:
+                signature = signature_remove_self(signature)
+            signature = signature_remove_context(signature)
+            if isinstance(v, APIEndpoint):
+                endpoint_function = generate_remote_function(
+                    self.node_uid,
+                    signature,
+                    v.service_path,
+                    self.make_call,
+                    pre_kwargs=v.pre_kwargs,
+                    warning=v.warning,
+                )
+            elif isinstance(v, LibEndpoint):
+                endpoint_function = generate_remote_lib_function(
+                    self,
+                    self.node_uid,
+                    signature,
+                    v.service_path,
+                    v.module_path,
+                    self.make_call,
+                    pre_kwargs=v.pre_kwargs,
+                )
+
+            endpoint_function.__doc__ = v.doc_string
+            self._add_route(api_module, v, endpoint_function)
+        return api_module
 
+    def generate_endpoints(self) -> None:
         if self.lib_endpoints is not None:
-            self.libs = build_endpoint_tree(self.lib_endpoints)
-        self.api_module = build_endpoint_tree(self.endpoints)
+            self.libs = self._build_endpoint_tree(self.lib_endpoints)
+        self.api_module = self._build_endpoint_tree(self.endpoints)
+
+    def fetch_lib_endpoints(self) -> Union[Dict[str, LibEndpoint], SyftError]:
+        # sent right away, also while a batch is open or from an AsyncSyftAPI
+        api_call = SyftAPICall(
+            node_uid=self.node_uid, path="action.lib_endpoints", args=[], kwargs={}
+        )
+        signed_result = self.connection.make_call(self._sign_call(api_call))
+        result = debox_signed_syftapicall_response(signed_result=signed_result)
+        return self._unwrap_result(result)
 
     @property
     def services(self) -> APIModule:
@@ -568,9 +841,14 @@ class SyftAPI(SyftObject):
         return self.api_module
 
     @property
-    def lib(self) -> APIModule:
+    def lib(self) -> Union[APIModule, SyftError]:
         if self.libs is None:
-            self.generate_endpoints()
+            if self.lib_endpoints is None:
+                lib_endpoints = self.fetch_lib_endpoints()
+                if isinstance(lib_endpoints, SyftError):
+                    return lib_endpoints
+                self.lib_endpoints = lib_endpoints
+            self.libs = self._build_endpoint_tree(self.lib_endpoints)
         return self.libs
 
     def has_service(self, service_name: str) -> bool:
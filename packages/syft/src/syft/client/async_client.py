@@ -0,0 +1,234 @@
+# future
+from __future__ import annotations
+
+# stdlib
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import functools
+import inspect
+from typing import Any
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
+# third party
+from typing_extensions import Self
+
+# relative
+from ..external import package_exists
+from ..serde.serializable import serializable
+from ..service.response import SyftError
+from ..types.syft_object import SYFT_OBJECT_VERSION_1
+from ..types.uid import UID
+from .api import APIEndpoint
+from .api import APIModule
+from .api import SignedSyftAPICall
+from .api import SyftAPI
+from .api import SyftAPICall
+from .api import debox_signed_syftapicall_response
+from .client import HTTPConnection
+from .client import SyftClient
+from .connection import NodeConnection
+from .transport import AsyncHTTPXTransport
+
+
+@serializable(attrs=["proxy_target_uid", "url"])
+class AsyncHTTPConnection(HTTPConnection):
+    """HTTPConnection that also sends api calls without blocking the event loop.
+
+    Everything but `make_call_async` stays synchronous and goes through the
+    pooled transport of the HTTPConnection.
+    """
+
+    __canonical_name__ = "AsyncHTTPConnection"
+    __version__ = SYFT_OBJECT_VERSION_1
+
+    # an AsyncHTTPXTransport for the event loop in `async_transport_loop`
+    async_transport_cache: Optional[AsyncHTTPXTransport]
+    async_transport_loop: Optional[Any]
+
+    @classmethod
+    def from_connection(cls, connection: HTTPConnection) -> Self:
+        return cls(
+            url=connection.url,
+            proxy_target_uid=connection.proxy_target_uid,
+            transport_cache=connection.transport,
+            compression=connection.compression,
+            node_serde_wire_version=connection.node_serde_wire_version,
+            node_accepts_gzip=connection.node_accepts_gzip,
+        )
+
+    def with_proxy(self, proxy_target_uid: UID) -> Self:
+        return AsyncHTTPConnection(
+            url=self.url,
+            proxy_target_uid=proxy_target_uid,
+            transport_cache=self.transport,
+            compression=self.compression,
+        )
+
+    async def get_async_transport(self) -> AsyncHTTPXTransport:
+        loop = asyncio.get_running_loop()
+        previous = None
+        if self.async_transport_cache is None or self.async_transport_loop not in (
+            None,
+            loop,
+        ):
+            previous = self.async_transport_cache
+            self.async_transport_cache = AsyncHTTPXTransport(http2=package_exists("h2"))
+        self.async_transport_loop = loop
+        if previous is not None:
+            # connections of a previous loop, e.g. of an earlier asyncio.run, are
+            # dead but still hold their sockets until they are closed
+            with contextlib.suppress(Exception):
+                await previous.close()
+        return self.async_transport_cache
+
+    async def make_call_async(
+        self, signed_call: SignedSyftAPICall
+    ) -> Union[Any, SyftError]:
+        data, headers = self.call_request(signed_call)
+        async_transport = await self.get_async_transport()
+        response = await async_transport.post(
+            str(self.api_url), data=data, headers=headers
+        )
+        return self.call_result(response)
+
+
+def to_async_connection(connection: NodeConnection) -> NodeConnection:
+    # httpx is optional, see the http2 extra
+    if (
+        isinstance(connection, HTTPConnection)
+        and not isinstance(connection, AsyncHTTPConnection)
+        and package_exists("httpx")
+    ):
+        return AsyncHTTPConnection.from_connection(connection)
+    # other connections fall back to NodeConnection.make_call_async, which waits
+    # for the blocking call in a worker thread
+    return connection
+
+
+def awaitable_endpoint(endpoint_method: Callable) -> Callable:
+    # endpoints return errors of argument validation right away, make them awaitable too
+    @functools.wraps(endpoint_method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = endpoint_method(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    return wrapper
+
+
+class AsyncSyftAPI(SyftAPI):
+    """SyftAPI with the same services and lib modules, whose endpoints are
+    coroutine functions."""
+
+    __canonical_name__ = "AsyncSyftAPI"
+    __version__ = SYFT_OBJECT_VERSION_1
+
+    @classmethod
+    def from_api(cls, api: SyftAPI, connection: NodeConnection) -> Self:
+        return cls(
+            connection=connection,
+            node_uid=api.node_uid,
+            node_name=api.node_name,
+            endpoints=api.endpoints,
+            lib_endpoints=api.lib_endpoints,
+            signing_key=api.signing_key,
+            refresh_api_callback=api.refresh_api_callback,
+        )
+
+    async def make_call(self, api_call: SyftAPICall) -> Any:  # type: ignore[override]
+        signed_call = self._sign_call(api_call)
+        signed_result = await self.connection.make_call_async(signed_call)
+
+        result = debox_signed_syftapicall_response(signed_result=signed_result)
+        return self._unwrap_result(result)
+
+    @staticmethod
+    def _add_route(
+        api_module: APIModule, endpoint: APIEndpoint, endpoint_method: Callable
+    ) -> None:
+        SyftAPI._add_route(api_module, endpoint, awaitable_endpoint(endpoint_method))
+
+
+class AsyncSyftClient:
+    """Asyncio view of a SyftClient, calls of `api.services` return awaitables.
+
+    Logging in, fetching the api and everything outside of the api stays on the
+    wrapped `client`. Calls to several nodes can run at the same time:
+
+        await asyncio.gather(*[c.api.services.dataset.get_all() for c in clients])
+    """
+
+    def __init__(self, client: SyftClient) -> None:
+        self.client = client
+        self.connection = to_async_connection(client.connection)
+        self._api: Optional[AsyncSyftAPI] = None
+        self._sync_api: Optional[SyftAPI] = None
+
+    @property
+    def api(self) -> AsyncSyftAPI:
+        sync_api = self.client.api
+        # follow the client when it logs in again or refreshes its api
+        if self._api is None or self._sync_api is not sync_api:
+            self._api = AsyncSyftAPI.from_api(sync_api, self.connection)
+            self._sync_api = sync_api
+        return self._api
+
+    @property
+    def services(self) -> APIModule:
+        return self.api.services
+
+    @property
+    def id(self) -> Optional[UID]:
+        return self.client.id
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.client.name
+
+    def __repr__(self) -> str:
+        return f"<Async{self.client!r}>"
+
+
+def get_endpoint(client: AsyncSyftClient, path: str) -> Callable:
+    endpoint = client.services
+    for name in path.split("."):
+        endpoint = getattr(endpoint, name)
+    return endpoint
+
+
+async def call_on_all(
+    clients: Sequence[Union[SyftClient, AsyncSyftClient]],
+    path: str,
+    *args: Any,
+    **kwargs: Any,
+) -> List[Any]:
+    """Call the service endpoint at `path`, like "dataset.get_all", on every node
+    at the same time. Results are in the order of `clients`."""
+    async_clients = [
+        client if isinstance(client, AsyncSyftClient) else client.to_async()
+        for client in clients
+    ]
+    calls = [get_endpoint(client, path)(*args, **kwargs) for client in async_clients]
+    return await asyncio.gather(*calls)
+
+
+def run_on_all(
+    clients: Sequence[Union[SyftClient, AsyncSyftClient]],
+    path: str,
+    *args: Any,
+    **kwargs: Any,
+) -> List[Any]:
+    """Blocking `call_on_all`, also works where a loop already runs, like in Jupyter."""
+    coroutine = call_on_all(clients, path, *args, **kwargs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
@@ -5,8 +5,11 @@ from __future__ import annotations
 from enum import Enum
 import hashlib
 import json
+import os
+from pathlib import Path
 from typing import Any
 from typing import Callable
+from typing import ContextManager
 from typing import Dict
 from typing import List
 from typing import Optional
@@ -20,9 +23,6 @@ from typing import cast
 import pydantic
 import requests
 from requests import Response
-from requests import Session
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
 from typing_extensions import Self
 
 # relative
@@ -34,6 +34,11 @@ from ..node.credentials import SyftSigningKey
 from ..node.credentials import SyftVerifyKey
 from ..node.credentials import UserLoginCredentials
 from ..serde.deserialize import _deserialize
+from ..serde.lib_service_registry import action_execute_registry_libs
+from ..serde.out_of_band import FramedBody
+from ..serde.out_of_band import OUT_OF_BAND_CONTENT_TYPE
+from ..serde.recursive import HIGHEST_SERDE_WIRE_VERSION
+from ..serde.recursive import SERDE_WIRE_VERSION_1
 from ..serde.serializable import serializable
 from ..serde.serialize import _serialize
 from ..service.context import NodeServiceContext
@@ -50,20 +55,30 @@ from ..types.syft_object import SYFT_OBJECT_VERSION_1
 from ..types.uid import UID
 from ..util.logger import debug
 from ..util.telemetry import instrument
+from ..util.util import get_root_data_path
 from ..util.util import prompt_warning_message
 from ..util.util import thread_ident
-from ..util.util import verify_tls
 from .api import APIModule
 from .api import APIRegistry
+from .api import PendingAPICall
 from .api import SignedSyftAPICall
 from .api import SyftAPI
 from .api import SyftAPICall
+from .api import SyftAPIDelta
 from .api import debox_signed_syftapicall_response
 from .connection import NodeConnection
+from .connection import SERDE_WIRE_VERSION_HEADER
+from .connection import negotiate_wire_version
+from .transport import COMPRESSION_MIN_SIZE
+from .transport import RequestsTransport
+from .transport import Transport
+from .transport import accepts_gzip
+from .transport import compress
 
 if TYPE_CHECKING:
     # relative
     from ..service.network.node_peer import NodePeer
+    from .async_client import AsyncSyftClient
 
 # use to enable mitm proxy
 # from syft.grid.connections.http_connection import HTTPConnection
@@ -72,9 +87,11 @@ if TYPE_CHECKING:
 
 def upgrade_tls(url: GridURL, response: Response) -> GridURL:
     try:
-        if response.url.startswith("https://") and url.protocol == "http":
+        # the url of an httpx response isn't a string
+        response_url = str(response.url)
+        if response_url.startswith("https://") and url.protocol == "http":
             # we got redirected to https
-            https_url = GridURL.from_url(response.url).with_path("")
+            https_url = GridURL.from_url(response_url).with_path("")
             debug(f"GridURL Upgraded to HTTPS. {https_url}")
             return https_url
     except Exception as e:
@@ -110,6 +127,35 @@ def forward_message_to_proxy(
     return response
 
 
+def api_cache_path(url: GridURL, verify_key: SyftVerifyKey) -> Path:
+    key = f"{__version__}|{url.base_url}|{verify_key}"
+    return get_root_data_path() / "api_cache" / hashlib.sha256(key.encode()).hexdigest()
+
+
+def load_cached_api(path: Path) -> Optional[Tuple[str, SyftAPI]]:
+    """Version and api stored by `store_cached_api`, if there is a readable one."""
+    try:
+        version, blob = path.read_bytes().split(b"\n", 1)
+        api = _deserialize(blob, from_bytes=True)
+    except Exception:  # nosec
+        return None
+    if not isinstance(api, SyftAPI):
+        return None
+    return version.decode(), api
+
+
+def store_cached_api(path: Path, version: str, blob: bytes) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # readers never see a half written file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(version.encode() + b"\n" + blob)
+        os.replace(tmp_path, path)
+    except OSError:
+        # the cache only saves time, not having one is fine
+        pass
+
+
 API_PATH = "/api/v2"
 DEFAULT_PYGRID_PORT = 80
 DEFAULT_PYGRID_ADDRESS = f"http://localhost:{DEFAULT_PYGRID_PORT}"
@@ -121,6 +167,7 @@ class Routes(Enum):
     ROUTE_LOGIN = f"{API_PATH}/login"
     ROUTE_REGISTER = f"{API_PATH}/register"
     ROUTE_API_CALL = f"{API_PATH}/api_call"
+    ROUTE_QUEUE_WAIT = f"{API_PATH}/queue_wait"
 
 
 @serializable(attrs=["proxy_target_uid", "url"])
@@ -131,14 +178,25 @@ class HTTPConnection(NodeConnection):
     proxy_target_uid: Optional[UID]
     url: GridURL
     routes: Type[Routes] = Routes
-    session_cache: Optional[Session]
+    # a RequestsTransport is created on first use if none is given
+    transport_cache: Optional[Transport]
+    # gzip large requests and ask for gzipped responses, pays off on slow links
+    compression: bool = False
+    node_serde_wire_version: int = SERDE_WIRE_VERSION_1
+    node_accepts_gzip: bool = False
 
     @pydantic.validator("url", pre=True, always=True)
     def make_url(cls, v: Union[GridURL, str]) -> GridURL:
         return GridURL.from_url(v).as_container_host()
 
     def with_proxy(self, proxy_target_uid: UID) -> Self:
-        return HTTPConnection(url=self.url, proxy_target_uid=proxy_target_uid)
+        # the proxied node is reached through the same connections
+        return HTTPConnection(
+            url=self.url,
+            proxy_target_uid=proxy_target_uid,
+            transport_cache=self.transport,
+            compression=self.compression,
+        )
 
     def get_cache_key(self) -> str:
         return str(self.url)
@@ -148,30 +206,60 @@ class HTTPConnection(NodeConnection):
         return self.url.with_path(self.routes.ROUTE_API_CALL.value)
 
     @property
-    def session(self) -> Session:
-        if self.session_cache is None:
-            session = requests.Session()
-            retry = Retry(total=3, backoff_factor=0.5)
-            adapter = HTTPAdapter(max_retries=retry)
-            session.mount("http://", adapter)
-            session.mount("https://", adapter)
-            self.session_cache = session
-        return self.session_cache
+    def serde_wire_version(self) -> int:
+        # a proxied node might be older than the one we are talking to
+        if self.proxy_target_uid:
+            return SERDE_WIRE_VERSION_1
+        return self.node_serde_wire_version
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            SERDE_WIRE_VERSION_HEADER: str(HIGHEST_SERDE_WIRE_VERSION),
+            "Accept-Encoding": "gzip" if self.compression else "identity",
+        }
+
+    def update_node_capabilities(self, response: Response) -> None:
+        self.node_serde_wire_version = negotiate_wire_version(
+            response.headers.get(SERDE_WIRE_VERSION_HEADER, None)
+        )
+        # nodes list the encodings they accept for request bodies
+        self.node_accepts_gzip = accepts_gzip(
+            response.headers.get("Accept-Encoding", None)
+        )
+
+    @property
+    def transport(self) -> Transport:
+        if self.transport_cache is None:
+            self.transport_cache = RequestsTransport()
+        return self.transport_cache
 
     def _make_get(self, path: str, params: Optional[Dict] = None) -> bytes:
+        return self._get_response(path, params=params).content
+
+    def _get_response(
+        self,
+        path: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
         url = self.url.with_path(path)
-        response = self.session.get(
-            str(url), verify=verify_tls(), proxies={}, params=params
+        response = self.transport.get(
+            str(url),
+            params=params,
+            headers=self.headers if headers is None else headers,
         )
-        if response.status_code != 200:
+        # 304 answers a conditional request for something we already have
+        if response.status_code not in (200, 304):
             raise requests.ConnectionError(
                 f"Failed to fetch {url}. Response returned with code {response.status_code}"
             )
 
         # upgrade to tls if available
         self.url = upgrade_tls(self.url, response)
+        self.update_node_capabilities(response)
 
-        return response.content
+        return response
 
     def _make_post(
         self,
@@ -180,8 +268,8 @@ class HTTPConnection(NodeConnection):
         data: Optional[bytes] = None,
     ) -> bytes:
         url = self.url.with_path(path)
-        response = self.session.post(
-            str(url), verify=verify_tls(), json=json, proxies={}, data=data
+        response = self.transport.post(
+            str(url), json=json, data=data, headers=self.headers
         )
         if response.status_code != 200:
             raise requests.ConnectionError(
@@ -190,6 +278,7 @@ class HTTPConnection(NodeConnection):
 
         # upgrade to tls if available
         self.url = upgrade_tls(self.url, response)
+        self.update_node_capabilities(response)
 
         return response.content
 
@@ -218,14 +307,39 @@ class HTTPConnection(NodeConnection):
                 credentials=credentials,
             )
         else:
-            content = self._make_get(self.routes.ROUTE_API.value, params=params)
-            obj = _deserialize(content, from_bytes=True)
+            obj = self._get_versioned_api(credentials.verify_key, params=params)
         obj.connection = self
         obj.signing_key = credentials
         if self.proxy_target_uid:
             obj.node_uid = self.proxy_target_uid
         return cast(SyftAPI, obj)
 
+    def _get_versioned_api(self, verify_key: SyftVerifyKey, params: Dict) -> SyftAPI:
+        # revalidate the api we got last time, even from an earlier session
+        cache_path = api_cache_path(self.url, verify_key)
+        cached = load_cached_api(cache_path)
+        headers = self.headers
+        if cached is not None:
+            headers["If-None-Match"] = f'"{cached[0]}"'
+
+        response = self._get_response(
+            self.routes.ROUTE_API.value, params=params, headers=headers
+        )
+        if response.status_code == 304 and cached is not None:
+            return cached[1]
+
+        blob = response.content
+        obj = _deserialize(blob, from_bytes=True)
+        if isinstance(obj, SyftAPIDelta) and cached is not None:
+            obj = obj.apply(cached[1])
+            blob = _serialize(obj, to_bytes=True)
+
+        # nodes without versioned apis don't send an ETag
+        version = response.headers.get("ETag", None)
+        if version is not None:
+            store_cached_api(cache_path, version.strip('"'), blob)
+        return obj
+
     def login(
         self,
         email: str,
@@ -260,16 +374,45 @@ class HTTPConnection(NodeConnection):
         return response
 
     def make_call(self, signed_call: SignedSyftAPICall) -> Union[Any, SyftError]:
-        msg_bytes: bytes = _serialize(obj=signed_call, to_bytes=True)
-        response = requests.post(  # nosec
-            url=str(self.api_url),
-            data=msg_bytes,
+        data, headers = self.call_request(signed_call)
+        response = self.transport.post(str(self.api_url), data=data, headers=headers)
+        return self.call_result(response)
+
+    def make_wait_call(self, signed_call: SignedSyftAPICall) -> Union[Any, SyftError]:
+        # the node waits for the queue items without holding a worker thread
+        data, headers = self.call_request(signed_call)
+        url = self.url.with_path(self.routes.ROUTE_QUEUE_WAIT.value)
+        response = self.transport.post(str(url), data=data, headers=headers)
+        return self.call_result(response)
+
+    def call_request(
+        self, signed_call: SignedSyftAPICall
+    ) -> Tuple[Union[bytes, FramedBody], Dict[str, str]]:
+        """Body and headers of the request sending `signed_call`."""
+        msg_bytes: bytes = _serialize(
+            obj=signed_call, to_bytes=True, wire_version=self.serde_wire_version
         )
+        headers = self.headers
+        data: Union[bytes, FramedBody] = msg_bytes
+        if signed_call.buffers:
+            # stream the array buffers after the message instead of copying them in
+            data = FramedBody([msg_bytes, *signed_call.buffers])
+            headers["Content-Type"] = OUT_OF_BAND_CONTENT_TYPE
+        elif (
+            self.compression
+            and self.node_accepts_gzip
+            and len(msg_bytes) >= COMPRESSION_MIN_SIZE
+        ):
+            data = compress(msg_bytes)
+            headers["Content-Encoding"] = "gzip"
+        return data, headers
 
+    def call_result(self, response: Response) -> Union[Any, SyftError]:
         if response.status_code != 200:
             raise requests.ConnectionError(
                 f"Failed to fetch metadata. Response returned with code {response.status_code}"
             )
+        self.update_node_capabilities(response)
 
         result = _deserialize(response.content, from_bytes=True)
         return result
@@ -314,6 +457,23 @@ class PythonConnection(NodeConnection):
     def with_proxy(self, proxy_target_uid: UID) -> Self:
         return PythonConnection(node=self.node, proxy_target_uid=proxy_target_uid)
 
+    @property
+    def serde_wire_version(self) -> int:
+        if self.proxy_target_uid:
+            return SERDE_WIRE_VERSION_1
+        return HIGHEST_SERDE_WIRE_VERSION
+
+    @property
+    def supports_out_of_band_buffers(self) -> bool:
+        # the node would keep views into the memory of the client side arrays
+        return False
+
+    async def make_call_async(
+        self, signed_call: SignedSyftAPICall
+    ) -> Union[Any, SyftError]:
+        # the node runs in this interpreter, a thread wouldn't run it any sooner
+        return self.make_call(signed_call)
+
     def get_node_metadata(self, credentials: SyftSigningKey) -> NodeMetadataJSON:
         if self.proxy_target_uid:
             response = forward_message_to_proxy(
@@ -391,7 +551,9 @@ class PythonConnection(NodeConnection):
         return response
 
     def make_call(self, signed_call: SignedSyftAPICall) -> Union[Any, SyftError]:
-        return self.node.handle_api_call(signed_call)
+        return self.node.handle_api_call(
+            signed_call, wire_version=self.serde_wire_version
+        )
 
     def __repr__(self) -> str:
         return f"{type(self).__name__}"
@@ -436,6 +598,7 @@ class SyftClient:
         self.metadata = metadata
         self.credentials: Optional[SyftSigningKey] = credentials
         self._api = api
+        self._async_client: Optional[AsyncSyftClient] = None
 
         self.post_init()
 
@@ -519,6 +682,45 @@ class SyftClient:
 
         return self._api
 
+    def batch(self) -> ContextManager[List[PendingAPICall]]:
+        """Send the calls made inside a `with client.batch():` block together.
+
+        Useful for chains of actions on pointers, which otherwise take one round
+        trip each. The results are available on the returned pending calls.
+        """
+        return self.api.batch()
+
+    def to_async(self) -> AsyncSyftClient:
+        """This client with api calls that return awaitables, see AsyncSyftClient."""
+        # relative
+        from .async_client import AsyncSyftClient
+
+        # keeps the pooled connections of the async transport between uses
+        if self._async_client is None:
+            self._async_client = AsyncSyftClient(self)
+        return self._async_client
+
+    def upload_action_object(
+        self, action_object: Any, transfer_id: Optional[UID] = None, **kwargs: Any
+    ) -> Any:
+        """Save an ActionObject or TwinObject like `api.services.action.set`, large
+        objects are sent in chunks. A failed upload is resumed by passing the
+        same object with the `transfer_id` of the error."""
+        # relative
+        from ..service.action.action_transfer import upload_action_object
+
+        return upload_action_object(
+            self.api, action_object, transfer_id=transfer_id, **kwargs
+        )
+
+    def download_action_object(self, uid: UID, **kwargs: Any) -> Any:
+        """Get an object like `api.services.action.get`, large objects are
+        fetched in chunks."""
+        # relative
+        from ..service.action.action_transfer import download_action_object
+
+        return download_action_object(self.api, uid, **kwargs)
+
     def guest(self) -> Self:
         return self.__class__(
             connection=self.connection,
@@ -663,8 +865,11 @@ class SyftClient:
         return response
 
     def __getattr__(self, name):
+        # only the roots of the libs, like numpy, fetch the lib endpoints. Typos
+        # and probes like the ones of IPython must not
         if (
-            hasattr(self, "api")
+            name in action_execute_registry_libs.children
+            and hasattr(self, "api")
             and hasattr(self.api, "lib")
             and hasattr(self.api.lib, name)
         ):
@@ -1,10 +1,28 @@
 # stdlib
+import asyncio
 from typing import Any
+from typing import Optional
 
 # relative
+from ..serde.recursive import HIGHEST_SERDE_WIRE_VERSION
+from ..serde.recursive import SERDE_WIRE_VERSION_1
+from ..serde.recursive import SERDE_WIRE_VERSION_3
 from ..types.syft_object import SYFT_OBJECT_VERSION_1
 from ..types.syft_object import SyftObject
 
+# clients send the highest serde wire version they can read, nodes answer with the
+# version they used for the response body
+SERDE_WIRE_VERSION_HEADER = "Syft-Serde-Wire-Version"
+
+
+def negotiate_wire_version(header_value: Optional[str]) -> int:
+    """Highest wire version both sides understand, peers without the header get 1."""
+    try:
+        peer_version = int(header_value)  # type: ignore
+    except (TypeError, ValueError):
+        return SERDE_WIRE_VERSION_1
+    return max(SERDE_WIRE_VERSION_1, min(peer_version, HIGHEST_SERDE_WIRE_VERSION))
+
 
 class NodeConnection(SyftObject):
     __canonical_name__ = "NodeConnection"
@@ -16,6 +34,25 @@ class NodeConnection(SyftObject):
     def __repr__(self) -> str:
         return f"<{type(self).__name__}"
 
+    async def make_call_async(self, signed_call: Any) -> Any:
+        # without an async transport the blocking call waits in a worker thread
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.make_call, signed_call)
+
+    def make_wait_call(self, signed_call: Any) -> Any:
+        # a call held open by the node until queue items resolve
+        return self.make_call(signed_call)
+
+    @property
+    def serde_wire_version(self) -> int:
+        # wire version for the messages we send, unknown peers only get version 1
+        return SERDE_WIRE_VERSION_1
+
+    @property
+    def supports_out_of_band_buffers(self) -> bool:
+        # whether large arrays can be sent as separate frames next to the message
+        return self.serde_wire_version >= SERDE_WIRE_VERSION_3
+
     @property
     def route(self) -> Any:
         # relative
@@ -76,7 +76,8 @@ class DomainClient(SyftClient):
                 twin = TwinObject(private_obj=asset.data, mock_obj=asset.mock)
             except Exception as e:
                 return SyftError(message=f"Failed to create twin. {e}")
-            response = self.api.services.action.set(twin)
+            # large assets are sent in chunks
+            response = self.upload_action_object(twin)
             if isinstance(response, SyftError):
                 print(f"Failed to upload asset\n: {asset}")
                 return response
@@ -86,7 +87,13 @@ class DomainClient(SyftClient):
         dataset.mb_size = dataset_size
         valid = dataset.check()
         if valid.ok():
-            return self.api.services.dataset.add(dataset=dataset)
+            # the private data is already stored, don't send it a second time
+            asset_list = [
+                asset.copy(update={"data": None}) for asset in dataset.asset_list
+            ]
+            return self.api.services.dataset.add(
+                dataset=dataset.copy(update={"asset_list": asset_list})
+            )
         else:
             if len(valid.err()) > 0:
                 return tuple(valid.err())
@@ -0,0 +1,229 @@
+# stdlib
+import gzip
+from typing import Any
+from typing import AsyncIterator
+from typing import Dict
+from typing import Optional
+from typing import Union
+
+# third party
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
+# relative
+from ..serde.out_of_band import FramedBody
+from ..util.util import verify_tls
+
+# connections kept alive per host and hosts kept in the pool
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_MAX_RETRIES = 3
+
+# smaller bodies aren't worth the time spent compressing them
+COMPRESSION_MIN_SIZE = 64 * 1024
+COMPRESSION_LEVEL = 1
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    if accept_encoding is None:
+        return False
+    codings = [coding.split(";")[0].strip() for coding in accept_encoding.split(",")]
+    return "gzip" in codings
+
+
+def compress(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=COMPRESSION_LEVEL)
+
+
+def import_httpx() -> Any:
+    try:
+        # third party
+        import httpx
+    except ImportError:
+        raise ImportError(
+            "The httpx transport needs httpx, install it with "
+            "'pip install httpx[http2]'"
+        )
+    return httpx
+
+
+class Transport:
+    """Sends the HTTP requests of an HTTPConnection over pooled connections.
+
+    Responses have `status_code`, `headers` and an already decoded `content`.
+    """
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        raise NotImplementedError
+
+    def post(
+        self,
+        url: str,
+        data: Optional[Union[bytes, FramedBody]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class RequestsTransport(Transport):
+    """HTTP/1.1 keep-alive connections of a requests Session."""
+
+    def __init__(
+        self,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        session = requests.Session()
+        # only idempotent requests are retried, api calls are never sent twice
+        retry = Retry(total=max_retries, backoff_factor=0.5)
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self.session = session
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        return self.session.get(
+            url, verify=verify_tls(), proxies={}, params=params, headers=headers
+        )
+
+    def post(
+        self,
+        url: str,
+        data: Optional[Union[bytes, FramedBody]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        return self.session.post(
+            url, verify=verify_tls(), proxies={}, data=data, json=json, headers=headers
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class HTTPXTransport(Transport):
+    """Connections of an httpx Client, multiplexed over HTTP/2 if `http2`.
+
+    Needs `pip install httpx[http2]`, HTTP/2 also has to be supported by the node
+    or the proxy in front of it, otherwise httpx stays on HTTP/1.1.
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        httpx = import_httpx()
+        limits = httpx.Limits(
+            max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize
+        )
+        # retries only cover failing to connect, like the Retry of requests
+        transport = httpx.HTTPTransport(
+            verify=verify_tls(), http2=http2, limits=limits, retries=max_retries
+        )
+        # api calls may run for a long time, like with requests there is no timeout
+        self.client = httpx.Client(transport=transport, timeout=None, trust_env=False)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        return self.client.get(url, params=params, headers=headers)
+
+    def post(
+        self,
+        url: str,
+        data: Optional[Union[bytes, FramedBody]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        if isinstance(data, FramedBody):
+            # stream the frames with a length instead of a chunked encoding
+            headers = {**(headers or {}), "Content-Length": str(len(data))}
+            return self.client.post(url, content=iter(data), headers=headers)
+        if data is not None:
+            return self.client.post(url, content=data, headers=headers)
+        return self.client.post(url, json=json, headers=headers)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class AsyncHTTPXTransport:
+    """The async counterpart of HTTPXTransport, requests are coroutines.
+
+    An httpx AsyncClient is bound to the event loop it first ran in, use one
+    transport per loop.
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        httpx = import_httpx()
+        limits = httpx.Limits(
+            max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize
+        )
+        transport = httpx.AsyncHTTPTransport(
+            verify=verify_tls(), http2=http2, limits=limits, retries=max_retries
+        )
+        self.client = httpx.AsyncClient(
+            transport=transport, timeout=None, trust_env=False
+        )
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        return await self.client.get(url, params=params, headers=headers)
+
+    async def post(
+        self,
+        url: str,
+        data: Optional[Union[bytes, FramedBody]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        if isinstance(data, FramedBody):
+            headers = {**(headers or {}), "Content-Length": str(len(data))}
+            return await self.client.post(
+                url, content=aiter_frames(data), headers=headers
+            )
+        if data is not None:
+            return await self.client.post(url, content=data, headers=headers)
+        return await self.client.post(url, json=json, headers=headers)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+async def aiter_frames(body: FramedBody) -> AsyncIterator[bytes]:
+    for frame in body:
+        yield frame
@@ -3,6 +3,14 @@ from ..serde.serializable import serializable
 from .node import Node
 
 
-@serializable(without=["queue_manager"])
+@serializable(
+    without=[
+        "queue_manager",
+        "_service_routes",
+        "_role_apis",
+        "_serialized_apis",
+        "_serialized_apis_lock",
+    ]
+)
 class Domain(Node):
     pass
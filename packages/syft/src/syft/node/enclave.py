@@ -4,7 +4,14 @@ from ..serde.serializable import serializable
 from .node import Node
 
 
-@serializable()
+@serializable(
+    without=[
+        "_service_routes",
+        "_role_apis",
+        "_serialized_apis",
+        "_serialized_apis_lock",
+    ]
+)
 class Enclave(Node):
     def post_init(self) -> None:
         self.node_type = NodeType.ENCLAVE
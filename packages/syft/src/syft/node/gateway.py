@@ -6,7 +6,14 @@ from ..service.network.network_service import NetworkService
 from .node import Node
 
 
-@serializable()
+@serializable(
+    without=[
+        "_service_routes",
+        "_role_apis",
+        "_serialized_apis",
+        "_serialized_apis_lock",
+    ]
+)
 class Gateway(Node):
     def post_init(self) -> None:
         self.node_type = NodeType.GATEWAY
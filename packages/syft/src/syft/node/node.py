@@ -3,6 +3,7 @@ from __future__ import annotations
 
 # stdlib
 import binascii
+from collections import OrderedDict
 import contextlib
 from datetime import datetime
 from functools import partial
@@ -10,20 +11,22 @@ import hashlib
 from multiprocessing import current_process
 import os
 import subprocess  # nosec
+import threading
 import traceback
+from types import MappingProxyType
 from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Tuple
 from typing import Type
 from typing import Union
 import uuid
 
 # third party
 import gevent
-import gipc
-from gipc.gipc import _GIPCDuplexHandle
 from nacl.signing import SigningKey
 from result import Err
 from result import Result
@@ -37,10 +40,15 @@ from ..abstract_node import NodeType
 from ..client.api import SignedSyftAPICall
 from ..client.api import SyftAPI
 from ..client.api import SyftAPICall
+from ..client.api import SyftAPICallBatch
 from ..client.api import SyftAPIData
+from ..client.api import SyftAPIDelta
+from ..client.api import api_version
 from ..client.api import debox_signed_syftapicall_response
+from ..client.api import endpoints_digest
+from ..client.api import role_version_of
 from ..external import OBLV
-from ..serde.deserialize import _deserialize
+from ..serde.recursive import SERDE_WIRE_VERSION_1
 from ..serde.serialize import _serialize
 from ..service.action.action_service import ActionService
 from ..service.action.action_store import DictActionStore
@@ -62,8 +70,11 @@ from ..service.policy.policy_service import PolicyService
 from ..service.project.project_service import ProjectService
 from ..service.queue.queue import APICallMessageHandler
 from ..service.queue.queue import QueueManager
+from ..service.queue.queue import QueueWorker
 from ..service.queue.queue_stash import QueueItem
+from ..service.queue.queue_stash import QueueItemWaiter
 from ..service.queue.queue_stash import QueueStash
+from ..service.queue.queue_stash import validate_queue_wait_kwargs
 from ..service.queue.zmq_queue import QueueConfig
 from ..service.queue.zmq_queue import ZMQQueueConfig
 from ..service.request.request_service import RequestService
@@ -101,14 +112,6 @@ from .worker_settings import WorkerSettings
 CODE_RELOADER: Dict[int, Callable] = {}
 
 
-def gipc_encoder(obj):
-    return _serialize(obj, to_bytes=True)
-
-
-def gipc_decoder(obj_bytes):
-    return _deserialize(obj_bytes, from_bytes=True)
-
-
 NODE_PRIVATE_KEY = "NODE_PRIVATE_KEY"
 NODE_UID = "NODE_UID"
 NODE_TYPE = "NODE_TYPE"
@@ -118,6 +121,10 @@ NODE_SIDE_TYPE = "NODE_SIDE_TYPE"
 DEFAULT_ROOT_EMAIL = "DEFAULT_ROOT_EMAIL"
 DEFAULT_ROOT_PASSWORD = "DEFAULT_ROOT_PASSWORD"  # nosec
 
+# serialized apis kept per (api version, wire version), the lib endpoints make
+# every one of them a few MB
+SERIALIZED_API_CACHE_SIZE = 16
+
 
 def get_env(key: str, default: Optional[Any] = None) -> Optional[str]:
     return os.environ.get(key, default)
@@ -298,10 +305,13 @@ class Node(AbstractNode):
             producer = self.queue_manager.create_producer(
                 queue_name=queue_name,
             )
-            consumer = self.queue_manager.create_consumer(
-                message_handler, producer.address
-            )
-            consumer.run()
+            # `processes` workers take turns, each keeps its own node between calls
+            for i in range(self.processes):
+                worker = QueueWorker(name=f"{self.name}-{queue_name}-{i}")
+                consumer = self.queue_manager.create_consumer(
+                    message_handler(worker), producer.address
+                )
+                consumer.run()
 
     @classmethod
     def named(
@@ -474,13 +484,21 @@ class Node(AbstractNode):
                 root_verify_key=self.verify_key,
             )
         else:
-            self.action_store = DictActionStore(root_verify_key=self.verify_key)
+            self.action_store = DictActionStore(
+                store_config=action_store_config,
+                root_verify_key=self.verify_key,
+            )
 
         self.action_store_config = action_store_config
         self.queue_stash = QueueStash(store=self.document_store)
 
     def _construct_services(self):
         self.service_path_map = {}
+        self._service_routes = {}
+        self._role_apis = {}
+        self._serialized_apis = OrderedDict()
+        # the routes look up apis from the threads of their threadpool
+        self._serialized_apis_lock = threading.Lock()
 
         for service_klass in self.services:
             kwargs = {}
@@ -514,6 +532,27 @@ class Node(AbstractNode):
                 **kwargs
             )
 
+    def service_routes_for_role(self, role: ServiceRole) -> Mapping[str, Callable]:
+        """Public API path to bound service method, for every path `role` can call.
+
+        Built once per role and rebuilt only when new services were registered.
+        """
+        registry = UserServiceConfigRegistry.from_role(role)
+        cached = self._service_routes.get(role, None)
+        if cached is not None and cached[0] is registry:
+            return cached[1]
+
+        routes = {}
+        for path, service_config in registry.get_registered_configs().items():
+            try:
+                routes[path] = self.get_service_method(service_config.private_path)
+            except (KeyError, AttributeError):
+                # the service is not part of this node
+                continue
+        routes = MappingProxyType(routes)
+        self._service_routes[role] = (registry, routes)
+        return routes
+
     def get_service_method(self, path_or_func: Union[str, Callable]) -> Callable:
         if callable(path_or_func):
             path_or_func = path_or_func.__qualname__
@@ -609,6 +648,37 @@ class Node(AbstractNode):
             return result.ok()
         return result.err()
 
+    def queue_item_waiter(
+        self,
+        credentials: SyftVerifyKey,
+        uids: List[UID],
+        timeout: Optional[float] = None,
+        return_when_all: bool = True,
+    ) -> QueueItemWaiter:
+        return QueueItemWaiter(
+            stash=self.queue_stash,
+            node_uid=self.id,
+            credentials=credentials,
+            uids=uids,
+            timeout=timeout,
+            return_when_all=return_when_all,
+        )
+
+    def wait_for_queue_items(
+        self,
+        credentials: SyftVerifyKey,
+        uids: List[UID],
+        timeout: Optional[float] = None,
+        return_when_all: bool = True,
+    ) -> Union[List[QueueItem], SyftError]:
+        """Resolved items among `uids`, once all or any of them resolved or after
+        `timeout` seconds."""
+        waiter = self.queue_item_waiter(credentials, uids, timeout, return_when_all)
+        # queue consumers of this process are greenlets, let them run meanwhile
+        while not waiter.poll():
+            gevent.sleep(waiter.sleep_time)
+        return waiter.result
+
     def forward_message(
         self, api_call: Union[SyftAPICall, SignedSyftAPICall]
     ) -> Result[Union[QueueItem, SyftObject], Err]:
@@ -660,12 +730,16 @@ class Node(AbstractNode):
         return role
 
     def handle_api_call(
-        self, api_call: Union[SyftAPICall, SignedSyftAPICall]
+        self,
+        api_call: Union[SyftAPICall, SignedSyftAPICall],
+        wire_version: int = SERDE_WIRE_VERSION_1,
     ) -> Result[SignedSyftAPICall, Err]:
         # Get the result
         result = self.handle_api_call_with_unsigned_result(api_call)
         # Sign the result
-        signed_result = SyftAPIData(data=result).sign(self.signing_key)
+        signed_result = SyftAPIData(data=result).sign(
+            self.signing_key, wire_version=wire_version
+        )
 
         return signed_result
 
@@ -682,45 +756,23 @@ class Node(AbstractNode):
 
         if api_call.message.node_uid != self.id:
             return self.forward_message(api_call=api_call)
-        if api_call.message.path == "queue":
-            return self.resolve_future(
-                credentials=api_call.credentials, uid=api_call.message.kwargs["uid"]
+        if isinstance(api_call.message, SyftAPICallBatch):
+            # the calls of a batch run one after the other on this node
+            return [
+                self.call_service(credentials=api_call.credentials, api_call=call)
+                for call in api_call.message.calls
+            ]
+        if api_call.message.path in ["queue", "queue_wait", "metadata"]:
+            return self.call_service(
+                credentials=api_call.credentials, api_call=api_call.message
             )
 
-        if api_call.message.path == "metadata":
-            return self.metadata
-
-        result = None
         is_blocking = api_call.message.blocking
 
         if is_blocking or self.is_subprocess or self.processes == 0:
-            credentials: SyftVerifyKey = api_call.credentials
-            api_call = api_call.message
-
-            role = self.get_role_for_credentials(credentials=credentials)
-            context = AuthedServiceContext(
-                node=self, credentials=credentials, role=role
+            return self.call_service(
+                credentials=api_call.credentials, api_call=api_call.message
             )
-
-            user_config_registry = UserServiceConfigRegistry.from_role(role)
-
-            if api_call.path not in user_config_registry:
-                if ServiceConfigRegistry.path_exists(api_call.path):
-                    return SyftError(
-                        message=f"As a `{role}`,"
-                        f"you have has no access to: {api_call.path}"
-                    )  # type: ignore
-                else:
-                    return SyftError(message=f"API call not in registered services: {api_call.path}")  # type: ignore
-
-            _private_api_path = user_config_registry.private_path_for(api_call.path)
-            method = self.get_service_method(_private_api_path)
-            try:
-                result = method(context, *api_call.args, **api_call.kwargs)
-            except Exception:
-                result = SyftError(
-                    message=f"Exception calling {api_call.path}. {traceback.format_exc()}"
-                )
         else:
             task_uid = UID()
             item = QueueItem(id=task_uid, node_uid=self.id)
@@ -733,14 +785,121 @@ class Node(AbstractNode):
             message_bytes = _serialize(
                 [task_uid, api_call, worker_settings], to_bytes=True
             )
-            self.queue_manager.send(message=message_bytes, queue_name="api_call")
+            # out of band buffers of the call travel as extra frames
+            message = (
+                [message_bytes, *api_call.buffers]
+                if api_call.buffers
+                else message_bytes
+            )
+            result = self.queue_manager.send(message=message, queue_name="api_call")
+            if isinstance(result, SyftError):
+                return result
 
             return item
+
+    def call_service(
+        self, credentials: SyftVerifyKey, api_call: SyftAPICall
+    ) -> Result[Union[QueueItem, SyftObject], Err]:
+        """Run an already verified call of `credentials` on this node."""
+        if api_call.path == "queue":
+            return self.resolve_future(
+                credentials=credentials, uid=api_call.kwargs["uid"]
+            )
+
+        if api_call.path == "queue_wait":
+            error = validate_queue_wait_kwargs(api_call.kwargs)
+            if error is not None:
+                return error
+            return self.wait_for_queue_items(credentials, **api_call.kwargs)
+
+        if api_call.path == "metadata":
+            return self.metadata
+
+        role = self.get_role_for_credentials(credentials=credentials)
+        context = AuthedServiceContext(node=self, credentials=credentials, role=role)
+
+        method = self.service_routes_for_role(role).get(api_call.path, None)
+        if method is None:
+            if ServiceConfigRegistry.path_exists(api_call.path):
+                return SyftError(
+                    message=f"As a `{role}`,"
+                    f"you have has no access to: {api_call.path}"
+                )  # type: ignore
+            else:
+                return SyftError(message=f"API call not in registered services: {api_call.path}")  # type: ignore
+
+        try:
+            result = method(context, *api_call.args, **api_call.kwargs)
+        except Exception:
+            result = SyftError(
+                message=f"Exception calling {api_call.path}. {traceback.format_exc()}"
+            )
         return result
 
     def get_api(self, for_user: Optional[SyftVerifyKey] = None) -> SyftAPI:
         return SyftAPI.for_user(node=self, user_verify_key=for_user)
 
+    def get_role_api(self, role: ServiceRole) -> Tuple[str, SyftAPI]:
+        """Version and api of everything but the user code endpoints of `role`.
+
+        Built once per role and rebuilt only when new services were registered.
+        """
+        registry = UserServiceConfigRegistry.from_role(role)
+        cache_key = (registry, self.enable_warnings, self.id, self.name)
+        cached = self._role_apis.get(role, None)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1], cached[2]
+
+        role_api = SyftAPI.for_role(node=self, role=role)
+        # the api also holds the node it belongs to, apis of two nodes with the
+        # same services aren't interchangeable
+        role_version = endpoints_digest(
+            {**role_api.endpoints, **(role_api.lib_endpoints or {})},
+            str(self.id),
+            self.name,
+        )
+        self._role_apis[role] = (cache_key, role_version, role_api)
+        return role_version, role_api
+
+    def get_serialized_api(
+        self,
+        for_user: Optional[SyftVerifyKey],
+        wire_version: int,
+        known_version: Optional[str] = None,
+    ) -> Tuple[str, Optional[bytes]]:
+        """Version and serialized api of a user, for a client which has the api of
+        `known_version`.
+
+        Returns no api if the client is up to date and a SyftAPIDelta with the user
+        code endpoints if only those changed.
+        """
+        role = self.get_role_for_credentials(credentials=for_user)
+        role_version, role_api = self.get_role_api(role)
+        code_endpoints = SyftAPI.user_code_endpoints(self, for_user)
+        version = api_version(role_version, endpoints_digest(code_endpoints))
+
+        if known_version == version:
+            return version, None
+        if known_version is not None and role_version_of(known_version) == role_version:
+            delta = SyftAPIDelta(version=version, code_endpoints=code_endpoints)
+            return version, _serialize(delta, to_bytes=True, wire_version=wire_version)
+
+        cache_key = (version, wire_version)
+        with self._serialized_apis_lock:
+            blob = self._serialized_apis.get(cache_key, None)
+            if blob is not None:
+                self._serialized_apis.move_to_end(cache_key)
+                return version, blob
+
+        # serialized outside of the lock, concurrent misses only do it twice
+        api = role_api.with_code_endpoints(code_endpoints)
+        blob = _serialize(api, to_bytes=True, wire_version=wire_version)
+        with self._serialized_apis_lock:
+            self._serialized_apis[cache_key] = blob
+            while len(self._serialized_apis) > SERIALIZED_API_CACHE_SIZE:
+                self._serialized_apis.popitem(last=False)
+        return version, blob
+
     def get_method_with_context(
         self, function: Callable, context: NodeServiceContext
     ) -> Callable:
@@ -784,87 +943,6 @@ class Node(AbstractNode):
             print("create_worker_metadata failed", e)
 
 
-def task_producer(
-    pipe: _GIPCDuplexHandle, api_call: SyftAPICall, blocking: bool
-) -> Any:
-    try:
-        result = None
-        with pipe:
-            pipe.put(api_call)
-            gevent.sleep(0)
-            if blocking:
-                try:
-                    result = pipe.get()
-                except EOFError:
-                    pass
-            pipe.close()
-        if blocking:
-            return result
-    except gipc.gipc.GIPCClosed:
-        pass
-    except Exception as e:
-        print("Exception in task_producer", e)
-
-
-def task_runner(
-    pipe: _GIPCDuplexHandle,
-    worker_settings: WorkerSettings,
-    task_uid: UID,
-    blocking: bool,
-) -> None:
-    worker = Node(
-        id=worker_settings.id,
-        name=worker_settings.name,
-        signing_key=worker_settings.signing_key,
-        document_store_config=worker_settings.document_store_config,
-        action_store_config=worker_settings.action_store_config,
-        is_subprocess=True,
-    )
-    try:
-        with pipe:
-            api_call = pipe.get()
-
-            result = worker.handle_api_call(api_call)
-            if blocking:
-                pipe.put(result)
-            else:
-                item = QueueItem(
-                    node_uid=worker.id, id=task_uid, result=result, resolved=True
-                )
-                worker.queue_stash.set_result(worker.verify_key, item)
-                worker.queue_stash.partition.close()
-            pipe.close()
-    except Exception as e:
-        print("Exception in task_runner", e)
-        raise e
-
-
-def queue_task(
-    api_call: SyftAPICall,
-    worker_settings: WorkerSettings,
-    task_uid: UID,
-    blocking: bool,
-) -> Optional[Any]:
-    with gipc.pipe(encoder=gipc_encoder, decoder=gipc_decoder, duplex=True) as (
-        cend,
-        pend,
-    ):
-        process = gipc.start_process(
-            task_runner, args=(cend, worker_settings, task_uid, blocking)
-        )
-        producer = gevent.spawn(task_producer, pend, api_call, blocking)
-        try:
-            process.join()
-        except KeyboardInterrupt:
-            producer.kill(block=True)
-            process.terminate()
-        process.join()
-
-    if blocking:
-        return producer.value
-    return None
-
-
 def create_admin_new(
     name: str,
     email: str,
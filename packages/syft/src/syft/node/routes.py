@@ -1,12 +1,22 @@
 # stdlib
+import asyncio
+import os
+from typing import Any
 from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+import zlib
 
 # third party
 from fastapi import APIRouter
 from fastapi import Body
 from fastapi import Depends
+from fastapi import HTTPException
 from fastapi import Request
 from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from loguru import logger
 from pydantic import ValidationError
@@ -14,11 +24,22 @@ from typing_extensions import Annotated
 
 # relative
 from ..abstract_node import AbstractNode
+from ..client.api import SignedSyftAPICall
+from ..client.api import SyftAPIData
+from ..client.connection import SERDE_WIRE_VERSION_HEADER
+from ..client.connection import negotiate_wire_version
+from ..client.transport import COMPRESSION_MIN_SIZE
+from ..client.transport import accepts_gzip
+from ..client.transport import compress
 from ..serde.deserialize import _deserialize as deserialize
+from ..serde.out_of_band import OUT_OF_BAND_CONTENT_TYPE
+from ..serde.out_of_band import unpack_frames
 from ..serde.serialize import _serialize as serialize
 from ..service.context import NodeServiceContext
 from ..service.context import UnauthedServiceContext
 from ..service.metadata.node_metadata import NodeMetadataJSON
+from ..service.queue.queue_stash import QueueItemWaiter
+from ..service.queue.queue_stash import validate_queue_wait_kwargs
 from ..service.response import SyftError
 from ..service.user.user import UserCreate
 from ..service.user.user import UserPrivateKey
@@ -28,8 +49,12 @@ from .credentials import SyftVerifyKey
 from .credentials import UserLoginCredentials
 from .worker import Worker
 
+# larger request bodies are refused before they are read, large action objects
+# can still be uploaded in chunks
+MAX_BODY_SIZE = int(os.environ.get("SYFT_MAX_BODY_SIZE", 1024**3))
 
-def make_routes(worker: Worker) -> APIRouter:
+
+def make_routes(worker: Worker, max_body_size: int = MAX_BODY_SIZE) -> APIRouter:
     if TRACE_MODE:
         # third party
         from opentelemetry import trace
@@ -37,8 +62,110 @@ def make_routes(worker: Worker) -> APIRouter:
 
     router = APIRouter()
 
+    def body_too_large() -> HTTPException:
+        return HTTPException(
+            status_code=413,
+            detail=f"Request bodies are limited to {max_body_size} bytes",
+        )
+
+    def get_content_length(request: Request) -> Optional[int]:
+        content_length = request.headers.get("content-length", None)
+        if content_length is None:
+            return None
+        try:
+            length = int(content_length)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length")
+        if length > max_body_size:
+            raise body_too_large()
+        return length
+
+    async def read_body(request: Request) -> bytes:
+        get_content_length(request)
+        chunks = []
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_body_size:
+                raise body_too_large()
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def decompress(body: bytes) -> bytes:
+        # a small gzip body can inflate to many GB, stop at the size we accept
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        try:
+            data = decompressor.decompress(body, max_body_size + 1)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip body")
+        if len(data) > max_body_size:
+            raise body_too_large()
+        if not decompressor.eof:
+            raise HTTPException(status_code=400, detail="Truncated gzip body")
+        return data
+
     async def get_body(request: Request) -> bytes:
-        return await request.body()
+        body = await read_body(request)
+        if request.headers.get("content-encoding", None) == "gzip":
+            return decompress(body)
+        return body
+
+    async def get_body_or_frames(request: Request) -> Union[bytes, List[memoryview]]:
+        if request.headers.get("content-encoding", None) == "gzip":
+            body = decompress(await read_body(request))
+            if request.headers.get("content-type", None) != OUT_OF_BAND_CONTENT_TYPE:
+                return body
+            return unpack_frames(bytearray(body))
+
+        if request.headers.get("content-type", None) != OUT_OF_BAND_CONTENT_TYPE:
+            return await read_body(request)
+
+        content_length = get_content_length(request)
+        if content_length is None:
+            return unpack_frames(bytearray(await read_body(request)))
+
+        # receive straight into one writable buffer, arrays rebuilt from the
+        # frames point into it and stay writable without another copy
+        buffer = bytearray(content_length)
+        offset = 0
+        with memoryview(buffer) as view:
+            async for chunk in request.stream():
+                if offset + len(chunk) > content_length:
+                    raise HTTPException(
+                        status_code=400, detail="Body is longer than Content-Length"
+                    )
+                view[offset : offset + len(chunk)] = chunk
+                offset += len(chunk)
+        if offset != content_length:
+            raise HTTPException(
+                status_code=400, detail="Body is shorter than Content-Length"
+            )
+        return unpack_frames(buffer)
+
+    def blob_response(
+        blob: bytes, request: Request, headers: Dict[str, str]
+    ) -> Response:
+        # we accept gzipped request bodies and gzip large answers if asked to
+        headers = {**headers, "Accept-Encoding": "gzip"}
+        if len(blob) >= COMPRESSION_MIN_SIZE and accepts_gzip(
+            request.headers.get("accept-encoding", None)
+        ):
+            blob = compress(blob)
+            headers["Content-Encoding"] = "gzip"
+        return Response(blob, media_type="application/octet-stream", headers=headers)
+
+    def serialized_response(obj: Any, request: Request) -> Response:
+        # answer in the highest wire version the client told us it can read
+        wire_version = negotiate_wire_version(
+            request.headers.get(SERDE_WIRE_VERSION_HEADER, None)
+        )
+        return blob_response(
+            serialize(obj, to_bytes=True, wire_version=wire_version),
+            request,
+            headers={SERDE_WIRE_VERSION_HEADER: str(wire_version)},
+        )
 
     @router.get(
         "/",
@@ -61,18 +188,27 @@ def make_routes(worker: Worker) -> APIRouter:
         return worker.metadata.to(NodeMetadataJSON)
 
     @router.get("/metadata_capnp")
-    def syft_metadata_capnp() -> Response:
+    def syft_metadata_capnp(request: Request) -> Response:
         result = worker.metadata
-        return Response(
-            serialize(result, to_bytes=True),
-            media_type="application/octet-stream",
-        )
+        return serialized_response(result, request)
 
-    def handle_syft_new_api(user_verify_key: SyftVerifyKey) -> Response:
-        return Response(
-            serialize(worker.get_api(user_verify_key), to_bytes=True),
-            media_type="application/octet-stream",
+    def handle_syft_new_api(
+        user_verify_key: SyftVerifyKey, request: Request
+    ) -> Response:
+        wire_version = negotiate_wire_version(
+            request.headers.get(SERDE_WIRE_VERSION_HEADER, None)
+        )
+        # the client sends the version of the api it has, if any
+        known_version = request.headers.get("If-None-Match", None)
+        if known_version is not None:
+            known_version = known_version.strip('"')
+        version, blob = worker.get_serialized_api(
+            user_verify_key, wire_version=wire_version, known_version=known_version
         )
+        headers = {SERDE_WIRE_VERSION_HEADER: str(wire_version), "ETag": f'"{version}"'}
+        if blob is None:
+            return Response(status_code=304, headers=headers)
+        return blob_response(blob, request, headers=headers)
 
     # get the SyftAPI object
     @router.get("/api")
@@ -84,22 +220,30 @@ def make_routes(worker: Worker) -> APIRouter:
                 context=extract(request.headers),
                 kind=trace.SpanKind.SERVER,
             ):
-                return handle_syft_new_api(user_verify_key)
+                return handle_syft_new_api(user_verify_key, request)
+        else:
+            return handle_syft_new_api(user_verify_key, request)
+
+    def handle_new_api_call(
+        data: Union[bytes, List[memoryview]], request: Request
+    ) -> Response:
+        if isinstance(data, list):
+            message, *buffers = data
+            obj_msg = deserialize(blob=message, from_bytes=True)
+            obj_msg.buffers = buffers
         else:
-            return handle_syft_new_api(user_verify_key)
-
-    def handle_new_api_call(data: bytes) -> Response:
-        obj_msg = deserialize(blob=data, from_bytes=True)
-        result = worker.handle_api_call(api_call=obj_msg)
-        return Response(
-            serialize(result, to_bytes=True),
-            media_type="application/octet-stream",
+            obj_msg = deserialize(blob=data, from_bytes=True)
+        wire_version = negotiate_wire_version(
+            request.headers.get(SERDE_WIRE_VERSION_HEADER, None)
         )
+        result = worker.handle_api_call(api_call=obj_msg, wire_version=wire_version)
+        return serialized_response(result, request)
 
     # make a request to the SyftAPI
     @router.post("/api_call")
     def syft_new_api_call(
-        request: Request, data: Annotated[bytes, Depends(get_body)]
+        request: Request,
+        data: Annotated[Union[bytes, List[memoryview]], Depends(get_body_or_frames)],
     ) -> Response:
         if TRACE_MODE:
             with trace.get_tracer(syft_new_api_call.__module__).start_as_current_span(
@@ -107,11 +251,75 @@ def make_routes(worker: Worker) -> APIRouter:
                 context=extract(request.headers),
                 kind=trace.SpanKind.SERVER,
             ):
-                return handle_new_api_call(data)
+                return handle_new_api_call(data, request)
+        else:
+            return handle_new_api_call(data, request)
+
+    def start_queue_wait(
+        data: bytes, request: Request
+    ) -> Tuple[Optional[Response], Optional[QueueItemWaiter]]:
+        signed_call = deserialize(blob=data, from_bytes=True)
+        if (
+            not isinstance(signed_call, SignedSyftAPICall)
+            or signed_call.message.node_uid != worker.id
+            or signed_call.message.path != "queue_wait"
+            or not signed_call.is_valid
+            or validate_queue_wait_kwargs(signed_call.message.kwargs) is not None
+        ):
+            # errors and waits on other nodes go the usual way
+            wire_version = negotiate_wire_version(
+                request.headers.get(SERDE_WIRE_VERSION_HEADER, None)
+            )
+            result = worker.handle_api_call(signed_call, wire_version)
+            return serialized_response(result, request), None
+
+        waiter = worker.queue_item_waiter(
+            signed_call.credentials, **signed_call.message.kwargs
+        )
+        return None, waiter
+
+    def queue_wait_response(waiter: QueueItemWaiter, request: Request) -> Response:
+        wire_version = negotiate_wire_version(
+            request.headers.get(SERDE_WIRE_VERSION_HEADER, None)
+        )
+        result = SyftAPIData(data=waiter.result).sign(
+            worker.signing_key, wire_version=wire_version
+        )
+        return serialized_response(result, request)
+
+    async def handle_queue_wait(data: bytes, request: Request) -> Response:
+        response, waiter = await run_in_threadpool(start_queue_wait, data, request)
+        if response is not None:
+            return response
+
+        # waiting requests only hold a coroutine, the stash is queried in a worker
+        # thread and only once items may have resolved
+        while True:
+            if waiter.should_check():
+                await run_in_threadpool(waiter.check)
+            if waiter.finished:
+                break
+            await asyncio.sleep(waiter.sleep_time)
+        return await run_in_threadpool(queue_wait_response, waiter, request)
+
+    # long poll for queue items, answers once they resolve or the wait times out
+    @router.post("/queue_wait")
+    async def syft_queue_wait(
+        request: Request, data: Annotated[bytes, Depends(get_body)]
+    ) -> Response:
+        if TRACE_MODE:
+            with trace.get_tracer(syft_queue_wait.__module__).start_as_current_span(
+                syft_queue_wait.__qualname__,
+                context=extract(request.headers),
+                kind=trace.SpanKind.SERVER,
+            ):
+                return await handle_queue_wait(data, request)
         else:
-            return handle_new_api_call(data)
+            return await handle_queue_wait(data, request)
 
-    def handle_login(email: str, password: str, node: AbstractNode) -> Response:
+    def handle_login(
+        email: str, password: str, node: AbstractNode, request: Request
+    ) -> Response:
         try:
             login_credentials = UserLoginCredentials(email=email, password=password)
         except ValidationError as e:
@@ -130,12 +338,9 @@ def make_routes(worker: Worker) -> APIRouter:
                 raise Exception(f"Incorrect return type: {type(user_private_key)}")
             response = user_private_key
 
-        return Response(
-            serialize(response, to_bytes=True),
-            media_type="application/octet-stream",
-        )
+        return serialized_response(response, request)
 
-    def handle_register(data: bytes, node: AbstractNode) -> Response:
+    def handle_register(data: bytes, node: AbstractNode, request: Request) -> Response:
         user_create = deserialize(data, from_bytes=True)
 
         if not isinstance(user_create, UserCreate):
@@ -152,10 +357,7 @@ def make_routes(worker: Worker) -> APIRouter:
         else:
             response = result
 
-        return Response(
-            serialize(response, to_bytes=True),
-            media_type="application/octet-stream",
-        )
+        return serialized_response(response, request)
 
     # exchange email and password for a SyftSigningKey
     @router.post("/login", name="login", status_code=200)
@@ -170,9 +372,9 @@ def make_routes(worker: Worker) -> APIRouter:
                 context=extract(request.headers),
                 kind=trace.SpanKind.SERVER,
             ):
-                return handle_login(email, password, worker)
+                return handle_login(email, password, worker, request)
         else:
-            return handle_login(email, password, worker)
+            return handle_login(email, password, worker, request)
 
     @router.post("/register", name="register", status_code=200)
     def register(
@@ -184,8 +386,8 @@ def make_routes(worker: Worker) -> APIRouter:
                 context=extract(request.headers),
                 kind=trace.SpanKind.SERVER,
             ):
-                return handle_register(data, worker)
+                return handle_register(data, worker, request)
         else:
-            return handle_register(data, worker)
+            return handle_register(data, worker, request)
 
     return router
@@ -136,7 +136,6 @@ def run_uvicorn(
         server = uvicorn.Server(config)
 
         await server.serve()
-        asyncio.get_running_loop().stop()
 
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
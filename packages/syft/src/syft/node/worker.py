@@ -3,6 +3,13 @@ from ..serde.serializable import serializable
 from .node import Node
 
 
-@serializable()
+@serializable(
+    without=[
+        "_service_routes",
+        "_role_apis",
+        "_serialized_apis",
+        "_serialized_apis_lock",
+    ]
+)
 class Worker(Node):
     pass
@@ -1,4 +1,6 @@
 # stdlib
+from typing import Optional
+from typing import Tuple
 from typing import Union
 from typing import cast
 
@@ -10,8 +12,14 @@ import pyarrow as pa
 from ..util.experimental_flags import ApacheArrowCompression
 from ..util.experimental_flags import flags
 from .deserialize import _deserialize
+from .out_of_band import OutOfBandBuffer
+from .out_of_band import export_buffer
+from .out_of_band import import_buffer
 from .serialize import _serialize
 
+# same dtypes as the arrow tensor path, rebuilt with np.frombuffer
+OUT_OF_BAND_DTYPE_KINDS = "biufc"
+
 
 def arrow_serialize(obj: np.ndarray) -> bytes:
     original_dtype = obj.dtype
@@ -110,7 +118,41 @@ def arraytonumpyutf8(string_list: Union[str, np.ndarray]) -> bytes:
     return cast(bytes, _serialize(output_array, to_bytes=True))
 
 
+def out_of_band_serialize(obj: np.ndarray) -> Optional[bytes]:
+    if obj.dtype.kind not in OUT_OF_BAND_DTYPE_KINDS:
+        return None
+    if obj.flags.c_contiguous:
+        order = "C"
+    elif obj.flags.f_contiguous:
+        order = "F"
+    else:
+        return None
+
+    # a flat uint8 view of the array memory, nothing is copied
+    buffer = export_buffer(obj.ravel(order=order).view(np.uint8))
+    if buffer is None:
+        return None
+    return cast(
+        bytes, _serialize((buffer, obj.dtype.str, obj.shape, order), to_bytes=True)
+    )
+
+
+def out_of_band_deserialize(
+    buffer: OutOfBandBuffer, dtype: str, shape: Tuple[int, ...], order: str
+) -> np.ndarray:
+    view = import_buffer(buffer)
+    np_array = np.frombuffer(view, dtype=np.dtype(dtype)).reshape(shape, order=order)
+    if view.readonly:
+        # keep handing out writable arrays, a single copy is still far cheaper
+        # than decoding the in band representation
+        np_array = np_array.copy(order=order)
+    return np_array
+
+
 def numpy_serialize(obj: np.ndarray) -> bytes:
+    out_of_band = out_of_band_serialize(obj)
+    if out_of_band is not None:
+        return out_of_band
     if obj.dtype.type != np.str_:
         return arrow_serialize(obj)
     else:
@@ -119,7 +161,9 @@ def numpy_serialize(obj: np.ndarray) -> bytes:
 
 def numpy_deserialize(buf: bytes) -> np.ndarray:
     deser = _deserialize(buf, from_bytes=True)
-    if isinstance(deser, tuple):
+    if isinstance(deser, tuple) and isinstance(deser[0], OutOfBandBuffer):
+        return out_of_band_deserialize(*deser)
+    elif isinstance(deser, tuple):
         return arrow_deserialize(*deser)
     elif isinstance(deser, np.ndarray):
         return numpyutf8toarray(deser)
@@ -1,5 +1,7 @@
 # stdlib
 from typing import Any
+from typing import List
+from typing import Optional
 
 # third party
 from capnp.lib.capnp import _DynamicStructBuilder
@@ -9,13 +11,16 @@ def _deserialize(
     blob: Any,
     from_proto: bool = True,
     from_bytes: bool = False,
+    buffers: Optional[List[Any]] = None,
+    verify_buffers: bool = True,
 ) -> Any:
     # relative
+    from .out_of_band import out_of_band_buffers
     from .recursive import rs_bytes2object
     from .recursive import rs_proto2object
 
     if (
-        (from_bytes and not isinstance(blob, bytes))
+        (from_bytes and not isinstance(blob, (bytes, bytearray, memoryview)))
         or (
             from_proto
             and not from_bytes
@@ -25,6 +30,10 @@ def _deserialize(
     ):
         raise TypeError("Wrong deserialization format.")
 
+    if buffers is not None:
+        with out_of_band_buffers(buffers, verify=verify_buffers):
+            return _deserialize(blob, from_proto=from_proto, from_bytes=from_bytes)
+
     if from_bytes:
         return rs_bytes2object(blob)
 
@@ -79,7 +79,10 @@ class CMPBase:
     def set_signature(self) -> None:
         pass
 
-    def build(self) -> None:
+    def build_children(self) -> None:
+        """Find the direct children of this node, without building them."""
+        if self.is_built:
+            return
         if self.obj is None:
             self.obj = import_from_path(self.absolute_path)
 
@@ -104,10 +107,22 @@ class CMPBase:
                         f"{self.absolute_path}.{attr_name}",
                     )
                 if child is not None:
-                    child.build()
                     self.children[attr_name] = child
+        self.is_built = True
+
+    def build(self) -> None:
+        """Build the whole subtree of this node."""
+        self.build_children()
+        # like build_children, only children which are attributes of the object
+        attr_names = getattr(self.obj, "__dict__", dict()).keys()
+        for attr_name, child in self.children.items():
+            if attr_name in attr_names and attr_name not in LIB_IGNORE_ATTRIBUTES:
+                child.build()
 
     def __getattr__(self, __name: str) -> Any:
+        if __name.startswith("__") or "is_built" not in self.__dict__:
+            raise AttributeError(__name)
+        self.build_children()
         if __name in self.children:
             return self.children[__name]
         else:
@@ -195,6 +210,10 @@ class CMPBase:
             res += c.flatten()
         return res
 
+    def get_child(self, name: str) -> Optional["CMPBase"]:
+        self.build_children()
+        return self.children.get(name, None)
+
     @staticmethod
     def isfunction(obj: Callable) -> bool:
         return (
@@ -303,23 +322,48 @@ class CMPProperty(CMPBase):
 
 
 class CMPTree:
-    """root node of the Tree(s), with one child per library"""
+    """root node of the Tree(s), with one child per library
+
+    Nodes find their children on first access, `build` walks the whole tree.
+    """
 
     def __init__(self, children: List[CMPModule]):
         self.children = {c.path: c for c in children}
-
-    def build(self) -> Self:
         for c in self.children.values():
             c.absolute_path = c.path
-            c.build()
+        self.is_built = False
+
+    def build(self) -> Self:
+        if not self.is_built:
+            for c in self.children.values():
+                c.build()
+            self.is_built = True
         return self
 
     def flatten(self) -> Sequence[CMPBase]:
+        self.build()
         res = []
         for c in self.children.values():
             res += c.flatten()
         return res
 
+    def get(self, path: str) -> Optional[CMPBase]:
+        """The node of `path`, like "numpy.linalg.norm", building only the nodes
+        along the way."""
+        lib, *names = path.split(".")
+        node = self.children.get(lib, None)
+        try:
+            for name in names:
+                if node is None:
+                    return None
+                node = node.get_child(name)
+            if node is not None:
+                # imports the object and sets the signature of predefined nodes
+                node.build_children()
+        except Exception:  # nosec
+            return None
+        return node
+
     def __getattr__(self, _name: str) -> Any:
         if _name in self.children:
             return self.children[_name]
@@ -330,6 +374,7 @@ class CMPTree:
         return "\n".join([c.__repr__() for c in self.children.values()])
 
 
+# built lazily, see LibConfigRegistry
 action_execute_registry_libs = CMPTree(
     children=[
         CMPModule(
@@ -352,4 +397,4 @@ action_execute_registry_libs = CMPTree(
             ],
         ),
     ]
-).build()
+)
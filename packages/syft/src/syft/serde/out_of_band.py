@@ -0,0 +1,166 @@
+# stdlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+import hashlib
+import struct
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import cast
+
+# relative
+from .recursive import BytesLike
+from .serializable import serializable
+
+# payloads smaller than this are cheaper to copy into the capnp message
+OUT_OF_BAND_MIN_SIZE = 2**20
+
+# media type of a request body made of a capnp message followed by its buffers
+OUT_OF_BAND_CONTENT_TYPE = "application/x-syft-frames"
+
+# frame count followed by the size of every frame, all unsigned 64 bit big endian
+FRAME_HEADER_ITEM = struct.Struct(">Q")
+
+_out_of_band_buffers: ContextVar[Optional[List[BytesLike]]] = ContextVar(
+    "out_of_band_buffers", default=None
+)
+_verify_out_of_band_buffers: ContextVar[bool] = ContextVar(
+    "verify_out_of_band_buffers", default=True
+)
+
+
+@serializable(attrs=["index", "nbytes", "digest"])
+class OutOfBandBuffer:
+    """Placeholder for a buffer which travels as its own frame next to the message.
+
+    The digest is part of the (signed) message, which makes sure nobody can swap
+    the buffer without invalidating the signature of the message.
+    """
+
+    def __init__(self, index: int, nbytes: int, digest: bytes) -> None:
+        self.index = index
+        self.nbytes = nbytes
+        self.digest = digest
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(index={self.index}, nbytes={self.nbytes})"
+
+
+@contextmanager
+def out_of_band_buffers(
+    buffers: Optional[List[BytesLike]], verify: bool = True
+) -> Iterator[Optional[List[BytesLike]]]:
+    """Collect large buffers into (or read them from) `buffers` while (de)serializing,
+    None keeps everything in band.
+
+    `verify=False` skips checking the digests of buffers which come from a trusted
+    place, hashing a memory mapped buffer would read all of its pages.
+    """
+    token = _out_of_band_buffers.set(buffers)
+    verify_token = _verify_out_of_band_buffers.set(verify)
+    try:
+        yield buffers
+    finally:
+        _verify_out_of_band_buffers.reset(verify_token)
+        _out_of_band_buffers.reset(token)
+
+
+def wants_out_of_band(nbytes: int) -> bool:
+    """Whether a payload of `nbytes` would be moved out of band right now."""
+    return _out_of_band_buffers.get() is not None and nbytes >= OUT_OF_BAND_MIN_SIZE
+
+
+def export_buffer(data: BytesLike) -> Optional[OutOfBandBuffer]:
+    """Move `data` out of band, returns None if it has to be serialized in band."""
+    view = memoryview(data).cast("B")
+    if not wants_out_of_band(view.nbytes):
+        return None
+
+    buffers = cast(List[BytesLike], _out_of_band_buffers.get())
+
+    buffer = OutOfBandBuffer(
+        index=len(buffers),
+        nbytes=view.nbytes,
+        digest=hashlib.sha256(view).digest(),
+    )
+    buffers.append(view)
+    return buffer
+
+
+def import_buffer(buffer: OutOfBandBuffer) -> memoryview:
+    buffers = _out_of_band_buffers.get()
+    if buffers is None or buffer.index >= len(buffers):
+        raise ValueError(f"{buffer} was not sent along with the message")
+
+    view = memoryview(buffers[buffer.index]).cast("B")
+    if view.nbytes != buffer.nbytes or (
+        _verify_out_of_band_buffers.get()
+        and hashlib.sha256(view).digest() != buffer.digest
+    ):
+        raise ValueError(f"{buffer} does not match the buffer sent with the message")
+    return view
+
+
+class FramedBody:
+    """Request body made of several frames, streamed without joining them.
+
+    Implements `__len__` so that requests sends a Content-Length instead of
+    falling back to a chunked transfer encoding.
+    """
+
+    def __init__(self, frames: Sequence[BytesLike]) -> None:
+        self.frames = [memoryview(frame).cast("B") for frame in frames]
+        header = [FRAME_HEADER_ITEM.pack(len(self.frames))]
+        header.extend(FRAME_HEADER_ITEM.pack(frame.nbytes) for frame in self.frames)
+        self.header = b"".join(header)
+
+    def __len__(self) -> int:
+        return len(self.header) + sum(frame.nbytes for frame in self.frames)
+
+    def __iter__(self) -> Iterator[BytesLike]:
+        yield self.header
+        yield from self.frames
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[BytesLike]:
+        """The body in pieces of `chunk_size` bytes, the last one may be shorter.
+
+        Pieces inside a single frame are views of it, only pieces spanning several
+        frames are copied together.
+        """
+        pending = bytearray()
+        for frame in self:
+            view = memoryview(frame).cast("B")
+            offset = 0
+            if pending:
+                offset = min(chunk_size - len(pending), view.nbytes)
+                pending += view[:offset]
+                if len(pending) < chunk_size:
+                    continue
+                yield bytes(pending)
+                pending = bytearray()
+            while view.nbytes - offset >= chunk_size:
+                yield view[offset : offset + chunk_size]
+                offset += chunk_size
+            pending += view[offset:]
+        if pending:
+            yield bytes(pending)
+
+
+def unpack_frames(body: BytesLike) -> List[memoryview]:
+    """Split a FramedBody into views of its frames, nothing is copied."""
+    view = memoryview(body).cast("B")
+    item_size = FRAME_HEADER_ITEM.size
+    (frame_count,) = FRAME_HEADER_ITEM.unpack_from(view, 0)
+    offset = item_size * (frame_count + 1)
+    if offset > view.nbytes:
+        raise ValueError("Truncated frame header")
+
+    frames = []
+    for idx in range(frame_count):
+        (frame_size,) = FRAME_HEADER_ITEM.unpack_from(view, item_size * (idx + 1))
+        if offset + frame_size > view.nbytes:
+            raise ValueError(f"Frame {idx} is truncated")
+        frames.append(view[offset : offset + frame_size])
+        offset += frame_size
+    return frames
@@ -5,9 +5,13 @@ import sys
 import types
 from typing import Any
 from typing import Callable
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Set
+from typing import Tuple
 from typing import Type
 from typing import Union
 
@@ -15,17 +19,43 @@ from typing import Union
 from capnp.lib.capnp import _DynamicStructBuilder
 from pydantic import BaseModel
 
-# syft absolute
-import syft as sy
-
 # relative
 from ..util.util import get_fully_qualified_name
 from ..util.util import index_syft_by_module_name
 from .capnp import get_capnp_schema
 
 TYPE_BANK = {}
+SERDE_PLANS: Dict[str, "SerdePlan"] = {}
+TYPE_PLANS: Dict[type, "SerdePlan"] = {}
 
 recursive_scheme = get_capnp_schema("recursive_serde.capnp").RecursiveSerde  # type: ignore
+# superset of recursive_scheme, messages of either version can be read with it
+nested_recursive_scheme = get_capnp_schema(  # type: ignore
+    "recursive_serde.capnp"
+).NestedRecursiveSerde
+
+MAX_TRAVERSAL_LIMIT = 2**64 - 1
+CHUNK_SIZE = int(5.12e8)  # capnp max for a List(Data) field
+
+# anything chunk_bytes can split and combine_bytes can hand to a deserializer
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Wire formats understood by rs_proto2object. Version 1 serializes every field and
+# container element to its own bytes blob, version 2 writes nested objects, lists
+# and dicts straight into the parent message. Version 3 messages are encoded like
+# version 2, but peers may send large arrays as out of band buffer frames next to
+# the message. Hashing always uses version 1.
+SERDE_WIRE_VERSION_1 = 1
+SERDE_WIRE_VERSION_2 = 2
+SERDE_WIRE_VERSION_3 = 3
+HIGHEST_SERDE_WIRE_VERSION = SERDE_WIRE_VERSION_3
+# Stores write version 1 until they can migrate what they hold, so that the
+# previous release can still read a database after a rollback
+STORE_SERDE_WIRE_VERSION = SERDE_WIRE_VERSION_1
+
+# containers which can be written into the parent message in version 2
+ITERABLE_CONTAINER = "iterable"
+KV_CONTAINER = "kv"
 
 
 def get_types(cls: Type, keys: Optional[List[str]] = None) -> Optional[List[Type]]:
@@ -79,6 +109,118 @@ def check_fqn_alias(cls: Union[object, type]) -> Optional[tuple]:
     return None
 
 
+class SerdePlan:
+    """Serialization plan for one registered class.
+
+    Compiled once in `recursive_serde_register` so that the encoder and decoder
+    don't have to unpack the `TYPE_BANK` tuple, rebuild and sort the attribute
+    sets or resolve the class from its fully qualified name on every call.
+    """
+
+    __slots__ = (
+        "fqn",
+        "cls",
+        "nonrecursive",
+        "serialize",
+        "deserialize",
+        "container",
+        "exclude_attrs",
+        "serde_overrides",
+        "hash_exclude_attrs",
+        "fields",
+        "decode_transforms",
+        "is_user_class",
+        "_hash_fields",
+        "_class_type",
+    )
+
+    def __init__(
+        self,
+        fqn: str,
+        cls: type,
+        nonrecursive: bool,
+        serialize: Optional[Callable],
+        deserialize: Optional[Callable],
+        attributes: Optional[Set[str]],
+        exclude_attrs: List[str],
+        serde_overrides: Dict[str, Sequence[Callable]],
+        hash_exclude_attrs: List[str],
+        container: Optional[str] = None,
+    ) -> None:
+        self.fqn = fqn
+        self.cls = cls
+        self.nonrecursive = nonrecursive
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.container = container
+        self.exclude_attrs = exclude_attrs
+        self.serde_overrides = serde_overrides
+        # this is the class attribute itself, SyftHashableObject extends it at runtime
+        self.hash_exclude_attrs = hash_exclude_attrs
+        # classes without attrs fall back to __dict__ at serialization time
+        self.fields = (
+            self._bind_fields(set(attributes) - set(exclude_attrs))
+            if attributes is not None
+            else None
+        )
+        self.decode_transforms = {
+            attr_name: transforms[1]
+            for attr_name, transforms in serde_overrides.items()
+        }
+        # user classes can be reloaded, so they are resolved on every call
+        self.is_user_class = "syft.user" in fqn
+        self._hash_fields: Optional[Tuple[Tuple[str, Optional[Callable]], ...]] = None
+        self._class_type: Optional[type] = None
+
+    def _bind_fields(
+        self, attribute_names: Iterable[str]
+    ) -> Tuple[Tuple[str, Optional[Callable]], ...]:
+        return tuple(
+            (attr_name, self.serde_overrides[attr_name][0])
+            if attr_name in self.serde_overrides
+            else (attr_name, None)
+            for attr_name in sorted(attribute_names)
+        )
+
+    def fields_for(
+        self, obj: Any, for_hashing: bool = False
+    ) -> Tuple[Tuple[str, Optional[Callable]], ...]:
+        if self.fields is None:
+            attribute_names = set(obj.__dict__.keys()) - set(self.exclude_attrs)
+            if for_hashing:
+                attribute_names -= self._hash_exclude_set()
+            return self._bind_fields(attribute_names)
+
+        if not for_hashing:
+            return self.fields
+
+        if self._hash_fields is None:
+            hash_exclude_set = self._hash_exclude_set()
+            self._hash_fields = tuple(
+                field for field in self.fields if field[0] not in hash_exclude_set
+            )
+        return self._hash_fields
+
+    def _hash_exclude_set(self) -> Set[str]:
+        # relative
+        from ..types.syft_object import DYNAMIC_SYFT_ATTRIBUTES
+
+        return set(self.hash_exclude_attrs).union(set(DYNAMIC_SYFT_ATTRIBUTES))
+
+    def class_type(self) -> type:
+        if self._class_type is not None:
+            return self._class_type
+
+        class_type = resolve_class_type(self.fqn)
+        if class_type is type(None):
+            # yes this looks stupid but it works and the opposite breaks
+            class_type = self.cls
+
+        if not self.is_user_class:
+            self._class_type = class_type
+        return class_type
+
+
 def recursive_serde_register(
     cls: Union[object, type],
     serialize: Optional[Callable] = None,
@@ -87,6 +229,7 @@ def recursive_serde_register(
     exclude_attrs: Optional[List] = None,
     inherit_attrs: Optional[bool] = True,
     inheritable_attrs: Optional[bool] = True,
+    nested_container: Optional[str] = None,
 ) -> None:
     pydantic_fields = None
     base_attrs = None
@@ -151,183 +294,254 @@ def recursive_serde_register(
 
     TYPE_BANK[fqn] = serde_attributes
 
+    plan = SerdePlan(
+        fqn=fqn,
+        cls=cls,
+        nonrecursive=nonrecursive,
+        serialize=_serialize,
+        deserialize=_deserialize,
+        attributes=attributes,
+        exclude_attrs=exclude_attrs,
+        serde_overrides=serde_overrides,
+        hash_exclude_attrs=hash_exclude_attrs,
+        container=nested_container,
+    )
+
+    # a class re-registered under an existing fqn replaces the old one everywhere
+    previous_plan = SERDE_PLANS.get(fqn, None)
+    if previous_plan is not None and TYPE_PLANS.get(previous_plan.cls) is previous_plan:
+        del TYPE_PLANS[previous_plan.cls]
+
+    SERDE_PLANS[fqn] = plan
+    TYPE_PLANS[cls] = plan
+
     if isinstance(alias_fqn, tuple):
         for alias in alias_fqn:
             TYPE_BANK[alias] = serde_attributes
+            SERDE_PLANS[alias] = plan
 
 
 def chunk_bytes(
-    data: bytes, field_name: Union[str, int], builder: _DynamicStructBuilder
+    data: BytesLike, field_name: Union[str, int], builder: _DynamicStructBuilder
 ) -> None:
-    CHUNK_SIZE = int(5.12e8)  # capnp max for a List(Data) field
     list_size = len(data) // CHUNK_SIZE + 1
     data_lst = builder.init(field_name, list_size)
-    END_INDEX = CHUNK_SIZE
-    for idx in range(list_size):
-        START_INDEX = idx * CHUNK_SIZE
-        END_INDEX = min(START_INDEX + CHUNK_SIZE, len(data))
-        data_lst[idx] = data[START_INDEX:END_INDEX]
+    if list_size == 1:
+        # capnp only accepts bytes, everything else has to be copied once anyway
+        data_lst[0] = data if isinstance(data, bytes) else bytes(data)
+        return
+
+    # slice a view so that only the chunk currently handed to capnp is copied
+    with memoryview(data) as view:
+        for idx in range(list_size):
+            START_INDEX = idx * CHUNK_SIZE
+            END_INDEX = min(START_INDEX + CHUNK_SIZE, len(data))
+            data_lst[idx] = bytes(view[START_INDEX:END_INDEX])
+
+
+def combine_bytes(capnp_list: List[bytes]) -> BytesLike:
+    list_size = len(capnp_list)
+    if list_size == 0:
+        return b""
+    if list_size == 1:
+        # the reader already hands out a fresh bytes object, no need to copy it
+        return capnp_list[0]
+
+    # every chunk except the last one is exactly CHUNK_SIZE long, so the final
+    # size is known upfront and each chunk can be released after it is copied
+    last_chunk = capnp_list[list_size - 1]
+    buffer = bytearray(CHUNK_SIZE * (list_size - 1) + len(last_chunk))
+    with memoryview(buffer) as view:
+        offset = 0
+        for idx in range(list_size - 1):
+            chunk = capnp_list[idx]
+            if len(chunk) != CHUNK_SIZE:
+                raise ValueError(
+                    f"Invalid chunk of size {len(chunk)} at position {idx}, "
+                    f"expected {CHUNK_SIZE}"
+                )
+            view[offset : offset + CHUNK_SIZE] = chunk
+            offset += CHUNK_SIZE
+        view[offset:] = last_chunk
+    return buffer
+
+
+def get_serde_plan(obj: Any) -> SerdePlan:
+    plan = TYPE_PLANS.get(type(obj), None)
+    if plan is not None:
+        return plan
+
+    fqn = get_fully_qualified_name(obj)
+    if fqn not in SERDE_PLANS:
+        # third party
+        raise Exception(f"{fqn} not in TYPE_BANK")
+    return SERDE_PLANS[fqn]
 
 
-def combine_bytes(capnp_list: List[bytes]) -> bytes:
-    # TODO: make sure this doesn't copy, perhaps allocate a fixed size buffer
-    # and move the bytes into it as we go
-    bytes_value = b""
-    for value in capnp_list:
-        bytes_value += value
-    return bytes_value
+def resolve_class_type(fqn: str) -> type:
+    # clean this mess, Tudor
+    module_parts = fqn.split(".")
+    klass = module_parts.pop()
+    class_type: Type = type(None)
 
+    if klass != "NoneType":
+        try:
+            class_type = index_syft_by_module_name(fqn)  # type: ignore
+        except Exception:  # nosec
+            try:
+                class_type = getattr(sys.modules[".".join(module_parts)], klass)
+            except Exception:  # nosec
+                if "syft.user" in fqn:
+                    # relative
+                    from ..node.node import CODE_RELOADER
+
+                    for _, load_user_code in CODE_RELOADER.items():
+                        load_user_code()
+                try:
+                    class_type = getattr(sys.modules[".".join(module_parts)], klass)
+                except Exception:  # nosec
+                    pass
+    return class_type
 
-def rs_object2proto(self: Any, for_hashing: bool = False) -> _DynamicStructBuilder:
-    # relative
-    from ..types.syft_object import DYNAMIC_SYFT_ATTRIBUTES
 
-    is_type = False
-    if isinstance(self, type):
-        is_type = True
+def rs_object2proto(
+    self: Any,
+    for_hashing: bool = False,
+    wire_version: int = SERDE_WIRE_VERSION_1,
+    builder: Optional[_DynamicStructBuilder] = None,
+) -> _DynamicStructBuilder:
+    plan = get_serde_plan(self)
 
-    msg = recursive_scheme.new_message()
-    fqn = get_fully_qualified_name(self)
-    if fqn not in TYPE_BANK:
-        # third party
-        raise Exception(f"{fqn} not in TYPE_BANK")
+    # hashes have to stay stable across wire formats
+    if for_hashing:
+        wire_version = SERDE_WIRE_VERSION_1
 
-    msg.fullyQualifiedName = fqn
-    (
-        nonrecursive,
-        serialize,
-        deserialize,
-        attribute_list,
-        exclude_attrs_list,
-        serde_overrides,
-        hash_exclude_attrs,
-        cls,
-        attribute_types,
-    ) = TYPE_BANK[fqn]
+    if builder is not None:
+        msg = builder
+    elif wire_version >= SERDE_WIRE_VERSION_2:
+        msg = nested_recursive_scheme.new_message()
+    else:
+        msg = recursive_scheme.new_message()
+    msg.fullyQualifiedName = plan.fqn
 
-    if nonrecursive or is_type:
-        if serialize is None:
+    if wire_version >= SERDE_WIRE_VERSION_2:
+        msg.serdeVersion = SERDE_WIRE_VERSION_2
+        if plan.container is not None and not isinstance(self, type):
+            nested_container2proto(self, plan.container, msg)
+            return msg
+
+    if plan.nonrecursive or isinstance(self, type):
+        if plan.serialize is None:
             raise Exception(
                 f"Cant serialize {type(self)} nonrecursive without serialize."
             )
-        chunk_bytes(serialize(self), "nonrecursiveBlob", msg)
+        chunk_bytes(plan.serialize(self), "nonrecursiveBlob", msg)
         return msg
 
-    if attribute_list is None:
-        attribute_list = self.__dict__.keys()
+    fields = plan.fields_for(self, for_hashing=for_hashing)
 
-    hash_exclude_attrs_set = (
-        set(hash_exclude_attrs).union(set(DYNAMIC_SYFT_ATTRIBUTES))
-        if for_hashing
-        else set()
-    )
-    attribute_list = (
-        set(attribute_list) - set(exclude_attrs_list) - hash_exclude_attrs_set
-    )
-
-    msg.init("fieldsName", len(attribute_list))
-    msg.init("fieldsData", len(attribute_list))
+    msg.init("fieldsName", len(fields))
+    fields_name = msg.fieldsName
+    if wire_version >= SERDE_WIRE_VERSION_2:
+        fields_data = msg.init("fieldsNested", len(fields))
+    else:
+        fields_data = msg.init("fieldsData", len(fields))
 
-    for idx, attr_name in enumerate(sorted(attribute_list)):
-        if not hasattr(self, attr_name):
+    for idx, (attr_name, transform) in enumerate(fields):
+        try:
+            field_obj = getattr(self, attr_name)
+        except AttributeError:
             raise ValueError(
                 f"{attr_name} on {type(self)} does not exist, serialization aborted!"
             )
 
-        field_obj = getattr(self, attr_name)
-        transforms = serde_overrides.get(attr_name, None)
-
-        if transforms is not None:
-            field_obj = transforms[0](field_obj)
+        if transform is not None:
+            field_obj = transform(field_obj)
 
         if isinstance(field_obj, types.FunctionType):
             continue
 
-        serialized = sy.serialize(field_obj, to_bytes=True, for_hashing=for_hashing)
-        msg.fieldsName[idx] = attr_name
-        chunk_bytes(serialized, idx, msg.fieldsData)
+        fields_name[idx] = attr_name
+        if wire_version >= SERDE_WIRE_VERSION_2:
+            rs_object2proto(
+                field_obj, wire_version=wire_version, builder=fields_data[idx]
+            )
+        else:
+            serialized = rs_object2proto(field_obj, for_hashing=for_hashing).to_bytes()
+            chunk_bytes(serialized, idx, fields_data)
 
     return msg
 
 
-def rs_bytes2object(blob: bytes) -> Any:
-    MAX_TRAVERSAL_LIMIT = 2**64 - 1
+def nested_container2proto(
+    obj: Any, container: str, builder: _DynamicStructBuilder
+) -> None:
+    if container == KV_CONTAINER:
+        keys = builder.init("keysNested", len(obj))
+        values = builder.init("valuesNested", len(obj))
+        for idx, (k, v) in enumerate(obj.items()):
+            rs_object2proto(k, wire_version=SERDE_WIRE_VERSION_2, builder=keys[idx])
+            rs_object2proto(v, wire_version=SERDE_WIRE_VERSION_2, builder=values[idx])
+    else:
+        values = builder.init("valuesNested", len(obj))
+        for idx, v in enumerate(obj):
+            rs_object2proto(v, wire_version=SERDE_WIRE_VERSION_2, builder=values[idx])
 
-    with recursive_scheme.from_bytes(  # type: ignore
+
+def rs_bytes2object(blob: bytes) -> Any:
+    with nested_recursive_scheme.from_bytes(  # type: ignore
         blob, traversal_limit_in_words=MAX_TRAVERSAL_LIMIT
     ) as msg:
         return rs_proto2object(msg)
 
 
 def rs_proto2object(proto: _DynamicStructBuilder) -> Any:
-    # relative
-    from .deserialize import _deserialize
-
-    # clean this mess, Tudor
-    module_parts = proto.fullyQualifiedName.split(".")
-    klass = module_parts.pop()
-    class_type: Type = type(None)
-
-    if klass != "NoneType":
-        try:
-            class_type = index_syft_by_module_name(proto.fullyQualifiedName)  # type: ignore
-        except Exception:  # nosec
-            try:
-                class_type = getattr(sys.modules[".".join(module_parts)], klass)
-            except Exception:  # nosec
-                if "syft.user" in proto.fullyQualifiedName:
-                    # relative
-                    from ..node.node import CODE_RELOADER
-
-                    for _, load_user_code in CODE_RELOADER.items():
-                        load_user_code()
-                try:
-                    class_type = getattr(sys.modules[".".join(module_parts)], klass)
-                except Exception:  # nosec
-                    pass
+    fqn = proto.fullyQualifiedName
+    plan = SERDE_PLANS.get(fqn, None)
+    if plan is None:
+        # make sure reloadable user code gets a chance to register itself
+        resolve_class_type(fqn)
+        plan = SERDE_PLANS.get(fqn, None)
+        if plan is None:
+            raise Exception(f"{fqn} not in TYPE_BANK")
+
+    try:
+        is_nested = proto.serdeVersion >= SERDE_WIRE_VERSION_2
+    except AttributeError:
+        # a version 1 builder handed to us directly
+        is_nested = False
+    if is_nested and plan.container is not None:
+        return nested_proto2container(proto, plan)
+
+    if plan.nonrecursive:
+        if plan.deserialize is None:
+            raise Exception(
+                f"Cant serialize {type(proto)} nonrecursive without serialize."
+            )
 
-    if proto.fullyQualifiedName not in TYPE_BANK:
-        raise Exception(f"{proto.fullyQualifiedName} not in TYPE_BANK")
+        return plan.deserialize(combine_bytes(proto.nonrecursiveBlob))
 
     # TODO: 🐉 sort this out, basically sometimes the syft.user classes are not in the
     # module name space in sub-processes or threads even though they are loaded on start
     # its possible that the uvicorn awsgi server is preloading a bunch of threads
     # however simply getting the class from the TYPE_BANK doesn't always work and
     # causes some errors so it seems like we want to get the local one where possible
-    (
-        nonrecursive,
-        serialize,
-        deserialize,
-        attribute_list,
-        exclude_attrs_list,
-        serde_overrides,
-        hash_exclude_attrs,
-        cls,
-        attribute_types,
-    ) = TYPE_BANK[proto.fullyQualifiedName]
-
-    if class_type == type(None):
-        # yes this looks stupid but it works and the opposite breaks
-        class_type = cls
-
-    if nonrecursive:
-        if deserialize is None:
-            raise Exception(
-                f"Cant serialize {type(proto)} nonrecursive without serialize."
-            )
-
-        return deserialize(combine_bytes(proto.nonrecursiveBlob))
+    class_type = plan.class_type()
+    decode_transforms = plan.decode_transforms
 
     kwargs = {}
 
-    for attr_name, attr_bytes_list in zip(proto.fieldsName, proto.fieldsData):
+    fields_data = proto.fieldsNested if is_nested else proto.fieldsData
+    for attr_name, attr_data in zip(proto.fieldsName, fields_data):
         if attr_name != "":
-            attr_bytes = combine_bytes(attr_bytes_list)
-            attr_value = _deserialize(attr_bytes, from_bytes=True)
-            transforms = serde_overrides.get(attr_name, None)
-
-            if transforms is not None:
-                attr_value = transforms[1](attr_value)
+            if is_nested:
+                attr_value = rs_proto2object(attr_data)
+            else:
+                attr_value = rs_bytes2object(combine_bytes(attr_data))
+            transform = decode_transforms.get(attr_name, None)
+
+            if transform is not None:
+                attr_value = transform(attr_value)
             kwargs[attr_name] = attr_value
 
     if hasattr(class_type, "serde_constructor"):
@@ -339,7 +553,7 @@ def rs_proto2object(proto: _DynamicStructBuilder) -> Any:
         # if we skip the __new__ flow of BaseModel we get the error
         # AttributeError: object has no attribute '__fields_set__'
 
-        if "syft.user" in proto.fullyQualifiedName:
+        if plan.is_user_class:
             # weird issues with pydantic and ForwardRef on user classes being inited
             # with custom state args / kwargs
             obj = class_type()
@@ -356,5 +570,13 @@ def rs_proto2object(proto: _DynamicStructBuilder) -> Any:
     return obj
 
 
+def nested_proto2container(proto: _DynamicStructBuilder, plan: SerdePlan) -> Any:
+    values = [rs_proto2object(value) for value in proto.valuesNested]
+    if plan.container == KV_CONTAINER:
+        keys = [rs_proto2object(key) for key in proto.keysNested]
+        return plan.cls(list(zip(keys, values)))
+    return plan.cls(values)
+
+
 # how else do you import a relative file to execute it?
 NOTHING = None
@@ -21,6 +21,10 @@ import weakref
 
 # relative
 from .capnp import get_capnp_schema
+from .recursive import BytesLike
+from .recursive import ITERABLE_CONTAINER
+from .recursive import KV_CONTAINER
+from .recursive import MAX_TRAVERSAL_LIMIT
 from .recursive import chunk_bytes
 from .recursive import combine_bytes
 from .recursive import recursive_serde_register
@@ -51,11 +55,10 @@ def serialize_iterable(iterable: Collection) -> bytes:
     return message.to_bytes()
 
 
-def deserialize_iterable(iterable_type: type, blob: bytes) -> Collection:
+def deserialize_iterable(iterable_type: type, blob: BytesLike) -> Collection:
     # relative
     from .deserialize import _deserialize
 
-    MAX_TRAVERSAL_LIMIT = 2**64 - 1
     values = []
 
     with iterable_schema.from_bytes(  # type: ignore
@@ -84,11 +87,10 @@ def serialize_kv(map: Mapping) -> bytes:
     return message.to_bytes()
 
 
-def get_deserialized_kv_pairs(blob: bytes) -> List[Any]:
+def get_deserialized_kv_pairs(blob: BytesLike) -> List[Any]:
     # relative
     from .deserialize import _deserialize
 
-    MAX_TRAVERSAL_LIMIT = 2**64 - 1
     pairs = []
 
     with kv_iterable_schema.from_bytes(  # type: ignore
@@ -179,7 +181,8 @@ recursive_serde_register(
     deserialize=lambda x: float.fromhex(x.decode()),
 )
 
-recursive_serde_register(bytes, serialize=lambda x: x, deserialize=lambda x: x)
+# bytes(x) is a no-op for bytes, but objects above CHUNK_SIZE arrive as a bytearray
+recursive_serde_register(bytes, serialize=lambda x: x, deserialize=bytes)
 
 recursive_serde_register(
     str, serialize=lambda x: x.encode(), deserialize=lambda x: x.decode()
@@ -189,16 +192,21 @@ recursive_serde_register(
     list,
     serialize=serialize_iterable,
     deserialize=functools.partial(deserialize_iterable, list),
+    nested_container=ITERABLE_CONTAINER,
 )
 
 recursive_serde_register(
     tuple,
     serialize=serialize_iterable,
     deserialize=functools.partial(deserialize_iterable, tuple),
+    nested_container=ITERABLE_CONTAINER,
 )
 
 recursive_serde_register(
-    dict, serialize=serialize_kv, deserialize=functools.partial(deserialize_kv, dict)
+    dict,
+    serialize=serialize_kv,
+    deserialize=functools.partial(deserialize_kv, dict),
+    nested_container=KV_CONTAINER,
 )
 
 recursive_serde_register(
@@ -211,6 +219,7 @@ recursive_serde_register(
     OrderedDict,
     serialize=serialize_kv,
     deserialize=functools.partial(deserialize_kv, OrderedDict),
+    nested_container=KV_CONTAINER,
 )
 
 recursive_serde_register(
@@ -227,18 +236,21 @@ recursive_serde_register(
     set,
     serialize=serialize_iterable,
     deserialize=functools.partial(deserialize_iterable, set),
+    nested_container=ITERABLE_CONTAINER,
 )
 
 recursive_serde_register(
     weakref.WeakSet,
     serialize=serialize_iterable,
     deserialize=functools.partial(deserialize_iterable, weakref.WeakSet),
+    nested_container=ITERABLE_CONTAINER,
 )
 
 recursive_serde_register(
     frozenset,
     serialize=serialize_iterable,
     deserialize=functools.partial(deserialize_iterable, frozenset),
+    nested_container=ITERABLE_CONTAINER,
 )
 
 recursive_serde_register(
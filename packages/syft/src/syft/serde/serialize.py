@@ -1,5 +1,10 @@
 # stdlib
 from typing import Any
+from typing import List
+from typing import Optional
+
+# relative
+from .recursive import SERDE_WIRE_VERSION_1
 
 
 def _serialize(
@@ -7,11 +12,22 @@ def _serialize(
     to_proto: bool = True,
     to_bytes: bool = False,
     for_hashing: bool = False,
+    wire_version: int = SERDE_WIRE_VERSION_1,
+    buffers: Optional[List[Any]] = None,
 ) -> Any:
     # relative
+    from .out_of_band import out_of_band_buffers
     from .recursive import rs_object2proto
 
-    proto = rs_object2proto(obj, for_hashing=for_hashing)
+    # large arrays are appended to `buffers` instead of being copied into the
+    # message, hashes always need the whole payload in band
+    if buffers is not None or for_hashing:
+        with out_of_band_buffers(None if for_hashing else buffers):
+            proto = rs_object2proto(
+                obj, for_hashing=for_hashing, wire_version=wire_version
+            )
+    else:
+        proto = rs_object2proto(obj, for_hashing=for_hashing, wire_version=wire_version)
 
     if to_bytes:
         return proto.to_bytes()
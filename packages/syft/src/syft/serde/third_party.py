@@ -27,6 +27,10 @@ import zmq.green as zmq
 
 # relative
 from .deserialize import _deserialize as deserialize
+from .out_of_band import OutOfBandBuffer
+from .out_of_band import export_buffer
+from .out_of_band import import_buffer
+from .out_of_band import wants_out_of_band
 from .recursive_primitives import recursive_serde_register
 from .recursive_primitives import recursive_serde_register_type
 from .serialize import _serialize as serialize
@@ -58,8 +62,20 @@ recursive_serde_register(cls=TypeError)
 recursive_serde_register_type(Collection)
 
 
+PARQUET_MAGIC = b"PAR1"
+
+
 def serialize_dataframe(df: DataFrame) -> bytes:
     table = pa.Table.from_pandas(df)
+    if wants_out_of_band(table.nbytes):
+        # an arrow stream can be read straight from the buffer it arrives in
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        buffer = export_buffer(sink.getvalue())
+        if buffer is not None:
+            return serialize(buffer, to_bytes=True)
+
     sink = pa.BufferOutputStream()
     # 🟡 TODO 37: Should we warn about this?
     parquet_args = {
@@ -73,6 +89,11 @@ def serialize_dataframe(df: DataFrame) -> bytes:
 
 
 def deserialize_dataframe(buf: bytes) -> DataFrame:
+    if buf[: len(PARQUET_MAGIC)] != PARQUET_MAGIC:
+        buffer: OutOfBandBuffer = deserialize(buf, from_bytes=True)
+        with pa.ipc.open_stream(pa.py_buffer(import_buffer(buffer))) as reader:
+            return reader.read_all().to_pandas()
+
     reader = pa.BufferReader(buf)
     numpy_bytes = reader.read_buffer()
     result = pq.read_table(numpy_bytes)
@@ -88,14 +109,21 @@ recursive_serde_register(
 )
 
 
+def serialize_series(series: Series) -> bytes:
+    if wants_out_of_band(series.memory_usage(index=True, deep=False)):
+        return serialize(DataFrame(series), to_bytes=True)
+    return serialize(DataFrame(series).to_dict(), to_bytes=True)
+
+
 def deserialize_series(blob: bytes) -> Series:
-    df = DataFrame.from_dict(deserialize(blob, from_bytes=True))
+    deser = deserialize(blob, from_bytes=True)
+    df = deser if isinstance(deser, DataFrame) else DataFrame.from_dict(deser)
     return df[df.columns[0]]
 
 
 recursive_serde_register(
     Series,
-    serialize=lambda x: serialize(DataFrame(x).to_dict(), to_bytes=True),
+    serialize=serialize_series,
     deserialize=deserialize_series,
 )
 
@@ -25,3 +25,20 @@ class ActionDataEmpty(SyftObject):
 
     def __str__(self) -> str:
         return f"{type(self).__name__} UID: {self.id} <{self.syft_internal_type}>"
+
+
+@serializable()
+class ActionDataBlob(ActionDataEmpty):
+    """Stands in for action data kept in a blob store, `digest` is its address."""
+
+    __canonical_name__ = "ActionDataBlob"
+    __version__ = SYFT_OBJECT_VERSION_1
+
+    digest: str
+    nbytes: int
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__} {self.digest} <{self.syft_internal_type}>"
+
+    def __str__(self) -> str:
+        return f"{type(self).__name__} {self.digest} <{self.syft_internal_type}>"
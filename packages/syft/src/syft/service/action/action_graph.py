@@ -3,14 +3,18 @@ from enum import Enum
 from functools import partial
 import os
 from pathlib import Path
+import struct
 import tempfile
 from typing import Any
+from typing import BinaryIO
 from typing import Callable
 from typing import Iterable
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Type
 from typing import Union
+import zlib
 
 # third party
 import matplotlib.pyplot as plt
@@ -206,15 +210,39 @@ class InMemoryStoreClientConfig(StoreClientConfig):
         return Path(self.path) / self.filename
 
 
-@serializable(without=["_lock"])
+# length and crc32 in front of every record of the mutation log
+LOG_RECORD_HEADER = struct.Struct("<II")
+# the log is compacted into a snapshot once it has at least this many records and
+# more records than the graph has nodes and edges, keeping writes O(1) amortized
+COMPACT_MIN_LOG_RECORDS = 1000
+
+
+@serializable(without=["_lock", "_log_file"])
 class NetworkXBackingStore(BaseGraphStore):
+    """NetworkX graph persisted as a snapshot plus an append-only mutation log.
+
+    Every change appends one record to `<file_path>.log`, `save` writes a new
+    snapshot and empties the log. Loading replays the log over the snapshot, a
+    record cut short by a crash is dropped.
+    """
+
     def __init__(self, store_config: StoreConfig, reset: bool = False) -> None:
         self.path_str = store_config.client_config.file_path.as_posix()
-
-        if not reset and os.path.exists(self.path_str):
-            self._db = self._load_from_path(self.path_str)
-        else:
+        self.log_path_str = f"{self.path_str}.log"
+        self._log_file: Optional[BinaryIO] = None
+        self.log_records = 0
+
+        if reset:
+            for path in (self.path_str, self.log_path_str):
+                if os.path.exists(path):
+                    os.remove(path)
             self._db = nx.DiGraph()
+        else:
+            if os.path.exists(self.path_str):
+                self._db = self._load_from_path(self.path_str)
+            else:
+                self._db = nx.DiGraph()
+            self.log_records = self._replay_log()
 
         self.locking_config = store_config.locking_config
         self._lock = None
@@ -246,26 +274,22 @@ class NetworkXBackingStore(BaseGraphStore):
         self._thread_safe_cbk(self._set, uid=uid, data=data)
 
     def _set(self, uid: UID, data: Any) -> None:
-        if self.exists(uid=uid):
-            self.update(uid=uid, data=data)
-        else:
-            self.db.add_node(uid, data=data)
-        self.save()
+        self._apply("set", uid, data)
+        self._append_to_log("set", uid, data)
 
     def get(self, uid: UID) -> Any:
         node_data = self.db.nodes.get(uid)
         return node_data.get("data")
 
     def exists(self, uid: Any) -> bool:
-        return uid in self.nodes()
+        return uid in self.db
 
     def delete(self, uid: UID) -> None:
         self._thread_safe_cbk(self._delete, uid=uid)
 
     def _delete(self, uid: UID) -> None:
-        if self.exists(uid=uid):
-            self.db.remove_node(uid)
-        self.save()
+        if self._apply("delete", uid):
+            self._append_to_log("delete", uid)
 
     def find_neighbors(self, uid: UID) -> Optional[Iterable]:
         if self.exists(uid=uid):
@@ -276,23 +300,94 @@ class NetworkXBackingStore(BaseGraphStore):
         self._thread_safe_cbk(self._update, uid=uid, data=data)
 
     def _update(self, uid: UID, data: Any) -> None:
-        if self.exists(uid=uid):
-            self.db.nodes[uid]["data"] = data
-        self.save()
+        if self._apply("update", uid, data):
+            self._append_to_log("update", uid, data)
 
     def add_edge(self, parent: Any, child: Any) -> None:
         self._thread_safe_cbk(self._add_edge, parent=parent, child=child)
 
     def _add_edge(self, parent: Any, child: Any) -> None:
-        self.db.add_edge(parent, child)
-        self.save()
+        self._apply("add_edge", parent, child)
+        self._append_to_log("add_edge", parent, child)
 
     def remove_edge(self, parent: Any, child: Any) -> None:
         self._thread_safe_cbk(self._remove_edge, parent=parent, child=child)
 
     def _remove_edge(self, parent: Any, child: Any) -> None:
         self.db.remove_edge(parent, child)
-        self.save()
+        self._append_to_log("remove_edge", parent, child)
+
+    def _apply(self, op: str, *args: Any) -> bool:
+        """Apply a logged change to the graph, False if it changed nothing."""
+        if op == "set":
+            uid, data = args
+            if self.exists(uid=uid):
+                self.db.nodes[uid]["data"] = data
+            else:
+                self.db.add_node(uid, data=data)
+        elif op == "update":
+            uid, data = args
+            if not self.exists(uid=uid):
+                return False
+            self.db.nodes[uid]["data"] = data
+        elif op == "delete":
+            (uid,) = args
+            if not self.exists(uid=uid):
+                return False
+            self.db.remove_node(uid)
+        elif op == "add_edge":
+            self.db.add_edge(*args)
+        elif op == "remove_edge":
+            if not self.db.has_edge(*args):
+                return False
+            self.db.remove_edge(*args)
+        else:
+            raise ValueError(f"Unknown action graph log record: {op}")
+        return True
+
+    def _append_to_log(self, op: str, *args: Any) -> None:
+        record = _serialize((op, list(args)), to_bytes=True)
+        if getattr(self, "_log_file", None) is None:
+            self._log_file = open(self.log_path_str, "ab")
+        self._log_file.write(
+            LOG_RECORD_HEADER.pack(len(record), zlib.crc32(record)) + record
+        )
+        self._log_file.flush()
+
+        self.log_records += 1
+        if self.log_records >= max(
+            COMPACT_MIN_LOG_RECORDS,
+            self.db.number_of_nodes() + self.db.number_of_edges(),
+        ):
+            self.save()
+
+    def _read_log(self) -> Tuple[List[Tuple[str, List[Any]]], int]:
+        """The records of the log and the size of its intact part."""
+        if not os.path.exists(self.log_path_str):
+            return [], 0
+        with open(self.log_path_str, "rb") as f:
+            log = f.read()
+
+        records = []
+        offset = 0
+        while offset + LOG_RECORD_HEADER.size <= len(log):
+            size, crc = LOG_RECORD_HEADER.unpack_from(log, offset)
+            start = offset + LOG_RECORD_HEADER.size
+            record = log[start : start + size]
+            if len(record) < size or zlib.crc32(record) != crc:
+                break
+            records.append(_deserialize(blob=record, from_bytes=True))
+            offset = start + size
+        return records, offset
+
+    def _replay_log(self) -> int:
+        records, intact_size = self._read_log()
+        for op, args in records:
+            self._apply(op, *args)
+        if os.path.exists(self.log_path_str):
+            # drop a record the last process didn't finish writing
+            os.truncate(self.log_path_str, intact_size)
+        return len(records)
 
     def visualize(self, seed: int = 3113794652, figsize=(20, 10)) -> None:
         plt.figure(figsize=figsize)
@@ -316,9 +411,20 @@ class NetworkXBackingStore(BaseGraphStore):
         return parent in parents
 
     def save(self) -> None:
+        """Write a snapshot of the whole graph and start a new log."""
         bytes = _serialize(self.db, to_bytes=True)
-        with open(self.path_str, "wb") as f:
+        # a crash while writing leaves the previous snapshot and log in place
+        tmp_path = f"{self.path_str}.tmp"
+        with open(tmp_path, "wb") as f:
             f.write(bytes)
+        os.replace(tmp_path, self.path_str)
+
+        # replaying the old log over the new snapshot ends in the same graph, in
+        # case we crash before it is emptied
+        if getattr(self, "_log_file", None) is not None:
+            self._log_file.close()
+        self._log_file = open(self.log_path_str, "wb")
+        self.log_records = 0
 
     def _filter_nodes_by(self, uid: UID, qks: QueryKeys) -> bool:
         node_data = self.db.nodes[uid]["data"]
@@ -25,6 +25,7 @@ from result import Result
 from typing_extensions import Self
 
 # relative
+from ...client.api import PendingAPICall
 from ...client.api import SyftAPI
 from ...client.client import SyftClient
 from ...serde.serializable import serializable
@@ -330,7 +331,12 @@ def send_action_side_effect(
 
         action_result = context.obj.syft_execute_action(context.action, sync=True)
 
-        if not isinstance(action_result, ActionObject):
+        if isinstance(action_result, PendingAPICall):
+            # inside a batch the result is only created once the batch is sent,
+            # but it is stored under the id of the action
+            context.node_uid = context.obj.syft_node_uid
+            context.result_id = context.action.result_id
+        elif not isinstance(action_result, ActionObject):
             raise RuntimeError(f"Got back unexpected response : {action_result}")
         else:
             context.node_uid = action_result.syft_node_uid
@@ -737,12 +743,14 @@ class ActionObject(SyftObject):
         """Get the object from a Syft Client"""
         # relative
         from ...client.api import APIRegistry
+        from .action_transfer import download_action_object
 
         api = APIRegistry.api_for(
             node_uid=self.syft_node_location,
             user_verify_key=self.syft_client_verify_key,
         )
-        res = api.services.action.get(self.id)
+        # large results are fetched in chunks
+        res = download_action_object(api, self.id)
 
         if not isinstance(res, ActionObject):
             return SyftError(message=f"{res}")
@@ -12,7 +12,9 @@ from result import Ok
 from result import Result
 
 # relative
+from ...serde.out_of_band import FramedBody
 from ...serde.serializable import serializable
+from ...serde.serialize import _serialize
 from ...types.twin_object import TwinObject
 from ...types.uid import UID
 from ..code.user_code import UserCode
@@ -27,6 +29,7 @@ from ..service import UserLibConfigRegistry
 from ..service import service_method
 from ..user.user_roles import GUEST_ROLE_LEVEL
 from ..warnings import HighSideCRUDWarning
+from .action_data_empty import ActionDataBlob
 from .action_object import Action
 from .action_object import ActionObject
 from .action_object import ActionObjectPointer
@@ -37,6 +40,9 @@ from .action_permissions import ActionObjectPermission
 from .action_permissions import ActionObjectREAD
 from .action_permissions import ActionPermission
 from .action_store import ActionStore
+from .action_transfer import TRANSFER_CHUNK_SIZE
+from .action_transfer import TransferInfo
+from .action_transfer import TransferStaging
 from .action_types import action_type_for_type
 from .numpy import NumpyArrayObject
 from .pandas import PandasDataFrameObject  # noqa: F401
@@ -47,6 +53,7 @@ from .pandas import PandasSeriesObject  # noqa: F401
 class ActionService(AbstractService):
     def __init__(self, store: ActionStore) -> None:
         self.store = store
+        self.staging = TransferStaging()
 
     @service_method(path="action.np_array", name="np_array")
     def np_array(self, context: AuthedServiceContext, data: Any) -> Any:
@@ -110,16 +117,145 @@ class ActionService(AbstractService):
         """Get an object from the action store"""
         return self._get(context, uid, twin_mode)
 
+    @service_method(
+        path="action.lib_endpoints", name="lib_endpoints", roles=GUEST_ROLE_LEVEL
+    )
+    def lib_endpoints(self, context: AuthedServiceContext) -> Dict[str, Any]:
+        """The lib endpoints of the user, which are left out of the api and fetched
+        the first time the client uses a lib"""
+        # relative
+        from ...client.api import SyftAPI
+
+        return SyftAPI.lib_endpoints_for(context.credentials)
+
+    @service_method(
+        path="action.start_upload", name="start_upload", roles=GUEST_ROLE_LEVEL
+    )
+    def start_upload(
+        self,
+        context: AuthedServiceContext,
+        nbytes: int,
+        chunk_size: int = TRANSFER_CHUNK_SIZE,
+    ) -> Result[TransferInfo, str]:
+        """Start a chunked upload of a serialized action object of `nbytes`"""
+        return self.staging.start_upload(context.credentials, nbytes, chunk_size)
+
+    @service_method(
+        path="action.upload_status", name="upload_status", roles=GUEST_ROLE_LEVEL
+    )
+    def upload_status(
+        self, context: AuthedServiceContext, transfer_id: UID
+    ) -> Result[TransferInfo, str]:
+        """The chunks of an upload the node already has"""
+        return self.staging.upload_status(context.credentials, transfer_id)
+
+    @service_method(
+        path="action.upload_chunk", name="upload_chunk", roles=GUEST_ROLE_LEVEL
+    )
+    def upload_chunk(
+        self,
+        context: AuthedServiceContext,
+        transfer_id: UID,
+        index: int,
+        data: bytes,
+        digest: str,
+    ) -> Result[int, str]:
+        """Stage chunk `index` of an upload, `digest` is the sha256 of `data`"""
+        return self.staging.write_chunk(
+            context.credentials, transfer_id, index, data, digest
+        )
+
+    @service_method(
+        path="action.commit_upload",
+        name="commit_upload",
+        roles=GUEST_ROLE_LEVEL,
+        warning=HighSideCRUDWarning(confirmation=True),
+    )
+    def commit_upload(
+        self, context: AuthedServiceContext, transfer_id: UID
+    ) -> Result[ActionObject, str]:
+        """Save the uploaded object to the action store, like action.set"""
+        result = self.staging.assemble(context.credentials, transfer_id)
+        if result.is_err():
+            return result
+        action_object = result.ok()
+        if not isinstance(action_object, (ActionObject, TwinObject)):
+            return Err(f"Uploaded {type(action_object)} is not an action object")
+        return self.set(context, action_object)
+
+    @service_method(
+        path="action.start_download", name="start_download", roles=GUEST_ROLE_LEVEL
+    )
+    def start_download(
+        self,
+        context: AuthedServiceContext,
+        uid: UID,
+        twin_mode: TwinMode = TwinMode.PRIVATE,
+        chunk_size: int = TRANSFER_CHUNK_SIZE,
+    ) -> Result[Union[ActionObject, TransferInfo], str]:
+        """Get an object like action.get, objects larger than `chunk_size` are
+        staged for a chunked download instead"""
+        result = self._get(context, uid, twin_mode, blob_links=True)
+        if result.is_err():
+            return result
+        obj = result.ok()
+
+        link = obj.syft_action_data if isinstance(obj, ActionObject) else None
+        if isinstance(link, ActionDataBlob):
+            # sized by what was stored, large payloads are sent as their blob
+            if link.nbytes <= chunk_size:
+                return Ok(self.store.load_payloads(obj))
+            chunks = self.store.blob_store.iter_chunks(link.digest, chunk_size)
+            return self.staging.start_download(
+                context.credentials, link.nbytes, chunks, chunk_size, obj=obj
+            )
+
+        # inline payloads are small unless there is no blob store to keep them
+        obj = self.store.load_payloads(obj)
+        buffers: List[Any] = []
+        message = _serialize(obj, to_bytes=True, buffers=buffers)
+        body = FramedBody([message, *buffers])
+        if len(body) <= chunk_size:
+            return Ok(obj)
+        return self.staging.start_download(
+            context.credentials, len(body), body.iter_chunks(chunk_size), chunk_size
+        )
+
+    @service_method(
+        path="action.download_chunk", name="download_chunk", roles=GUEST_ROLE_LEVEL
+    )
+    def download_chunk(
+        self, context: AuthedServiceContext, transfer_id: UID, index: int
+    ) -> Result[bytes, str]:
+        """Chunk `index` of a download"""
+        return self.staging.read_chunk(context.credentials, transfer_id, index)
+
+    @service_method(
+        path="action.finish_transfer", name="finish_transfer", roles=GUEST_ROLE_LEVEL
+    )
+    def finish_transfer(
+        self, context: AuthedServiceContext, transfer_id: UID
+    ) -> Result[SyftSuccess, str]:
+        """Remove the staged chunks of an upload or download"""
+        result = self.staging.finish(context.credentials, transfer_id)
+        if result.is_err():
+            return result
+        return Ok(SyftSuccess(message=f"Transfer {transfer_id} finished"))
+
     def _get(
         self,
         context: AuthedServiceContext,
         uid: UID,
         twin_mode: TwinMode = TwinMode.PRIVATE,
         has_permission=False,
+        blob_links: bool = False,
     ) -> Result[ActionObject, str]:
         """Get an object from the action store"""
         result = self.store.get(
-            uid=uid, credentials=context.credentials, has_permission=has_permission
+            uid=uid,
+            credentials=context.credentials,
+            has_permission=has_permission,
+            blob_links=blob_links,
         )
         if result.is_ok():
             obj = result.ok()
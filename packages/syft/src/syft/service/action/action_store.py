@@ -2,6 +2,9 @@
 from __future__ import annotations
 
 # stdlib
+from contextlib import contextmanager
+from typing import Any
+from typing import Iterator
 from typing import List
 from typing import Optional
 
@@ -13,15 +16,24 @@ from result import Result
 # relative
 from ...node.credentials import SyftSigningKey
 from ...node.credentials import SyftVerifyKey
+from ...serde.deserialize import _deserialize
+from ...serde.out_of_band import FramedBody
+from ...serde.out_of_band import unpack_frames
 from ...serde.serializable import serializable
+from ...serde.serialize import _serialize
 from ...store.dict_document_store import DictStoreConfig
 from ...store.document_store import BasePartitionSettings
 from ...store.document_store import StoreConfig
+from ...store.kv_document_store import CachedBackingStore
+from ...store.locks import SyftLock
 from ...types.syft_object import SyftObject
 from ...types.twin_object import TwinObject
 from ...types.uid import LineageID
 from ...types.uid import UID
 from ..response import SyftSuccess
+from .action_data_empty import ActionDataBlob
+from .action_data_empty import ActionDataEmpty
+from .action_object import ActionObject
 from .action_object import TwinMode
 from .action_object import is_action_data_empty
 from .action_permissions import ActionObjectEXECUTE
@@ -36,6 +48,14 @@ class ActionStore:
     pass
 
 
+def with_action_data(action_object: ActionObject, data: Any) -> ActionObject:
+    # ActionObject forwards copy() and friends to its data, build the copy by hand
+    fields = dict(object.__getattribute__(action_object, "__dict__"))
+    fields["syft_action_data"] = data
+    fields_set = set(object.__getattribute__(action_object, "__fields_set__"))
+    return type(action_object).construct(_fields_set=fields_set, **fields)
+
+
 @serializable()
 class KeyValueActionStore(ActionStore):
     """Generic Key-Value Action store.
@@ -55,6 +75,8 @@ class KeyValueActionStore(ActionStore):
         self.data = self.store_config.backing_store(
             "data", self.settings, self.store_config
         )
+        if self.store_config.cache_size > 0:
+            self.data = CachedBackingStore(self.data, self.store_config.cache_size)
         self.permissions = self.store_config.backing_store(
             "permissions", self.settings, self.store_config, ddtype=set
         )
@@ -62,9 +84,27 @@ class KeyValueActionStore(ActionStore):
             root_verify_key = SyftSigningKey.generate().verify_key
         self.root_verify_key = root_verify_key
 
+        self.blob_store = None
+        if self.store_config.blob_storage_config is not None:
+            self.blob_store = self.store_config.blob_storage_config.make_store()
+            # how many stored objects use a blob, it goes with the last of them
+            self.blob_refs = self.store_config.backing_store(
+                "blob_refs", self.settings, self.store_config
+            )
+            locking_config = self.store_config.locking_config.copy(
+                update={"lock_name": "Action_blob_refs"}
+            )
+            self.blob_refs_lock = SyftLock(locking_config)
+
     def get(
-        self, uid: UID, credentials: SyftVerifyKey, has_permission=False
+        self,
+        uid: UID,
+        credentials: SyftVerifyKey,
+        has_permission=False,
+        blob_links: bool = False,
     ) -> Result[SyftObject, str]:
+        """With `blob_links`, payloads kept in the blob store stay `ActionDataBlob`
+        links to it instead of being loaded."""
         uid = uid.id  # We only need the UID from LineageID or UID
 
         # if you get something you need READ permission
@@ -77,7 +117,7 @@ class KeyValueActionStore(ActionStore):
                     syft_object = self.data[uid]
                 else:
                     raise Exception(f"Unrecognized UID type: {type(uid)}")
-                return Ok(syft_object)
+                return Ok(self.load_payloads(syft_object, blob_links=blob_links))
             except Exception as e:
                 return Err(f"Could not find item with uid {uid}, {e}")
         return Err(f"Permission: {read_permission} denied")
@@ -92,12 +132,13 @@ class KeyValueActionStore(ActionStore):
             if uid in self.data:
                 obj = self.data[uid]
                 if isinstance(obj, TwinObject):
-                    obj = (
-                        obj.mock if not is_action_data_empty(obj.mock) else obj.private
-                    )
+                    # the private payload stays in the blob store
+                    mock = self._load_payload(obj.mock)
+                    obj = mock if not is_action_data_empty(mock) else obj.private
                     # we patch the real id on it so we can keep using the twin
                     obj.id = uid
                 else:
+                    obj = self.load_payloads(obj)
                     obj.syft_twin_type = TwinMode.NONE
                 obj.syft_point_to(node_uid)
                 return Ok(obj)
@@ -137,7 +178,15 @@ class KeyValueActionStore(ActionStore):
                 can_write = True if ownership_result.is_ok() else False
 
         if can_write:
-            self.data[uid] = syft_object
+            if self.blob_store is not None:
+                old_digests = (
+                    self._blob_digests(self.data[uid]) if uid in self.data else []
+                )
+                syft_object = self._store_payloads(syft_object)
+                self.data[uid] = syft_object
+                self._remove_blob_refs(old_digests)
+            else:
+                self.data[uid] = syft_object
             if has_result_read_permission:
                 if uid not in self.permissions:
                     # create default permissions
@@ -181,12 +230,138 @@ class KeyValueActionStore(ActionStore):
         owner_permission = ActionObjectOWNER(uid=uid, credentials=credentials)
         if self.has_permission(owner_permission):
             if uid in self.data:
+                digests = (
+                    self._blob_digests(self.data[uid])
+                    if self.blob_store is not None
+                    else []
+                )
                 del self.data[uid]
+                self._remove_blob_refs(digests)
             if uid in self.permissions:
                 del self.permissions[uid]
             return Ok(SyftSuccess(message=f"ID: {uid} deleted"))
         return Err(f"Permission: {owner_permission} denied")
 
+    def _store_payload(self, action_object: ActionObject) -> ActionObject:
+        data = action_object.syft_action_data
+        if isinstance(data, ActionDataEmpty):
+            return action_object
+
+        # large arrays stay separate frames, nothing is joined into one buffer
+        buffers: List[Any] = []
+        message = _serialize(data, to_bytes=True, buffers=buffers)
+        body = FramedBody([message, *buffers])
+        if len(body) < self.store_config.blob_storage_config.min_size:
+            return action_object
+
+        with self._locked_blob_refs():
+            blob = self.blob_store.write(body)
+            self._add_blob_refs([blob.digest])
+            # `write` keeps the bytes it finds, which a delete may have removed
+            # since. Counted, they are safe from deletes, so write them again
+            if not self.blob_store.exists(blob.digest):
+                self.blob_store.write(body)
+        link = ActionDataBlob(
+            syft_internal_type=type(data), digest=blob.digest, nbytes=blob.nbytes
+        )
+        return with_action_data(action_object, link)
+
+    def _store_payloads(self, syft_object: SyftObject) -> SyftObject:
+        """`syft_object` with its large payloads moved to the blob store, each
+        counted as used once more."""
+        if isinstance(syft_object, TwinObject):
+            return syft_object.copy(
+                update={
+                    "private_obj": self._store_payload(syft_object.private_obj),
+                    "mock_obj": self._store_payload(syft_object.mock_obj),
+                }
+            )
+        if isinstance(syft_object, ActionObject):
+            return self._store_payload(syft_object)
+        return syft_object
+
+    def _load_payload(
+        self, action_object: ActionObject, blob_links: bool = False
+    ) -> ActionObject:
+        link = action_object.syft_action_data
+        if not isinstance(link, ActionDataBlob):
+            return action_object
+        if blob_links:
+            # stored objects may be shared by a cache, readers get their own copy
+            return with_action_data(action_object, link)
+
+        message, *buffers = unpack_frames(self.blob_store.map(link.digest))
+        # arrays are views of the mapped blob, pages are read once they are used.
+        # The blob is named after the sha256 of its bytes already, hashing its
+        # buffers again would read all of them.
+        data = _deserialize(
+            message, from_bytes=True, buffers=buffers, verify_buffers=False
+        )
+        # stored objects may be shared by a cache, readers get their own copy
+        return with_action_data(action_object, data)
+
+    def load_payloads(
+        self, syft_object: SyftObject, blob_links: bool = False
+    ) -> SyftObject:
+        """`syft_object` with the payloads it links to in the blob store."""
+        if isinstance(syft_object, TwinObject):
+            return syft_object.copy(
+                update={
+                    "private_obj": self._load_payload(
+                        syft_object.private_obj, blob_links
+                    ),
+                    "mock_obj": self._load_payload(syft_object.mock_obj, blob_links),
+                }
+            )
+        if isinstance(syft_object, ActionObject):
+            return self._load_payload(syft_object, blob_links)
+        return syft_object
+
+    @staticmethod
+    def _blob_digests(syft_object: SyftObject) -> List[str]:
+        if isinstance(syft_object, TwinObject):
+            action_objects = [syft_object.private_obj, syft_object.mock_obj]
+        elif isinstance(syft_object, ActionObject):
+            action_objects = [syft_object]
+        else:
+            return []
+        return [
+            obj.syft_action_data.digest
+            for obj in action_objects
+            if isinstance(obj.syft_action_data, ActionDataBlob)
+        ]
+
+    @contextmanager
+    def _locked_blob_refs(self) -> Iterator[None]:
+        # counting a blob and writing or deleting it happen as one, so that a
+        # blob isn't deleted between being written and being counted
+        if not self.blob_refs_lock.acquire(blocking=True):
+            raise RuntimeError("Failed to acquire the lock of the blob references")
+        try:
+            yield
+        finally:
+            self.blob_refs_lock.release()
+
+    def _add_blob_refs(self, digests: List[str]) -> None:
+        for digest in digests:
+            count = self.blob_refs[digest] if digest in self.blob_refs else 0
+            self.blob_refs[digest] = count + 1
+
+    def _remove_blob_refs(self, digests: List[str]) -> None:
+        if not digests:
+            return
+        with self._locked_blob_refs():
+            for digest in digests:
+                if digest not in self.blob_refs:
+                    continue
+                count = self.blob_refs[digest] - 1
+                if count > 0:
+                    self.blob_refs[digest] = count
+                else:
+                    # no stored object uses these bytes anymore
+                    del self.blob_refs[digest]
+                    self.blob_store.delete(digest)
+
     def has_permission(self, permission: ActionObjectPermission) -> bool:
         if not isinstance(permission.permission, ActionPermission):
             raise Exception(f"ObjectPermission type: {permission.permission} not valid")
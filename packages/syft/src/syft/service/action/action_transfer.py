@@ -0,0 +1,412 @@
+# stdlib
+import functools
+import hashlib
+import json
+import mmap
+import operator
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import time
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Union
+import uuid
+
+# third party
+from result import Err
+from result import Ok
+from result import Result
+
+# relative
+from ...client.api import SyftAPI
+from ...node.credentials import SyftVerifyKey
+from ...serde.deserialize import _deserialize
+from ...serde.out_of_band import FramedBody
+from ...serde.out_of_band import unpack_frames
+from ...serde.recursive import BytesLike
+from ...serde.serializable import serializable
+from ...serde.serialize import _serialize
+from ...types.syft_object import SYFT_OBJECT_VERSION_1
+from ...types.syft_object import SyftObject
+from ...types.syft_object import attach_attribute_to_syft_object
+from ...types.uid import UID
+from ..response import SyftError
+from .action_object import TwinMode
+from .action_store import with_action_data
+
+# every chunk travels as one api call, small enough to be held in memory twice
+TRANSFER_CHUNK_SIZE = 8 * 1024 * 1024
+MAX_TRANSFER_CHUNK_SIZE = 64 * 1024 * 1024
+# transfers nobody touched for this long are removed when the next one starts
+TRANSFER_TTL = 24 * 60 * 60
+# a failed chunk is sent or fetched again this many times, waiting longer each time
+TRANSFER_MAX_RETRIES = 3
+TRANSFER_RETRY_DELAY = 0.5
+
+
+def default_transfer_path() -> Path:
+    return Path(tempfile.gettempdir()) / "syft_transfers"
+
+
+def chunk_digest(chunk: BytesLike) -> str:
+    return hashlib.sha256(chunk).hexdigest()
+
+
+@serializable()
+class TransferInfo(SyftObject):
+    """State of a chunked upload or download of an action object.
+
+    Uploads list the chunks the node already has in `received`, a client resumes
+    by sending the others. Downloads come with the sha256 of every chunk, and
+    with `obj` when the chunks are only its payload, as kept in the blob store.
+    """
+
+    __canonical_name__ = "TransferInfo"
+    __version__ = SYFT_OBJECT_VERSION_1
+
+    id: UID
+    nbytes: int
+    chunk_size: int
+    received: List[int] = []
+    chunk_digests: List[str] = []
+    obj: Any = None
+
+    @property
+    def chunk_count(self) -> int:
+        return max(1, -(-self.nbytes // self.chunk_size))
+
+    def chunk_nbytes(self, index: int) -> int:
+        if index == self.chunk_count - 1:
+            return self.nbytes - self.chunk_size * index
+        return self.chunk_size
+
+    @property
+    def missing(self) -> List[int]:
+        received = set(self.received)
+        return [idx for idx in range(self.chunk_count) if idx not in received]
+
+
+@serializable(attrs=["root"])
+class TransferStaging:
+    """Chunks of transfers as files of a local folder shared by the processes of
+    a node, `<path>/<transfer id>/`.
+
+    Only the user who started a transfer can send, read or finish its chunks.
+    """
+
+    def __init__(self, path: Union[str, Path, None] = None) -> None:
+        self.root = str(path) if path is not None else str(default_transfer_path())
+
+    @property
+    def path(self) -> Path:
+        return Path(self.root)
+
+    def dir_for(self, transfer_id: UID) -> Path:
+        return self.path / transfer_id.no_dash
+
+    def _start(
+        self, credentials: SyftVerifyKey, nbytes: int, chunk_size: int
+    ) -> Result[TransferInfo, str]:
+        if nbytes < 0:
+            return Err(f"Invalid transfer size {nbytes}")
+        if not 0 < chunk_size <= MAX_TRANSFER_CHUNK_SIZE:
+            return Err(
+                f"Chunk size must be between 1 and {MAX_TRANSFER_CHUNK_SIZE} bytes"
+            )
+        self.remove_stale()
+
+        info = TransferInfo(id=UID(), nbytes=nbytes, chunk_size=chunk_size)
+        transfer_dir = self.dir_for(info.id)
+        transfer_dir.mkdir(parents=True)
+        meta = {
+            "owner": str(credentials),
+            "nbytes": nbytes,
+            "chunk_size": chunk_size,
+        }
+        (transfer_dir / "meta.json").write_text(json.dumps(meta))
+        return Ok(info)
+
+    def _info(
+        self, credentials: SyftVerifyKey, transfer_id: UID
+    ) -> Result[TransferInfo, str]:
+        transfer_dir = self.dir_for(transfer_id)
+        try:
+            meta = json.loads((transfer_dir / "meta.json").read_text())
+        except FileNotFoundError:
+            return Err(f"No transfer with id {transfer_id}")
+        if meta["owner"] != str(credentials):
+            return Err(f"No transfer with id {transfer_id}")
+        # keep transfers in use from being removed as stale
+        os.utime(transfer_dir)
+        return Ok(
+            TransferInfo(
+                id=transfer_id,
+                nbytes=meta["nbytes"],
+                chunk_size=meta["chunk_size"],
+                chunk_digests=meta.get("chunk_digests", []),
+            )
+        )
+
+    def start_upload(
+        self, credentials: SyftVerifyKey, nbytes: int, chunk_size: int
+    ) -> Result[TransferInfo, str]:
+        return self._start(credentials, nbytes, chunk_size)
+
+    def upload_status(
+        self, credentials: SyftVerifyKey, transfer_id: UID
+    ) -> Result[TransferInfo, str]:
+        result = self._info(credentials, transfer_id)
+        if result.is_err():
+            return result
+        info = result.ok()
+        transfer_dir = self.dir_for(transfer_id)
+        info.received = sorted(
+            int(path.name) for path in transfer_dir.iterdir() if path.name.isdigit()
+        )
+        return Ok(info)
+
+    def write_chunk(
+        self,
+        credentials: SyftVerifyKey,
+        transfer_id: UID,
+        index: int,
+        data: bytes,
+        digest: str,
+    ) -> Result[int, str]:
+        result = self._info(credentials, transfer_id)
+        if result.is_err():
+            return result
+        info = result.ok()
+        if not 0 <= index < info.chunk_count:
+            return Err(f"Chunk {index} is out of range")
+        if len(data) != info.chunk_nbytes(index):
+            return Err(
+                f"Chunk {index} has {len(data)} bytes, expected "
+                f"{info.chunk_nbytes(index)}"
+            )
+        if chunk_digest(data) != digest:
+            return Err(f"Chunk {index} does not match its digest")
+
+        # chunks appear complete or not at all, a retry just writes them again
+        transfer_dir = self.dir_for(transfer_id)
+        tmp_path = transfer_dir / f"{index}.{uuid.uuid4().hex}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, transfer_dir / str(index))
+        return Ok(index)
+
+    def assemble(
+        self, credentials: SyftVerifyKey, transfer_id: UID
+    ) -> Result[Any, str]:
+        """Deserialize the uploaded object, once all of its chunks arrived."""
+        result = self.upload_status(credentials, transfer_id)
+        if result.is_err():
+            return result
+        info = result.ok()
+        if info.missing:
+            return Err(f"Chunks {info.missing} of transfer {transfer_id} are missing")
+
+        transfer_dir = self.dir_for(transfer_id)
+        body_path = transfer_dir / "body"
+        with open(body_path, "wb") as body:
+            for index in range(info.chunk_count):
+                with open(transfer_dir / str(index), "rb") as chunk:
+                    shutil.copyfileobj(chunk, body)
+        try:
+            with open(body_path, "rb") as body:
+                # arrays of the object are views of the body, pages are only read
+                # as they are used
+                buffer = mmap.mmap(body.fileno(), 0, access=mmap.ACCESS_COPY)
+            message, *buffers = unpack_frames(buffer)
+            obj = _deserialize(message, from_bytes=True, buffers=buffers)
+        except Exception as e:
+            return Err(f"Failed to load transfer {transfer_id}: {e}")
+        finally:
+            self.remove(transfer_id)
+        return Ok(obj)
+
+    def start_download(
+        self,
+        credentials: SyftVerifyKey,
+        nbytes: int,
+        chunks: Iterable[BytesLike],
+        chunk_size: int,
+        obj: Any = None,
+    ) -> Result[TransferInfo, str]:
+        """Stage `nbytes` coming as `chunks` of `chunk_size` bytes."""
+        result = self._start(credentials, nbytes, chunk_size)
+        if result.is_err():
+            return result
+        info = result.ok()
+        transfer_dir = self.dir_for(info.id)
+        written = 0
+        try:
+            with open(transfer_dir / "body", "wb") as f:
+                for chunk in chunks:
+                    info.chunk_digests.append(chunk_digest(chunk))
+                    written += f.write(chunk)
+        except Exception as e:
+            self.remove(info.id)
+            return Err(f"Failed to stage download {info.id}: {e}")
+        if written != nbytes:
+            self.remove(info.id)
+            return Err(f"Download {info.id} has {written} bytes, expected {nbytes}")
+
+        meta_path = transfer_dir / "meta.json"
+        meta = json.loads(meta_path.read_text())
+        meta["chunk_digests"] = info.chunk_digests
+        meta_path.write_text(json.dumps(meta))
+        info.obj = obj
+        return Ok(info)
+
+    def read_chunk(
+        self, credentials: SyftVerifyKey, transfer_id: UID, index: int
+    ) -> Result[bytes, str]:
+        result = self._info(credentials, transfer_id)
+        if result.is_err():
+            return result
+        info = result.ok()
+        if not 0 <= index < info.chunk_count:
+            return Err(f"Chunk {index} is out of range")
+        with open(self.dir_for(transfer_id) / "body", "rb") as f:
+            f.seek(index * info.chunk_size)
+            return Ok(f.read(info.chunk_nbytes(index)))
+
+    def finish(self, credentials: SyftVerifyKey, transfer_id: UID) -> Result[UID, str]:
+        result = self._info(credentials, transfer_id)
+        if result.is_err():
+            return result
+        self.remove(transfer_id)
+        return Ok(transfer_id)
+
+    def remove(self, transfer_id: UID) -> None:
+        shutil.rmtree(self.dir_for(transfer_id), ignore_errors=True)
+
+    def remove_stale(self) -> None:
+        if not self.path.exists():
+            return
+        deadline = time.time() - TRANSFER_TTL
+        for transfer_dir in self.path.iterdir():
+            try:
+                if transfer_dir.stat().st_mtime < deadline:
+                    shutil.rmtree(transfer_dir, ignore_errors=True)
+            except FileNotFoundError:
+                # removed by another process
+                continue
+
+
+def is_chunk(data: Any, digest: str) -> bool:
+    return isinstance(data, bytes) and chunk_digest(data) == digest
+
+
+def call_with_retries(
+    endpoint: Callable, *args: Any, is_valid: Callable[[Any], bool]
+) -> Any:
+    result = None
+    for attempt in range(TRANSFER_MAX_RETRIES + 1):
+        if attempt > 0:
+            time.sleep(TRANSFER_RETRY_DELAY * attempt)
+        try:
+            result = endpoint(*args)
+        except Exception as e:
+            result = SyftError(message=str(e))
+        if is_valid(result):
+            break
+    return result
+
+
+def upload_action_object(
+    api: SyftAPI,
+    action_object: Any,
+    chunk_size: int = TRANSFER_CHUNK_SIZE,
+    transfer_id: Optional[UID] = None,
+) -> Any:
+    """Save `action_object` like `action.set`, sending it in chunks of
+    `chunk_size` if it is larger than that.
+
+    Failed chunks are retried, an upload which still fails can be resumed by
+    passing the same object with the `transfer_id` of the error message.
+    """
+    buffers: List[Any] = []
+    message = _serialize(action_object, to_bytes=True, buffers=buffers)
+    body = FramedBody([message, *buffers])
+
+    if transfer_id is not None:
+        info = api.services.action.upload_status(transfer_id)
+    elif len(body) <= chunk_size:
+        return api.services.action.set(action_object)
+    else:
+        info = api.services.action.start_upload(len(body), chunk_size)
+    if not isinstance(info, TransferInfo):
+        return SyftError(message=f"Failed to start the upload: {info}")
+    if info.nbytes != len(body):
+        return SyftError(message=f"Transfer {info.id} is for another object")
+
+    missing = set(info.missing)
+    for index, chunk in enumerate(body.iter_chunks(info.chunk_size)):
+        if index not in missing:
+            continue
+        data = bytes(chunk)
+        result = call_with_retries(
+            api.services.action.upload_chunk,
+            info.id,
+            index,
+            data,
+            chunk_digest(data),
+            is_valid=functools.partial(operator.eq, index),
+        )
+        if result != index:
+            return SyftError(
+                message=f"Failed to upload chunk {index}: {result}. "
+                f"Resume the upload with transfer_id={info.id}"
+            )
+    return api.services.action.commit_upload(info.id)
+
+
+def download_action_object(
+    api: SyftAPI,
+    uid: UID,
+    twin_mode: TwinMode = TwinMode.PRIVATE,
+    chunk_size: int = TRANSFER_CHUNK_SIZE,
+) -> Any:
+    """Get an object like `action.get`, objects larger than `chunk_size` are
+    fetched in chunks whose digests are checked as they arrive."""
+    info = api.services.action.start_download(uid, twin_mode, chunk_size)
+    if not isinstance(info, TransferInfo):
+        # the object itself or an error
+        return info
+
+    # chunks are written straight into one buffer, the arrays of the object
+    # point into it
+    buffer = bytearray(info.nbytes)
+    try:
+        for index in range(info.chunk_count):
+            digest = info.chunk_digests[index]
+            data = call_with_retries(
+                api.services.action.download_chunk,
+                info.id,
+                index,
+                is_valid=functools.partial(is_chunk, digest=digest),
+            )
+            if not is_chunk(data, digest):
+                return SyftError(message=f"Failed to download chunk {index}: {data}")
+            start = index * info.chunk_size
+            buffer[start : start + len(data)] = data
+    finally:
+        api.services.action.finish_transfer(info.id)
+
+    message, *buffers = unpack_frames(buffer)
+    obj = _deserialize(message, from_bytes=True, buffers=buffers)
+    if info.obj is not None:
+        obj = with_action_data(info.obj, obj)
+    return attach_attribute_to_syft_object(
+        result=obj,
+        attr_dict={
+            "syft_node_location": api.node_uid,
+            "syft_client_verify_key": api.signing_key.verify_key,
+        },
+    )
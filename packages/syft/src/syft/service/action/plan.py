@@ -7,7 +7,6 @@ from typing import Optional
 
 # relative
 from ... import ActionObject
-from ... import Worker
 from ...client.client import SyftClient
 from ...serde.recursive import recursive_serde_register
 from ...types.syft_object import SYFT_OBJECT_VERSION_1
@@ -56,6 +55,9 @@ class Plan(SyftObject):
 
 
 def planify(func):
+    # relative
+    from ...node.worker import Worker
+
     TraceResult.reset()
     ActionObject.add_trace_hook()
     worker = Worker.named(name="plan_building", reset=True, processes=0)
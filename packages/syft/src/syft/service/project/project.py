@@ -25,6 +25,7 @@ from typing_extensions import Self
 
 # relative
 from ...client.api import NodeIdentity
+from ...client.async_client import run_on_all
 from ...client.client import SyftClient
 from ...client.client import SyftClientSessionCache
 from ...node.credentials import SyftSigningKey
@@ -1263,8 +1264,8 @@ class ProjectSubmit(SyftObject):
     def _pre_submit_checks(self, clients: List[SyftClient]):
         try:
             # Check if the user can create projects
-            for client in clients:
-                result = client.api.services.project.can_create_project()
+            # ask all the nodes at once
+            for result in run_on_all(clients, "project.can_create_project"):
                 if isinstance(result, SyftError):
                     raise SyftException(result.message)
         except Exception:
@@ -1289,8 +1290,8 @@ class ProjectSubmit(SyftObject):
     def _create_projects(self, clients: List[SyftClient]):
         projects: Dict[SyftClient, Project] = dict()
 
-        for client in clients:
-            result = client.api.services.project.create_project(project=self)
+        results = run_on_all(clients, "project.create_project", project=self)
+        for client, result in zip(clients, results):
             if isinstance(result, SyftError):
                 raise SyftException(result.message)
             projects[client] = result
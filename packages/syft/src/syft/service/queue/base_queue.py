@@ -1,11 +1,13 @@
 # stdlib
 from typing import Any
 from typing import ClassVar
+from typing import List
 from typing import Optional
 from typing import Type
 from typing import Union
 
 # relative
+from ...serde.recursive import BytesLike
 from ...serde.serializable import serializable
 from ..response import SyftError
 from ..response import SyftSuccess
@@ -21,9 +23,14 @@ class AbstractMessageHandler:
     queue_name: ClassVar[str]
 
     @staticmethod
-    def handle_message(message: bytes):
+    def handle_message(message: Union[bytes, List[BytesLike]]):
+        """`message` is a list of frames when it was sent with out of band buffers"""
         raise NotImplementedError
 
+    def close(self) -> None:
+        """Handlers passed as instances release what they hold here"""
+        pass
+
 
 @serializable(attrs=["message_handler", "queue_name", "address"])
 class QueueConsumer:
@@ -85,7 +92,7 @@ class BaseQueueManager:
 
     def create_consumer(
         self,
-        message_handler: Type[AbstractMessageHandler],
+        message_handler: Union[Type[AbstractMessageHandler], AbstractMessageHandler],
         address: Optional[str],
     ) -> QueueConsumer:
         raise NotImplementedError
@@ -1,19 +1,33 @@
 # stdlib
+import time
+from typing import Any
+from typing import Dict
+from typing import List
 from typing import Optional
+from typing import TYPE_CHECKING
 from typing import Type
 from typing import Union
 
 # relative
+from ...abstract_node import AbstractNode
+from ...node.worker_settings import WorkerSettings
 from ...serde.deserialize import _deserialize as deserialize
+from ...serde.recursive import BytesLike
 from ...serde.serializable import serializable
+from ...types.uid import UID
 from ..response import SyftError
 from ..response import SyftSuccess
 from .base_queue import AbstractMessageHandler
 from .base_queue import BaseQueueManager
 from .base_queue import QueueConfig
+from .base_queue import QueueConsumer
 from .queue_stash import QueueItem
 from .queue_stash import Status
 
+if TYPE_CHECKING:
+    # relative
+    from ...client.api import SignedSyftAPICall
+
 
 @serializable()
 class QueueManager(BaseQueueManager):
@@ -28,9 +42,9 @@ class QueueManager(BaseQueueManager):
 
     def create_consumer(
         self,
-        message_handler: Type[AbstractMessageHandler],
+        message_handler: Union[Type[AbstractMessageHandler], AbstractMessageHandler],
         address: Optional[str] = None,
-    ):
+    ) -> QueueConsumer:
         consumer = self._client.add_consumer(
             message_handler=message_handler,
             queue_name=message_handler.queue_name,
@@ -43,7 +57,7 @@ class QueueManager(BaseQueueManager):
 
     def send(
         self,
-        message: bytes,
+        message: Union[bytes, List[BytesLike]],
         queue_name: str,
     ) -> Union[SyftSuccess, SyftError]:
         return self._client.send_message(
@@ -59,26 +73,78 @@ class QueueManager(BaseQueueManager):
     def consumers(self):
         return self._client.consumers
 
-
-@serializable()
-class APICallMessageHandler(AbstractMessageHandler):
-    queue_name = "api_call"
-
-    @staticmethod
-    def handle_message(message: bytes):
+    def queue_stats(self, queue_name: str) -> Dict[str, int]:
+        """Counters of the messages that went through `queue_name`."""
+        producer = self.producers.get(queue_name, None)
+        return producer.get_stats() if producer is not None else {}
+
+    def worker_stats(self, queue_name: str) -> List[Dict[str, Any]]:
+        """Stats of the QueueWorker of every consumer of `queue_name`."""
+        workers = [
+            consumer.message_handler.worker
+            for consumer in self.consumers.get(queue_name, [])
+            if isinstance(consumer.message_handler, APICallMessageHandler)
+        ]
+        return [{"name": worker.name, **worker.stats.to_dict()} for worker in workers]
+
+
+class QueueWorkerStats:
+    """Counters of the calls a QueueWorker handled."""
+
+    def __init__(self) -> None:
+        self.started_at = time.time()
+        self.handled = 0
+        self.errored = 0
+        self.busy_seconds = 0.0
+        self.node_builds = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        uptime = time.time() - self.started_at
+        return {
+            "handled": self.handled,
+            "errored": self.errored,
+            "busy_seconds": self.busy_seconds,
+            "utilization": self.busy_seconds / uptime if uptime else 0.0,
+            "node_builds": self.node_builds,
+        }
+
+
+class QueueWorker:
+    """Runs queued api calls on a Node that is built once and then kept.
+
+    Building a Node sets up its stores, services and admin user, which used to
+    happen for every queued call.
+    """
+
+    def __init__(self, name: str = "worker") -> None:
+        self.name = name
+        self.node: Optional[AbstractNode] = None
+        self.stats = QueueWorkerStats()
+
+    def get_node(self, worker_settings: WorkerSettings) -> AbstractNode:
         # relative
         from ...node.node import Node
 
-        task_uid, api_call, worker_settings = deserialize(message, from_bytes=True)
-
-        worker = Node(
-            id=worker_settings.id,
-            name=worker_settings.name,
-            signing_key=worker_settings.signing_key,
-            document_store_config=worker_settings.document_store_config,
-            action_store_config=worker_settings.action_store_config,
-            is_subprocess=True,
-        )
+        if self.node is None or self.node.id != worker_settings.id:
+            self.node = Node(
+                id=worker_settings.id,
+                name=worker_settings.name,
+                signing_key=worker_settings.signing_key,
+                document_store_config=worker_settings.document_store_config,
+                action_store_config=worker_settings.action_store_config,
+                is_subprocess=True,
+            )
+            self.stats.node_builds += 1
+        return self.node
+
+    def handle(
+        self,
+        task_uid: UID,
+        api_call: "SignedSyftAPICall",
+        worker_settings: WorkerSettings,
+    ) -> None:
+        start = time.perf_counter()
+        worker = self.get_node(worker_settings)
 
         item = QueueItem(
             node_uid=worker.id,
@@ -105,3 +171,32 @@ class APICallMessageHandler(AbstractMessageHandler):
         )
 
         worker.queue_stash.set_result(worker.verify_key, item)
+
+        self.stats.handled += 1
+        if status == Status.ERRORED:
+            self.stats.errored += 1
+        self.stats.busy_seconds += time.perf_counter() - start
+
+    def close(self) -> None:
+        self.node = None
+
+
+@serializable()
+class APICallMessageHandler(AbstractMessageHandler):
+    queue_name = "api_call"
+
+    def __init__(self, worker: Optional[QueueWorker] = None) -> None:
+        self.worker = QueueWorker() if worker is None else worker
+
+    def handle_message(self, message: Union[bytes, List[BytesLike]]):
+        buffers = None
+        if isinstance(message, list):
+            message, *buffers = message
+
+        task_uid, api_call, worker_settings = deserialize(message, from_bytes=True)
+        api_call.buffers = buffers
+
+        self.worker.handle(task_uid, api_call, worker_settings)
+
+    def close(self) -> None:
+        self.worker.close()
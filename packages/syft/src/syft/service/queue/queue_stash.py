@@ -1,6 +1,11 @@
 # stdlib
+from collections import defaultdict
 from enum import Enum
+import time
 from typing import Any
+from typing import DefaultDict
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Union
@@ -28,6 +33,22 @@ from ..response import SyftError
 from ..response import SyftNotReady
 from ..response import SyftSuccess
 
+# longest a single wait request is held open, clients wait longer with more requests
+MAX_QUEUE_WAIT = 30.0
+# waiters look at the resolved counter of their node this often
+QUEUE_WAIT_POLL_INTERVAL = 0.01
+# items resolved by other processes don't bump the counter, the stash is queried
+# at least this often
+QUEUE_WAIT_RECHECK_INTERVAL = 1.0
+
+# queue items resolved in this process per node, waiters only query the stash
+# again after it changed
+_resolved_counts: DefaultDict[UID, int] = defaultdict(int)
+
+
+def resolved_count(node_uid: UID) -> int:
+    return _resolved_counts[node_uid]
+
 
 @serializable()
 class Status(str, Enum):
@@ -76,6 +97,172 @@ class QueueItem(SyftObject):
             return self.result.message
         return SyftNotReady(message=f"{self.id} not ready yet.")
 
+    def wait(self, timeout: Optional[float] = None) -> Union[Any, SyftNotReady]:
+        """Block until the item is completed or errored, or `timeout` seconds passed,
+        and return its result like `resolve`."""
+        if not self.resolved:
+            result = wait_for_queue_items([self], timeout=timeout)
+            if isinstance(result, SyftError):
+                return result
+        return self.resolve
+
+
+def wait_for_queue_items(
+    items: Iterable[QueueItem],
+    timeout: Optional[float] = None,
+    return_when_all: bool = True,
+) -> Union[List[QueueItem], SyftError]:
+    """Block until all `items`, or the first of them if not `return_when_all`, are
+    resolved or `timeout` seconds passed. Returns the resolved items.
+
+    The node holds one request per client open until items resolve, instead of
+    being asked about every item over and over. Resolved items are updated in place.
+    """
+    items = list(items)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    pending: Dict[UID, QueueItem] = {
+        item.id: item for item in items if not item.resolved
+    }
+    resolved = [item for item in items if item.resolved]
+
+    groups: Dict[Any, List[QueueItem]] = defaultdict(list)
+    for item in pending.values():
+        groups[(item.node_uid, item.syft_client_verify_key)].append(item)
+    # a single node can hold the request open, with more nodes we go around
+    max_wait = MAX_QUEUE_WAIT if len(groups) == 1 else QUEUE_WAIT_RECHECK_INTERVAL
+
+    while pending and (return_when_all or not resolved):
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            break
+        wait = max_wait if remaining is None else min(max_wait, remaining)
+        for (node_uid, verify_key), group in groups.items():
+            uids = [item.id for item in group if item.id in pending]
+            if not uids:
+                continue
+            api = APIRegistry.api_for(node_uid=node_uid, user_verify_key=verify_key)
+            if api is None:
+                return SyftError(message=f"You must login to {node_uid}")
+            call = SyftAPICall(
+                node_uid=node_uid,
+                path="queue_wait",
+                args=[],
+                kwargs={
+                    "uids": uids,
+                    "timeout": wait,
+                    "return_when_all": return_when_all,
+                },
+                blocking=True,
+            )
+            result = api.make_wait_call(call)
+            if isinstance(result, SyftError):
+                return result
+            for done in result:
+                item = pending.pop(done.id, None)
+                if item is None:
+                    continue
+                item.resolved = True
+                item.result = done.result
+                item.status = done.status
+                resolved.append(item)
+            if resolved and not return_when_all:
+                break
+    return resolved
+
+
+def validate_queue_wait_kwargs(kwargs: Dict[str, Any]) -> Optional[SyftError]:
+    """Error for the kwargs of a queue_wait call, which come straight from the
+    client, that the node can't wait with."""
+    unknown = set(kwargs) - {"uids", "timeout", "return_when_all"}
+    if unknown:
+        return SyftError(message=f"Unexpected arguments for queue_wait: {unknown}")
+    uids = kwargs.get("uids", None)
+    if not isinstance(uids, list) or not all(isinstance(uid, UID) for uid in uids):
+        return SyftError(message="queue_wait needs a list of UIDs as uids")
+    timeout = kwargs.get("timeout", None)
+    if timeout is not None and (
+        isinstance(timeout, bool) or not isinstance(timeout, (int, float))
+    ):
+        return SyftError(message="The timeout of queue_wait must be in seconds")
+    if not isinstance(kwargs.get("return_when_all", True), bool):
+        return SyftError(message="return_when_all of queue_wait must be a bool")
+    return None
+
+
+class QueueItemWaiter:
+    """Resolved items among `uids` of a node, for a node side wait.
+
+    `should_check` is cheap while no item of the node resolved in this process,
+    the stash is queried by `check` only after that or every
+    QUEUE_WAIT_RECHECK_INTERVAL, once for all the pending uids.
+    """
+
+    def __init__(
+        self,
+        stash: "QueueStash",
+        node_uid: UID,
+        credentials: SyftVerifyKey,
+        uids: List[UID],
+        timeout: Optional[float] = None,
+        return_when_all: bool = True,
+    ) -> None:
+        self.stash = stash
+        self.node_uid = node_uid
+        self.credentials = credentials
+        self.pending = set(uids)
+        self.return_when_all = return_when_all
+        timeout = MAX_QUEUE_WAIT if timeout is None else min(timeout, MAX_QUEUE_WAIT)
+        self.deadline = time.monotonic() + max(timeout, 0)
+        self.items: List[QueueItem] = []
+        self.error: Optional[SyftError] = None
+        self.seen_count: Optional[int] = None
+        self.last_check = 0.0
+
+    @property
+    def done(self) -> bool:
+        return (
+            self.error is not None
+            or not self.pending
+            or (bool(self.items) and not self.return_when_all)
+        )
+
+    def should_check(self) -> bool:
+        """Whether the stash may hold newly resolved items."""
+        return (
+            resolved_count(self.node_uid) != self.seen_count
+            or time.monotonic() - self.last_check >= QUEUE_WAIT_RECHECK_INTERVAL
+        )
+
+    def check(self) -> None:
+        """Query the stash for resolved items."""
+        self.seen_count = resolved_count(self.node_uid)
+        self.last_check = time.monotonic()
+        result = self.stash.pop_resolved(self.credentials, list(self.pending))
+        if result.is_err():
+            self.error = SyftError(message=result.err())
+        else:
+            for item in result.ok():
+                self.pending.discard(item.id)
+                self.items.append(item)
+
+    @property
+    def finished(self) -> bool:
+        return self.done or time.monotonic() >= self.deadline
+
+    def poll(self) -> bool:
+        """Check for resolved items, True once the wait is over."""
+        if self.should_check():
+            self.check()
+        return self.finished
+
+    @property
+    def sleep_time(self) -> float:
+        return max(0, min(QUEUE_WAIT_POLL_INTERVAL, self.deadline - time.monotonic()))
+
+    @property
+    def result(self) -> Union[List[QueueItem], SyftError]:
+        return self.error if self.error is not None else self.items
+
 
 @instrument
 @serializable()
@@ -98,7 +285,11 @@ class QueueStash(BaseStash):
             valid = self.check_type(item, self.object_type)
             if valid.is_err():
                 return SyftError(message=valid.err())
-            return super().update(credentials, item, add_permissions)
+            result = super().update(credentials, item, add_permissions)
+            if result.is_ok():
+                # wake up the waiters of this node
+                _resolved_counts[item.node_uid] += 1
+            return result
         return None
 
     def set_placeholder(
@@ -141,6 +332,27 @@ class QueueStash(BaseStash):
                 self.delete_by_uid(credentials=credentials, uid=uid)
         return item
 
+    def pop_resolved(
+        self, credentials: SyftVerifyKey, uids: List[UID]
+    ) -> Result[List[QueueItem], str]:
+        """The resolved items among `uids` with a single query, completed ones are
+        removed like in `pop_on_complete`."""
+        if not uids:
+            return Ok([])
+        qks = QueryKeys(qks=[UIDPartitionKey.with_obj(uid) for uid in uids])
+        result = self.partition.get_all_from_store(credentials, qks)
+        if result.is_err():
+            return result
+        items = [item for item in result.ok() if item.resolved]
+        completed = [
+            UIDPartitionKey.with_obj(item.id)
+            for item in items
+            if item.status == Status.COMPLETED
+        ]
+        if completed:
+            self.delete_many(credentials=credentials, qks=completed)
+        return Ok(items)
+
     def delete_by_uid(
         self, credentials: SyftVerifyKey, uid: UID
     ) -> Result[SyftSuccess, str]:
@@ -1,10 +1,17 @@
 # stdlib
 from collections import defaultdict
+from collections import deque
+import contextlib
 import socketserver
+import threading
+import time
 from typing import DefaultDict
+from typing import Deque
 from typing import Dict
+from typing import List
 from typing import Optional
 from typing import Union
+import uuid
 
 # third party
 import gevent
@@ -12,10 +19,12 @@ from pydantic import validator
 import zmq.green as zmq
 
 # relative
+from ...serde.recursive import BytesLike
 from ...serde.serializable import serializable
 from ...types.syft_object import SYFT_OBJECT_VERSION_1
 from ...types.syft_object import SyftObject
 from ...types.uid import UID
+from ...util.logger import error
 from ..response import SyftError
 from ..response import SyftSuccess
 from .base_queue import AbstractMessageHandler
@@ -25,33 +34,239 @@ from .base_queue import QueueConfig
 from .base_queue import QueueConsumer
 from .base_queue import QueueProducer
 
+# consumers check this often whether they are closing
+CONSUMER_POLL_TIMEOUT_MS = 500
+CONSUMER_CLOSE_TIMEOUT = 30.0
+# consumers send a heartbeat at this interval, idle or not
+HEARTBEAT_INTERVAL = 0.5
+PRODUCER_POLL_TIMEOUT_MS = 50
+
+# messages a queue holds before `send` pushes back
+DEFAULT_MAX_QUEUE_SIZE = 10_000
+# consumers without a heartbeat for this long are taken as gone, their messages
+# go to another consumer, and to the dead letters after `max_attempts`
+DEFAULT_HEARTBEAT_LIVENESS = 5.0
+DEFAULT_MAX_ATTEMPTS = 3
+# the latest messages given up on are kept for inspection, older ones dropped
+DEFAULT_MAX_DEAD_LETTERS = 1000
+# a consumer gets its next message while it works on the current one
+DEFAULT_PREFETCH = 2
+
+# first frame of the messages between producers and consumers, followed by the
+# message id for MESSAGE, ACK and NACK and by the message frames for MESSAGE
+READY = b"\x01"
+HEARTBEAT = b"\x02"
+MESSAGE = b"\x03"
+ACK = b"\x04"
+NACK = b"\x05"
+DISCONNECT = b"\x06"
+
+PRODUCER_COUNTERS = (
+    "queued",
+    "dispatched",
+    "acked",
+    "nacked",
+    "timed_out",
+    "redelivered",
+    "dead_lettered",
+    "rejected",
+    "purged",
+)
+CONSUMER_COUNTERS = ("received", "acked", "nacked")
+
+
+class QueuedMessage:
+    def __init__(self, frames: List[BytesLike]) -> None:
+        self.id = uuid.uuid4().bytes
+        self.frames = frames
+        self.attempts = 0
+        self.consumer: Optional[bytes] = None
+
+
+class ConnectedConsumer:
+    def __init__(self) -> None:
+        self.last_seen = time.monotonic()
+        self.last_dispatch = 0.0
+        self.in_flight = 0
+
 
 @serializable()
 class ZMQProducer(QueueProducer):
-    def __init__(self, address: str, queue_name: str) -> None:
+    """Broker of a queue, consumers connect to its ROUTER socket.
+
+    Messages go to the consumer with the fewest unacked messages, each consumer
+    holds at most `prefetch` of them. Messages that are nacked, or whose consumer
+    sent no heartbeat for `heartbeat_liveness` seconds, are sent again, and go to
+    `dead_letters` after `max_attempts`, which keeps the last `max_dead_letters`.
+    Calls may take as long as they need while their consumer is alive.
+    The queue holds at most `max_queue_size` messages that no consumer took yet,
+    `send` raises zmq.Again when it is full.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        queue_name: str,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        heartbeat_liveness: float = DEFAULT_HEARTBEAT_LIVENESS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        prefetch: int = DEFAULT_PREFETCH,
+        max_dead_letters: int = DEFAULT_MAX_DEAD_LETTERS,
+    ) -> None:
         ctx = zmq.Context.instance()
         self.address = address
-        self._producer = ctx.socket(zmq.PUSH)
+        self._producer = ctx.socket(zmq.ROUTER)
+        # fail instead of dropping messages to consumers that are gone
+        self._producer.setsockopt(zmq.ROUTER_MANDATORY, 1)
         self._producer.bind(address)
         self.queue_name = queue_name
+        self.max_queue_size = max_queue_size
+        self.heartbeat_liveness = heartbeat_liveness
+        self.max_attempts = max_attempts
+        self.prefetch = prefetch
+
+        self.pending: Deque[QueuedMessage] = deque()
+        self.in_flight: Dict[bytes, QueuedMessage] = {}
+        self.dead_letters: Deque[QueuedMessage] = deque(maxlen=max_dead_letters)
+        self.consumers: Dict[bytes, ConnectedConsumer] = {}
+        self.stats = dict.fromkeys(PRODUCER_COUNTERS, 0)
+
+        self._thread_ident = threading.get_ident()
+        self.thread = gevent.spawn(self._run)
 
-    def send(self, message: bytes) -> None:
-        try:
-            message_list = [message]
-            # TODO: Enable zero copy
-            self._producer.send_multipart(message_list)
-            print("Message Queued Successfully !")
-        except zmq.Again as e:
-            # TODO: Add retry mechanism if this error occurs
-            raise e
-        except zmq.ZMQError as e:
-            if e.errno == zmq.ETERM:
-                print("Connection Interrupted....")
-            else:
-                raise e
+    def send(self, message: Union[bytes, List[BytesLike]]) -> None:
+        if len(self.pending) >= self.max_queue_size:
+            self.stats["rejected"] += 1
+            raise zmq.Again(f"Queue {self.queue_name} is full")
+        frames = message if isinstance(message, list) else [message]
+        self.pending.append(QueuedMessage(frames))
+        self.stats["queued"] += 1
+        # sockets belong to the thread that made them, others wait for the loop
+        if threading.get_ident() == self._thread_ident:
+            # the message is queued, the loop sends what fails to be sent now
+            with contextlib.suppress(zmq.ZMQError):
+                self._dispatch()
+
+    def _run(self) -> None:
+        while not self._producer.closed:
+            try:
+                if self._producer.poll(timeout=PRODUCER_POLL_TIMEOUT_MS):
+                    self._receive()
+                self._expire()
+                self._dispatch()
+            except zmq.ZMQError as e:
+                if e.errno == zmq.ETERM or self._producer.closed:
+                    break
+                error(f"Queue {self.queue_name} failed: {e}")
+
+    def _receive(self) -> None:
+        while self._producer.poll(timeout=0):
+            identity, command, *rest = self._producer.recv_multipart()
+            if command == DISCONNECT:
+                self._requeue_from(identity)
+                continue
+            # any message shows that the consumer is alive
+            consumer = self.consumers.setdefault(identity, ConnectedConsumer())
+            consumer.last_seen = time.monotonic()
+            if command in (ACK, NACK):
+                message = self.in_flight.get(rest[0], None)
+                if message is None or message.consumer != identity:
+                    # the message was sent again after its consumer timed out
+                    continue
+                del self.in_flight[message.id]
+                consumer.in_flight = max(consumer.in_flight - 1, 0)
+                if command == ACK:
+                    self.stats["acked"] += 1
+                else:
+                    self.stats["nacked"] += 1
+                    self._retry(message)
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for identity, consumer in list(self.consumers.items()):
+            # consumers keep sending heartbeats while they handle a message
+            if now - consumer.last_seen <= self.heartbeat_liveness:
+                continue
+            del self.consumers[identity]
+            for message in list(self.in_flight.values()):
+                if message.consumer == identity:
+                    del self.in_flight[message.id]
+                    self.stats["timed_out"] += 1
+                    self._retry(message)
+
+    def _requeue_from(self, identity: bytes) -> None:
+        # a consumer that closed never got to the messages it had prefetched
+        self.consumers.pop(identity, None)
+        for message in list(self.in_flight.values()):
+            if message.consumer == identity:
+                del self.in_flight[message.id]
+                message.attempts -= 1
+                self.pending.appendleft(message)
+
+    def _retry(self, message: QueuedMessage) -> None:
+        if message.attempts >= self.max_attempts:
+            self.dead_letters.append(message)
+            self.stats["dead_lettered"] += 1
+            error(
+                f"Queue {self.queue_name} gave up on a message after "
+                f"{message.attempts} attempts"
+            )
+        else:
+            self.pending.appendleft(message)
+            self.stats["redelivered"] += 1
+
+    def _next_consumer(self) -> Optional[bytes]:
+        ready = [
+            (consumer.in_flight, consumer.last_dispatch, identity)
+            for identity, consumer in self.consumers.items()
+            if consumer.in_flight < self.prefetch
+        ]
+        return min(ready)[2] if ready else None
+
+    def _dispatch(self) -> None:
+        while self.pending:
+            identity = self._next_consumer()
+            if identity is None:
+                break
+            # the message leaves the queue once it is sent, failed sends keep it
+            message = self.pending[0]
+            try:
+                # zmq keeps a reference to the frames instead of copying them
+                self._producer.send_multipart(
+                    [identity, MESSAGE, message.id, *message.frames], copy=False
+                )
+            except zmq.ZMQError as e:
+                if e.errno != zmq.EHOSTUNREACH:
+                    raise
+                # the consumer went away, the message waits for the next one
+                del self.consumers[identity]
+                continue
+            self.pending.popleft()
+            consumer = self.consumers[identity]
+            consumer.in_flight += 1
+            consumer.last_dispatch = time.monotonic()
+            message.attempts += 1
+            message.consumer = identity
+            self.in_flight[message.id] = message
+            self.stats["dispatched"] += 1
+
+    def purge(self) -> None:
+        """Drop the messages that no consumer took yet."""
+        self.stats["purged"] += len(self.pending)
+        self.pending.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "pending": len(self.pending),
+            "in_flight": len(self.in_flight),
+            "dead_letters": len(self.dead_letters),
+            "consumers": len(self.consumers),
+        }
 
     def close(self):
-        self._producer.close()
+        self.thread.kill()
+        self._producer.close(linger=0)
 
     @property
     def alive(self):
@@ -73,35 +288,87 @@ class ZMQConsumer(QueueConsumer):
 
     def post_init(self):
         ctx = zmq.Context.instance()
-        self._consumer = ctx.socket(zmq.PULL)
+        self._consumer = ctx.socket(zmq.DEALER)
 
         self.thread = None
+        self._stopping = False
+        self._ready = False
+        self.stats = dict.fromkeys(CONSUMER_COUNTERS, 0)
         self._consumer.connect(self.address)
 
+    def _send(self, *frames: bytes) -> None:
+        self._consumer.send_multipart(list(frames))
+
     def receive(self):
+        if not self._ready:
+            # the producer only sends to consumers that asked for a message
+            self._send(READY)
+            self._ready = True
         try:
-            message_list = self._consumer.recv_multipart()
-            message = message_list[0]
-            print("Message Received Successfully !")
+            command, *frames = self._consumer.recv_multipart(copy=False)
         except zmq.ZMQError as e:
             if e.errno == zmq.ETERM:
-                print("Subscriber connection Terminated")
-            else:
-                raise e
-        self.message_handler.handle_message(message=message)
+                return
+            raise e
+        if command.bytes != MESSAGE:
+            return
+
+        message_id, *message_frames = frames
+        self.stats["received"] += 1
+        # large frames are handed over as views of the zmq buffers
+        message_list = [message_frames[0].bytes] + [
+            frame.buffer for frame in message_frames[1:]
+        ]
+        message = message_list[0] if len(message_list) == 1 else message_list
+        # the handler runs in a thread of the hub, so that the heartbeats go out
+        # even while it holds on to the cpu
+        heartbeat = gevent.spawn(self._heartbeat)
+        try:
+            gevent.get_hub().threadpool.apply(
+                self.message_handler.handle_message, kwds={"message": message}
+            )
+        except Exception as e:
+            self.stats["nacked"] += 1
+            error(f"Consumer of {self.queue_name} failed to handle a message: {e}")
+            self._send(NACK, message_id.bytes)
+        else:
+            self.stats["acked"] += 1
+            self._send(ACK, message_id.bytes)
+        finally:
+            heartbeat.kill()
+
+    def _heartbeat(self) -> None:
+        # tells the producer that the consumer is alive while it handles a message
+        while True:
+            gevent.sleep(HEARTBEAT_INTERVAL)
+            self._send(HEARTBEAT)
 
     def _run(self):
-        while True:
-            self.receive()
+        last_heartbeat = time.monotonic()
+        while not self._stopping:
+            # wake up now and then to notice that the consumer is closing
+            if self._consumer.poll(timeout=CONSUMER_POLL_TIMEOUT_MS):
+                self.receive()
+            if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL:
+                self._send(HEARTBEAT)
+                last_heartbeat = time.monotonic()
 
     def run(self):
         self.thread = gevent.spawn(self._run)
         self.thread.start()
 
-    def close(self):
+    def close(self, timeout: Optional[float] = CONSUMER_CLOSE_TIMEOUT):
+        self._stopping = True
         if self.thread is not None:
+            # the message being handled gets `timeout` seconds to finish
+            self.thread.join(timeout=timeout)
             self.thread.kill()
-        self._consumer.close()
+        if not self._consumer.closed:
+            with contextlib.suppress(zmq.ZMQError):
+                self._send(DISCONNECT)
+        self._consumer.close(linger=0)
+        if isinstance(self.message_handler, AbstractMessageHandler):
+            self.message_handler.close()
 
     @property
     def alive(self):
@@ -115,6 +382,11 @@ class ZMQClientConfig(SyftObject, QueueClientConfig):
 
     id: Optional[UID]
     hostname: Optional[str]
+    max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE
+    heartbeat_liveness: float = DEFAULT_HEARTBEAT_LIVENESS
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    prefetch: int = DEFAULT_PREFETCH
+    max_dead_letters: int = DEFAULT_MAX_DEAD_LETTERS
 
     @validator("hostname", pre=True, always=True)
     def get_hostname(cls, v: Optional[str]) -> str:
@@ -130,6 +402,7 @@ class ZMQClient(QueueClient):
 
     def __init__(self, config: ZMQClientConfig) -> None:
         self.host = config.hostname
+        self.config = config
         self.producers = dict()
         self.consumers = defaultdict(list)
 
@@ -159,7 +432,15 @@ class ZMQClient(QueueClient):
             address = consumer.address if consumer else None
 
         address = self._get_free_tcp_addr(self.host) if address is None else address
-        producer = ZMQProducer(address=address, queue_name=queue_name)
+        producer = ZMQProducer(
+            address=address,
+            queue_name=queue_name,
+            max_queue_size=self.config.max_queue_size,
+            heartbeat_liveness=self.config.heartbeat_liveness,
+            max_attempts=self.config.max_attempts,
+            prefetch=self.config.prefetch,
+            max_dead_letters=self.config.max_dead_letters,
+        )
         self.producers[queue_name] = producer
 
         return producer
@@ -202,7 +483,7 @@ class ZMQClient(QueueClient):
 
     def send_message(
         self,
-        message: bytes,
+        message: Union[bytes, List[BytesLike]],
         queue_name: str,
     ) -> Union[SyftSuccess, SyftError]:
         producer = self.producers.get(queue_name)
@@ -212,6 +493,10 @@ class ZMQClient(QueueClient):
             )
         try:
             producer.send(message=message)
+        except zmq.Again:
+            return SyftError(
+                message=f"Queue: {queue_name} is full, please try again later"
+            )
         except Exception as e:
             return SyftError(
                 message=f"Failed to send message to: {queue_name} with error: {e}"
@@ -237,13 +522,8 @@ class ZMQClient(QueueClient):
         if queue_name not in self.producers:
             return SyftError(message=f"No producer running for : {queue_name}")
 
-        producer = self.producers[queue_name]
-
-        # close existing connection.
-        producer.close()
-
-        # add a new connection
-        self.add_producer(queue_name=queue_name, address=producer.address)
+        # messages that consumers are working on are kept
+        self.producers[queue_name].purge()
 
         return SyftSuccess(message=f"Queue: {queue_name} successfully purged")
 
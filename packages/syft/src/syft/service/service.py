@@ -3,10 +3,16 @@ from collections import defaultdict
 from copy import deepcopy
 import inspect
 from inspect import Parameter
+import os
+from pathlib import Path
+import pickle  # nosec
+import sys
+from types import MappingProxyType
 from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import List
+from typing import Mapping
 from typing import Optional
 from typing import Set
 from typing import Tuple
@@ -14,10 +20,12 @@ from typing import Type
 from typing import Union
 
 # third party
+import numpy
 from result import Ok
 from result import OkErr
 
 # relative
+from .. import __version__
 from ..abstract_node import AbstractNode
 from ..node.credentials import SyftVerifyKey
 from ..serde.lib_permissions import CMPCRUDPermission
@@ -35,6 +43,8 @@ from ..types.syft_object import SyftBaseObject
 from ..types.syft_object import SyftObject
 from ..types.syft_object import attach_attribute_to_syft_object
 from ..types.uid import UID
+from ..util.util import get_root_data_path
+from ..util.util import str_to_bool
 from .context import AuthedServiceContext
 from .context import ChangeContext
 from .response import SyftError
@@ -45,6 +55,10 @@ from .warnings import APIEndpointWarning
 TYPE_TO_SERVICE = {}
 SERVICE_TO_TYPES = defaultdict(set)
 
+# set to true to keep the lib configs on disk instead of walking numpy in every
+# process which needs all of them
+LIB_CONFIG_CACHE_ENV = "SYFT_LIB_CONFIG_CACHE"
+
 
 class AbstractService:
     node: AbstractNode
@@ -107,12 +121,15 @@ class LibConfig(BaseConfig):
 
 class ServiceConfigRegistry:
     __service_config_registry__: Dict[str, ServiceConfig] = {}
+    # routing table of every role, built on first use and dropped on registration
+    __role_config_registries__: Dict[ServiceRole, "UserServiceConfigRegistry"] = {}
     # __public_to_private_path_map__: Dict[str, str] = {}
 
     @classmethod
     def register(cls, config: ServiceConfig) -> None:
         if not cls.path_exists(config.public_path):
             cls.__service_config_registry__[config.public_path] = config
+            cls.__role_config_registries__.clear()
             # cls.__public_to_private_path_map__[config.public_path] = config.private_path
 
     @classmethod
@@ -126,60 +143,111 @@ class ServiceConfigRegistry:
 
 class LibConfigRegistry:
     __service_config_registry__: Dict[str, ServiceConfig] = {}
+    # configs executable by users, built on first use and dropped on registration
+    __user_config_registry__: Optional["UserLibConfigRegistry"] = None
+    # the configs of action_execute_registry_libs are only registered on first use
+    __loaded__: bool = False
 
     @classmethod
     def register(cls, config: ServiceConfig) -> None:
-        if not cls.path_exists(config.public_path):
+        if config.public_path not in cls.__service_config_registry__:
             cls.__service_config_registry__[config.public_path] = config
+            cls.__user_config_registry__ = None
+
+    @classmethod
+    def load(cls) -> None:
+        if cls.__loaded__:
+            return
+        lib_configs = load_cached_lib_configs()
+        if lib_configs is None:
+            lib_configs = [
+                lib_config
+                for lib_obj in action_execute_registry_libs.flatten()
+                if (lib_config := lib_config_for(lib_obj)) is not None
+            ]
+            store_cached_lib_configs(lib_configs)
+        for lib_config in lib_configs:
+            cls.register(lib_config)
+        cls.__loaded__ = True
 
     @classmethod
     def get_registered_configs(cls) -> Dict[str, ServiceConfig]:
+        cls.load()
         return cls.__service_config_registry__
 
+    @classmethod
+    def get_config(cls, path: str) -> Optional[LibConfig]:
+        """The config of `path`, resolving only that path if the registry is not
+        loaded yet."""
+        lib_config = cls.__service_config_registry__.get(path, None)
+        if lib_config is None and not cls.__loaded__:
+            lib_obj = action_execute_registry_libs.get(path)
+            if lib_obj is not None:
+                lib_config = lib_config_for(lib_obj)
+            if lib_config is not None:
+                cls.register(lib_config)
+        return lib_config
+
     @classmethod
     def path_exists(cls, path: str):
-        return path in cls.__service_config_registry__
+        return cls.get_config(path) is not None
 
 
 class UserLibConfigRegistry:
-    def __init__(self, service_config_registry: Dict[str, LibConfig]):
-        self.__service_config_registry__: Dict[str, LibConfig] = service_config_registry
+    def __init__(self, credentials: Optional[SyftVerifyKey]):
+        self.credentials = credentials
+        self.__service_config_registry__: Optional[Mapping[str, LibConfig]] = None
 
     @classmethod
     def from_user(cls, credentials: SyftVerifyKey):
-        return cls(
-            {
-                k: lib_config
-                for k, lib_config in LibConfigRegistry.get_registered_configs().items()
-                if lib_config.has_permission(credentials)
-            }
-        )
+        # LibConfig permissions don't depend on the user yet, so everyone shares
+        # a single registry instead of filtering the whole lib registry per call
+        registry = LibConfigRegistry.__user_config_registry__
+        if registry is None:
+            registry = cls(credentials)
+            LibConfigRegistry.__user_config_registry__ = registry
+        return registry
 
     def __contains__(self, path: str):
-        return path in self.__service_config_registry__
+        lib_config = LibConfigRegistry.get_config(path)
+        return lib_config is not None and lib_config.has_permission(self.credentials)
 
     def private_path_for(self, public_path: str) -> str:
-        return self.__service_config_registry__[public_path].private_path
-
-    def get_registered_configs(self) -> Dict[str, LibConfig]:
+        return LibConfigRegistry.get_config(public_path).private_path
+
+    def get_registered_configs(self) -> Mapping[str, LibConfig]:
+        if self.__service_config_registry__ is None:
+            self.__service_config_registry__ = MappingProxyType(
+                {
+                    k: lib_config
+                    for k, lib_config in LibConfigRegistry.get_registered_configs().items()
+                    if lib_config.has_permission(self.credentials)
+                }
+            )
         return self.__service_config_registry__
 
 
 class UserServiceConfigRegistry:
     def __init__(self, service_config_registry: Dict[str, ServiceConfig]):
-        self.__service_config_registry__: Dict[
+        self.__service_config_registry__: Mapping[
             str, ServiceConfig
-        ] = service_config_registry
+        ] = MappingProxyType(service_config_registry)
 
     @classmethod
     def from_role(cls, user_service_role: ServiceRole):
-        return cls(
-            {
-                k: service_config
-                for k, service_config in ServiceConfigRegistry.get_registered_configs().items()
-                if service_config.has_permission(user_service_role)
-            }
-        )
+        # immutable and shared by every call made with the same role
+        registries = ServiceConfigRegistry.__role_config_registries__
+        registry = registries.get(user_service_role, None)
+        if registry is None:
+            registry = cls(
+                {
+                    k: service_config
+                    for k, service_config in ServiceConfigRegistry.get_registered_configs().items()
+                    if service_config.has_permission(user_service_role)
+                }
+            )
+            registries[user_service_role] = registry
+        return registry
 
     def __contains__(self, path: str):
         return path in self.__service_config_registry__
@@ -187,39 +255,72 @@ class UserServiceConfigRegistry:
     def private_path_for(self, public_path: str) -> str:
         return self.__service_config_registry__[public_path].private_path
 
-    def get_registered_configs(self) -> Dict[str, ServiceConfig]:
+    def get_registered_configs(self) -> Mapping[str, ServiceConfig]:
         return self.__service_config_registry__
 
 
-def register_lib_obj(lib_obj: CMPBase):
+def lib_config_for(lib_obj: CMPBase) -> Optional[LibConfig]:
+    if not isinstance(lib_obj, (CMPFunction, CMPClass)):
+        return None
     signature = lib_obj.signature
     path = lib_obj.absolute_path
-    func_name = lib_obj.name
-
-    if signature is not None:
-        if path != "numpy.source":
-            lib_config = LibConfig(
-                public_path=str(path),
-                private_path=str(path),
-                public_name=str(func_name),
-                method_name=str(func_name),
-                doc_string=str(lib_obj.__doc__),
-                signature=signature,
-                permissions=set([lib_obj.permissions]),
-                is_from_lib=True,
-            )
+    if signature is None or path == "numpy.source":
+        return None
 
-            LibConfigRegistry.register(lib_config)
+    func_name = lib_obj.name
+    return LibConfig(
+        public_path=str(path),
+        private_path=str(path),
+        public_name=str(func_name),
+        method_name=str(func_name),
+        doc_string=str(lib_obj.__doc__),
+        signature=signature,
+        permissions=set([lib_obj.permissions]),
+        is_from_lib=True,
+    )
 
 
-# hacky, prevent circular imports
-for lib_obj in action_execute_registry_libs.flatten():
-    # # for functions
-    # func_name = func.__name__
-    # # for classes
-    # func_name = path.split(".")[-1]
-    if isinstance(lib_obj, CMPFunction) or isinstance(lib_obj, CMPClass):
-        register_lib_obj(lib_obj)
+def register_lib_obj(lib_obj: CMPBase):
+    lib_config = lib_config_for(lib_obj)
+    if lib_config is not None:
+        LibConfigRegistry.register(lib_config)
+
+
+def lib_config_cache_path() -> Optional[Path]:
+    if not str_to_bool(os.environ.get(LIB_CONFIG_CACHE_ENV, "false")):
+        return None
+    # the lib configs only change with the libraries, syft and python
+    python_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    name = f"numpy-{numpy.__version__}-syft-{__version__}-python-{python_version}"
+    return get_root_data_path() / "lib_configs" / f"{name}.pkl"
+
+
+def load_cached_lib_configs() -> Optional[List[LibConfig]]:
+    path = lib_config_cache_path()
+    if path is None:
+        return None
+    try:
+        # written by store_cached_lib_configs of this user, like the other
+        # files in the syft data folder
+        return pickle.loads(path.read_bytes())  # nosec
+    except Exception:
+        # a missing or broken cache is built again
+        return None
+
+
+def store_cached_lib_configs(lib_configs: List[LibConfig]) -> None:
+    path = lib_config_cache_path()
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # readers never see a half written file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(pickle.dumps(lib_configs))
+        os.replace(tmp_path, path)
+    except Exception:
+        # the cache only saves time, not having one is fine
+        pass
 
 
 def deconstruct_param(param: inspect.Parameter) -> Dict[str, Any]:
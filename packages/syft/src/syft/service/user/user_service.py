@@ -1,4 +1,6 @@
 # stdlib
+import time
+from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -41,6 +43,10 @@ from .user_roles import ServiceRole
 from .user_roles import ServiceRoleCapability
 from .user_stash import UserStash
 
+# seconds a looked up role is trusted for. Writes made through the UserService
+# drop the cached roles right away, writes of other processes after this long.
+ROLE_CACHE_TTL = 10.0
+
 
 @instrument
 @serializable()
@@ -51,6 +57,11 @@ class UserService(AbstractService):
     def __init__(self, store: DocumentStore) -> None:
         self.store = store
         self.stash = UserStash(store=store)
+        # verify key -> (expiry, role), the role is needed for every api call
+        self.role_cache: Dict[SyftVerifyKey, Tuple[float, ServiceRole]] = {}
+
+    def invalidate_role_cache(self) -> None:
+        self.role_cache.clear()
 
     @service_method(path="user.create", name="create")
     def create(
@@ -78,6 +89,7 @@ class UserService(AbstractService):
         )
         if result.is_err():
             return SyftError(message=str(result.err()))
+        self.invalidate_role_cache()
         user = result.ok()
         return user.to(UserView)
 
@@ -131,6 +143,9 @@ class UserService(AbstractService):
         # they could be different
 
         if isinstance(credentials, SyftVerifyKey):
+            cached = self.role_cache.get(credentials, None)
+            if cached is not None and time.monotonic() < cached[0]:
+                return cached[1]
             result = self.stash.get_by_verify_key(
                 credentials=credentials, verify_key=credentials
             )
@@ -138,12 +153,17 @@ class UserService(AbstractService):
             result = self.stash.get_by_signing_key(
                 credentials=credentials, signing_key=credentials
             )
-        if result.is_ok():
-            # this seems weird that we get back None as Ok(None)
-            user = result.ok()
-            if user:
-                return user.role
-        return ServiceRole.GUEST
+        if result.is_err():
+            return ServiceRole.GUEST
+
+        # this seems weird that we get back None as Ok(None)
+        user = result.ok()
+        if not user:
+            return ServiceRole.GUEST
+        if isinstance(credentials, SyftVerifyKey):
+            expiry = time.monotonic() + ROLE_CACHE_TTL
+            self.role_cache[credentials] = (expiry, user.role)
+        return user.role
 
     @service_method(path="user.search", name="search", autosplat=["user_search"])
     def search(
@@ -283,6 +303,7 @@ class UserService(AbstractService):
             )
             return SyftError(message=error_msg)
 
+        self.invalidate_role_cache()
         user = result.ok()
         if user.role == ServiceRole.ADMIN:
             settings_stash = SettingsStash(store=self.store)
@@ -331,6 +352,7 @@ class UserService(AbstractService):
         result = self.stash.delete_by_uid(
             credentials=context.credentials, uid=uid, has_permission=True
         )
+        self.invalidate_role_cache()
         if result.is_err():
             return SyftError(message=str(result.err()))
 
@@ -423,6 +445,7 @@ class UserService(AbstractService):
         if result.is_err():
             return SyftError(message=str(result.err()))
 
+        self.invalidate_role_cache()
         user = result.ok()
 
         success_message = f"User '{user.name}' successfully registered!"
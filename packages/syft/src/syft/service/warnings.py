@@ -2,7 +2,6 @@
 from typing import Optional
 
 # third party
-from IPython.display import display
 from rich.prompt import Confirm
 from typing_extensions import Self
 
@@ -57,6 +56,9 @@ class APIEndpointWarning(SyftBaseModel):
     def show(self):
         if not self.enabled or not self.message:
             return True
+        # third party
+        from IPython.display import display
+
         display(self)
         if self.confirmation:
             allowed = Confirm.ask("Would you like to proceed?")
@@ -0,0 +1,288 @@
+# stdlib
+import hashlib
+import mmap
+import os
+from pathlib import Path
+import tempfile
+from typing import Any
+from typing import BinaryIO
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Union
+import uuid
+
+# third party
+from pydantic import BaseModel
+from pydantic import Field
+from pydantic import validator
+
+# relative
+from ..serde.recursive import BytesLike
+from ..serde.serializable import serializable
+
+# payloads serialized to fewer bytes stay inline with their action object
+BLOB_MIN_SIZE = 64 * 1024
+BLOB_CHUNK_SIZE = 1024 * 1024
+
+
+def default_blob_path() -> Path:
+    return Path(tempfile.gettempdir()) / "syft_blobs"
+
+
+@serializable(attrs=["digest", "nbytes"])
+class BlobInfo:
+    """Address of a payload in a BlobStore, the sha256 of its bytes."""
+
+    def __init__(self, digest: str, nbytes: int) -> None:
+        self.digest = digest
+        self.nbytes = nbytes
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(digest={self.digest}, nbytes={self.nbytes})"
+
+
+class BlobStore:
+    """Content addressed storage of payload bytes.
+
+    Writing the same bytes twice stores them once, callers keep track of how many
+    objects use a blob before deleting it.
+    """
+
+    def write(self, chunks: Iterable[BytesLike]) -> BlobInfo:
+        raise NotImplementedError
+
+    def iter_chunks(
+        self, digest: str, chunk_size: int = BLOB_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def read(self, digest: str) -> bytearray:
+        """The whole blob in one writable buffer."""
+        data = bytearray()
+        for chunk in self.iter_chunks(digest):
+            data += chunk
+        return data
+
+    def map(self, digest: str) -> BytesLike:
+        """The whole blob in one writable buffer, stores which can map the blob
+        only read the pages that are touched."""
+        return self.read(digest)
+
+    def exists(self, digest: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, digest: str) -> None:
+        raise NotImplementedError
+
+
+@serializable()
+class BlobStorageConfig(BaseModel):
+    """Base blob storage configuration
+
+    Parameters:
+        `min_size`: int
+            Payloads serialized to fewer bytes are kept inline in the action store.
+            Default 64 KiB.
+    """
+
+    min_size: int = BLOB_MIN_SIZE
+
+    def make_store(self) -> BlobStore:
+        raise NotImplementedError
+
+
+@serializable()
+class OnDiskBlobStorageConfig(BlobStorageConfig):
+    """Blobs as files of a local folder
+
+    Parameters:
+        `path`: Path or str
+            Folder of the blobs, shared by all processes of a node.
+            Defaults to `syft_blobs` in the temp folder.
+    """
+
+    path: Union[str, Path] = Field(default_factory=default_blob_path)
+
+    # so users can still do OnDiskBlobStorageConfig(path=None)
+    @validator("path", pre=True)
+    def __default_path(cls, path: Optional[Union[str, Path]]) -> Union[str, Path]:
+        if path is None:
+            return default_blob_path()
+        return path
+
+    def make_store(self) -> BlobStore:
+        return OnDiskBlobStore(self)
+
+
+@serializable(attrs=["config"])
+class OnDiskBlobStore(BlobStore):
+    """Blobs as files named after their digest, `<path>/<digest[:2]>/<digest>`.
+
+    Blobs are streamed into a temporary file and moved into place once complete,
+    readers never see a partial blob.
+    """
+
+    def __init__(self, config: OnDiskBlobStorageConfig) -> None:
+        self.config = config
+
+    @property
+    def root(self) -> Path:
+        return Path(self.config.path)
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def write(self, chunks: Iterable[BytesLike]) -> BlobInfo:
+        tmp_dir = self.root / "tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_dir / uuid.uuid4().hex
+
+        sha256 = hashlib.sha256()
+        nbytes = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in chunks:
+                    sha256.update(chunk)
+                    nbytes += f.write(chunk)
+            digest = sha256.hexdigest()
+            path = self.path_for(digest)
+            if path.exists():
+                # we already have these bytes
+                tmp_path.unlink()
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return BlobInfo(digest=digest, nbytes=nbytes)
+
+    def open(self, digest: str) -> BinaryIO:
+        return open(self.path_for(digest), "rb")
+
+    def iter_chunks(
+        self, digest: str, chunk_size: int = BLOB_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        with self.open(digest) as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def read(self, digest: str) -> bytearray:
+        path = self.path_for(digest)
+        data = bytearray(path.stat().st_size)
+        with open(path, "rb") as f:
+            f.readinto(data)
+        return data
+
+    def map(self, digest: str) -> BytesLike:
+        with self.open(digest) as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return bytearray()
+            # copy on write: processes mapping the same blob share the page cache,
+            # writes to the arrays on top of it stay private and never reach the file
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    def exists(self, digest: str) -> bool:
+        return self.path_for(digest).exists()
+
+    def delete(self, digest: str) -> None:
+        self.path_for(digest).unlink(missing_ok=True)
+
+
+def import_boto3() -> Any:
+    try:
+        # third party
+        import boto3
+    except ImportError:
+        raise ImportError(
+            "The S3 blob storage needs boto3, install it with 'pip install boto3'"
+        )
+    return boto3
+
+
+@serializable()
+class S3BlobStorageConfig(BlobStorageConfig):
+    """Blobs as objects of an S3 compatible bucket, like the seaweedfs of the grid
+
+    Parameters:
+        `bucket_name`: str
+            Bucket of the blobs, created on first use
+        `endpoint_url`: Optional[str]
+            Endpoint of the S3 api, e.g. "http://seaweedfs:8333". None for AWS.
+        `access_key`, `secret_key`, `region`: credentials and region of the bucket
+    """
+
+    bucket_name: str = "syft-blobs"
+    endpoint_url: Optional[str] = None
+    access_key: Optional[str] = None
+    secret_key: Optional[str] = None
+    region: str = "us-east-1"
+
+    def make_store(self) -> BlobStore:
+        return S3BlobStore(self)
+
+
+@serializable(attrs=["config"])
+class S3BlobStore(BlobStore):
+    """Blobs as S3 objects named after their digest.
+
+    The digest is only known once all bytes were seen, writes are spooled to a
+    temporary file before being uploaded in parts.
+    """
+
+    def __init__(self, config: S3BlobStorageConfig) -> None:
+        self.config = config
+
+    @property
+    def client(self) -> Any:
+        client = self.__dict__.get("_client", None)
+        if client is None:
+            boto3 = import_boto3()
+            client = boto3.client(
+                "s3",
+                endpoint_url=self.config.endpoint_url,
+                aws_access_key_id=self.config.access_key,
+                aws_secret_access_key=self.config.secret_key,
+                region_name=self.config.region,
+            )
+            try:
+                client.head_bucket(Bucket=self.config.bucket_name)
+            except client.exceptions.ClientError:
+                client.create_bucket(Bucket=self.config.bucket_name)
+            self._client = client
+        return client
+
+    def write(self, chunks: Iterable[BytesLike]) -> BlobInfo:
+        sha256 = hashlib.sha256()
+        nbytes = 0
+        with tempfile.SpooledTemporaryFile(max_size=BLOB_CHUNK_SIZE * 8) as f:
+            for chunk in chunks:
+                sha256.update(chunk)
+                nbytes += f.write(chunk)
+            digest = sha256.hexdigest()
+            if not self.exists(digest):
+                f.seek(0)
+                self.client.upload_fileobj(f, self.config.bucket_name, digest)
+        return BlobInfo(digest=digest, nbytes=nbytes)
+
+    def iter_chunks(
+        self, digest: str, chunk_size: int = BLOB_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.config.bucket_name, Key=digest)
+        yield from response["Body"].iter_chunks(chunk_size)
+
+    def exists(self, digest: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.config.bucket_name, Key=digest)
+        except self.client.exceptions.ClientError as e:
+            # anything but a missing key (denied, throttled...) must not look
+            # like a missing blob, the caller would upload it again
+            code = e.response.get("Error", {}).get("Code")
+            if code in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def delete(self, digest: str) -> None:
+        self.client.delete_object(Bucket=self.config.bucket_name, Key=digest)
@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 # stdlib
+from contextlib import contextmanager
 import sys
 import types
 import typing
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -33,6 +35,7 @@ from ..types.syft_object import SyftBaseObject
 from ..types.syft_object import SyftObject
 from ..types.uid import UID
 from ..util.telemetry import instrument
+from .blob_storage import BlobStorageConfig
 from .locks import LockingConfig
 from .locks import NoLockingConfig
 from .locks import SyftLock
@@ -286,6 +289,15 @@ class QueryKeys(SyftBaseModel):
 UIDPartitionKey = PartitionKey(key="id", type_=UID)
 
 
+def permissions_for(
+    obj: SyftObject, permissions: Optional[List[ActionObjectPermission]]
+) -> Optional[List[ActionObjectPermission]]:
+    """The permissions of a batch which belong to `obj`."""
+    if permissions is None:
+        return None
+    return [permission for permission in permissions if permission.uid == obj.id]
+
+
 @serializable()
 class PartitionSettings(BasePartitionSettings):
     object_type: type
@@ -301,6 +313,13 @@ class PartitionSettings(BasePartitionSettings):
         return PartitionKeys.from_dict(self.object_type._syft_searchable_keys_dict())
 
 
+class _RollbackError(Exception):
+    # carries an Err out of a transaction, so that the transaction is rolled back
+    def __init__(self, result: Err) -> None:
+        super().__init__(result.err())
+        self.result = result
+
+
 @instrument
 @serializable(attrs=["settings", "store_config", "unique_cks", "searchable_cks"])
 class StorePartition:
@@ -350,6 +369,15 @@ class StorePartition:
     def store_query_keys(self, objs: Any) -> QueryKeys:
         return QueryKeys(qks=[self.store_query_key(obj) for obj in objs])
 
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Commit everything written inside at once. Nested transactions join the
+        outer one, an exception rolls the whole transaction back.
+
+        Backends without transactions write right away.
+        """
+        yield
+
     # Thread-safe methods
     def _thread_safe_cbk(self, cbk: Callable, *args, **kwargs):
         locked = self.lock.acquire(blocking=True)
@@ -357,7 +385,13 @@ class StorePartition:
             return Err("Failed to acquire lock for the operation")
 
         try:
-            result = cbk(*args, **kwargs)
+            with self.transaction():
+                result = cbk(*args, **kwargs)
+                if isinstance(result, Err):
+                    # undo whatever the call wrote before it failed
+                    raise _RollbackError(result)
+        except _RollbackError as e:
+            result = e.result
         except BaseException as e:
             result = Err(str(e))
         self.lock.release()
@@ -453,6 +487,35 @@ class StorePartition:
     ) -> Result[List[BaseStash.object_type], str]:
         return self._thread_safe_cbk(self._all, credentials, order_by)
 
+    # Batched variants, the whole batch is checked and written under a single lock
+    # and transaction
+    def set_many(
+        self,
+        credentials: SyftVerifyKey,
+        objs: List[SyftObject],
+        add_permissions: Optional[List[ActionObjectPermission]] = None,
+        ignore_duplicates: bool = False,
+    ) -> Result[List[SyftObject], str]:
+        return self._thread_safe_cbk(
+            self._set_many,
+            credentials=credentials,
+            objs=objs,
+            add_permissions=add_permissions,
+            ignore_duplicates=ignore_duplicates,
+        )
+
+    def get_many(
+        self, credentials: SyftVerifyKey, uids: List[UID]
+    ) -> Result[List[SyftObject], str]:
+        return self._thread_safe_cbk(self._get_many, credentials, uids)
+
+    def delete_many(
+        self, credentials: SyftVerifyKey, qks: List[QueryKey], has_permission=False
+    ) -> Result[SyftSuccess, str]:
+        return self._thread_safe_cbk(
+            self._delete_many, credentials, qks, has_permission=has_permission
+        )
+
     # Potentially thread-unsafe methods.
     # CAUTION:
     #       * Don't use self.lock here.
@@ -482,6 +545,48 @@ class StorePartition:
     def _all(self) -> Result[List[BaseStash.object_type], str]:
         raise NotImplementedError
 
+    # Backends without a batched implementation fall back to one call per object
+
+    def _set_many(
+        self,
+        credentials: SyftVerifyKey,
+        objs: List[SyftObject],
+        add_permissions: Optional[List[ActionObjectPermission]] = None,
+        ignore_duplicates: bool = False,
+    ) -> Result[List[SyftObject], str]:
+        results = []
+        for obj in objs:
+            result = self._set(
+                credentials=credentials,
+                obj=obj,
+                add_permissions=permissions_for(obj, add_permissions),
+                ignore_duplicates=ignore_duplicates,
+            )
+            if result.is_err():
+                return result
+            results.append(result.ok())
+        return Ok(results)
+
+    def _get_many(
+        self, credentials: SyftVerifyKey, uids: List[UID]
+    ) -> Result[List[SyftObject], str]:
+        results = []
+        for uid in uids:
+            result = self._get(uid=uid, credentials=credentials)
+            if result.is_err():
+                return result
+            results.append(result.ok())
+        return Ok(results)
+
+    def _delete_many(
+        self, credentials: SyftVerifyKey, qks: List[QueryKey], has_permission=False
+    ) -> Result[SyftSuccess, str]:
+        for qk in qks:
+            result = self._delete(credentials, qk, has_permission=has_permission)
+            if result.is_err():
+                return result
+        return Ok(SyftSuccess(message=f"Deleted {len(qks)} objects"))
+
 
 @instrument
 @serializable()
@@ -644,6 +749,32 @@ class BaseStash:
             credentials=credentials, qk=qk, has_permission=has_permission
         )
 
+    def set_many(
+        self,
+        credentials: SyftVerifyKey,
+        objs: List[BaseStash.object_type],
+        add_permissions: Optional[List[ActionObjectPermission]] = None,
+        ignore_duplicates: bool = False,
+    ) -> Result[List[BaseStash.object_type], str]:
+        return self.partition.set_many(
+            credentials=credentials,
+            objs=objs,
+            add_permissions=add_permissions,
+            ignore_duplicates=ignore_duplicates,
+        )
+
+    def get_many(
+        self, credentials: SyftVerifyKey, uids: List[UID]
+    ) -> Result[List[BaseStash.object_type], str]:
+        return self.partition.get_many(credentials=credentials, uids=uids)
+
+    def delete_many(
+        self, credentials: SyftVerifyKey, qks: List[QueryKey], has_permission=False
+    ) -> Result[SyftSuccess, str]:
+        return self.partition.delete_many(
+            credentials=credentials, qks=qks, has_permission=has_permission
+        )
+
     def update(
         self,
         credentials: SyftVerifyKey,
@@ -676,6 +807,30 @@ class BaseUIDStoreStash(BaseStash):
     def add_permissions(self, permissions: List[ActionObjectPermission]) -> None:
         self.partition.add_permissions(permissions)
 
+    def set_many(
+        self,
+        credentials: SyftVerifyKey,
+        objs: List[BaseUIDStoreStash.object_type],
+        add_permissions: Optional[List[ActionObjectPermission]] = None,
+        ignore_duplicates: bool = False,
+    ) -> Result[List[BaseUIDStoreStash.object_type], str]:
+        for obj in objs:
+            res = self.check_type(obj, self.object_type)
+            if res.is_err():
+                return res
+        return super().set_many(
+            credentials=credentials,
+            objs=objs,
+            add_permissions=add_permissions,
+            ignore_duplicates=ignore_duplicates,
+        )
+
+    def delete_many_by_uid(
+        self, credentials: SyftVerifyKey, uids: List[UID]
+    ) -> Result[SyftSuccess, str]:
+        qks = [UIDPartitionKey.with_obj(uid) for uid in uids]
+        return super().delete_many(credentials=credentials, qks=qks)
+
     def set(
         self,
         credentials: SyftVerifyKey,
@@ -711,6 +866,12 @@ class StoreConfig(SyftBaseObject):
                 * FileLockingConfig: file based locking, ideal for same-device different-processes/threads stores.
                 * RedisLockingConfig: Redis-based locking, ideal for multi-device stores.
             Defaults to NoLockingConfig.
+        cache_size: int
+            How many deserialized objects of every partition are kept in memory, only
+            used by key-value stores. Defaults to 0, which disables the cache.
+        blob_storage_config: Optional[BlobStorageConfig]
+            Where action stores keep large payloads of action objects, the objects
+            themselves only keep their address. Defaults to None, payloads stay inline.
     """
 
     __canonical_name__ = "StoreConfig"
@@ -719,3 +880,5 @@ class StoreConfig(SyftBaseObject):
     store_type: Type[DocumentStore]
     client_config: Optional[StoreClientConfig]
     locking_config: LockingConfig = NoLockingConfig()
+    cache_size: int = 0
+    blob_storage_config: Optional[BlobStorageConfig] = None
@@ -2,12 +2,16 @@
 from __future__ import annotations
 
 # stdlib
+from collections import OrderedDict
 from collections import defaultdict
 from enum import Enum
+import threading
 from typing import Any
 from typing import List
+from typing import NamedTuple
 from typing import Optional
 from typing import Set
+from typing import Tuple
 
 # third party
 from result import Err
@@ -34,6 +38,22 @@ from .document_store import QueryKey
 from .document_store import QueryKeys
 from .document_store import StoreConfig
 from .document_store import StorePartition
+from .document_store import permissions_for
+
+
+def _hashable(value: Any) -> Any:
+    # list keys are compared by their items
+    return tuple(value) if isinstance(value, list) else value
+
+
+class BatchEntry(NamedTuple):
+    """Everything `_set_many` writes for a single object."""
+
+    store_query_key: QueryKey
+    unique_query_keys: QueryKeys
+    searchable_query_keys: QueryKeys
+    obj: SyftObject
+    permissions: Set[str]
 
 
 @serializable()
@@ -89,6 +109,153 @@ class KeyValueBackingStore:
         raise NotImplementedError
 
 
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class CachedBackingStore(KeyValueBackingStore):
+    """Write-through LRU cache of deserialized values in front of another store.
+
+    Reads are served from the cache, writes and deletes go to the wrapped store and
+    update the cache. Cached values are shared between readers, like the values of
+    a dict backed store.
+
+    If the wrapped store implements `generation()`, a counter the store bumps on
+    every committed write (see SQLiteBackingStore), it is checked on every read and
+    the cache is cleared when another process, or a rolled back transaction,
+    changed it. Anything else is forwarded to the wrapped store.
+
+    Parameters:
+        `store`: KeyValueBackingStore
+            The store holding the data
+        `maxsize`: int
+            How many values to keep, least recently used ones are evicted first
+    """
+
+    def __init__(self, store: KeyValueBackingStore, maxsize: int) -> None:
+        self.store = store
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self._generation = self._store_generation()
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes this class doesn't define
+        store = self.__dict__.get("store", None)
+        if store is None:
+            raise AttributeError(name)
+        return getattr(store, name)
+
+    def _store_generation(self) -> Optional[int]:
+        generation = getattr(self.store, "generation", None)
+        return generation() if generation is not None else None
+
+    def _validate(self) -> None:
+        generation = self._store_generation()
+        if generation != self._generation:
+            self._cache.clear()
+            self._generation = generation
+
+    def _put(self, key: Any, value: Any) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cache))
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._lock:
+            # catch up with writes of others first, only our own write may be
+            # adopted below. the key is dropped before writing, so that a failed
+            # write doesn't leave it cached
+            self._validate()
+            self._cache.pop(key, None)
+            self.store[key] = value
+            # our own write, the cache holds the new value
+            self._generation = self._store_generation()
+            self._put(key, value)
+
+    def __getitem__(self, key: Any) -> Any:
+        with self._lock:
+            self._validate()
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            self.misses += 1
+            value = self.store[key]
+            # values made up by the store for missing keys (`ddtype`) aren't cached
+            if getattr(self.store, "_ddtype", None) is None or key in self.store:
+                self._put(key, value)
+            return value
+
+    def __delitem__(self, key: Any) -> None:
+        with self._lock:
+            self._validate()
+            self._cache.pop(key, None)
+            del self.store[key]
+            self._generation = self._store_generation()
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            self._validate()
+            if key in self._cache:
+                return True
+        return key in self.store
+
+    def __repr__(self) -> str:
+        return repr(self.store)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __iter__(self) -> Any:
+        return iter(self.store)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._validate()
+            self._cache.clear()
+            self.store.clear()
+            self._generation = self._store_generation()
+
+    def copy(self) -> Self:
+        return self.store.copy()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def keys(self) -> Any:
+        return self.store.keys()
+
+    def values(self) -> Any:
+        return self.store.values()
+
+    def items(self) -> Any:
+        return self.store.items()
+
+    def pop(self, key: Any, *args: Any) -> Any:
+        with self._lock:
+            self._validate()
+            self._cache.pop(key, None)
+            value = self.store.pop(key, *args)
+            self._generation = self._store_generation()
+            return value
+
+
 class KeyValueStorePartition(StorePartition):
     """Key-Value StorePartition
 
@@ -116,30 +283,109 @@ class KeyValueStorePartition(StorePartition):
             self.data = self.store_config.backing_store(
                 "data", self.settings, self.store_config
             )
-            self.unique_keys = self.store_config.backing_store(
-                "unique_keys", self.settings, self.store_config
-            )
-            self.searchable_keys = self.store_config.backing_store(
-                "searchable_keys", self.settings, self.store_config
-            )
-            self.permissions = self.store_config.backing_store(
-                "permissions", self.settings, self.store_config, ddtype=set
-            )
-
-            for partition_key in self.unique_cks:
-                pk_key = partition_key.key
-                if pk_key not in self.unique_keys:
-                    self.unique_keys[pk_key] = {}
-
-            for partition_key in self.searchable_cks:
-                pk_key = partition_key.key
-                if pk_key not in self.searchable_keys:
-                    self.searchable_keys[pk_key] = defaultdict(list)
+            if self.store_config.cache_size > 0:
+                self.data = CachedBackingStore(self.data, self.store_config.cache_size)
+            self._init_permissions()
+            self._init_keys()
         except BaseException as e:
             return Err(str(e))
 
         return Ok()
 
+    def _init_permissions(self) -> None:
+        # maps every uid to the set of its permission strings
+        self.permissions = self.store_config.backing_store(
+            "permissions", self.settings, self.store_config, ddtype=set
+        )
+
+    # Index of the unique and searchable keys.
+    # The default layout keeps one dict per partition key in a backing store, which
+    # is read and written back as a whole. Backends with a better way to store an
+    # index (see SQLiteStorePartition) override the methods below.
+
+    def _init_keys(self) -> None:
+        self.unique_keys = self.store_config.backing_store(
+            "unique_keys", self.settings, self.store_config
+        )
+        self.searchable_keys = self.store_config.backing_store(
+            "searchable_keys", self.settings, self.store_config
+        )
+
+        for partition_key in self.unique_cks:
+            pk_key = partition_key.key
+            if pk_key not in self.unique_keys:
+                self.unique_keys[pk_key] = {}
+
+        for partition_key in self.searchable_cks:
+            pk_key = partition_key.key
+            if pk_key not in self.searchable_keys:
+                self.searchable_keys[pk_key] = defaultdict(list)
+
+    def _get_unique_key(self, qk: QueryKey) -> Optional[UID]:
+        """UID of the object holding the unique value of `qk`, if any"""
+        if qk.key not in self.unique_keys:
+            raise KeyError(f"pk_key: {qk.key} not in unique_keys")
+        return self.unique_keys[qk.key].get(qk.value, None)
+
+    def _add_unique_key(self, qk: QueryKey, uid: UID) -> None:
+        ck_col = self.unique_keys[qk.key]
+        ck_col[qk.value] = uid
+        self.unique_keys[qk.key] = ck_col
+
+    def _remove_unique_key(self, qk: QueryKey) -> None:
+        ck_col = self.unique_keys[qk.key]
+        ck_col.pop(qk.value, None)
+        self.unique_keys[qk.key] = ck_col
+
+    def _find_search_key(self, qk: QueryKey) -> Set[UID]:
+        """UIDs of all objects matching the searchable value of `qk`"""
+        if qk.key not in self.searchable_keys:
+            raise KeyError(f"pk_key: {qk.key} not in searchable_keys")
+        ck_col = self.searchable_keys[qk.key]
+
+        if not qk.type_list:
+            return set(ck_col.get(qk.value, []))
+
+        # 🟡 TODO: change this hacky way to do on to many relationships
+        # this is when you search a QueryKey which is a list of items
+        # at the moment its mostly just a List[UID]
+        # match OR against all keys for this col
+        # the values of the list will be turned into strings in a single key
+        matches = set()
+        for item in qk.value:
+            for col_key, store_values in ck_col.items():
+                if str(item) in col_key:
+                    matches.update(store_values)
+        return matches
+
+    def _add_search_key(self, qk: QueryKey, uid: UID) -> None:
+        ck_col = self.searchable_keys[qk.key]
+        pk_value = qk.value
+        if qk.type_list:
+            # coerce the list of objects to strings for a single key
+            pk_value = " ".join([str(obj) for obj in pk_value])
+
+        # check if key is present, then add to existing key
+        if pk_value in ck_col:
+            ck_col[pk_value].append(uid)
+        else:
+            # else create the key with a list
+            ck_col[pk_value] = [uid]
+
+        self.searchable_keys[qk.key] = ck_col
+
+    def _remove_search_key(self, qk: QueryKey, uid: UID) -> None:
+        ck_col = self.searchable_keys[qk.key]
+        pk_value = qk.value
+        if qk.type_list:
+            pk_value = " ".join([str(obj) for obj in pk_value])
+
+        if pk_value in ck_col and uid in ck_col[pk_value]:
+            ck_col[pk_value].remove(uid)
+            if len(ck_col[pk_value]) == 0:
+                del ck_col[pk_value]
+        self.searchable_keys[qk.key] = ck_col
+
     def __len__(self) -> int:
         return len(self.data)
 
@@ -221,6 +467,116 @@ class KeyValueStorePartition(StorePartition):
         except Exception as e:
             return Err(f"Failed to write obj {obj}. {e}")
 
+    def _set_many(
+        self,
+        credentials: SyftVerifyKey,
+        objs: List[SyftObject],
+        add_permissions: Optional[List[ActionObjectPermission]] = None,
+        ignore_duplicates: bool = False,
+    ) -> Result[List[SyftObject], str]:
+        # check the whole batch before writing anything, so that a duplicate in the
+        # middle of the batch doesn't leave the first half written
+        entries: List[BatchEntry] = []
+        batch_unique_values: Set[Tuple[str, Any]] = set()
+        unique_keys = self.settings.unique_keys
+        searchable_keys = self.settings.searchable_keys
+        for obj in objs:
+            try:
+                if obj.id is None:
+                    obj.id = UID()
+                store_query_key = self.settings.store_key.with_obj(obj)
+                uid = store_query_key.value
+                unique_query_keys = unique_keys.with_obj(obj)
+                unique_values = {
+                    (qk.key, _hashable(qk.value)) for qk in unique_query_keys.all
+                }
+
+                if (
+                    uid in self.data
+                    or not unique_values.isdisjoint(batch_unique_values)
+                    or self._check_partition_keys_unique(unique_query_keys)
+                    != UniqueKeyCheck.EMPTY
+                ):
+                    if ignore_duplicates:
+                        continue
+                    keys = ", ".join(f"`{key.key}`" for key in unique_query_keys.all)
+                    return Err(
+                        f"Duplication Key Error for {obj}.\n"
+                        f"The fields that should be unique are {keys}."
+                    )
+
+                # the first person using this UID can claim ownership
+                if uid in self.permissions:
+                    write_permission = ActionObjectWRITE(
+                        uid=uid, credentials=credentials
+                    )
+                    return Err(f"Permission: {write_permission} denied")
+
+                permissions = {
+                    permission(uid=uid, credentials=credentials).permission_string
+                    for permission in [
+                        ActionObjectOWNER,
+                        ActionObjectWRITE,
+                        ActionObjectREAD,
+                        ActionObjectEXECUTE,
+                    ]
+                }
+                permissions.update(
+                    x.permission_string
+                    for x in permissions_for(obj, add_permissions) or []
+                )
+                batch_unique_values.update(unique_values)
+                entries.append(
+                    BatchEntry(
+                        store_query_key=store_query_key,
+                        unique_query_keys=unique_query_keys,
+                        searchable_query_keys=searchable_keys.with_obj(obj),
+                        obj=obj,
+                        permissions=permissions,
+                    )
+                )
+            except Exception as e:
+                return Err(f"Failed to write obj {obj}. {e}")
+
+        # errors while writing are raised, which rolls back the whole batch on
+        # backends with transactions
+        self._set_many_data_and_keys(entries)
+        return Ok(list(objs))
+
+    def _set_many_data_and_keys(self, entries: List[BatchEntry]) -> None:
+        for entry in entries:
+            self._set_data_and_keys(
+                store_query_key=entry.store_query_key,
+                unique_query_keys=entry.unique_query_keys,
+                searchable_query_keys=entry.searchable_query_keys,
+                obj=entry.obj,
+            )
+            self.permissions[entry.store_query_key.value] = entry.permissions
+
+    def _delete_many(
+        self, credentials: SyftVerifyKey, qks: List[QueryKey], has_permission=False
+    ) -> Result[SyftSuccess, str]:
+        objs = []
+        for qk in qks:
+            if not has_permission and not self.has_permission(
+                ActionObjectWRITE(uid=qk.value, credentials=credentials)
+            ):
+                return Err(
+                    f"Failed to delete with query key {qk}, you have no permission"
+                )
+            if qk.value not in self.data:
+                return Err(f"Failed to delete with query key {qk}, no such object")
+            objs.append(self.data[qk.value])
+
+        self._delete_many_data_and_keys(objs)
+        return Ok(SyftSuccess(message=f"Deleted {len(objs)} objects"))
+
+    def _delete_many_data_and_keys(self, objs: List[SyftObject]) -> None:
+        for obj in objs:
+            del self.data[self.settings.store_key.with_obj(obj).value]
+            self._delete_unique_keys_for(obj)
+            self._delete_search_keys_for(obj)
+
     def take_ownership(
         self, uid: UID, credentials: SyftVerifyKey
     ) -> Result[SyftSuccess, str]:
@@ -301,20 +657,11 @@ class KeyValueStorePartition(StorePartition):
         unique_query_keys: QueryKeys,
         searchable_query_keys: QueryKeys,
     ) -> None:
-        uqks = unique_query_keys.all
-        for qk in uqks:
-            pk_key, pk_value = qk.key, qk.value
-            ck_col = self.unique_keys[pk_key]
-            ck_col.pop(store_key.value, None)
-            self.unique_keys[pk_key] = ck_col
-
-        sqks = searchable_query_keys.all
-        for qk in sqks:
-            pk_key, pk_value = qk.key, qk.value
-            ck_col = self.searchable_keys[pk_key]
-            if pk_value in ck_col and (store_key.value in ck_col[pk_value]):
-                ck_col[pk_value].remove(store_key.value)
-            self.searchable_keys[pk_key] = ck_col
+        for qk in unique_query_keys.all:
+            self._remove_unique_key(qk)
+
+        for qk in searchable_query_keys.all:
+            self._remove_search_key(qk, store_key.value)
 
     def _find_index_or_search_keys(
         self,
@@ -455,14 +802,13 @@ class KeyValueStorePartition(StorePartition):
 
     def _delete_unique_keys_for(self, obj: SyftObject) -> Result[SyftSuccess, str]:
         for _unique_ck in self.unique_cks:
-            qk = _unique_ck.with_obj(obj)
-            self.unique_keys[qk.key].pop(qk.value, None)
+            self._remove_unique_key(_unique_ck.with_obj(obj))
         return Ok(SyftSuccess(message="Deleted"))
 
     def _delete_search_keys_for(self, obj: SyftObject) -> Result[SyftSuccess, str]:
+        uid = self.settings.store_key.with_obj(obj).value
         for _search_ck in self.searchable_cks:
-            qk = _search_ck.with_obj(obj)
-            self.searchable_keys[qk.key].pop(qk.value, None)
+            self._remove_search_key(_search_ck.with_obj(obj), uid)
         return Ok(SyftSuccess(message="Deleted"))
 
     def _get_keys_index(self, qks: QueryKeys) -> Result[Set[Any], str]:
@@ -470,15 +816,13 @@ class KeyValueStorePartition(StorePartition):
             # match AND
             subsets = []
             for qk in qks.all:
-                subset = {}
-                pk_key, pk_value = qk.key, qk.value
-                if pk_key not in self.unique_keys:
+                try:
+                    store_value = self._get_unique_key(qk)
+                except KeyError:
                     return Err(f"Failed to query index with {qk}")
-                ck_col = self.unique_keys[pk_key]
-                if pk_value not in ck_col.keys():
+                if store_value is None:
                     # must be at least one in all query keys
                     continue
-                store_value = ck_col[pk_value]
                 subsets.append({store_value})
 
             if len(subsets) == 0:
@@ -497,34 +841,14 @@ class KeyValueStorePartition(StorePartition):
             # match AND
             subsets = []
             for qk in qks.all:
-                subset = {}
-                pk_key, pk_value = qk.key, qk.value
-                if pk_key not in self.searchable_keys:
+                try:
+                    matches = self._find_search_key(qk)
+                except KeyError:
                     return Err(f"Failed to search with {qk}")
-                ck_col = self.searchable_keys[pk_key]
-                if qk.type_list:
-                    # 🟡 TODO: change this hacky way to do on to many relationships
-                    # this is when you search a QueryKey which is a list of items
-                    # at the moment its mostly just a List[UID]
-                    # match OR against all keys for this col
-                    # the values of the list will be turned into strings in a single key
-                    matches = set()
-                    for item in pk_value:
-                        for col_key in ck_col.keys():
-                            if str(item) in col_key:
-                                store_values = ck_col[col_key]
-                                for value in store_values:
-                                    matches.add(value)
-                    if len(matches):
-                        subsets.append(matches)
-                else:
-                    # this is the normal path
-                    if pk_value not in ck_col.keys():
-                        # must be at least one in all query keys
-                        subsets.append(set())
-                        continue
-                    store_values = ck_col[pk_value]
-                    subsets.append(set(store_values))
+                if qk.type_list and len(matches) == 0:
+                    # an empty OR match over a list doesn't restrict the result
+                    continue
+                subsets.append(matches)
 
             if len(subsets) == 0:
                 return Ok(set())
@@ -547,14 +871,12 @@ class KeyValueStorePartition(StorePartition):
         ]
         matches = []
         for qk in qks:
-            pk_key, pk_value = qk.key, qk.value
-            if pk_key not in self.unique_keys:
-                raise Exception(
-                    f"pk_key: {pk_key} not in unique_keys: {self.unique_keys.keys()}"
-                )
-            ck_col = self.unique_keys[pk_key]
-            if pk_value in ck_col:
-                matches.append(pk_key)
+            try:
+                store_value = self._get_unique_key(qk)
+            except KeyError as e:
+                raise Exception(str(e))
+            if store_value is not None:
+                matches.append(qk.key)
 
         if len(matches) == 0:
             return UniqueKeyCheck.EMPTY
@@ -570,33 +892,11 @@ class KeyValueStorePartition(StorePartition):
         searchable_query_keys: QueryKeys,
         obj: SyftObject,
     ) -> None:
-        uqks = unique_query_keys.all
-
-        for qk in uqks:
-            pk_key, pk_value = qk.key, qk.value
-            ck_col = self.unique_keys[pk_key]
-            ck_col[pk_value] = store_query_key.value
-            self.unique_keys[pk_key] = ck_col
-
-        self.unique_keys[store_query_key.key][
-            store_query_key.value
-        ] = store_query_key.value
-
-        sqks = searchable_query_keys.all
-        for qk in sqks:
-            pk_key, pk_value = qk.key, qk.value
-            ck_col = self.searchable_keys[pk_key]
-            if qk.type_list:
-                # coerce the list of objects to strings for a single key
-                pk_value = " ".join([str(obj) for obj in pk_value])
-
-            # check if key is present, then add to existing key
-            if pk_value in ck_col:
-                ck_col[pk_value].append(store_query_key.value)
-            else:
-                # else create the key with a list
-                ck_col[pk_value] = [store_query_key.value]
+        uid = store_query_key.value
+        for qk in unique_query_keys.all:
+            self._add_unique_key(qk, uid)
 
-            self.searchable_keys[pk_key] = ck_col
+        for qk in searchable_query_keys.all:
+            self._add_search_key(qk, uid)
 
-        self.data[store_query_key.value] = obj
+        self.data[uid] = obj
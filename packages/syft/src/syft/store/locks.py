@@ -182,9 +182,12 @@ class PatchedFileLock(FileLock):
             ).astimezone(datetime.timezone.utc)
         return expiry_time.isoformat()
 
-    def _thread_safe_cbk(self, cbk: Callable) -> bool:
+    def _thread_safe_cbk(self, cbk: Callable, blocking: bool = False) -> bool:
         # Acquire lock at Python level(if-needed)
-        locked = self._lock_py_thread._acquire()
+        if blocking:
+            locked = self._lock_py_thread.lock.acquire()
+        else:
+            locked = self._lock_py_thread._acquire()
         if not locked:
             return False
 
@@ -200,7 +203,9 @@ class PatchedFileLock(FileLock):
         return self._thread_safe_cbk(self._acquire_file_lock)
 
     def _release(self) -> None:
-        return self._thread_safe_cbk(self._release_file_lock)
+        # waits out threads trying to acquire, skipping would leave the file
+        # lock held until it expires
+        return self._thread_safe_cbk(self._release_file_lock, blocking=True)
 
     def _acquire_file_lock(self) -> bool:
         if not self._lock_file_enabled:
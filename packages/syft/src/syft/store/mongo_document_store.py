@@ -7,8 +7,11 @@ from typing import Type
 
 # third party
 from pymongo import ASCENDING
+from pymongo import DeleteOne
+from pymongo import UpdateOne
 from pymongo import WriteConcern
 from pymongo.collection import Collection as MongoCollection
+from pymongo.errors import BulkWriteError
 from pymongo.errors import DuplicateKeyError
 from result import Err
 from result import Ok
@@ -18,11 +21,15 @@ from typing_extensions import Self
 # relative
 from ..node.credentials import SyftVerifyKey
 from ..serde.deserialize import _deserialize
+from ..serde.recursive import STORE_SERDE_WIRE_VERSION
 from ..serde.serializable import serializable
 from ..serde.serialize import _serialize
+from ..service.action.action_permissions import ActionObjectEXECUTE
+from ..service.action.action_permissions import ActionObjectOWNER
 from ..service.action.action_permissions import ActionObjectPermission
 from ..service.action.action_permissions import ActionObjectREAD
 from ..service.action.action_permissions import ActionObjectWRITE
+from ..service.action.action_permissions import ActionPermission
 from ..service.response import SyftSuccess
 from ..types.syft_object import StorableObjectType
 from ..types.syft_object import SyftBaseObject
@@ -30,17 +37,32 @@ from ..types.syft_object import SyftObject
 from ..types.transforms import TransformContext
 from ..types.transforms import transform
 from ..types.transforms import transform_method
+from ..types.uid import UID
 from .document_store import DocumentStore
 from .document_store import PartitionKey
 from .document_store import QueryKey
 from .document_store import QueryKeys
 from .document_store import StoreConfig
 from .document_store import StorePartition
+from .document_store import permissions_for
 from .locks import LockingConfig
 from .locks import NoLockingConfig
 from .mongo_client import MongoClient
 from .mongo_client import MongoStoreClientConfig
 
+# error code of a write that violates a unique index
+MONGO_DUPLICATE_KEY_ERROR = 11000
+
+# indexed array of the permission strings of a document, see ActionObjectPermission
+PERMISSIONS_FIELD = "__permissions__"
+
+# permissions also granted to everyone through their ALL_ counterpart
+ALL_PERMISSIONS = {
+    ActionPermission.READ: ActionPermission.ALL_READ,
+    ActionPermission.WRITE: ActionPermission.ALL_WRITE,
+    ActionPermission.EXECUTE: ActionPermission.ALL_EXECUTE,
+}
+
 
 @serializable()
 class MongoDict(SyftBaseObject):
@@ -87,7 +109,9 @@ def to_mongo(context: TransformContext) -> TransformContext:
         output["_id"] = context.output["id"]
     output["__canonical_name__"] = context.obj.__canonical_name__
     output["__version__"] = context.obj.__version__
-    output["__blob__"] = _serialize(context.obj, to_bytes=True)
+    output["__blob__"] = _serialize(
+        context.obj, to_bytes=True, wire_version=STORE_SERDE_WIRE_VERSION
+    )
     output["__arepr__"] = _repr_debug_(context.obj)  # a comes first in alphabet
     context.output = output
     return context
@@ -132,7 +156,11 @@ class MongoStorePartition(StorePartition):
 
         self._collection = collection_status.ok()
 
-        return self._create_update_index()
+        index_status = self._create_update_index()
+        if index_status.is_err():
+            return index_status
+
+        return self._migrate_permissions()
 
     # Potentially thread-unsafe methods.
     # CAUTION:
@@ -152,6 +180,12 @@ class MongoStorePartition(StorePartition):
             new_index_keys.sort()
             return current_keys == new_index_keys
 
+        try:
+            # multikey index, every permission check filters on it
+            collection.create_index(PERMISSIONS_FIELD)
+        except Exception as e:
+            return Err(f"Failed to create the permissions index: {e}")
+
         syft_obj = self.settings.object_type
 
         unique_attrs = getattr(syft_obj, "__attr_unique__", [])
@@ -193,6 +227,24 @@ class MongoStorePartition(StorePartition):
 
         return Ok()
 
+    def _migrate_permissions(self) -> Result[Ok, Err]:
+        """Fill in the permissions of documents written before they were stored
+        in them. Mongo stores didn't check permissions then, everyone could read,
+        write and execute every document, so that is what they are given."""
+        legacy_permissions = [
+            permission.name for permission in ALL_PERMISSIONS.values()
+        ]
+        try:
+            self._collection.update_many(
+                {PERMISSIONS_FIELD: {"$exists": False}},
+                {"$set": {PERMISSIONS_FIELD: legacy_permissions}},
+            )
+        except Exception as e:
+            return Err(
+                f"Failed to migrate the permissions of {self.settings.name}: {e}"
+            )
+        return Ok()
+
     @property
     def collection(self) -> Result[MongoCollection, Err]:
         if not hasattr(self, "_collection"):
@@ -209,28 +261,68 @@ class MongoStorePartition(StorePartition):
         add_permissions: Optional[List[ActionObjectPermission]] = None,
         ignore_duplicates: bool = False,
     ) -> Result[SyftObject, str]:
-        write_permission = ActionObjectWRITE(uid=obj.id, credentials=credentials)
-        can_write = self.has_permission(write_permission)
-        if can_write:
-            storage_obj = obj.to(self.storage_type)
-
-            collection_status = self.collection
-            if collection_status.is_err():
-                return collection_status
-            collection = collection_status.ok()
-
-            if ignore_duplicates:
-                collection = collection.with_options(write_concern=WriteConcern(w=0))
-            try:
-                collection.insert_one(storage_obj)
-            except DuplicateKeyError as e:
-                return Err(f"Duplicate Key Error for {obj}: {e}")
-            if add_permissions is not None:
-                pass
-                # TODO: update permissions
-            return Ok(obj)
-        else:
-            return Err(f"No permission to write object with id {obj.id}")
+        # objects are only ever inserted, the unique `_id` index makes sure that
+        # nobody takes over an object which already exists
+        collection_status = self.collection
+        if collection_status.is_err():
+            return collection_status
+        collection = collection_status.ok()
+
+        storage_obj = self._to_storage(credentials, obj, add_permissions)
+        if ignore_duplicates:
+            collection = collection.with_options(write_concern=WriteConcern(w=0))
+        try:
+            collection.insert_one(storage_obj)
+        except DuplicateKeyError as e:
+            return Err(f"Duplicate Key Error for {obj}: {e}")
+        return Ok(obj)
+
+    def _to_storage(
+        self,
+        credentials: SyftVerifyKey,
+        obj: SyftObject,
+        add_permissions: Optional[List[ActionObjectPermission]] = None,
+    ) -> MongoBsonObject:
+        # whoever creates an object owns it, like KeyValueStorePartition.take_ownership
+        if obj.id is None:
+            obj.id = UID()
+        permissions = [
+            ActionObjectOWNER(uid=obj.id, credentials=credentials),
+            ActionObjectWRITE(uid=obj.id, credentials=credentials),
+            ActionObjectREAD(uid=obj.id, credentials=credentials),
+            ActionObjectEXECUTE(uid=obj.id, credentials=credentials),
+        ]
+        if add_permissions is not None:
+            permissions.extend(add_permissions)
+
+        storage_obj = obj.to(self.storage_type)
+        storage_obj[PERMISSIONS_FIELD] = sorted(
+            {permission.permission_string for permission in permissions}
+        )
+        return storage_obj
+
+    def _permission_filter(
+        self, credentials: SyftVerifyKey, permission: ActionPermission
+    ) -> Dict[str, Any]:
+        """Mongo filter matching the documents `credentials` hold `permission` on"""
+        # TODO: fix for other admins
+        if credentials.verify == self.root_verify_key.verify:
+            return {}
+        permission_strings = [f"{credentials.verify}_{permission.name}"]
+        if permission in ALL_PERMISSIONS:
+            permission_strings.append(ALL_PERMISSIONS[permission].name)
+        return {PERMISSIONS_FIELD: {"$in": permission_strings}}
+
+    def _filter(
+        self,
+        credentials: SyftVerifyKey,
+        qks: QueryKeys,
+        permission: ActionPermission,
+    ) -> Dict[str, Any]:
+        return {
+            **qks.as_dict_mongo,
+            **self._permission_filter(credentials, permission),
+        }
 
     def _update(
         self,
@@ -244,43 +336,41 @@ class MongoStorePartition(StorePartition):
             return collection_status
         collection = collection_status.ok()
 
-        # TODO: optimize the update. The ID should not be overwritten,
-        # but the qk doesn't necessarily have to include the `id` field either.
-
-        prev_obj_status = self._get_all_from_store(credentials, QueryKeys(qks=[qk]))
-        if prev_obj_status.is_err():
-            return Err(f"No object found with query key: {qk}")
-
-        prev_obj = prev_obj_status.ok()
-        if len(prev_obj) == 0:
+        # The ID should not be overwritten, but the qk doesn't necessarily have to
+        # include the `id` field either. Only the `_id` of the previous object is
+        # fetched, nothing gets deserialized.
+        qks = QueryKeys(qks=[qk])
+        prev_obj = collection.find_one(filter=qks.as_dict_mongo, projection=["_id"])
+        if prev_obj is None:
             return Err(f"Missing values for query key: {qk}")
 
-        prev_obj = prev_obj[0]
-        if has_permission or self.has_permission(
-            ActionObjectWRITE(uid=prev_obj.id, credentials=credentials)
-        ):
-            # we don't want to overwrite Mongo's "id_" or Syft's "id" on update
-            obj_id = obj["id"]
+        # we don't want to overwrite Mongo's "id_" or Syft's "id" on update
+        obj_id = obj["id"]
 
-            # Set ID to the updated object value
-            obj.id = prev_obj["id"]
+        # Set ID to the updated object value
+        obj.id = prev_obj["_id"]
 
-            # Create the Mongo object
-            storage_obj = obj.to(self.storage_type)
+        # Create the Mongo object, `$set` leaves its permissions alone
+        storage_obj = obj.to(self.storage_type)
 
-            # revert the ID
-            obj.id = obj_id
+        # revert the ID
+        obj.id = obj_id
 
-            try:
-                collection.update_one(
-                    filter=qk.as_dict_mongo, update={"$set": storage_obj}
-                )
-            except Exception as e:
-                return Err(f"Failed to update obj: {obj} with qk: {qk}. Error: {e}")
+        update_filter = {"_id": prev_obj["_id"]}
+        if not has_permission:
+            update_filter.update(
+                self._permission_filter(credentials, ActionPermission.WRITE)
+            )
+        try:
+            result = collection.update_one(
+                filter=update_filter, update={"$set": storage_obj}
+            )
+        except Exception as e:
+            return Err(f"Failed to update obj: {obj} with qk: {qk}. Error: {e}")
 
-            return Ok(obj)
-        else:
+        if result.matched_count == 0:
             return Err(f"Failed to update obj {obj}, you have no permission")
+        return Ok(obj)
 
     def _find_index_or_search_keys(
         self,
@@ -306,23 +396,16 @@ class MongoStorePartition(StorePartition):
             return collection_status
         collection = collection_status.ok()
 
-        if order_by is not None:
-            storage_objs = collection.find(filter=qks.as_dict_mongo).sort(order_by.key)
-        else:
-            _default_key = "_id"
-            storage_objs = collection.find(filter=qks.as_dict_mongo).sort(_default_key)
+        # documents the user can't read are filtered out by Mongo
+        query_filter = self._filter(credentials, qks, ActionPermission.READ)
+        sort_key = order_by.key if order_by is not None else "_id"
+        storage_objs = collection.find(filter=query_filter).sort(sort_key)
         syft_objs = []
         for storage_obj in storage_objs:
             obj = self.storage_type(storage_obj)
             transform_context = TransformContext(output={}, obj=obj)
             syft_objs.append(obj.to(self.settings.object_type, transform_context))
-
-        # TODO: maybe do this in loop before this
-        res = []
-        for s in syft_objs:
-            if self.has_permission(ActionObjectREAD(uid=s.id, credentials=credentials)):
-                res.append(s)
-        return Ok(res)
+        return Ok(syft_objs)
 
     def _delete(
         self, credentials: SyftVerifyKey, qk: QueryKey, has_permission: bool = False
@@ -332,20 +415,158 @@ class MongoStorePartition(StorePartition):
             return collection_status
         collection = collection_status.ok()
 
-        if has_permission or self.has_permission(
-            ActionObjectWRITE(uid=qk.value, credentials=credentials)
-        ):
-            qks = QueryKeys(qks=qk)
-            result = collection.delete_one(filter=qks.as_dict_mongo)
+        qks = QueryKeys(qks=qk)
+        if has_permission:
+            delete_filter = qks.as_dict_mongo
+        else:
+            delete_filter = self._filter(credentials, qks, ActionPermission.WRITE)
+        result = collection.delete_one(filter=delete_filter)
 
-            if result.deleted_count == 1:
-                return Ok(SyftSuccess(message="Deleted"))
+        if result.deleted_count == 1:
+            return Ok(SyftSuccess(message="Deleted"))
 
         return Err(f"Failed to delete object with qk: {qk}")
 
+    def _set_many(
+        self,
+        credentials: SyftVerifyKey,
+        objs: List[SyftObject],
+        add_permissions: Optional[List[ActionObjectPermission]] = None,
+        ignore_duplicates: bool = False,
+    ) -> Result[List[SyftObject], str]:
+        collection_status = self.collection
+        if collection_status.is_err():
+            return collection_status
+        collection = collection_status.ok()
+
+        if len(objs) == 0:
+            return Ok([])
+
+        storage_objs = [
+            self._to_storage(credentials, obj, permissions_for(obj, add_permissions))
+            for obj in objs
+        ]
+        try:
+            # an unordered insert keeps going after a duplicate
+            collection.insert_many(storage_objs, ordered=not ignore_duplicates)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            only_duplicates = all(
+                error.get("code") == MONGO_DUPLICATE_KEY_ERROR for error in write_errors
+            )
+            if not (ignore_duplicates and only_duplicates):
+                return Err(f"Duplicate Key Error for {objs}: {write_errors}")
+        return Ok(objs)
+
+    def _get_many(
+        self, credentials: SyftVerifyKey, uids: List[UID]
+    ) -> Result[List[SyftObject], str]:
+        collection_status = self.collection
+        if collection_status.is_err():
+            return collection_status
+        collection = collection_status.ok()
+
+        query_filter = {
+            "_id": {"$in": uids},
+            **self._permission_filter(credentials, ActionPermission.READ),
+        }
+        syft_objs = {}
+        for storage_obj in collection.find(filter=query_filter):
+            obj = self.storage_type(storage_obj)
+            transform_context = TransformContext(output={}, obj=obj)
+            syft_obj = obj.to(self.settings.object_type, transform_context)
+            syft_objs[syft_obj.id] = syft_obj
+
+        missing = [uid for uid in uids if uid not in syft_objs]
+        if len(missing) > 0:
+            return Err(f"{missing} don't exist or you have no permission to read them")
+        return Ok([syft_objs[uid] for uid in uids])
+
+    def _delete_many(
+        self, credentials: SyftVerifyKey, qks: List[QueryKey], has_permission=False
+    ) -> Result[SyftSuccess, str]:
+        collection_status = self.collection
+        if collection_status.is_err():
+            return collection_status
+        collection = collection_status.ok()
+
+        if len(qks) == 0:
+            return Ok(SyftSuccess(message="Deleted 0 objects"))
+
+        requests = []
+        for qk in qks:
+            qk_filter = QueryKeys(qks=qk)
+            if has_permission:
+                requests.append(DeleteOne(qk_filter.as_dict_mongo))
+            else:
+                requests.append(
+                    DeleteOne(
+                        self._filter(credentials, qk_filter, ActionPermission.WRITE)
+                    )
+                )
+        result = collection.bulk_write(requests)
+        if result.deleted_count != len(qks):
+            return Err(
+                f"Deleted {result.deleted_count} of {len(qks)} objects with qks: {qks}"
+            )
+        return Ok(SyftSuccess(message=f"Deleted {len(qks)} objects"))
+
+    def add_permission(self, permission: ActionObjectPermission) -> None:
+        self.add_permissions([permission])
+
+    def add_permissions(self, permissions: List[ActionObjectPermission]) -> None:
+        collection_status = self.collection
+        if collection_status.is_err():
+            return
+        collection = collection_status.ok()
+
+        if len(permissions) == 0:
+            return
+        requests = [
+            UpdateOne(
+                {"_id": permission.uid},
+                {"$addToSet": {PERMISSIONS_FIELD: permission.permission_string}},
+            )
+            for permission in permissions
+        ]
+        collection.bulk_write(requests)
+
+    def remove_permission(self, permission: ActionObjectPermission) -> None:
+        collection_status = self.collection
+        if collection_status.is_err():
+            return
+        collection = collection_status.ok()
+
+        collection.update_one(
+            {"_id": permission.uid},
+            {"$pull": {PERMISSIONS_FIELD: permission.permission_string}},
+        )
+
     def has_permission(self, permission: ActionObjectPermission) -> bool:
-        # TODO: implement
-        return True
+        if not isinstance(permission.permission, ActionPermission):
+            raise Exception(f"ObjectPermission type: {permission.permission} not valid")
+
+        # TODO: fix for other admins
+        if (
+            permission.credentials is not None
+            and self.root_verify_key.verify == permission.credentials.verify
+        ):
+            return True
+
+        collection_status = self.collection
+        if collection_status.is_err():
+            return False
+        collection = collection_status.ok()
+
+        if permission.credentials is None:
+            # ALL_READ etc. are stored as they are
+            permission_filter = {PERMISSIONS_FIELD: permission.permission_string}
+        else:
+            permission_filter = self._permission_filter(
+                permission.credentials, permission.permission
+            )
+        query_filter = {"_id": permission.uid, **permission_filter}
+        return collection.count_documents(filter=query_filter, limit=1) > 0
 
     def _all(self, credentials: SyftVerifyKey, order_by: Optional[PartitionKey] = None):
         qks = QueryKeys(qks=())
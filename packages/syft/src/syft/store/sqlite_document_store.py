@@ -2,14 +2,21 @@
 from __future__ import annotations
 
 # stdlib
+from contextlib import contextmanager
 from copy import deepcopy
+import os
 from pathlib import Path
 import sqlite3
 import tempfile
+import threading
 from typing import Any
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 from typing import Type
 from typing import Union
 
@@ -22,15 +29,23 @@ from result import Result
 from typing_extensions import Self
 
 # relative
+from ..node.credentials import SyftVerifyKey
 from ..serde.deserialize import _deserialize
+from ..serde.recursive import STORE_SERDE_WIRE_VERSION
 from ..serde.serializable import serializable
 from ..serde.serialize import _serialize
+from ..service.action.action_permissions import ActionObjectPermission
+from ..service.action.action_permissions import ActionPermission
+from ..types.syft_object import SyftObject
 from ..types.uid import UID
-from ..util.util import thread_ident
 from .document_store import DocumentStore
+from .document_store import PartitionKey
 from .document_store import PartitionSettings
+from .document_store import QueryKey
+from .document_store import QueryKeys
 from .document_store import StoreClientConfig
 from .document_store import StoreConfig
+from .kv_document_store import BatchEntry
 from .kv_document_store import KeyValueBackingStore
 from .kv_document_store import KeyValueStorePartition
 from .locks import FileLockingConfig
@@ -43,6 +58,173 @@ def _repr_debug_(value: Any) -> str:
     return repr(value)
 
 
+# generation counter of every cached table
+GENERATION_TABLE = "syft_generation"
+
+# stay well below SQLITE_MAX_VARIABLE_NUMBER, which is 999 on older versions
+SQLITE_MAX_BATCH_PARAMS = 500
+
+
+def _file_id(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+class SQLiteConnectionPool:
+    """Connections to a single SQLite file, shared by every backing store using it.
+
+    SQLite connections can't be shared between threads by default, so every thread
+    gets its own connection. It is kept in a thread local and goes away together
+    with the thread. When connections may cross threads (`check_same_thread=False`)
+    up to `pool_size` connections of finished threads are kept around and handed to
+    new threads.
+
+    Writes made inside `transaction()` are committed together when the outermost
+    transaction of the thread ends, outside of a transaction every write is
+    committed right away.
+    """
+
+    def __init__(self, client_config: SQLiteStoreClientConfig) -> None:
+        self.client_config = client_config
+        self.file_path = client_config.file_path
+        self.file_id: Optional[Tuple[int, int]] = None
+        self._local = threading.local()
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        with self._lock:
+            if len(self._idle) > 0:
+                return self._idle.pop()
+
+        client_config = self.client_config
+        connection = sqlite3.connect(
+            self.file_path,
+            timeout=client_config.timeout,
+            check_same_thread=client_config.check_same_thread,
+        )
+        if client_config.journal_mode is not None:
+            connection.execute(f"pragma journal_mode={client_config.journal_mode}")
+        if client_config.synchronous is not None:
+            connection.execute(f"pragma synchronous={client_config.synchronous}")
+        self.file_id = _file_id(self.file_path)
+        return connection
+
+    def _release(self, connection: sqlite3.Connection) -> None:
+        # called once the thread owning the connection is gone
+        if not self.client_config.check_same_thread:
+            with self._lock:
+                if len(self._idle) < self.client_config.pool_size:
+                    connection.rollback()
+                    self._idle.append(connection)
+                    return
+        try:
+            connection.close()
+        except sqlite3.ProgrammingError:
+            # closed once it is garbage collected
+            pass
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, "connection", None) is None:
+            local.connection = self._connect()
+            local.depth = 0
+            local.failed = False
+            local.finalizer = _ThreadFinalizer(self._release, local.connection)
+        return local.connection
+
+    @property
+    def in_transaction(self) -> bool:
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self.connection
+        local = self._local
+        local.depth += 1
+        try:
+            yield connection
+        except BaseException:
+            local.failed = True
+            raise
+        finally:
+            local.depth -= 1
+            if local.depth == 0:
+                failed, local.failed = local.failed, False
+                if failed:
+                    connection.rollback()
+                else:
+                    connection.commit()
+
+    def commit(self) -> None:
+        # a thread without a connection has nothing to commit, don't open one
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and not self.in_transaction:
+            connection.commit()
+
+    def rollback(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            return
+        if self.in_transaction:
+            # the whole transaction is rolled back once it ends
+            self._local.failed = True
+        else:
+            connection.rollback()
+
+    def close(self) -> None:
+        local = self._local
+        connection = getattr(local, "connection", None)
+        if connection is not None:
+            local.connection = None
+            local.finalizer.detach()
+            connection.close()
+
+
+class _ThreadFinalizer:
+    # lives in the thread local of a pool, hands the connection back to the pool
+    # when the thread ends and its locals are cleared
+
+    def __init__(self, callback: Any, connection: sqlite3.Connection) -> None:
+        self.callback = callback
+        self.connection: Optional[sqlite3.Connection] = connection
+
+    def detach(self) -> None:
+        self.connection = None
+
+    def __del__(self) -> None:
+        if self.connection is not None:
+            try:
+                self.callback(self.connection)
+            except BaseException:  # nosec
+                pass
+
+
+_POOLS: Dict[Tuple[int, str], SQLiteConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def sqlite_connection_pool(
+    client_config: SQLiteStoreClientConfig,
+) -> SQLiteConnectionPool:
+    """The connection pool of the file `client_config` points to."""
+    key = (os.getpid(), str(client_config.file_path))
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key, None)
+        # the file can be deleted and created again, e.g. when a node is reset,
+        # connections to the old file must not be reused for the new one
+        if pool is None or (
+            pool.file_id is not None and pool.file_id != _file_id(pool.file_path)
+        ):
+            pool = SQLiteConnectionPool(client_config)
+            _POOLS[key] = pool
+        return pool
+
+
 @serializable(attrs=["index_name", "settings", "store_config"])
 class SQLiteBackingStore(KeyValueBackingStore):
     """Core Store logic for the SQLite stores.
@@ -69,30 +251,61 @@ class SQLiteBackingStore(KeyValueBackingStore):
         self.settings = settings
         self.store_config = store_config
         self._ddtype = ddtype
-        self._db: Dict[int, sqlite3.Connection] = {}
-        self._cur: Dict[int, sqlite3.Cursor] = {}
         self.create_table()
+        if self._tracks_generation:
+            self.cur.execute(
+                f"create table if not exists {GENERATION_TABLE} ("  # nosec
+                + "name TEXT NOT NULL PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+            self._commit()
 
     @property
     def table_name(self) -> str:
         return f"{self.settings.name}_{self.index_name}"
 
-    def _connect(self) -> None:
-        # SQLite is not thread safe by default so we ensure that each connection
-        # comes from a different thread. In cases of Uvicorn and other AWSGI servers
-        # there will be many threads handling incoming requests so we need to ensure
-        # that different connections are used in each thread. By using a dict for the
-        # _db and _cur we can ensure they are never shared
-        self.file_path = self.store_config.client_config.file_path
-        self._db[thread_ident()] = sqlite3.connect(
-            self.file_path,
-            timeout=self.store_config.client_config.timeout,
-            check_same_thread=self.store_config.client_config.check_same_thread,
-        )
+    @property
+    def pool(self) -> SQLiteConnectionPool:
+        # every backing store of the same file shares its connections, so that the
+        # writes of a partition can be grouped into a single transaction
+        if getattr(self, "_pool", None) is None:
+            self._pool = sqlite_connection_pool(self.store_config.client_config)
+        return self._pool
 
-        # TODO: Review OSX compatibility.
-        # Set journal mode to WAL.
-        # self._db[thread_ident()].execute("pragma journal_mode=wal")
+    # Cross process cache invalidation, see CachedBackingStore.
+    # Only kept up to date if the stores of this config are cached at all.
+
+    @property
+    def _tracks_generation(self) -> bool:
+        return self.store_config.cache_size > 0
+
+    def generation(self) -> Optional[int]:
+        """Counter bumped by every committed write to the table"""
+        if not self._tracks_generation:
+            return None
+        select_sql = (
+            f"select generation from {GENERATION_TABLE} where name = ?"  # nosec
+        )
+        res = self._execute(select_sql, [self.table_name])
+        if res.is_err():
+            raise ValueError(res.err())
+        row = res.ok().fetchone()
+        return 0 if row is None else row[0]
+
+    @contextmanager
+    def _write(self) -> Iterator[None]:
+        # bump the generation in the same transaction as the write, so that nobody
+        # sees the new data with the old generation
+        with self.pool.transaction():
+            yield
+            if self._tracks_generation:
+                res = self._execute(
+                    f"insert into {GENERATION_TABLE} (name, generation) "  # nosec
+                    + "values (?, 1) on conflict (name) "
+                    + "do update set generation = generation + 1",
+                    [self.table_name],
+                )
+                if res.is_err():
+                    raise ValueError(res.err())
 
     def create_table(self):
         try:
@@ -101,30 +314,29 @@ class SQLiteBackingStore(KeyValueBackingStore):
                 + "repr TEXT NOT NULL, value BLOB NOT NULL, "  # nosec
                 + "sqltime TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL)"  # nosec
             )
-            self.db.commit()
+            self._commit()
         except sqlite3.OperationalError as e:
             if f"table {self.table_name} already exists" not in str(e):
                 raise e
 
     @property
     def db(self) -> sqlite3.Connection:
-        if thread_ident() not in self._db:
-            self._connect()
-        return self._db[thread_ident()]
+        return self.pool.connection
 
     @property
     def cur(self) -> sqlite3.Cursor:
-        if thread_ident() not in self._cur:
-            self._cur[thread_ident()] = self.db.cursor()
-
-        return self._cur[thread_ident()]
+        return self.db.cursor()
 
     def _close(self) -> None:
+        # the connections belong to the pool and are shared with other stores,
+        # they are released when their threads end
         self._commit()
-        self.db.close()
 
     def _commit(self) -> None:
-        self.db.commit()
+        self.pool.commit()
+
+    def _rollback(self) -> None:
+        self.pool.rollback()
 
     def _execute(
         self, sql: str, *args: Optional[List[Any]]
@@ -134,33 +346,37 @@ class SQLiteBackingStore(KeyValueBackingStore):
         try:
             cursor = self.cur.execute(sql, *args)
         except BaseException as e:
-            self.db.rollback()  # Roll back all changes if an exception occurs.
+            self._rollback()  # Roll back all changes if an exception occurs.
             err = Err(str(e))
         else:
-            self.db.commit()  # Commit if everything went ok
+            self._commit()  # Commit if everything went ok
 
         if err is not None:
             return err
 
         return Ok(cursor)
 
+    def _executemany(self, sqls: List[Tuple[str, List[Tuple]]]) -> None:
+        # all statements are committed together
+        try:
+            for sql, params in sqls:
+                self.cur.executemany(sql, params)
+        except BaseException as e:
+            self._rollback()
+            raise ValueError(str(e))
+        self._commit()
+
     def _set(self, key: UID, value: Any) -> None:
-        if self._exists(key):
-            self._update(key, value)
-        else:
-            insert_sql = f"insert into {self.table_name} (uid, repr, value) VALUES (?, ?, ?)"  # nosec
-            data = _serialize(value, to_bytes=True)
-            res = self._execute(insert_sql, [str(key), _repr_debug_(value), data])
+        upsert_sql = (
+            f"insert into {self.table_name} (uid, repr, value) values (?, ?, ?) "  # nosec
+            + "on conflict (uid) do update set repr = excluded.repr, value = excluded.value"
+        )
+        data = _serialize(value, to_bytes=True, wire_version=STORE_SERDE_WIRE_VERSION)
+        with self._write():
+            res = self._execute(upsert_sql, [str(key), _repr_debug_(value), data])
             if res.is_err():
                 raise ValueError(res.err())
 
-    def _update(self, key: UID, value: Any) -> None:
-        insert_sql = f"update {self.table_name} set uid = ?, repr = ?, value = ? where uid = ?"  # nosec
-        data = _serialize(value, to_bytes=True)
-        res = self._execute(insert_sql, [str(key), _repr_debug_(value), data, str(key)])
-        if res.is_err():
-            raise ValueError(res.err())
-
     def _get(self, key: UID) -> Any:
         select_sql = (
             f"select * from {self.table_name} where uid = ? order by sqltime"  # nosec
@@ -228,15 +444,38 @@ class SQLiteBackingStore(KeyValueBackingStore):
 
     def _delete(self, key: UID) -> None:
         select_sql = f"delete from {self.table_name} where uid = ?"  # nosec
-        res = self._execute(select_sql, [str(key)])
-        if res.is_err():
-            raise ValueError(res.err())
+        with self._write():
+            res = self._execute(select_sql, [str(key)])
+            if res.is_err():
+                raise ValueError(res.err())
+
+    def set_many(self, items: Iterable[Tuple[UID, Any]]) -> None:
+        upsert_sql = (
+            f"insert into {self.table_name} (uid, repr, value) values (?, ?, ?) "  # nosec
+            + "on conflict (uid) do update set repr = excluded.repr, value = excluded.value"
+        )
+        rows = [
+            (
+                str(key),
+                _repr_debug_(value),
+                _serialize(value, to_bytes=True, wire_version=STORE_SERDE_WIRE_VERSION),
+            )
+            for key, value in items
+        ]
+        with self._write():
+            self._executemany([(upsert_sql, rows)])
+
+    def delete_many(self, keys: Iterable[UID]) -> None:
+        delete_sql = f"delete from {self.table_name} where uid = ?"  # nosec
+        with self._write():
+            self._executemany([(delete_sql, [(str(key),) for key in keys])])
 
     def _delete_all(self) -> None:
         select_sql = f"delete from {self.table_name}"  # nosec
-        res = self._execute(select_sql)
-        if res.is_err():
-            raise ValueError(res.err())
+        with self._write():
+            res = self._execute(select_sql)
+            if res.is_err():
+                raise ValueError(res.err())
 
     def _len(self) -> int:
         select_sql = f"select count(uid) from {self.table_name}"  # nosec
@@ -294,11 +533,253 @@ class SQLiteBackingStore(KeyValueBackingStore):
     def __iter__(self) -> Any:
         return iter(self.keys())
 
-    def __del__(self):
-        try:
-            self._close()
-        except BaseException:
-            pass
+
+def _index_value(value: Any) -> bytes:
+    # the hashing serialization is deterministic, so equal values share a row
+    return _serialize(value, to_bytes=True, for_hashing=True)
+
+
+def _index_values(qk: QueryKey) -> List[bytes]:
+    # a list of items is stored with one row per item, matching any of them
+    if qk.type_list:
+        return [_index_value(str(item)) for item in qk.value]
+    return [_index_value(qk.value)]
+
+
+@serializable(attrs=["index_name", "settings", "store_config", "unique"])
+class SQLiteIndexBackingStore(SQLiteBackingStore):
+    """Unique or searchable key index of a SQLiteStorePartition.
+
+    Stores one row per (key, value, uid) instead of a blob per key, so adding or
+    removing an object only touches its own rows.
+
+    Parameters:
+        `index_name`: str
+            Index name
+        `settings`: PartitionSettings
+            Syft specific settings
+        `store_config`: SQLiteStoreConfig
+            Connection Configuration
+        `unique`: bool
+            Whether a value can only point to one uid
+    """
+
+    def __init__(
+        self,
+        index_name: str,
+        settings: PartitionSettings,
+        store_config: StoreConfig,
+        unique: bool = False,
+    ) -> None:
+        self.unique = unique
+        super().__init__(index_name, settings, store_config)
+
+    @property
+    def _tracks_generation(self) -> bool:
+        # indexes are only read through SQL, never cached
+        return False
+
+    def create_table(self) -> None:
+        primary_key = "key, value" if self.unique else "key, value, uid"
+        self.cur.execute(
+            f"create table if not exists {self.table_name} ("  # nosec
+            + "key TEXT NOT NULL, value BLOB NOT NULL, uid VARCHAR(32) NOT NULL, "
+            + f"PRIMARY KEY ({primary_key}))"  # nosec
+        )
+        self.cur.execute(
+            f"create index if not exists {self.table_name}_uid "  # nosec
+            + f"on {self.table_name} (uid)"  # nosec
+        )
+        self._commit()
+
+    def add(self, rows: Iterable[Tuple[str, bytes, UID]]) -> None:
+        conflict = "replace" if self.unique else "ignore"
+        self._executemany(
+            [
+                (
+                    f"insert or {conflict} into {self.table_name} "  # nosec
+                    + "(key, value, uid) values (?, ?, ?)",
+                    [(key, value, str(uid)) for key, value, uid in rows],
+                )
+            ]
+        )
+
+    def remove(self, key: str, values: List[bytes], uid: Optional[UID] = None) -> None:
+        sql = f"delete from {self.table_name} where key = ? and value = ?"  # nosec
+        params: List[Tuple] = [(key, value) for value in values]
+        if uid is not None:
+            sql += " and uid = ?"
+            params = [(key, value, str(uid)) for value in values]
+        self._executemany([(sql, params)])
+
+    def remove_uids(self, uids: Iterable[UID]) -> None:
+        delete_sql = f"delete from {self.table_name} where uid = ?"  # nosec
+        self._executemany([(delete_sql, [(str(uid),) for uid in uids])])
+
+    def find(self, key: str, values: List[bytes]) -> Set[UID]:
+        if len(values) == 0:
+            return set()
+        placeholders = ", ".join("?" * len(values))
+        select_sql = (
+            f"select distinct uid from {self.table_name} "  # nosec
+            + f"where key = ? and value in ({placeholders})"  # nosec
+        )
+        res = self._execute(select_sql, [key, *values])
+        if res.is_err():
+            raise ValueError(res.err())
+        return {UID(row[0]) for row in res.ok().fetchall()}
+
+
+@serializable(attrs=["index_name", "settings", "store_config"])
+class SQLitePermissionBackingStore(SQLiteBackingStore):
+    """Permissions of a SQLiteStorePartition.
+
+    Behaves like a mapping from a uid to its set of permission strings, but stores
+    one row per (uid, permission) so that queries can join against it.
+
+    Parameters:
+        `index_name`: str
+            Index name
+        `settings`: PartitionSettings
+            Syft specific settings
+        `store_config`: SQLiteStoreConfig
+            Connection Configuration
+    """
+
+    def __init__(
+        self,
+        index_name: str,
+        settings: PartitionSettings,
+        store_config: StoreConfig,
+    ) -> None:
+        super().__init__(index_name, settings, store_config, ddtype=set)
+
+    @property
+    def _tracks_generation(self) -> bool:
+        # permissions are checked in SQL, never cached
+        return False
+
+    def create_table(self) -> None:
+        self.cur.execute(
+            f"create table if not exists {self.table_name} ("  # nosec
+            + "uid VARCHAR(32) NOT NULL, permission TEXT NOT NULL, "
+            + "PRIMARY KEY (uid, permission))"
+        )
+        self._commit()
+
+    def _set(self, key: UID, value: Set[str]) -> None:
+        self._executemany(
+            [
+                (f"delete from {self.table_name} where uid = ?", [(str(key),)]),
+                (
+                    f"insert or ignore into {self.table_name} "  # nosec
+                    + "(uid, permission) values (?, ?)",
+                    [(str(key), permission) for permission in value],
+                ),
+            ]
+        )
+
+    def _get(self, key: UID) -> Set[str]:
+        select_sql = f"select permission from {self.table_name} where uid = ?"  # nosec
+        res = self._execute(select_sql, [str(key)])
+        if res.is_err():
+            raise KeyError(f"Query {select_sql} failed")
+        rows = res.ok().fetchall()
+        if len(rows) == 0:
+            raise KeyError(f"{key} not in {type(self)}")
+        return {row[0] for row in rows}
+
+    def _exists(self, key: UID) -> bool:
+        select_sql = f"select 1 from {self.table_name} where uid = ? limit 1"  # nosec
+        res = self._execute(select_sql, [str(key)])
+        if res.is_err():
+            return False
+        return res.ok().fetchone() is not None
+
+    def _get_all(self) -> Any:
+        select_sql = f"select uid, permission from {self.table_name}"  # nosec
+        res = self._execute(select_sql)
+        if res.is_err():
+            return {}
+        permissions: Dict[UID, Set[str]] = {}
+        for uid, permission in res.ok().fetchall():
+            permissions.setdefault(UID(uid), set()).add(permission)
+        return permissions
+
+    def _get_all_keys(self) -> Any:
+        select_sql = f"select distinct uid from {self.table_name}"  # nosec
+        res = self._execute(select_sql)
+        if res.is_err():
+            return []
+        return [UID(row[0]) for row in res.ok().fetchall()]
+
+    def _len(self) -> int:
+        select_sql = f"select count(distinct uid) from {self.table_name}"  # nosec
+        res = self._execute(select_sql)
+        if res.is_err():
+            raise ValueError(res.err())
+        return res.ok().fetchone()[0]
+
+    def add(self, uid: UID, permission: str) -> None:
+        self._executemany(
+            [
+                (
+                    f"insert or ignore into {self.table_name} "  # nosec
+                    + "(uid, permission) values (?, ?)",
+                    [(str(uid), permission)],
+                )
+            ]
+        )
+
+    def remove(self, uid: UID, permission: str) -> None:
+        self._executemany(
+            [
+                (
+                    f"delete from {self.table_name} "  # nosec
+                    + "where uid = ? and permission = ?",
+                    [(str(uid), permission)],
+                )
+            ]
+        )
+
+    def set_many(self, items: Iterable[Tuple[UID, Set[str]]]) -> None:
+        items = list(items)
+        self._executemany(
+            [
+                (
+                    f"delete from {self.table_name} where uid = ?",  # nosec
+                    [(str(uid),) for uid, _ in items],
+                ),
+                (
+                    f"insert or ignore into {self.table_name} "  # nosec
+                    + "(uid, permission) values (?, ?)",
+                    [
+                        (str(uid), permission)
+                        for uid, permissions in items
+                        for permission in permissions
+                    ],
+                ),
+            ]
+        )
+
+    def has_any(self, uid: UID, permissions: List[str]) -> bool:
+        placeholders = ", ".join("?" * len(permissions))
+        select_sql = (
+            f"select 1 from {self.table_name} where uid = ? "  # nosec
+            + f"and permission in ({placeholders}) limit 1"  # nosec
+        )
+        res = self._execute(select_sql, [str(uid), *permissions])
+        if res.is_err():
+            raise ValueError(res.err())
+        return res.ok().fetchone() is not None
+
+
+def _read_permissions(credentials: SyftVerifyKey) -> List[str]:
+    # permission strings granting READ, see ActionObjectPermission.permission_string
+    return [
+        f"{credentials.verify}_{ActionPermission.READ.name}",
+        ActionPermission.ALL_READ.name,
+    ]
 
 
 @serializable()
@@ -312,20 +793,285 @@ class SQLiteStorePartition(KeyValueStorePartition):
             SQLite specific configuration
     """
 
+    def _init_keys(self) -> None:
+        self.unique_keys = SQLiteIndexBackingStore(
+            "unique_index", self.settings, self.store_config, unique=True
+        )
+        self.searchable_keys = SQLiteIndexBackingStore(
+            "searchable_index", self.settings, self.store_config
+        )
+        self._migrate_legacy_keys()
+
+    def _migrate_legacy_keys(self) -> None:
+        # older versions stored every key index as a single pickled dict in the
+        # `unique_keys` and `searchable_keys` tables, rebuild the index from the
+        # data and drop them
+        legacy_tables = [
+            f"{self.settings.name}_unique_keys",
+            f"{self.settings.name}_searchable_keys",
+        ]
+        res = self.data._execute(
+            "select name from sqlite_master where type = 'table' and name in (?, ?)",
+            legacy_tables,
+        )
+        if res.is_err() or len(res.ok().fetchall()) == 0:
+            return
+
+        unique_rows = []
+        searchable_rows = []
+        for uid, obj in self.data.items():
+            for qk in self.settings.unique_keys.with_obj(obj).all:
+                unique_rows.extend((qk.key, value, uid) for value in _index_values(qk))
+            for qk in self.settings.searchable_keys.with_obj(obj).all:
+                searchable_rows.extend(
+                    (qk.key, value, uid) for value in _index_values(qk)
+                )
+        self.unique_keys.add(unique_rows)
+        self.searchable_keys.add(searchable_rows)
+
+        for table in legacy_tables:
+            res = self.data._execute(f"drop table if exists {table}")  # nosec
+            if res.is_err():
+                raise ValueError(res.err())
+
+    def _init_permissions(self) -> None:
+        self.permissions = SQLitePermissionBackingStore(
+            "permission_index", self.settings, self.store_config
+        )
+        self._migrate_legacy_permissions()
+
+    def _migrate_legacy_permissions(self) -> None:
+        # older versions stored the permissions of every object as a pickled set
+        # in the `permissions` table
+        legacy_table = f"{self.settings.name}_permissions"
+        res = self.data._execute(
+            "select name from sqlite_master where type = 'table' and name = ?",
+            [legacy_table],
+        )
+        if res.is_err() or len(res.ok().fetchall()) == 0:
+            return
+
+        res = self.data._execute(f"select uid, value from {legacy_table}")  # nosec
+        if res.is_err():
+            raise ValueError(res.err())
+        for uid, value in res.ok().fetchall():
+            permissions = _deserialize(value, from_bytes=True)
+            if len(permissions) > 0:
+                self.permissions[UID(uid)] = permissions
+
+        res = self.data._execute(f"drop table if exists {legacy_table}")  # nosec
+        if res.is_err():
+            raise ValueError(res.err())
+
+    def _get_unique_key(self, qk: QueryKey) -> Optional[UID]:
+        uids = self.unique_keys.find(qk.key, _index_values(qk))
+        return next(iter(uids), None)
+
+    def _add_unique_key(self, qk: QueryKey, uid: UID) -> None:
+        self.unique_keys.add((qk.key, value, uid) for value in _index_values(qk))
+
+    def _remove_unique_key(self, qk: QueryKey) -> None:
+        self.unique_keys.remove(qk.key, _index_values(qk))
+
+    def _find_search_key(self, qk: QueryKey) -> Set[UID]:
+        return self.searchable_keys.find(qk.key, _index_values(qk))
+
+    def _add_search_key(self, qk: QueryKey, uid: UID) -> None:
+        self.searchable_keys.add((qk.key, value, uid) for value in _index_values(qk))
+
+    def _remove_search_key(self, qk: QueryKey, uid: UID) -> None:
+        self.searchable_keys.remove(qk.key, _index_values(qk), uid=uid)
+
+    def add_permission(self, permission: ActionObjectPermission) -> None:
+        self.permissions.add(permission.uid, permission.permission_string)
+
+    def remove_permission(self, permission: ActionObjectPermission) -> None:
+        self.permissions.remove(permission.uid, permission.permission_string)
+
+    def has_permission(self, permission: ActionObjectPermission) -> bool:
+        if not isinstance(permission.permission, ActionPermission):
+            raise Exception(f"ObjectPermission type: {permission.permission} not valid")
+
+        # TODO: fix for other admins
+        if self.root_verify_key.verify == permission.credentials.verify:
+            return True
+
+        if permission.permission == ActionPermission.READ:
+            permissions = _read_permissions(permission.credentials)
+        else:
+            permissions = [permission.permission_string]
+        return self.permissions.has_any(permission.uid, permissions)
+
+    # Queries are answered by a single statement over the data table, which joins
+    # the key indexes and the permissions instead of resolving the matching uids
+    # first and then loading and checking every object on its own.
+
+    def _key_conditions(
+        self, index: SQLiteIndexBackingStore, qks: QueryKeys
+    ) -> Tuple[str, List[Any]]:
+        """SQL condition on `d.uid` for the AND of `qks` against `index`.
+
+        Mirrors _get_keys_index and _find_keys_search: a unique key or a list key
+        without any match doesn't restrict the result, but at least one key has
+        to match.
+        """
+        conditions: List[str] = []
+        params: List[Any] = []
+        any_match: List[str] = []
+        any_params: List[Any] = []
+        for qk in qks.all:
+            values = _index_values(qk)
+            if len(values) == 0:
+                continue
+            placeholders = ", ".join("?" * len(values))
+            matches = (
+                f"select uid from {index.table_name} "  # nosec
+                + f"where key = ? and value in ({placeholders})"  # nosec
+            )
+            match_params = [qk.key, *values]
+            if index.unique or qk.type_list:
+                conditions.append(f"(d.uid in ({matches}) or not exists ({matches}))")
+                params.extend(match_params * 2)
+            else:
+                conditions.append(f"d.uid in ({matches})")
+                params.extend(match_params)
+            any_match.append(f"exists ({matches})")
+            any_params.extend(match_params)
+
+        if len(any_match) == 0:
+            return "0", []
+        conditions.append(f"({' or '.join(any_match)})")
+        return " and ".join(conditions), params + any_params
+
+    def _select_readable(
+        self,
+        credentials: SyftVerifyKey,
+        conditions: List[str],
+        params: List[Any],
+        order_by: Optional[PartitionKey] = None,
+    ) -> Result[List[SyftObject], str]:
+        conditions = list(conditions)
+        params = list(params)
+        if self.root_verify_key.verify != credentials.verify:
+            read_permissions = _read_permissions(credentials)
+            placeholders = ", ".join("?" * len(read_permissions))
+            conditions.append(
+                f"exists (select 1 from {self.permissions.table_name} p "  # nosec
+                + f"where p.uid = d.uid and p.permission in ({placeholders}))"
+            )
+            params.extend(read_permissions)
+
+        select_sql = f"select d.value from {self.data.table_name} d"  # nosec
+        if len(conditions) > 0:
+            select_sql += " where " + " and ".join(conditions)
+        select_sql += " order by d.sqltime"
+
+        res = self.data._execute(select_sql, params)
+        if res.is_err():
+            return Err(f"Failed to query {self.settings.name}. {res.err()}")
+        result = [_deserialize(row[0], from_bytes=True) for row in res.ok()]
+
+        # the stored values are serialized, so ordering by an attribute stays in python
+        if order_by is not None:
+            result = sorted(result, key=lambda x: getattr(x, order_by.key, ""))
+        return Ok(result)
+
+    def _all(
+        self, credentials: SyftVerifyKey, order_by: Optional[PartitionKey] = None
+    ) -> Result[List[SyftObject], str]:
+        return self._select_readable(credentials, [], [], order_by=order_by)
+
+    def _find_index_or_search_keys(
+        self,
+        credentials: SyftVerifyKey,
+        index_qks: QueryKeys,
+        search_qks: QueryKeys,
+        order_by: Optional[PartitionKey] = None,
+    ) -> Result[List[SyftObject], str]:
+        conditions = []
+        params: List[Any] = []
+        for index, qks in [
+            (self.unique_keys, index_qks),
+            (self.searchable_keys, search_qks),
+        ]:
+            if len(qks.all) > 0:
+                condition, condition_params = self._key_conditions(index, qks)
+                conditions.append(condition)
+                params.extend(condition_params)
+
+        if len(conditions) == 0:
+            return Ok([])
+
+        return self._select_readable(credentials, conditions, params, order_by=order_by)
+
+    def _get_many(
+        self, credentials: SyftVerifyKey, uids: List[UID]
+    ) -> Result[List[SyftObject], str]:
+        objs: Dict[UID, SyftObject] = {}
+        for idx in range(0, len(uids), SQLITE_MAX_BATCH_PARAMS):
+            batch = [str(uid) for uid in uids[idx : idx + SQLITE_MAX_BATCH_PARAMS]]
+            placeholders = ", ".join("?" * len(batch))
+            res = self._select_readable(
+                credentials, [f"d.uid in ({placeholders})"], batch
+            )
+            if res.is_err():
+                return res
+            objs.update((obj.id, obj) for obj in res.ok())
+
+        missing = [uid for uid in uids if uid not in objs]
+        if len(missing) > 0:
+            return Err(f"{missing} don't exist or you have no permission to read them")
+        return Ok([objs[uid] for uid in uids])
+
+    def _set_many_data_and_keys(self, entries: List[BatchEntry]) -> None:
+        unique_rows = []
+        searchable_rows = []
+        for entry in entries:
+            uid = entry.store_query_key.value
+            for qk in entry.unique_query_keys.all:
+                unique_rows.extend((qk.key, value, uid) for value in _index_values(qk))
+            for qk in entry.searchable_query_keys.all:
+                searchable_rows.extend(
+                    (qk.key, value, uid) for value in _index_values(qk)
+                )
+
+        self.unique_keys.add(unique_rows)
+        self.searchable_keys.add(searchable_rows)
+        self.data.set_many(
+            (entry.store_query_key.value, entry.obj) for entry in entries
+        )
+        self.permissions.set_many(
+            (entry.store_query_key.value, entry.permissions) for entry in entries
+        )
+
+    def _delete_many_data_and_keys(self, objs: List[SyftObject]) -> None:
+        uids = [self.settings.store_key.with_obj(obj).value for obj in objs]
+        self.data.delete_many(uids)
+        self.unique_keys.remove_uids(uids)
+        self.searchable_keys.remove_uids(uids)
+
     def close(self) -> None:
         self.lock.acquire()
         try:
             self.data._close()
+            self.permissions._close()
             self.unique_keys._close()
             self.searchable_keys._close()
         except BaseException:
             pass
         self.lock.release()
 
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # the data, permissions and key indexes share the connection of this thread
+        with self.data.pool.transaction():
+            yield
+
     def commit(self) -> None:
         self.lock.acquire()
         try:
             self.data._commit()
+            self.permissions._commit()
             self.unique_keys._commit()
             self.searchable_keys._commit()
         except BaseException:
@@ -346,6 +1092,19 @@ class SQLiteDocumentStore(DocumentStore):
     partition_type = SQLiteStorePartition
 
 
+SQLITE_JOURNAL_MODES = ["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"]
+SQLITE_SYNCHRONOUS_MODES = ["OFF", "NORMAL", "FULL", "EXTRA"]
+
+
+def _pragma_value(name: str, value: Optional[str], allowed: List[str]) -> Optional[str]:
+    # pragmas can't be parametrized, only let known values through
+    if value is None:
+        return None
+    if value.upper() not in allowed:
+        raise ValueError(f"{name} must be one of {allowed}, got {value}")
+    return value.upper()
+
+
 @serializable()
 class SQLiteStoreClientConfig(StoreClientConfig):
     """SQLite connection config
@@ -364,12 +1123,24 @@ class SQLiteStoreClientConfig(StoreClientConfig):
             How many seconds the connection should wait before raising an exception, if the database
             is locked by another connection. If another connection opens a transaction to modify the
             database, it will be locked until that transaction is committed. Default five seconds.
+        `journal_mode`: str
+            SQLite journal mode of the connections, e.g. "WAL" to let readers and a writer work
+            concurrently. Defaults to None, which keeps the mode of the database file.
+        `synchronous`: str
+            SQLite synchronous setting of the connections, e.g. "NORMAL" which only syncs at WAL
+            checkpoints instead of on every commit. Defaults to None, which keeps SQLite's default.
+        `pool_size`: int
+            How many connections of finished threads are kept for reuse, only applies if
+            `check_same_thread` is False. Default eight.
     """
 
     filename: Optional[str] = None
     path: Union[str, Path] = Field(default_factory=tempfile.gettempdir)
     check_same_thread: bool = True
     timeout: int = 5
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    pool_size: int = 8
 
     # We need this in addition to Field(default_factory=...)
     # so users can still do SQLiteStoreClientConfig(path=None)
@@ -379,6 +1150,14 @@ class SQLiteStoreClientConfig(StoreClientConfig):
             return tempfile.gettempdir()
         return path
 
+    @validator("journal_mode")
+    def __journal_mode(cls, journal_mode: Optional[str]) -> Optional[str]:
+        return _pragma_value("journal_mode", journal_mode, SQLITE_JOURNAL_MODES)
+
+    @validator("synchronous")
+    def __synchronous(cls, synchronous: Optional[str]) -> Optional[str]:
+        return _pragma_value("synchronous", synchronous, SQLITE_SYNCHRONOUS_MODES)
+
     @property
     def file_path(self) -> Optional[Path]:
         return Path(self.path) / self.filename if self.filename is not None else None
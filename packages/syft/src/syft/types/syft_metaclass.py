@@ -49,59 +49,63 @@ class PartialModelMetaclass(ModelMetaclass):
                 fields = self.__class__.__fields__
                 fields_map: Dict[ModelField, Tuple[Any, bool]] = {}
 
-                def optionalize(
-                    fields: Dict[str, ModelField], *, restore: bool = False
-                ) -> None:
+                def optionalize(fields: Dict[str, ModelField]) -> None:
                     for _, field in fields.items():
-                        if not restore:
-                            if isinstance(field.required, UndefinedType):
-                                raise Exception(f"{field.name} is a required field.")
-                            fields_map[field] = (field.type_, field.required)
-                            # If field has None allowed as a value
-                            # then it becomes a required field.
-                            if field.allow_none and field.name in kwargs:
-                                field.required = True
-                            else:
-                                field.required = False
-                            if inspect.isclass(field.type_) and issubclass(
-                                field.type_, BaseModel
-                            ):
-                                field.populate_validators()
-                                if field.sub_fields is not None:
-                                    for sub_field in field.sub_fields:
-                                        sub_field.type_ = field.type_
-                                        sub_field.populate_validators()
-                                optionalize(field.type_.__fields__)
+                        if isinstance(field.required, UndefinedType):
+                            raise Exception(f"{field.name} is a required field.")
+                        # nested models can be reached more than once, e.g. by
+                        # two DateTime fields, keep what they were before the first
+                        fields_map.setdefault(field, (field.type_, field.required))
+                        # If field has None allowed as a value
+                        # then it becomes a required field.
+                        if field.allow_none and field.name in kwargs:
+                            field.required = True
                         else:
-                            # No need to recursively de-optionalize once original types
-                            # are restored
-                            field.type_, field.required = fields_map[field]
+                            field.required = False
+                        if inspect.isclass(field.type_) and issubclass(
+                            field.type_, BaseModel
+                        ):
+                            field.populate_validators()
                             if field.sub_fields is not None:
                                 for sub_field in field.sub_fields:
                                     sub_field.type_ = field.type_
-
-                # Make fields and fields of nested model types optional
-                optionalize(fields)
-
-                # Transform kwargs that are PartialModels to their dict() forms. This
-                # will exclude `None` (see below) from the dictionary used to construct
-                # the temporarily-partial model field, avoiding ValidationErrors of
-                # type type_error.none.not_allowed.
-                for kwarg, value in kwargs.items():
-                    if value.__class__.__class__ is PartialModelMetaclass:
-                        kwargs[kwarg] = value.dict()
-                    elif isinstance(value, (tuple, list)):
-                        kwargs[kwarg] = value.__class__(
-                            v.dict()
-                            if v.__class__.__class__ is PartialModelMetaclass
-                            else v
-                            for v in value
-                        )
-
-                # Validation is performed in __init__, for which all fields are now optional
-                cls_init(self, *args, **kwargs)
-                # Restore requiredness
-                optionalize(fields, restore=True)
+                                    sub_field.populate_validators()
+                            optionalize(field.type_.__fields__)
+
+                def restore() -> None:
+                    # the fields of nested model types are shared with every other
+                    # instance of those models, so they are restored as well
+                    for field, (type_, required) in fields_map.items():
+                        field.type_, field.required = type_, required
+                        if field.sub_fields is not None:
+                            for sub_field in field.sub_fields:
+                                sub_field.type_ = field.type_
+
+                try:
+                    # Make fields and fields of nested model types optional
+                    optionalize(fields)
+
+                    # Transform kwargs that are PartialModels to their dict() forms.
+                    # This will exclude `None` (see below) from the dictionary used
+                    # to construct the temporarily-partial model field, avoiding
+                    # ValidationErrors of type type_error.none.not_allowed.
+                    for kwarg, value in kwargs.items():
+                        if value.__class__.__class__ is PartialModelMetaclass:
+                            kwargs[kwarg] = value.dict()
+                        elif isinstance(value, (tuple, list)):
+                            kwargs[kwarg] = value.__class__(
+                                v.dict()
+                                if v.__class__.__class__ is PartialModelMetaclass
+                                else v
+                                for v in value
+                            )
+
+                    # Validation is performed in __init__, for which all fields are
+                    # now optional
+                    cls_init(self, *args, **kwargs)
+                finally:
+                    # Restore requiredness
+                    restore()
 
         cls.__init__ = __init__
 
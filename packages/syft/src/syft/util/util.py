@@ -35,7 +35,6 @@ from typing import Type
 from typing import Union
 
 # third party
-from IPython.display import display
 from forbiddenfruit import curse
 from nacl.signing import SigningKey
 from nacl.signing import VerifyKey
@@ -446,6 +445,9 @@ def obj2pointer_type(obj: Optional[object] = None, fqn: Optional[str] = None) ->
 
 
 def prompt_warning_message(message: str, confirm: bool = False) -> bool:
+    # third party
+    from IPython.display import display
+
     # relative
     from ..service.response import SyftWarning
 
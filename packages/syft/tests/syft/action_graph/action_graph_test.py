@@ -14,10 +14,12 @@ from threading import Thread
 
 # third party
 import networkx as nx
+import pytest
 from result import Err
 
 # syft absolute
 from syft.node.credentials import SyftVerifyKey
+from syft.service.action import action_graph
 from syft.service.action.action_graph import ExecutionStatus
 from syft.service.action.action_graph import InMemoryActionGraphStore
 from syft.service.action.action_graph import InMemoryGraphConfig
@@ -303,6 +305,45 @@ def test_networkx_backing_store_save_load_custom(verify_key: SyftVerifyKey) -> N
     os.remove(custom_in_mem_graph_config.client_config.file_path)
 
 
+def test_networkx_backing_store_replays_log(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, verify_key: SyftVerifyKey
+) -> None:
+    store_config = InMemoryGraphConfig()
+    store_config.client_config = InMemoryStoreClientConfig(path=tmp_path)
+    networkx_store = NetworkXBackingStore(store_config=store_config, reset=True)
+    nodes = [create_action_obj_node(verify_key) for _ in range(4)]
+    for node in nodes:
+        networkx_store.set(uid=node.id, data=node)
+    networkx_store.add_edge(parent=nodes[0].id, child=nodes[1].id)
+    networkx_store.add_edge(parent=nodes[1].id, child=nodes[2].id)
+    networkx_store.remove_edge(parent=nodes[1].id, child=nodes[2].id)
+    networkx_store.delete(uid=nodes[3].id)
+    nodes[0].status = ExecutionStatus.DONE
+    networkx_store.update(uid=nodes[0].id, data=nodes[0])
+
+    # nothing but the log was written
+    assert not os.path.exists(networkx_store.path_str)
+    assert networkx_store.log_records == 9
+
+    # a record cut short by a crash is dropped
+    with open(networkx_store.log_path_str, "ab") as f:
+        f.write(b"\x10\x00\x00\x00")
+    networkx_store_2 = NetworkXBackingStore(store_config)
+    assert networkx_store_2.nodes() == networkx_store.nodes()
+    assert networkx_store_2.edges() == networkx_store.edges()
+    assert networkx_store_2.get(nodes[0].id).status == ExecutionStatus.DONE
+
+    # the log is compacted into a snapshot as it grows
+    monkeypatch.setattr(action_graph, "COMPACT_MIN_LOG_RECORDS", 4)
+    for node in nodes:
+        networkx_store_2.set(uid=node.id, data=node)
+    assert os.path.exists(networkx_store_2.path_str)
+    assert networkx_store_2.log_records < 4
+    networkx_store_3 = NetworkXBackingStore(store_config)
+    assert networkx_store_3.nodes() == networkx_store_2.nodes()
+    assert networkx_store_3.edges() == networkx_store_2.edges()
+
+
 def test_networkx_backing_store_subgraph(
     networkx_store_with_nodes: NetworkXBackingStore, verify_key: SyftVerifyKey
 ):
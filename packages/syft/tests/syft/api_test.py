@@ -1,5 +1,8 @@
 # stdlib
+from concurrent.futures import ThreadPoolExecutor
+import sys
 from textwrap import dedent
+from threading import Thread
 from typing import Callable
 
 # third party
@@ -8,9 +11,23 @@ import pytest
 
 # syft absolute
 import syft as sy
+from syft.client.api import PendingAPICall
+from syft.client.api import SyftAPI
+from syft.client.api import SyftAPICall
+from syft.client.api import SyftAPICallBatch
+from syft.client.api import SyftAPIDelta
+from syft.client.api import role_version_of
+from syft.client.client import load_cached_api
+from syft.client.client import store_cached_api
+from syft.node import node
+from syft.node.credentials import SyftSigningKey
+from syft.serde.recursive import HIGHEST_SERDE_WIRE_VERSION
+from syft.serde.recursive import SERDE_WIRE_VERSION_1
 from syft.service.response import SyftAttributeError
+from syft.service.response import SyftException
 from syft.service.user.user import UserUpdate
 from syft.service.user.user_roles import ServiceRole
+from syft.types.uid import UID
 
 
 def test_api_cache_invalidation(worker):
@@ -76,3 +93,191 @@ def test_api_cache_invalidation_login(root_verify_key, worker):
     guest_client.login(email="a@b.org", password="aaa")
 
     assert guest_client.upload_dataset(dataset)
+
+
+def test_api_versioning(worker, tmp_path):
+    root_domain_client = worker.root_client
+    verify_key = root_domain_client.credentials.verify_key
+
+    version, blob = worker.get_serialized_api(verify_key, HIGHEST_SERDE_WIRE_VERSION)
+    # the serialized api is cached and revalidated by its version
+    assert worker.get_serialized_api(verify_key, HIGHEST_SERDE_WIRE_VERSION) == (
+        version,
+        blob,
+    )
+    assert worker.get_serialized_api(
+        verify_key, HIGHEST_SERDE_WIRE_VERSION, known_version=version
+    ) == (version, None)
+
+    # the version covers the node, an api never passes for the one of another node
+    other_worker = sy.Worker.named(name=f"{worker.name} other")
+    other_version, _ = other_worker.get_serialized_api(
+        verify_key, HIGHEST_SERDE_WIRE_VERSION
+    )
+    assert role_version_of(other_version) != role_version_of(version)
+
+    @sy.syft_function_single_use()
+    def my_versioned_func():
+        return 1
+
+    my_versioned_func.code = dedent(my_versioned_func.code)
+    assert root_domain_client.code.submit(my_versioned_func)
+
+    # only the user code endpoints changed, so only those are sent
+    new_version, delta_blob = worker.get_serialized_api(
+        verify_key, HIGHEST_SERDE_WIRE_VERSION, known_version=version
+    )
+    assert new_version != version
+    assert role_version_of(new_version) == role_version_of(version)
+    delta = sy.deserialize(delta_blob, from_bytes=True)
+    assert isinstance(delta, SyftAPIDelta)
+    assert list(delta.code_endpoints) == ["code.call_my_versioned_func"]
+    assert len(delta_blob) < len(blob) / 10
+
+    api = delta.apply(sy.deserialize(blob, from_bytes=True))
+    assert "code.call_my_versioned_func" in api.endpoints
+    # lib endpoints are fetched on first use instead of being part of the api
+    assert api.lib_endpoints is None
+
+    # clients keep the api of their last session on disk
+    cache_path = tmp_path / "api"
+    store_cached_api(cache_path, new_version, sy.serialize(api, to_bytes=True))
+    cached_version, cached_api = load_cached_api(cache_path)
+    assert cached_version == new_version
+    assert cached_api.endpoints.keys() == api.endpoints.keys()
+    assert load_cached_api(tmp_path / "missing") is None
+
+
+def test_serialized_api_cache_threads(worker, monkeypatch):
+    verify_key = worker.root_client.credentials.verify_key
+    # every other lookup evicts the api of the previous one
+    monkeypatch.setattr(node, "SERIALIZED_API_CACHE_SIZE", 1)
+    wire_versions = [SERDE_WIRE_VERSION_1, HIGHEST_SERDE_WIRE_VERSION]
+    expected = {
+        wire_version: worker.get_serialized_api(verify_key, wire_version)
+        for wire_version in wire_versions
+    }
+
+    def get_apis() -> None:
+        for i in range(50):
+            wire_version = wire_versions[i % 2]
+            result = worker.get_serialized_api(verify_key, wire_version)
+            assert result == expected[wire_version]
+
+    # switch threads as often as possible, to run into the races
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(get_apis) for _ in range(4)]
+    finally:
+        sys.setswitchinterval(switch_interval)
+    for future in futures:
+        future.result()
+    assert len(worker._serialized_apis) == 1
+
+
+def test_lib_endpoints_on_demand(worker, monkeypatch):
+    guest_client = worker.guest_client
+    api = guest_client.api
+    assert api.lib_endpoints is None and api.libs is None
+
+    paths = []
+    handle_api_call = worker.handle_api_call
+
+    def mock_handle_api_call(api_call, **kwargs):
+        paths.append(api_call.message.path)
+        return handle_api_call(api_call, **kwargs)
+
+    monkeypatch.setattr(worker, "handle_api_call", mock_handle_api_call)
+
+    # names which aren't libs never fetch the lib endpoints
+    assert not hasattr(guest_client, "_ipython_display_")
+    assert not hasattr(guest_client, "nunpy")
+    assert paths == []
+
+    assert guest_client.numpy.add(1, 2) == 3
+    assert paths[0] == "action.lib_endpoints"
+    assert api.lib_endpoints.keys() == SyftAPI.lib_endpoints_for(None).keys()
+
+    # once per api
+    assert guest_client.api.lib.numpy.add(2, 3) == 5
+    assert paths.count("action.lib_endpoints") == 1
+
+
+def test_signed_call_validity_cache():
+    signing_key = SyftSigningKey.generate()
+    signed_call = SyftAPICall(
+        node_uid=UID(), path="user.get_all", args=[], kwargs={}
+    ).sign(signing_key)
+    assert signed_call.is_valid
+
+    # the outcome is kept until the message or the signature changes
+    signed_call.signature = (
+        SyftSigningKey.generate()
+        .signing_key.sign(signed_call.serialized_message)
+        .signature
+    )
+    assert not signed_call.is_valid
+    signed_call.serialized_message += b"hacked"
+    assert not signed_call.is_valid
+
+
+def test_api_call_batch(worker, monkeypatch):
+    root_domain_client = worker.root_client
+    x = sy.ActionObject.from_obj(np.array([1, 2, 3])).send(root_domain_client)
+
+    messages = []
+    handle_api_call = worker.handle_api_call
+
+    def mock_handle_api_call(api_call, **kwargs):
+        messages.append(api_call.message)
+        return handle_api_call(api_call, **kwargs)
+
+    monkeypatch.setattr(worker, "handle_api_call", mock_handle_api_call)
+
+    with root_domain_client.batch() as pending_calls:
+        y = x + 1
+        z = y * 2
+        # nothing was sent yet
+        assert not messages
+        assert not pending_calls[-1].done
+        root_domain_client.api.services.action.get(UID())
+
+    # all calls went out together and ran in order
+    assert len(messages) == 1
+    assert isinstance(messages[0], SyftAPICallBatch)
+    assert len(messages[0].calls) == len(pending_calls)
+    assert all(pending_call.done for pending_call in pending_calls)
+    assert z.get().tolist() == [4, 6, 8]
+    assert y.get().tolist() == [2, 3, 4]
+    # a failing call only fails its own result
+    assert isinstance(pending_calls[-1].result, str)
+
+    # calls raising inside the block are dropped
+    with pytest.raises(ZeroDivisionError):
+        with root_domain_client.batch():
+            x + 1
+            1 / 0  # noqa: B018
+    assert len(messages) == 3
+
+    # other threads using the same client aren't part of the batch
+    results = []
+    with root_domain_client.batch() as pending_calls:
+        thread = Thread(
+            target=lambda: results.append(
+                root_domain_client.api.services.user.get_current_user()
+            )
+        )
+        thread.start()
+        thread.join()
+        assert not isinstance(results[0], PendingAPICall)
+        assert len(messages) == 4
+        root_domain_client.api.services.user.get_current_user()
+
+        # a batch goes to a single node
+        api_call = SyftAPICall(node_uid=UID(), path="user.get_all", args=[], kwargs={})
+        with pytest.raises(SyftException):
+            root_domain_client.api.make_call(api_call)
+    assert len(pending_calls) == 1
+    assert len(messages) == 5
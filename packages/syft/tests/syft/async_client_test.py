@@ -0,0 +1,123 @@
+# stdlib
+import asyncio
+
+# third party
+import numpy as np
+import pytest
+
+# the async transports need httpx, which comes with the http2 extra
+pytest.importorskip("httpx")
+
+# third party
+import httpx
+
+# syft absolute
+import syft as sy
+from syft.client import async_client
+from syft.client.async_client import AsyncHTTPConnection
+from syft.client.async_client import call_on_all
+from syft.client.async_client import run_on_all
+from syft.client.client import HTTPConnection
+from syft.client.client import SyftClient
+from syft.client.transport import AsyncHTTPXTransport
+from syft.node.routes import make_routes
+from syft.node.server import make_app
+from syft.service.response import SyftError
+
+# relative
+from .transport_test import AppTransport
+
+
+class AsyncAppTransport(AsyncHTTPXTransport):
+    """Sends the requests straight to an app, without a server."""
+
+    def __init__(self, app) -> None:
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+
+
+def test_async_client_python_connection(worker, faker) -> None:
+    other_worker = sy.Worker.named(name=faker.name())
+    clients = [worker.root_client, other_worker.root_client]
+
+    async def get_users():
+        async_client = clients[0].to_async()
+        user = await async_client.api.services.user.get_current_user()
+        # invalid arguments fail without calling the node, but are awaitable too
+        error = await async_client.api.services.user.view(1, 2, 3)
+        return user, error
+
+    user, error = asyncio.run(get_users())
+    assert user.email == "info@openmined.org"
+    assert isinstance(error, SyftError)
+
+    metadatas = run_on_all(clients, "metadata.get_metadata")
+    assert [metadata.id for metadata in metadatas] == [worker.id, other_worker.id]
+
+
+def test_async_http_connection(worker) -> None:
+    app = make_app(worker.name, make_routes(worker))
+    # the sync part of the connection logs in and fetches the api
+    connection = AsyncHTTPConnection(
+        url="http://testserver", transport_cache=AppTransport(app)
+    )
+    client = SyftClient(connection=connection, credentials=worker.signing_key)
+
+    data = np.arange(100_000)
+
+    async def calls():
+        async_client = client.to_async()
+        assert async_client.connection is connection
+        connection.async_transport_cache = AsyncAppTransport(app)
+        users, pointer = await asyncio.gather(
+            async_client.api.services.user.get_all(),
+            # large arrays are sent as frames next to the message
+            async_client.api.services.action.set(sy.ActionObject.from_obj(data)),
+        )
+        results = await call_on_all([client, client], "user.get_current_user")
+        return users, pointer, results
+
+    users, pointer, results = asyncio.run(calls())
+    assert len(users) == 1
+    assert len(connection.transport.requests) == 0
+    pointer.syft_node_location = client.id
+    pointer.syft_client_verify_key = client.verify_key
+    assert (pointer.get() == data).all()
+    assert [user.email for user in results] == ["info@openmined.org"] * 2
+
+
+def test_async_http_connection_replaces_transport(worker, monkeypatch) -> None:
+    closed = []
+
+    class ClosingTransport(AsyncAppTransport):
+        async def close(self) -> None:
+            closed.append(self)
+            await super().close()
+
+    app = make_app(worker.name, make_routes(worker))
+    monkeypatch.setattr(
+        async_client, "AsyncHTTPXTransport", lambda http2: ClosingTransport(app)
+    )
+    connection = AsyncHTTPConnection(
+        url="http://testserver", transport_cache=AppTransport(app)
+    )
+
+    # every asyncio.run needs a transport of its own, the previous one is closed
+    transports = [asyncio.run(connection.get_async_transport()) for _ in range(3)]
+    assert closed == transports[:2]
+
+
+def test_async_client_without_httpx(worker, monkeypatch) -> None:
+    monkeypatch.setattr(
+        async_client, "package_exists", lambda package: package != "httpx"
+    )
+    app = make_app(worker.name, make_routes(worker))
+    connection = HTTPConnection(
+        url="http://testserver", transport_cache=AppTransport(app)
+    )
+    client = SyftClient(connection=connection, credentials=worker.signing_key)
+
+    # blocking calls in worker threads instead of the async transport
+    async_syft_client = client.to_async()
+    assert async_syft_client.connection is connection
+    (user,) = run_on_all([async_syft_client], "user.get_current_user")
+    assert user.email == "info@openmined.org"
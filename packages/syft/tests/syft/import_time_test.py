@@ -0,0 +1,67 @@
+# stdlib
+from importlib import import_module
+import os
+import subprocess
+import sys
+from typing import Dict
+
+# third party
+import pytest
+
+# syft absolute
+import syft as sy
+
+# seconds `import syft` may take alone (`-m benchmark`), override where machines
+# are slower
+IMPORT_TIME_BUDGET = float(os.environ.get("SYFT_IMPORT_TIME_BUDGET", "6"))
+
+# loaded on first use of sy.Worker, sy.serve_node, sy.orchestra, ...
+SERVER_SIDE_MODULES = [
+    "fastapi",
+    "hagrid",
+    "syft.client.deploy",
+    "syft.node.node",
+    "syft.node.routes",
+    "syft.node.server",
+    "syft.node.worker",
+    "uvicorn",
+]
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """Cumulative import time in microseconds of every module imported by
+    `statement` in a fresh interpreter, from `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_skips_server_side_modules() -> None:
+    times = import_times("import syft")
+    assert "syft" in times
+    assert [name for name in SERVER_SIDE_MODULES if name in times] == []
+
+
+def test_lazy_attributes() -> None:
+    for name, (module_name, attr_name) in sy.LAZY_ATTRIBUTES.items():
+        assert name in dir(sy)
+        assert getattr(sy, name) is getattr(import_module(module_name), attr_name)
+
+    with pytest.raises(AttributeError):
+        sy.not_an_attribute  # noqa: B018
+
+
+@pytest.mark.benchmark
+def test_import_time_budget() -> None:
+    seconds = min(import_times("import syft")["syft"] for _ in range(3)) / 1e6
+    assert seconds < IMPORT_TIME_BUDGET
@@ -1,7 +1,72 @@
+# stdlib
+from contextlib import contextmanager
+from typing import Any
+from typing import Callable
+from typing import ContextManager
+from typing import Dict
+from typing import Optional
+
 # third party
 import pytest
 
+# syft absolute
+from syft.serde import recursive
+from syft.serde.recursive import SerdePlan
+from syft.serde.recursive import TYPE_BANK
+
 
 @pytest.fixture
 def numpy_syft_instance(guest_client):
     return guest_client.api.lib.numpy
+
+
+class TypeBankPlans(Dict[str, SerdePlan]):
+    """Serde plans built from the TYPE_BANK entry on every lookup, the way the
+    encoder and decoder worked before plans were compiled at registration."""
+
+    def get(self, fqn: str, default: Optional[SerdePlan] = None) -> Any:
+        if fqn not in TYPE_BANK:
+            return default
+        (
+            nonrecursive,
+            serialize,
+            deserialize,
+            attributes,
+            exclude_attrs,
+            serde_overrides,
+            hash_exclude_attrs,
+            cls,
+            _,
+        ) = TYPE_BANK[fqn]
+        return SerdePlan(
+            fqn=fqn,
+            cls=cls,
+            nonrecursive=nonrecursive,
+            serialize=serialize,
+            deserialize=deserialize,
+            attributes=attributes,
+            exclude_attrs=exclude_attrs,
+            serde_overrides=serde_overrides,
+            hash_exclude_attrs=hash_exclude_attrs,
+        )
+
+    def __contains__(self, fqn: object) -> bool:
+        return fqn in TYPE_BANK
+
+    def __getitem__(self, fqn: str) -> SerdePlan:
+        return self.get(fqn)
+
+
+@pytest.fixture
+def type_bank_interpreter() -> Callable[[], ContextManager]:
+    """Serde inside the returned context interprets the TYPE_BANK on every call,
+    the baseline for the compiled plans."""
+
+    @contextmanager
+    def interpret():
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(recursive, "TYPE_PLANS", {})
+            monkeypatch.setattr(recursive, "SERDE_PLANS", TypeBankPlans())
+            yield
+
+    return interpret
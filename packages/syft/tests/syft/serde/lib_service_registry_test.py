@@ -0,0 +1,105 @@
+# stdlib
+import json
+import re
+import subprocess
+import sys
+from typing import Any
+from typing import List
+
+# third party
+import pytest
+
+# syft absolute
+from syft.serde.lib_service_registry import action_execute_registry_libs
+from syft.service import service
+from syft.service.service import LibConfigRegistry
+from syft.service.service import lib_config_for
+
+
+def test_lib_registry_is_built_on_first_use() -> None:
+    code = (
+        "import syft;"
+        "from syft.serde.lib_service_registry import action_execute_registry_libs;"
+        "from syft.service.service import LibConfigRegistry;"
+        "assert LibConfigRegistry.path_exists('numpy.linalg.norm');"
+        "assert not LibConfigRegistry.path_exists('numpy.not_a_function');"
+        "assert not action_execute_registry_libs.is_built;"
+        "assert not LibConfigRegistry.__loaded__"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_lib_registry_lookups_match_the_whole_tree() -> None:
+    def describe(lib_config: Any) -> List[str]:
+        return [
+            lib_config.public_name,
+            repr(sorted(str(p) for p in lib_config.permissions)),
+            # defaults without a repr of their own show their address
+            re.sub(" at 0x[0-9a-f]+", "", str(lib_config.signature)),
+        ]
+
+    lib_configs = {
+        lib_config.public_path: describe(lib_config)
+        for lib_obj in action_execute_registry_libs.flatten()
+        if (lib_config := lib_config_for(lib_obj)) is not None
+    }
+
+    # every path is resolved on its own in a fresh interpreter, before the tree
+    # is built
+    code = (
+        "import json, re, sys\n"
+        "from syft.serde.lib_service_registry import action_execute_registry_libs\n"
+        "from syft.service.service import LibConfigRegistry\n"
+        "describe = lambda c: [c.public_name, "
+        "repr(sorted(str(p) for p in c.permissions)), "
+        "re.sub(' at 0x[0-9a-f]+', '', str(c.signature))]\n"
+        "configs = {}\n"
+        "for path in json.load(sys.stdin):\n"
+        "    lib_config = LibConfigRegistry.get_config(path)\n"
+        "    configs[path] = None if lib_config is None else describe(lib_config)\n"
+        "assert not action_execute_registry_libs.is_built\n"
+        "assert not LibConfigRegistry.__loaded__\n"
+        "print(json.dumps(configs))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        input=json.dumps(list(lib_configs)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert json.loads(result.stdout) == lib_configs
+
+
+def test_lib_config_cache(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(service, "get_root_data_path", lambda: tmp_path)
+    assert service.lib_config_cache_path() is None
+
+    monkeypatch.setenv(service.LIB_CONFIG_CACHE_ENV, "true")
+    path = service.lib_config_cache_path()
+    assert path.parent == tmp_path / "lib_configs"
+    assert service.load_cached_lib_configs() is None
+
+    lib_configs = list(LibConfigRegistry.get_registered_configs().values())
+    service.store_cached_lib_configs(lib_configs)
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+    cached = service.load_cached_lib_configs()
+    assert [c.public_path for c in cached] == [c.public_path for c in lib_configs]
+
+    # a broken cache is built again
+    path.write_bytes(b"broken")
+    assert service.load_cached_lib_configs() is None
+
+
+@pytest.mark.benchmark
+def test_import_does_not_walk_the_libs() -> None:
+    code = (
+        "import time;start = time.perf_counter();import syft;"
+        "print(time.perf_counter() - start)"
+    )
+    lazy = float(subprocess.check_output([sys.executable, "-c", code]))
+    code = code.replace(
+        "print(", "syft.service.service.LibConfigRegistry.load();print("
+    )
+    loaded = float(subprocess.check_output([sys.executable, "-c", code]))
+    assert lazy < loaded
@@ -0,0 +1,86 @@
+# third party
+import numpy as np
+import pandas as pd
+import pytest
+
+# syft absolute
+import syft as sy
+from syft.client.api import SyftAPICall
+from syft.serde.out_of_band import FramedBody
+from syft.serde.out_of_band import OUT_OF_BAND_MIN_SIZE
+from syft.serde.out_of_band import unpack_frames
+from syft.types.uid import UID
+
+
+def large_payloads() -> dict:
+    rows = OUT_OF_BAND_MIN_SIZE // 8 + 1
+    df = pd.DataFrame({"ints": np.arange(rows), "floats": np.random.rand(rows)})
+    return {
+        "c_order": np.random.rand(rows, 2),
+        "f_order": np.asfortranarray(np.random.rand(rows, 2)),
+        "bool": np.ones(OUT_OF_BAND_MIN_SIZE, dtype=bool),
+        "small": np.arange(10),
+        "strided": np.random.rand(rows, 2)[:, 0],
+        "df": df,
+        "series": df["floats"],
+    }
+
+
+def assert_payloads_equal(result: dict, expected: dict) -> None:
+    assert result.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, np.ndarray):
+            assert result[key].dtype == value.dtype
+            assert (result[key] == value).all()
+        else:
+            assert result[key].equals(value)
+
+
+def test_out_of_band_roundtrip() -> None:
+    payloads = large_payloads()
+    buffers = []
+    blob = sy.serialize(payloads, to_bytes=True, buffers=buffers)
+
+    # everything large and contiguous left the message
+    assert len(buffers) == 5
+    assert len(blob) < OUT_OF_BAND_MIN_SIZE
+
+    frames = unpack_frames(bytearray().join(FramedBody([blob, *buffers])))
+    result = sy.deserialize(frames[0], from_bytes=True, buffers=frames[1:])
+    assert_payloads_equal(result, payloads)
+    assert result["f_order"].flags.f_contiguous
+    # arrays point into the received frames instead of owning a copy
+    assert np.shares_memory(result["c_order"], np.frombuffer(frames[1], np.uint8))
+    assert result["c_order"].flags.writeable
+
+    # read only frames get copied once so that arrays stay writable
+    result = sy.deserialize(blob, from_bytes=True, buffers=[bytes(b) for b in buffers])
+    assert_payloads_equal(result, payloads)
+    assert result["c_order"].flags.writeable
+
+
+def test_out_of_band_buffers_stay_in_band_by_default() -> None:
+    payloads = large_payloads()
+    # the in band encoding of a series goes through a dict and is very slow
+    payloads.pop("series")
+    blob = sy.serialize(payloads, to_bytes=True)
+    assert len(blob) > OUT_OF_BAND_MIN_SIZE
+    assert_payloads_equal(sy.deserialize(blob, from_bytes=True), payloads)
+
+
+def test_out_of_band_buffers_are_signed() -> None:
+    signing_key = sy.SyftSigningKey.generate()
+    api_call = SyftAPICall(
+        node_uid=UID(), path="action.set", args=[np.arange(10**6)], kwargs={}
+    )
+    signed_call = api_call.sign(signing_key, buffers=[])
+    assert len(signed_call.buffers) == 1
+    assert signed_call.is_valid
+    assert (signed_call.message.args[0] == api_call.args[0]).all()
+
+    tampered = bytearray(signed_call.buffers[0])
+    tampered[0] ^= 1
+    signed_call.buffers = [tampered]
+    signed_call.cached_deseralized_message = None
+    with pytest.raises(ValueError):
+        _ = signed_call.message
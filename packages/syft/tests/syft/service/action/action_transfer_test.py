@@ -0,0 +1,176 @@
+# stdlib
+import os
+
+# third party
+import numpy as np
+
+# syft absolute
+import syft as sy
+from syft.node.credentials import SyftSigningKey
+from syft.serde.out_of_band import FramedBody
+from syft.service.action import action_service
+from syft.service.action import action_transfer
+from syft.service.action.action_object import ActionObject
+from syft.service.action.action_object import TwinMode
+from syft.service.action.action_transfer import TransferStaging
+from syft.service.action.action_transfer import chunk_digest
+from syft.service.response import SyftError
+from syft.store.blob_storage import OnDiskBlobStorageConfig
+from syft.store.dict_document_store import DictStoreConfig
+from syft.types.twin_object import TwinObject
+from syft.types.uid import UID
+
+CHUNK_SIZE = 256 * 1024
+
+
+def test_framed_body_iter_chunks() -> None:
+    frames = [os.urandom(size) for size in (5, 17, 0, 33, 8)]
+    body = FramedBody(frames)
+    joined = b"".join(bytes(frame) for frame in body)
+    for chunk_size in (1, 7, 16, len(joined)):
+        chunks = [bytes(chunk) for chunk in body.iter_chunks(chunk_size)]
+        assert b"".join(chunks) == joined
+        assert all(len(chunk) == chunk_size for chunk in chunks[:-1])
+
+
+def test_chunked_upload_and_download(worker, tmp_path) -> None:
+    service = worker.get_service("actionservice")
+    service.staging = TransferStaging(tmp_path)
+    client = worker.root_client
+
+    data = np.random.rand(500, 1000)
+    pointer = client.upload_action_object(
+        ActionObject.from_obj(data), chunk_size=CHUNK_SIZE
+    )
+    assert (service.store.data[pointer.id].syft_action_data == data).all()
+
+    result = client.download_action_object(pointer.id, chunk_size=CHUNK_SIZE)
+    assert (result.syft_action_data == data).all()
+    assert result.syft_node_location == worker.id
+    assert pointer.get() is not None
+
+    # nothing is left in the staging area
+    assert list(tmp_path.iterdir()) == []
+
+    # small objects don't take the detour
+    pointer = client.upload_action_object(ActionObject.from_obj([1, 2, 3]))
+    assert client.download_action_object(pointer.id).syft_action_data == [1, 2, 3]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_chunked_twin_download_modes(worker, tmp_path) -> None:
+    service = worker.get_service("actionservice")
+    service.staging = TransferStaging(tmp_path)
+    client = worker.root_client
+
+    private = np.random.rand(500, 1000)
+    mock = np.random.rand(500, 1000)
+    twin = TwinObject(private_obj=private, mock_obj=mock)
+    client.upload_action_object(twin, chunk_size=CHUNK_SIZE)
+
+    result = client.download_action_object(
+        twin.id, twin_mode=TwinMode.MOCK, chunk_size=CHUNK_SIZE
+    )
+    assert (result.syft_action_data == mock).all()
+    result = client.download_action_object(twin.id, chunk_size=CHUNK_SIZE)
+    assert (result.syft_action_data == private).all()
+
+
+def test_chunked_download_streams_blobs(faker, tmp_path, monkeypatch) -> None:
+    blob_storage_config = OnDiskBlobStorageConfig(path=tmp_path / "blobs")
+    worker = sy.Worker(
+        name=faker.name(),
+        action_store_config=DictStoreConfig(blob_storage_config=blob_storage_config),
+    )
+    service = worker.get_service("actionservice")
+    service.staging = TransferStaging(tmp_path / "transfers")
+    client = worker.root_client
+
+    private = np.random.rand(500, 1000)
+    mock = np.random.rand(500, 1000)
+    twin = TwinObject(private_obj=private, mock_obj=mock)
+    client.upload_action_object(twin, chunk_size=CHUNK_SIZE)
+
+    # the stored payloads are sent as they are, nothing is serialized again
+    def fail_serialize(*args, **kwargs):
+        raise AssertionError("serialized the stored object")
+
+    monkeypatch.setattr(action_service, "_serialize", fail_serialize)
+    for twin_mode, data in [(TwinMode.PRIVATE, private), (TwinMode.MOCK, mock)]:
+        result = client.download_action_object(
+            twin.id, twin_mode=twin_mode, chunk_size=CHUNK_SIZE
+        )
+        assert (result.syft_action_data == data).all()
+        assert result.id == twin.id
+        assert result.syft_node_location == worker.id
+
+    # payloads within a chunk come with the object
+    result = client.download_action_object(twin.id, chunk_size=private.nbytes * 2)
+    assert (result.syft_action_data == private).all()
+    assert list((tmp_path / "transfers").iterdir()) == []
+
+
+def test_chunked_upload_resumes(worker, tmp_path, monkeypatch) -> None:
+    service = worker.get_service("actionservice")
+    service.staging = TransferStaging(tmp_path)
+    client = worker.root_client
+    monkeypatch.setattr(action_transfer, "TRANSFER_RETRY_DELAY", 0)
+
+    upload_chunk = client.api.services.action.upload_chunk
+    sent = []
+
+    def flaky_upload_chunk(transfer_id, index, data, digest):
+        sent.append(index)
+        if index == 2:
+            raise ConnectionError("connection reset")
+        return upload_chunk(transfer_id, index, data, digest)
+
+    monkeypatch.setattr(client.api.services.action, "upload_chunk", flaky_upload_chunk)
+    data = np.random.rand(500, 1000)
+    action_object = ActionObject.from_obj(data)
+    error = client.upload_action_object(action_object, chunk_size=CHUNK_SIZE)
+    assert isinstance(error, SyftError)
+    # the failing chunk was sent again before giving up
+    assert sent == [0, 1] + [2] * (action_transfer.TRANSFER_MAX_RETRIES + 1)
+
+    (transfer_dir,) = tmp_path.iterdir()
+    transfer_id = UID.from_string(transfer_dir.name)
+    assert f"transfer_id={transfer_id}" in error.message
+
+    # chunks are checked against their digest
+    result = upload_chunk(transfer_id, 2, b"x" * CHUNK_SIZE, chunk_digest(b"x"))
+    assert "digest" in result
+
+    # resuming only sends what is missing
+    sent.clear()
+
+    def recording_upload_chunk(transfer_id, index, data, digest):
+        sent.append(index)
+        return upload_chunk(transfer_id, index, data, digest)
+
+    monkeypatch.setattr(
+        client.api.services.action, "upload_chunk", recording_upload_chunk
+    )
+    pointer = client.upload_action_object(
+        action_object, transfer_id=transfer_id, chunk_size=CHUNK_SIZE
+    )
+    assert sent == list(range(2, len(sent) + 2))
+    assert (pointer.get() == data).all()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_transfers_belong_to_their_user(tmp_path) -> None:
+    staging = TransferStaging(tmp_path)
+    owner = SyftSigningKey.generate().verify_key
+    other = SyftSigningKey.generate().verify_key
+    info = staging.start_upload(owner, nbytes=6, chunk_size=4).ok()
+
+    assert staging.write_chunk(owner, info.id, 1, b"ab", chunk_digest(b"ab")).is_ok()
+    assert staging.upload_status(owner, info.id).ok().missing == [0]
+    assert staging.upload_status(other, info.id).is_err()
+    assert staging.write_chunk(
+        other, info.id, 0, b"abcd", chunk_digest(b"abcd")
+    ).is_err()
+    assert staging.finish(other, info.id).is_err()
+    assert staging.finish(owner, info.id).is_ok()
+    assert list(tmp_path.iterdir()) == []
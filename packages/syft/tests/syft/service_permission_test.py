@@ -4,6 +4,11 @@ import pytest
 # syft absolute
 from syft import SyftError
 from syft.client.api import SyftAPICall
+from syft.node.credentials import SyftSigningKey
+from syft.service.service import UserLibConfigRegistry
+from syft.service.service import UserServiceConfigRegistry
+from syft.service.user.user_roles import ServiceRole
+from syft.service.user.user_service import UserService
 
 
 @pytest.fixture
@@ -52,3 +57,21 @@ def test_directly_call_service_no_permission(guest_domain_client):
     signed_result = guest_domain_client.api.connection.make_call(signed_call)
     result = signed_result.message.data
     assert isinstance(result, SyftError)
+
+
+def test_service_routing_tables_are_shared(worker):
+    registry = UserServiceConfigRegistry.from_role(ServiceRole.GUEST)
+    assert UserServiceConfigRegistry.from_role(ServiceRole.GUEST) is registry
+    assert UserServiceConfigRegistry.from_role(ServiceRole.ADMIN) is not registry
+    with pytest.raises(TypeError):
+        registry.get_registered_configs()["user.get_all"] = None
+
+    routes = worker.service_routes_for_role(ServiceRole.ADMIN)
+    assert worker.service_routes_for_role(ServiceRole.ADMIN) is routes
+    assert routes["user.get_all"] == worker.get_service_method(UserService.get_all)
+    assert "user.get_all" not in worker.service_routes_for_role(ServiceRole.GUEST)
+
+    lib_registry = UserLibConfigRegistry.from_user(worker.root_client.verify_key)
+    assert UserLibConfigRegistry.from_user(SyftSigningKey.generate().verify_key) is (
+        lib_registry
+    )
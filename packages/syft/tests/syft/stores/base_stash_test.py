@@ -1,5 +1,6 @@
 # stdlib
 import random
+import time
 from typing import Any
 from typing import Callable
 from typing import Container
@@ -14,7 +15,9 @@ import pytest
 from typing_extensions import ParamSpec
 
 # syft absolute
+from syft.node.credentials import SyftSigningKey
 from syft.serde.serializable import serializable
+from syft.service.action.action_permissions import ActionObjectREAD
 from syft.service.response import SyftSuccess
 from syft.store.dict_document_store import DictDocumentStore
 from syft.store.document_store import BaseUIDStoreStash
@@ -26,6 +29,9 @@ from syft.store.document_store import UIDPartitionKey
 from syft.types.syft_object import SyftObject
 from syft.types.uid import UID
 
+# relative
+from .store_fixtures_test import sqlite_document_store_fn
+
 
 @serializable()
 class MockObject(SyftObject):
@@ -447,3 +453,110 @@ def test_basestash_cannot_query_non_searchable(
     assert base_stash.query_all(
         root_verify_key, QueryKeys(qks=[qk, UIDPartitionKey.with_obj(obj.id)])
     ).is_err()
+
+
+@pytest.fixture(params=["dict", "sqlite"])
+def batch_stash(root_verify_key, sqlite_workspace, request) -> MockStash:
+    if request.param == "dict":
+        return MockStash(store=DictDocumentStore(root_verify_key))
+    return MockStash(store=sqlite_document_store_fn(root_verify_key, sqlite_workspace))
+
+
+def test_basestash_set_get_delete_many(
+    root_verify_key, batch_stash: MockStash, mock_objects: List[MockObject]
+) -> None:
+    result = batch_stash.set_many(root_verify_key, mock_objects)
+    assert result.is_ok()
+    assert result.ok() == mock_objects
+
+    uids = [obj.id for obj in reversed(mock_objects)]
+    result = batch_stash.get_many(root_verify_key, uids)
+    assert result.is_ok()
+    assert result.ok() == list(reversed(mock_objects))
+    assert batch_stash.get_many(root_verify_key, uids + [UID()]).is_err()
+
+    for obj in mock_objects:
+        assert batch_stash.get_by_uid(root_verify_key, obj.id).ok() == obj
+        assert batch_stash.query_one_kwargs(root_verify_key, name=obj.name).ok() == obj
+
+    deleted, kept = mock_objects[:5], mock_objects[5:]
+    result = batch_stash.delete_many_by_uid(root_verify_key, [x.id for x in deleted])
+    assert result.is_ok()
+    assert isinstance(result.ok(), SyftSuccess)
+    assert batch_stash.get_all(root_verify_key).ok() == kept
+    for obj in deleted:
+        assert batch_stash.query_one_kwargs(root_verify_key, name=obj.name).ok() is None
+
+    assert batch_stash.delete_many_by_uid(root_verify_key, [deleted[0].id]).is_err()
+
+
+def test_basestash_set_many_duplicates(
+    root_verify_key, batch_stash: MockStash, faker: Faker
+) -> None:
+    objs = [MockObject(**kwargs) for kwargs in multiple_object_kwargs(faker)]
+    assert batch_stash.set(root_verify_key, objs[0]).is_ok()
+
+    # nothing is written if any object in the batch is a duplicate
+    assert batch_stash.set_many(root_verify_key, objs).is_err()
+    same_name = MockObject(**object_kwargs(faker, name=objs[1].name))
+    assert batch_stash.set_many(root_verify_key, objs[1:] + [same_name]).is_err()
+    assert batch_stash.get_all(root_verify_key).ok() == objs[:1]
+
+    result = batch_stash.set_many(
+        root_verify_key, objs + [same_name], ignore_duplicates=True
+    )
+    assert result.is_ok()
+    assert batch_stash.get_all(root_verify_key).ok() == objs
+
+
+def test_basestash_set_many_permissions(
+    root_verify_key, batch_stash: MockStash, mock_objects: List[MockObject]
+) -> None:
+    guest_key = SyftSigningKey.generate().verify_key
+    shared = mock_objects[0]
+    add_permissions = [ActionObjectREAD(uid=shared.id, credentials=guest_key)]
+    assert batch_stash.set_many(
+        root_verify_key, mock_objects, add_permissions=add_permissions
+    ).is_ok()
+
+    assert batch_stash.get_many(guest_key, [shared.id]).ok() == [shared]
+    assert batch_stash.get_many(guest_key, [mock_objects[1].id]).is_err()
+    assert batch_stash.get_all(guest_key).ok() == [shared]
+    assert batch_stash.delete_many_by_uid(guest_key, [shared.id]).is_err()
+
+
+def test_basestash_set_many_matches_set(
+    root_verify_key, batch_stash: MockStash, faker: Faker
+) -> None:
+    # faker repeats names once in a while, which would be duplicates
+    objs = [MockObject(**object_kwargs(faker, name=f"name {i}")) for i in range(100)]
+    for obj in objs[:50]:
+        assert batch_stash.set(root_verify_key, obj).is_ok()
+    assert batch_stash.set_many(root_verify_key, objs[50:]).ok() == objs[50:]
+
+    uids = [obj.id for obj in objs]
+    assert batch_stash.get_many(root_verify_key, uids).ok() == objs
+    assert sorted(
+        batch_stash.get_all(root_verify_key).ok(), key=lambda obj: obj.name
+    ) == sorted(objs, key=lambda obj: obj.name)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("n", [1000])
+def test_basestash_set_many_benchmark(
+    root_verify_key, sqlite_workspace, faker: Faker, n: int
+) -> None:
+    # faker repeats names once in a while, which would be duplicates
+    objs = [MockObject(**object_kwargs(faker, name=f"name {i}")) for i in range(n)]
+    stash = MockStash(store=sqlite_document_store_fn(root_verify_key, sqlite_workspace))
+    start = time.perf_counter()
+    for obj in objs[: n // 2]:
+        assert stash.set(root_verify_key, obj).is_ok()
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert stash.set_many(root_verify_key, objs[n // 2 :]).is_ok()
+    batched = time.perf_counter() - start
+
+    assert batched < single
+    assert len(stash.get_all(root_verify_key).ok()) == n
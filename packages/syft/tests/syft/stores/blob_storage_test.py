@@ -0,0 +1,248 @@
+# stdlib
+import mmap
+from pathlib import Path
+from threading import Thread
+from typing import Any
+
+# third party
+import numpy as np
+import pytest
+
+# syft absolute
+from syft.node.credentials import SyftVerifyKey
+from syft.service.action.action_data_empty import ActionDataBlob
+from syft.service.action.action_object import ActionObject
+from syft.service.action.action_store import DictActionStore
+from syft.service.action.action_store import SQLiteActionStore
+from syft.store.blob_storage import OnDiskBlobStorageConfig
+from syft.store.blob_storage import OnDiskBlobStore
+from syft.store.blob_storage import S3BlobStorageConfig
+from syft.store.blob_storage import S3BlobStore
+from syft.store.dict_document_store import DictStoreConfig
+from syft.store.sqlite_document_store import SQLiteStoreClientConfig
+from syft.store.sqlite_document_store import SQLiteStoreConfig
+from syft.types.twin_object import TwinObject
+from syft.types.uid import UID
+
+# relative
+from .store_constants_test import test_verify_key_string_root
+
+
+def test_on_disk_blob_store(tmp_path: Path) -> None:
+    store = OnDiskBlobStore(OnDiskBlobStorageConfig(path=tmp_path))
+    blob = store.write([b"hello ", memoryview(b"world")])
+    assert blob.nbytes == 11
+    assert store.exists(blob.digest)
+    assert store.read(blob.digest) == b"hello world"
+    assert b"".join(store.iter_chunks(blob.digest, chunk_size=4)) == b"hello world"
+
+    # the same bytes are stored once
+    assert store.write([b"hello world"]).digest == blob.digest
+    files = [path for path in tmp_path.rglob("*") if path.is_file()]
+    assert files == [store.path_for(blob.digest)]
+
+    store.delete(blob.digest)
+    assert not store.exists(blob.digest)
+
+
+class FakeClientError(Exception):
+    def __init__(self, code: str) -> None:
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeBody:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+
+    def iter_chunks(self, chunk_size: int) -> Any:
+        for i in range(0, len(self.data), chunk_size):
+            yield self.data[i : i + chunk_size]
+
+
+class FakeS3Client:
+    """Just enough of a boto3 s3 client to back a S3BlobStore."""
+
+    class exceptions:
+        ClientError = FakeClientError
+
+    def __init__(self) -> None:
+        self.objects: dict = {}
+        self.uploads = 0
+        self.head_error: str = "404"
+
+    def upload_fileobj(self, f: Any, bucket: str, key: str) -> None:
+        self.uploads += 1
+        self.objects[(bucket, key)] = f.read()
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError(self.head_error)
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def get_object(self, Bucket: str, Key: str) -> dict:
+        return {"Body": FakeBody(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket: str, Key: str) -> None:
+        self.objects.pop((Bucket, Key), None)
+
+
+def test_s3_blob_store() -> None:
+    store = S3BlobStore(S3BlobStorageConfig(bucket_name="test"))
+    client = store._client = FakeS3Client()
+
+    blob = store.write([b"hello ", memoryview(b"world")])
+    assert blob.nbytes == 11
+    assert store.exists(blob.digest)
+    assert store.read(blob.digest) == b"hello world"
+    assert b"".join(store.iter_chunks(blob.digest, chunk_size=4)) == b"hello world"
+
+    # the same bytes are uploaded once
+    assert store.write([b"hello world"]).digest == blob.digest
+    assert client.uploads == 1
+    assert list(client.objects) == [("test", blob.digest)]
+
+    store.delete(blob.digest)
+    assert not store.exists(blob.digest)
+
+    client.head_error = "NoSuchKey"
+    assert not store.exists(blob.digest)
+
+
+def test_s3_blob_store_raises_on_other_errors() -> None:
+    store = S3BlobStore(S3BlobStorageConfig(bucket_name="test"))
+    client = store._client = FakeS3Client()
+    client.head_error = "403"
+
+    # a denied head must not be taken as a missing blob and re-uploaded
+    with pytest.raises(FakeClientError):
+        store.exists("digest")
+    with pytest.raises(FakeClientError):
+        store.write([b"hello"])
+    assert client.uploads == 0
+
+
+@pytest.fixture(params=["dict", "sqlite"])
+def blob_action_store(request, tmp_path: Path):
+    blob_storage_config = OnDiskBlobStorageConfig(path=tmp_path / "blobs")
+    root_key = SyftVerifyKey.from_string(test_verify_key_string_root)
+    if request.param == "dict":
+        store_config = DictStoreConfig(blob_storage_config=blob_storage_config)
+        return DictActionStore(store_config=store_config, root_verify_key=root_key)
+    client_config = SQLiteStoreClientConfig(filename="actions.sqlite", path=tmp_path)
+    store_config = SQLiteStoreConfig(
+        client_config=client_config, blob_storage_config=blob_storage_config
+    )
+    return SQLiteActionStore(store_config=store_config, root_verify_key=root_key)
+
+
+def test_action_store_keeps_payloads_in_blobs(blob_action_store) -> None:
+    store = blob_action_store
+    root_key = store.root_verify_key
+    data = np.random.rand(1000, 100)
+    uids = [UID(), UID()]
+    for uid in uids:
+        assert store.set(uid, root_key, ActionObject.from_obj(data)).is_ok()
+
+    # the stored objects only keep the address of the payload, which is shared
+    links = [store.data[uid].syft_action_data for uid in uids]
+    assert all(isinstance(link, ActionDataBlob) for link in links)
+    assert links[0].digest == links[1].digest
+    assert store.blob_refs[links[0].digest] == 2
+
+    obj = store.get(uids[0], root_key).ok()
+    assert (obj.syft_action_data == data).all()
+
+    # small payloads stay inline
+    small_uid = UID()
+    store.set(small_uid, root_key, ActionObject.from_obj([1, 2, 3]))
+    assert store.data[small_uid].syft_action_data == [1, 2, 3]
+
+    # the blob goes with the last object using it
+    assert store.delete(uids[0], root_key).is_ok()
+    assert store.blob_store.exists(links[0].digest)
+    assert store.delete(uids[1], root_key).is_ok()
+    assert not store.blob_store.exists(links[0].digest)
+
+
+def test_action_store_pointer_skips_private_payload(
+    blob_action_store, monkeypatch
+) -> None:
+    store = blob_action_store
+    root_key = store.root_verify_key
+    private = np.random.rand(1000, 100)
+    mock = np.random.rand(1000, 100)
+    twin = TwinObject(private_obj=private, mock_obj=mock)
+    assert store.set(twin.id, root_key, twin).is_ok()
+
+    reads = []
+    map_blob = store.blob_store.map
+
+    def record_map(digest: str) -> Any:
+        reads.append(digest)
+        return map_blob(digest)
+
+    monkeypatch.setattr(store.blob_store, "map", record_map)
+
+    pointer = store.get_pointer(twin.id, root_key, UID()).ok()
+    assert (pointer.syft_action_data == mock).all()
+    stored = store.data[twin.id]
+    assert reads == [stored.mock_obj.syft_action_data.digest]
+
+    twin = store.get(twin.id, root_key).ok()
+    assert (twin.private.syft_action_data == private).all()
+
+
+def test_action_store_maps_array_blobs(blob_action_store) -> None:
+    store = blob_action_store
+    root_key = store.root_verify_key
+    # large enough for its memory to be stored as a frame of its own
+    data = np.random.rand(1000, 200)
+    uid = UID()
+    store.set(uid, root_key, ActionObject.from_obj(data))
+    digest = store.data[uid].syft_action_data.digest
+    blob = store.blob_store.read(digest)
+
+    array = store.get(uid, root_key).ok().syft_action_data
+    base = array
+    while not isinstance(base, memoryview):
+        base = base.base
+    assert isinstance(base.obj, mmap.mmap)
+    assert (array == data).all()
+
+    # writes stay with the reader
+    array[0, 0] = -1.0
+    assert store.blob_store.read(digest) == blob
+    assert store.get(uid, root_key).ok().syft_action_data[0, 0] == data[0, 0]
+
+
+def test_action_store_shared_blob_concurrent(blob_action_store) -> None:
+    store = blob_action_store
+    root_key = store.root_verify_key
+    data = np.random.rand(1000, 100)
+    uid, other_uid = UID(), UID()
+    errors = []
+
+    def churn() -> None:
+        # keeps dropping the last reference to the blob the other thread writes
+        for _ in range(20):
+            store.set(uid, root_key, ActionObject.from_obj(data))
+            store.delete(uid, root_key)
+
+    def write_and_read() -> None:
+        for _ in range(20):
+            store.set(other_uid, root_key, ActionObject.from_obj(data))
+            result = store.get(other_uid, root_key)
+            if result.is_err() or not (result.ok().syft_action_data == data).all():
+                errors.append(result)
+
+    threads = [Thread(target=churn), Thread(target=write_and_read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    digest = store.data[other_uid].syft_action_data.digest
+    assert store.blob_refs[digest] == 1
+    assert store.blob_store.exists(digest)
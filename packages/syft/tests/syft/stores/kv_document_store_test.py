@@ -6,8 +6,10 @@ from threading import Thread
 import pytest
 
 # syft absolute
+from syft.store.dict_document_store import DictBackingStore
 from syft.store.document_store import PartitionSettings
 from syft.store.document_store import QueryKeys
+from syft.store.kv_document_store import CachedBackingStore
 from syft.store.kv_document_store import KeyValueStorePartition
 
 # relative
@@ -279,3 +281,57 @@ def test_kv_store_partition_set_delete_multithreaded(
     assert execution_err is None
     stored_cnt = len(kv_store_partition.all(root_verify_key).ok())
     assert stored_cnt == 0
+
+
+def test_cached_backing_store_lru() -> None:
+    store = DictBackingStore()
+    cache = CachedBackingStore(store, maxsize=2)
+
+    for key in "abc":
+        cache[key] = key.upper()
+    # written through, but only the two most recent values are kept
+    assert dict(store) == {"a": "A", "b": "B", "c": "C"}
+    assert cache.cache_info().currsize == 2
+
+    assert cache["b"] == "B"
+    assert cache["a"] == "A"
+    assert cache.cache_info()[:2] == (1, 1)
+
+    # "c" was the least recently used value
+    assert cache["c"] == "C"
+    assert cache.cache_info()[:2] == (1, 2)
+
+    del cache["c"]
+    assert "c" not in cache
+    assert "c" not in store
+    assert cache.pop("a") == "A"
+    assert len(cache) == 1
+
+    cache.clear()
+    assert len(store) == 0
+    assert cache.cache_info().currsize == 0
+
+
+def test_cached_backing_store_ddtype() -> None:
+    cache = CachedBackingStore(DictBackingStore(ddtype=set), maxsize=2)
+    assert cache["missing"] == set()
+    # the fallback value is not cached
+    assert cache.cache_info().currsize == 0
+    assert "missing" not in cache
+
+
+def test_cached_backing_store_failed_write() -> None:
+    class FailingStore(DictBackingStore):
+        def __setitem__(self, key, value) -> None:
+            raise ValueError("write failed")
+
+    store = FailingStore()
+    store.update({"a": "A"})
+    cache = CachedBackingStore(store, maxsize=2)
+    assert cache["a"] == "A"
+
+    with pytest.raises(ValueError):
+        cache["a"] = "B"
+    # the key isn't cached any more, reads go to the store
+    assert cache.cache_info().currsize == 0
+    assert cache["a"] == "A"
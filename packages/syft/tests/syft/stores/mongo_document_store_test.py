@@ -9,11 +9,17 @@ from joblib import delayed
 import pytest
 
 # syft absolute
+from syft.node.credentials import SyftSigningKey
+from syft.service.action.action_permissions import ActionObjectPermission
+from syft.service.action.action_permissions import ActionObjectREAD
+from syft.service.action.action_permissions import ActionObjectWRITE
+from syft.service.action.action_permissions import ActionPermission
 from syft.store.document_store import PartitionSettings
 from syft.store.document_store import QueryKeys
 from syft.store.mongo_client import MongoStoreClientConfig
 from syft.store.mongo_document_store import MongoStoreConfig
 from syft.store.mongo_document_store import MongoStorePartition
+from syft.store.mongo_document_store import PERMISSIONS_FIELD
 
 # relative
 from .store_constants_test import generate_db_name
@@ -599,3 +605,95 @@ def test_mongo_store_partition_set_delete_joblib(
         ).ok()
     )
     assert stored_cnt == 0
+
+
+@pytest.mark.skipif(
+    sys.platform != "linux", reason="pytest_mock_resources + docker issues on Windows"
+)
+@pytest.mark.flaky(reruns=5, reruns_delay=2)
+def test_mongo_store_partition_permissions(
+    root_verify_key,
+    mongo_store_partition: MongoStorePartition,
+) -> None:
+    res = mongo_store_partition.init_store()
+    assert res.is_ok()
+
+    owner = SyftSigningKey.generate().verify_key
+    guest = SyftSigningKey.generate().verify_key
+
+    obj = MockSyftObject(data=1)
+    res = mongo_store_partition.set(owner, obj, ignore_duplicates=False)
+    assert res.is_ok()
+    key = mongo_store_partition.settings.store_key.with_obj(obj)
+
+    assert mongo_store_partition.has_permission(
+        ActionObjectWRITE(uid=obj.id, credentials=owner)
+    )
+    assert not mongo_store_partition.has_permission(
+        ActionObjectREAD(uid=obj.id, credentials=guest)
+    )
+    assert len(mongo_store_partition.all(owner).ok()) == 1
+    assert len(mongo_store_partition.all(guest).ok()) == 0
+    assert len(mongo_store_partition.all(root_verify_key).ok()) == 1
+
+    # writes are scoped to the documents the user can write to
+    res = mongo_store_partition.update(guest, key, MockSyftObject(data=2))
+    assert res.is_err()
+    res = mongo_store_partition.delete(guest, key)
+    assert res.is_err()
+    assert mongo_store_partition.all(owner).ok()[0].data == 1
+
+    # permissions given on set and granted later
+    other = MockSyftObject(data=3)
+    res = mongo_store_partition.set(
+        owner,
+        other,
+        add_permissions=[ActionObjectREAD(uid=other.id, credentials=guest)],
+    )
+    assert res.is_ok()
+    assert [o.id for o in mongo_store_partition.all(guest).ok()] == [other.id]
+
+    mongo_store_partition.add_permission(
+        ActionObjectPermission(uid=obj.id, permission=ActionPermission.ALL_READ)
+    )
+    assert len(mongo_store_partition.all(guest).ok()) == 2
+    mongo_store_partition.remove_permission(
+        ActionObjectREAD(uid=other.id, credentials=guest)
+    )
+    assert [o.id for o in mongo_store_partition.all(guest).ok()] == [obj.id]
+
+    res = mongo_store_partition.delete(owner, key)
+    assert res.is_ok()
+
+
+@pytest.mark.skipif(
+    sys.platform != "linux", reason="pytest_mock_resources + docker issues on Windows"
+)
+@pytest.mark.flaky(reruns=5, reruns_delay=2)
+def test_mongo_store_partition_migrates_permissions(
+    root_verify_key,
+    mongo_store_partition: MongoStorePartition,
+) -> None:
+    res = mongo_store_partition.init_store()
+    assert res.is_ok()
+
+    # a document written before permissions were stored in documents
+    owner = SyftSigningKey.generate().verify_key
+    obj = MockSyftObject(data=1)
+    res = mongo_store_partition.set(owner, obj, ignore_duplicates=False)
+    assert res.is_ok()
+    collection = mongo_store_partition.collection.ok()
+    collection.update_one({"_id": obj.id}, {"$unset": {PERMISSIONS_FIELD: ""}})
+
+    partition = MongoStorePartition(
+        root_verify_key,
+        settings=mongo_store_partition.settings,
+        store_config=mongo_store_partition.store_config,
+    )
+    res = partition.init_store()
+    assert res.is_ok()
+
+    # it keeps the access everyone had to it
+    guest = SyftSigningKey.generate().verify_key
+    assert [o.id for o in partition.all(guest).ok()] == [obj.id]
+    assert partition.has_permission(ActionObjectWRITE(uid=obj.id, credentials=guest))
@@ -1,4 +1,5 @@
 # stdlib
+from pathlib import Path
 from threading import Thread
 from typing import Tuple
 
@@ -6,13 +7,28 @@ from typing import Tuple
 from joblib import Parallel
 from joblib import delayed
 import pytest
+from result import Err
 
 # syft absolute
+from syft.node.credentials import SyftSigningKey
+from syft.service.action.action_permissions import ActionObjectPermission
+from syft.service.action.action_permissions import ActionObjectREAD
+from syft.service.action.action_permissions import ActionPermission
+from syft.store.dict_document_store import DictStoreConfig
+from syft.store.dict_document_store import DictStorePartition
+from syft.store.document_store import PartitionKey
+from syft.store.document_store import PartitionSettings
 from syft.store.document_store import QueryKeys
+from syft.store.kv_document_store import CachedBackingStore
+from syft.store.sqlite_document_store import SQLiteBackingStore
+from syft.store.sqlite_document_store import SQLiteConnectionPool
+from syft.store.sqlite_document_store import SQLiteStoreClientConfig
+from syft.store.sqlite_document_store import SQLiteStoreConfig
 from syft.store.sqlite_document_store import SQLiteStorePartition
 
 # relative
 from .store_fixtures_test import sqlite_store_partition_fn
+from .store_mocks_test import MockIndexedObject
 from .store_mocks_test import MockObjectType
 from .store_mocks_test import MockSyftObject
 
@@ -523,3 +539,424 @@ def test_sqlite_store_partition_set_delete_joblib(
         ).ok()
     )
     assert stored_cnt == 0
+
+
+EmailPartitionKey = PartitionKey(key="email", type_=str)
+GroupPartitionKey = PartitionKey(key="group", type_=str)
+
+
+def sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace: Tuple[Path, str]):
+    workspace, db_name = sqlite_workspace
+    store_config = SQLiteStoreConfig(
+        client_config=SQLiteStoreClientConfig(filename=db_name, path=workspace)
+    )
+    settings = PartitionSettings(name="indexed", object_type=MockIndexedObject)
+    return SQLiteStorePartition(
+        root_verify_key, settings=settings, store_config=store_config
+    )
+
+
+def index_rows(partition: SQLiteStorePartition, index_name: str) -> int:
+    table_name = f"{partition.settings.name}_{index_name}"
+    res = partition.data._execute(f"select count(*) from {table_name}")  # nosec
+    return res.ok().fetchone()[0]
+
+
+def find_ids(partition: SQLiteStorePartition, root_verify_key, qk, unique: bool):
+    index_qks = QueryKeys(qks=[qk] if unique else [])
+    search_qks = QueryKeys(qks=[] if unique else [qk])
+    res = partition.find_index_or_search_keys(
+        root_verify_key, index_qks=index_qks, search_qks=search_qks
+    )
+    return {obj.id for obj in res.ok()}
+
+
+def test_sqlite_store_partition_key_index_rows(
+    root_verify_key, sqlite_workspace: Tuple[Path, str]
+) -> None:
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+
+    a = MockIndexedObject(email="a@openmined.org", group="x")
+    b = MockIndexedObject(email="b@openmined.org", group="x")
+    c = MockIndexedObject(email="c@openmined.org", group="y")
+    for obj in [a, b, c]:
+        assert partition.set(root_verify_key, obj).is_ok()
+
+    # one row per unique key (email and id) and one per searchable key
+    assert index_rows(partition, "unique_index") == 6
+    assert index_rows(partition, "searchable_index") == 3
+
+    email_a = EmailPartitionKey.with_obj(a.email)
+    assert find_ids(partition, root_verify_key, email_a, unique=True) == {a.id}
+    group_x = GroupPartitionKey.with_obj("x")
+    assert find_ids(partition, root_verify_key, group_x, unique=False) == {a.id, b.id}
+
+    duplicate = MockIndexedObject(email=a.email, group="z")
+    assert partition.set(root_verify_key, duplicate).is_err()
+
+    # updating moves the object between index rows
+    b_key = partition.settings.store_key.with_obj(b)
+    b_update = MockIndexedObject(id=b.id, email="new@openmined.org", group="y")
+    assert partition.update(root_verify_key, b_key, b_update).is_ok()
+    assert find_ids(partition, root_verify_key, group_x, unique=False) == {a.id}
+    group_y = GroupPartitionKey.with_obj("y")
+    assert find_ids(partition, root_verify_key, group_y, unique=False) == {b.id, c.id}
+    assert index_rows(partition, "unique_index") == 6
+
+    # the old email of b is free again
+    assert partition.set(
+        root_verify_key, MockIndexedObject(email=b.email, group="x")
+    ).is_ok()
+
+    c_key = partition.settings.store_key.with_obj(c)
+    assert partition.delete(root_verify_key, c_key).is_ok()
+    assert find_ids(partition, root_verify_key, group_y, unique=False) == {b.id}
+    assert index_rows(partition, "unique_index") == 6
+    assert index_rows(partition, "searchable_index") == 3
+
+
+def test_sqlite_store_partition_migrates_legacy_keys(
+    root_verify_key, sqlite_workspace: Tuple[Path, str]
+) -> None:
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+    objs = [
+        MockIndexedObject(email=f"{i}@openmined.org", group=str(i % 2))
+        for i in range(REPEATS)
+    ]
+    for obj in objs:
+        assert partition.set(root_verify_key, obj).is_ok()
+
+    # turn the file into the old layout, with a blob per key and no index rows
+    for index_name in ["unique_keys", "searchable_keys"]:
+        table_name = f"{partition.settings.name}_{index_name}"
+        assert partition.data._execute(
+            f"create table {table_name} (uid VARCHAR(32) NOT NULL PRIMARY KEY, "  # nosec
+            + "repr TEXT NOT NULL, value BLOB NOT NULL, "
+            + "sqltime TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL)"
+        ).is_ok()
+    for index_name in ["unique_index", "searchable_index"]:
+        table_name = f"{partition.settings.name}_{index_name}"
+        assert partition.data._execute(f"delete from {table_name}").is_ok()  # nosec
+
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+    assert index_rows(partition, "unique_index") == 2 * REPEATS
+    assert index_rows(partition, "searchable_index") == REPEATS
+    res = partition.data._execute(
+        "select name from sqlite_master where name like 'indexed_%_keys'"
+    )
+    assert res.ok().fetchall() == []
+
+    group_0 = GroupPartitionKey.with_obj("0")
+    assert find_ids(partition, root_verify_key, group_0, unique=False) == {
+        obj.id for obj in objs if obj.group == "0"
+    }
+    email = EmailPartitionKey.with_obj(objs[3].email)
+    assert find_ids(partition, root_verify_key, email, unique=True) == {objs[3].id}
+
+
+def test_sqlite_store_partition_query_pushdown(
+    root_verify_key, sqlite_workspace: Tuple[Path, str]
+) -> None:
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+    dict_partition = DictStorePartition(
+        root_verify_key,
+        settings=partition.settings,
+        store_config=DictStoreConfig(),
+    )
+    guest_key = SyftSigningKey.generate().verify_key
+
+    objs = [
+        MockIndexedObject(email=f"{i}@openmined.org", group=str(i % 3))
+        for i in range(REPEATS)
+    ]
+    for i, obj in enumerate(objs):
+        # the guest can read every other object, and two of them are public
+        add_permissions = []
+        if i % 2 == 0:
+            add_permissions.append(ActionObjectREAD(uid=obj.id, credentials=guest_key))
+        if i in (1, 3):
+            add_permissions.append(
+                ActionObjectPermission(obj.id, ActionPermission.ALL_READ)
+            )
+        for store in [partition, dict_partition]:
+            assert store.set(
+                root_verify_key, obj, add_permissions=add_permissions
+            ).is_ok()
+
+    email = EmailPartitionKey.with_obj(objs[4].email)
+    missing_email = EmailPartitionKey.with_obj("missing@openmined.org")
+    group = GroupPartitionKey.with_obj("1")
+    missing_group = GroupPartitionKey.with_obj("missing")
+    queries = [
+        ([email], []),
+        ([missing_email], []),
+        ([email, missing_email], []),
+        ([], [group]),
+        ([], [missing_group]),
+        ([email], [group]),
+        ([email], [GroupPartitionKey.with_obj("0")]),
+        ([missing_email], [group]),
+        ([], []),
+    ]
+    for credentials in [root_verify_key, guest_key]:
+        for index_qks, search_qks in queries:
+            results = [
+                store.find_index_or_search_keys(
+                    credentials,
+                    index_qks=QueryKeys(qks=index_qks),
+                    search_qks=QueryKeys(qks=search_qks),
+                ).ok()
+                for store in [partition, dict_partition]
+            ]
+            assert {obj.id for obj in results[0]} == {obj.id for obj in results[1]}
+
+        assert {obj.id for obj in partition.all(credentials).ok()} == {
+            obj.id for obj in dict_partition.all(credentials).ok()
+        }
+
+    readable = partition.all(guest_key).ok()
+    assert {obj.id for obj in readable} == {
+        obj.id for i, obj in enumerate(objs) if i % 2 == 0 or i in (1, 3)
+    }
+
+    # a query is a single statement, no matter how many objects match
+    statements = []
+    partition.data.db.set_trace_callback(statements.append)
+    partition.permissions.db.set_trace_callback(statements.append)
+    res = partition.find_index_or_search_keys(
+        guest_key,
+        index_qks=QueryKeys(qks=[]),
+        search_qks=QueryKeys(qks=[group]),
+        order_by=EmailPartitionKey,
+    )
+    assert len(statements) == 1
+    assert [obj.email for obj in res.ok()] == sorted(
+        obj.email for obj in readable if obj.group == "1"
+    )
+
+
+def test_sqlite_store_partition_permission_rows(
+    root_verify_key, sqlite_workspace: Tuple[Path, str]
+) -> None:
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+    guest_key = SyftSigningKey.generate().verify_key
+    obj = MockIndexedObject(email="a@openmined.org", group="x")
+    assert partition.set(root_verify_key, obj).is_ok()
+
+    read = ActionObjectREAD(uid=obj.id, credentials=guest_key)
+    assert not partition.has_permission(read)
+    partition.add_permission(read)
+    assert partition.has_permission(read)
+    assert read.permission_string in partition.permissions[obj.id]
+    partition.remove_permission(read)
+    assert not partition.has_permission(read)
+
+    # turn the permissions back into the old layout, a pickled set per object
+    permissions = partition.permissions[obj.id] | {read.permission_string}
+    legacy_store = SQLiteBackingStore(
+        "permissions", partition.settings, partition.store_config
+    )
+    legacy_store[obj.id] = permissions
+    assert partition.permissions._execute(
+        f"delete from {partition.permissions.table_name}"  # nosec
+    ).is_ok()
+
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+    assert partition.permissions[obj.id] == permissions
+    assert partition.has_permission(read)
+    assert partition.get(guest_key, obj.id).ok() == obj
+    res = partition.data._execute(
+        "select name from sqlite_master where name = 'indexed_permissions'"
+    )
+    assert res.ok().fetchall() == []
+
+
+def test_sqlite_store_partition_shares_connections(
+    root_verify_key, sqlite_workspace: Tuple[Path, str]
+) -> None:
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+    other_partition = sqlite_store_partition_fn(root_verify_key, sqlite_workspace)
+
+    # one connection per thread and file, no matter how many stores use it
+    connection = partition.data.db
+    for store in [
+        partition.permissions,
+        partition.unique_keys,
+        partition.searchable_keys,
+        other_partition.data,
+    ]:
+        assert store.db is connection
+
+    def thread_connection() -> None:
+        connections.append(partition.data.db)
+
+    connections = []
+    thread = Thread(target=thread_connection)
+    thread.start()
+    thread.join()
+    assert connections[0] is not connection
+
+
+def test_sqlite_store_partition_transaction(
+    root_verify_key, sqlite_workspace: Tuple[Path, str]
+) -> None:
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+    statements = []
+    partition.data.db.set_trace_callback(statements.append)
+
+    # data, permissions and both key indexes are written in a single commit
+    obj = MockIndexedObject(email="a@openmined.org", group="x")
+    assert partition.set(root_verify_key, obj).is_ok()
+    assert statements.count("COMMIT") == 1
+
+    statements.clear()
+    with pytest.raises(RuntimeError):
+        with partition.transaction():
+            for i in range(REPEATS):
+                other = MockIndexedObject(email=f"{i}@openmined.org", group="y")
+                assert partition.set(root_verify_key, other).is_ok()
+            raise RuntimeError("abort")
+    assert "COMMIT" not in statements
+
+    assert [o.id for o in partition.all(root_verify_key).ok()] == [obj.id]
+    group_y = GroupPartitionKey.with_obj("y")
+    assert find_ids(partition, root_verify_key, group_y, unique=False) == set()
+    assert index_rows(partition, "unique_index") == 2
+
+    # updates are written as upserts
+    updated = MockIndexedObject(id=obj.id, email=obj.email, group="z")
+    partition.data[obj.id] = updated
+    assert partition.data[obj.id] == updated
+    assert len(partition.data) == 1
+
+
+def test_sqlite_store_partition_rolls_back_errors(
+    root_verify_key, sqlite_workspace: Tuple[Path, str]
+) -> None:
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+    obj = MockIndexedObject(email="a@openmined.org", group="x")
+
+    def set_and_fail() -> Err:
+        assert partition._set(root_verify_key, obj).is_ok()
+        return Err("failed after writing")
+
+    result = partition._thread_safe_cbk(set_and_fail)
+    assert result == Err("failed after writing")
+    assert partition.all(root_verify_key).ok() == []
+    assert index_rows(partition, "unique_index") == 0
+
+
+def test_sqlite_store_partition_close_keeps_connections(
+    root_verify_key, sqlite_workspace: Tuple[Path, str]
+) -> None:
+    partition = sqlite_indexed_partition_fn(root_verify_key, sqlite_workspace)
+    other_partition = sqlite_store_partition_fn(root_verify_key, sqlite_workspace)
+    connection = partition.data.db
+    pool = partition.data.pool
+
+    def close_in_thread() -> None:
+        partition.data._close()
+        partition.close()
+        connections.append(getattr(pool._local, "connection", None))
+
+    # closing from a thread without a connection, like the gc, doesn't open one
+    connections = []
+    thread = Thread(target=close_in_thread)
+    thread.start()
+    thread.join()
+    assert connections == [None]
+
+    # the other partitions on the file keep using the connection of the thread
+    partition.close()
+    assert other_partition.data.db is connection
+    assert other_partition.all(root_verify_key).is_ok()
+
+
+def test_sqlite_store_client_config_pragmas(sqlite_workspace: Tuple[Path, str]):
+    workspace, db_name = sqlite_workspace
+    client_config = SQLiteStoreClientConfig(
+        filename=db_name, path=workspace, journal_mode="wal", synchronous="normal"
+    )
+    store_config = SQLiteStoreConfig(client_config=client_config)
+    settings = PartitionSettings(name="pragmas", object_type=MockIndexedObject)
+    store = SQLiteBackingStore("data", settings, store_config)
+
+    assert store.db.execute("pragma journal_mode").fetchone()[0] == "wal"
+    # 1 is NORMAL
+    assert store.db.execute("pragma synchronous").fetchone()[0] == 1
+
+    with pytest.raises(ValueError):
+        SQLiteStoreClientConfig(filename=db_name, journal_mode="wal; drop table x")
+
+
+def test_sqlite_connection_pool_reuses_connections(sqlite_workspace: Tuple[Path, str]):
+    workspace, db_name = sqlite_workspace
+    client_config = SQLiteStoreClientConfig(
+        filename=db_name, path=workspace, check_same_thread=False, pool_size=1
+    )
+    pool = SQLiteConnectionPool(client_config)
+
+    def use_pool() -> None:
+        connections.append(pool.connection)
+        pool.connection.execute("select 1")
+
+    connections = []
+    for _ in range(3):
+        thread = Thread(target=use_pool)
+        thread.start()
+        thread.join()
+
+    # the connection of a finished thread is handed to the next one
+    assert connections[0] is connections[1] is connections[2]
+    assert pool.connection is connections[0]
+
+
+def test_sqlite_store_partition_cache(
+    root_verify_key, sqlite_workspace: Tuple[Path, str]
+) -> None:
+    workspace, db_name = sqlite_workspace
+    client_config = SQLiteStoreClientConfig(filename=db_name, path=workspace)
+    store_config = SQLiteStoreConfig(client_config=client_config, cache_size=10)
+    settings = PartitionSettings(name="cached", object_type=MockObjectType)
+    partition = SQLiteStorePartition(
+        root_verify_key, settings=settings, store_config=store_config
+    )
+    assert partition.init_store().is_ok()
+    cache = partition.data
+    assert isinstance(cache, CachedBackingStore)
+
+    obj = MockSyftObject(data=1)
+    assert partition.set(root_verify_key, obj).is_ok()
+    for _ in range(REPEATS):
+        assert partition.data[obj.id] == obj
+    assert cache.cache_info().hits == REPEATS
+    assert cache.cache_info().misses == 0
+
+    # a write by another store of the same table bumps the generation
+    other = SQLiteBackingStore("data", settings, store_config)
+    updated = MockSyftObject(id=obj.id, data=2)
+    other[obj.id] = updated
+    assert partition.data[obj.id] == updated
+    assert cache.cache_info().misses == 1
+
+    # so does rolling back a transaction the cache has seen the writes of
+    with pytest.raises(RuntimeError):
+        with partition.transaction():
+            partition.data[obj.id] = MockSyftObject(id=obj.id, data=3)
+            assert partition.data[obj.id].data == 3
+            raise RuntimeError("abort")
+    assert partition.data[obj.id] == updated
+
+    # our own writes don't hide one another store made before them
+    other[obj.id] = MockSyftObject(id=obj.id, data=4)
+    second = MockSyftObject(data=5)
+    partition.data[second.id] = second
+    assert partition.data[obj.id].data == 4
+    other[obj.id] = updated
+    del partition.data[second.id]
+    assert partition.data[obj.id] == updated
+
+    key = partition.settings.store_key.with_obj(obj)
+    assert partition.delete(root_verify_key, key).is_ok()
+    assert obj.id not in partition.data
+    assert len(partition.all(root_verify_key).ok()) == 0
@@ -1,5 +1,7 @@
 # stdlib
 from typing import Any
+from typing import ClassVar
+from typing import List
 from typing import Type
 
 # syft absolute
@@ -8,6 +10,7 @@ from syft.store.document_store import DocumentStore
 from syft.store.document_store import PartitionSettings
 from syft.store.document_store import StoreConfig
 from syft.store.kv_document_store import KeyValueBackingStore
+from syft.types.syft_object import SYFT_OBJECT_VERSION_1
 from syft.types.syft_object import SyftObject
 from syft.types.uid import UID
 
@@ -61,6 +64,18 @@ class MockSyftObject(SyftObject):
     data: Any
 
 
+@serializable()
+class MockIndexedObject(SyftObject):
+    __canonical_name__ = "MockIndexedObject"
+    __version__ = SYFT_OBJECT_VERSION_1
+
+    email: str
+    group: str
+
+    __attr_unique__: ClassVar[List[str]] = ["email"]
+    __attr_searchable__: ClassVar[List[str]] = ["group"]
+
+
 @serializable()
 class MockStoreConfig(StoreConfig):
     store_type: Type[DocumentStore] = MockStore
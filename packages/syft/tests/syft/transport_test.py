@@ -0,0 +1,168 @@
+# stdlib
+from collections import OrderedDict
+import gzip
+import time
+
+# third party
+from faker import Faker
+import numpy as np
+import pytest
+
+# the app is reached through httpx, which comes with the http2 extra
+pytest.importorskip("httpx")
+
+# third party
+from fastapi.testclient import TestClient
+
+# syft absolute
+import syft as sy
+from syft.client.api import APIRegistry
+from syft.client.client import API_PATH
+from syft.client.client import HTTPConnection
+from syft.client.client import SyftClient
+from syft.client.transport import COMPRESSION_MIN_SIZE
+from syft.client.transport import HTTPXTransport
+from syft.client.transport import RequestsTransport
+from syft.external import package_exists
+from syft.node.routes import make_routes
+from syft.node.server import make_app
+from syft.serde.out_of_band import OUT_OF_BAND_CONTENT_TYPE
+from syft.service.action.action_object import ActionObject
+from syft.service.action.action_transfer import TransferStaging
+
+
+class AppTransport(HTTPXTransport):
+    """Sends the requests straight to an app, without a server."""
+
+    def __init__(self, app) -> None:
+        self.client = TestClient(app)
+        self.requests = []
+        self.responses = []
+
+    def get(self, url, params=None, headers=None):
+        response = super().get(url, params=params, headers=headers)
+        self.responses.append(response)
+        return response
+
+    def post(self, url, data=None, json=None, headers=None):
+        self.requests.append((data, headers))
+        response = super().post(url, data=data, json=json, headers=headers)
+        self.responses.append(response)
+        return response
+
+
+@pytest.mark.parametrize("compression", [True, False])
+def test_http_connection_compression(worker, compression: bool) -> None:
+    transport = AppTransport(make_app(worker.name, make_routes(worker)))
+    connection = HTTPConnection(
+        url="http://testserver", transport_cache=transport, compression=compression
+    )
+    client = SyftClient(connection=connection, credentials=worker.signing_key)
+
+    # the api is large enough to be compressed
+    assert client.api.services.user.get_current_user()
+    (api_response,) = [r for r in transport.responses if r.url.path.endswith("/api")]
+    assert len(api_response.content) > COMPRESSION_MIN_SIZE
+    encoding = api_response.headers.get("Content-Encoding", None)
+    assert encoding == ("gzip" if compression else None)
+    assert connection.node_accepts_gzip
+
+    text = "a" * COMPRESSION_MIN_SIZE
+    pointer = sy.ActionObject.from_obj(text).send(client)
+    data, headers = transport.requests[-1]
+    if compression:
+        assert headers["Content-Encoding"] == "gzip"
+        assert len(data) < COMPRESSION_MIN_SIZE
+    else:
+        assert "Content-Encoding" not in headers
+    assert pointer.get() == text
+
+    # proxies share the connections of the node they go through
+    assert connection.with_proxy(worker.id).transport is transport
+
+
+def test_http_connection_chunked_transfer(worker, tmp_path) -> None:
+    service = worker.get_service("actionservice")
+    service.staging = TransferStaging(tmp_path)
+    app = make_app(worker.name, make_routes(worker))
+    connection = HTTPConnection(
+        url="http://testserver", transport_cache=AppTransport(app)
+    )
+    client = SyftClient(connection=connection, credentials=worker.signing_key)
+
+    chunk_size = 256 * 1024
+    data = np.random.rand(500, 1000)
+    pointer = client.upload_action_object(
+        ActionObject.from_obj(data), chunk_size=chunk_size
+    )
+    result = client.download_action_object(pointer.id, chunk_size=chunk_size)
+    assert (result.syft_action_data == data).all()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_http_max_body_size(worker) -> None:
+    max_body_size = 1024
+    app = make_app(worker.name, make_routes(worker, max_body_size=max_body_size))
+    client = TestClient(app)
+    url = f"{API_PATH}/api_call"
+
+    response = client.post(url, content=b"a" * (max_body_size + 1))
+    assert response.status_code == 413
+
+    # the length is checked before anything is allocated for the body
+    headers = {"content-type": OUT_OF_BAND_CONTENT_TYPE}
+    response = client.post(
+        url,
+        content=b"a" * 10,
+        headers={**headers, "content-length": str(max_body_size + 1)},
+    )
+    assert response.status_code == 413
+
+    # and so is the size of gzipped bodies once they are decompressed
+    gzip_headers = {"content-encoding": "gzip"}
+    body = gzip.compress(b"a" * (max_body_size + 1))
+    assert len(body) < max_body_size
+    response = client.post(url, content=body, headers=gzip_headers)
+    assert response.status_code == 413
+    for body in [b"a" * 10, gzip.compress(b"a" * 10)[:-4]]:
+        response = client.post(url, content=body, headers=gzip_headers)
+        assert response.status_code == 400
+
+    for content_length in ["20", "5", "-1", "a"]:
+        response = client.post(
+            url,
+            content=b"a" * 10,
+            headers={**headers, "content-length": content_length},
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("n", [200])
+def test_http_transport_benchmark(
+    monkeypatch, record_property, faker: Faker, n: int
+) -> None:
+    # keep the apis of the landed node out of the registry of the other tests
+    monkeypatch.setattr(APIRegistry, "__api_registry__", OrderedDict())
+    transports = {"requests": RequestsTransport}
+    if package_exists("httpx"):
+        transports["httpx"] = lambda: HTTPXTransport(http2=package_exists("h2"))
+
+    node = sy.orchestra.launch(name=faker.name(), port="auto", reset=True)
+    try:
+        for name, make_transport in transports.items():
+            connection = HTTPConnection(
+                url=f"http://localhost:{node.port}", transport_cache=make_transport()
+            )
+            client = SyftClient(connection=connection).login(
+                email="info@openmined.org", password="changethis"
+            )
+            client.api.services.user.get_current_user()
+
+            start = time.perf_counter()
+            for _ in range(n):
+                assert client.api.services.user.get_current_user()
+            duration = time.perf_counter() - start
+            record_property(f"{name}_calls_per_second", n / duration)
+    finally:
+        node.land()
@@ -1,4 +1,5 @@
 # stdlib
+import time
 from typing import List
 from typing import Tuple
 from typing import Type
@@ -645,3 +646,48 @@ def test_userservice_exchange_credentials_get_email_fails(
     response = user_service.exchange_credentials(unauthed_context)
     assert isinstance(response, SyftError)
     assert response.message == expected_error_msg
+
+
+def test_userservice_role_cache(
+    monkeypatch: MonkeyPatch,
+    user_service: UserService,
+    authed_context: AuthedServiceContext,
+    guest_user: User,
+    update_user: UserUpdate,
+) -> None:
+    lookups = []
+
+    def mock_get_by_verify_key(credentials: SyftVerifyKey, verify_key) -> Ok:
+        lookups.append(verify_key)
+        return Ok(guest_user)
+
+    monkeypatch.setattr(user_service.stash, "get_by_verify_key", mock_get_by_verify_key)
+    verify_key = guest_user.verify_key
+
+    # the role is only looked up once
+    for _ in range(3):
+        assert user_service.get_role_for_credentials(verify_key) == guest_user.role
+    assert len(lookups) == 1
+
+    # updating a user drops the cached roles
+    def mock_get_by_uid(credentials: SyftVerifyKey, uid: UID) -> Ok:
+        return Ok(guest_user)
+
+    def mock_update(credentials: SyftVerifyKey, user: User, has_permission: bool) -> Ok:
+        return Ok(user)
+
+    monkeypatch.setattr(user_service.stash, "get_by_uid", mock_get_by_uid)
+    monkeypatch.setattr(user_service.stash, "update", mock_update)
+    authed_context.role = ServiceRole.ADMIN
+    update_user.role = ServiceRole.DATA_OWNER
+    assert isinstance(
+        user_service.update(authed_context, uid=guest_user.id, user_update=update_user),
+        UserView,
+    )
+    assert user_service.get_role_for_credentials(verify_key) == ServiceRole.DATA_OWNER
+    assert len(lookups) == 2
+
+    # and so does the time to live running out
+    with mock.patch("time.monotonic", return_value=time.monotonic() + 3600):
+        user_service.get_role_for_credentials(verify_key)
+    assert len(lookups) == 3
@@ -1,22 +1,44 @@
 # stdlib
+from collections import OrderedDict
 from collections import defaultdict
 import random
+import threading
+import time
 
 # third party
 from faker import Faker
+import gevent
+import pytest
 from zmq import Socket
+import zmq.green as zmq
 
 # syft absolute
 import syft
+from syft.client.api import APIRegistry
+from syft.client.api import SyftAPICall
+from syft.client.client import HTTPConnection
+from syft.client.client import SyftClient
+from syft.node.routes import make_routes
+from syft.node.server import make_app
 from syft.service.queue.base_queue import AbstractMessageHandler
+from syft.service.queue.queue import APICallMessageHandler
 from syft.service.queue.queue import QueueManager
+from syft.service.queue.queue_stash import QueueItem
+from syft.service.queue.queue_stash import Status
+from syft.service.queue.queue_stash import wait_for_queue_items
+from syft.service.queue.zmq_queue import ConnectedConsumer
+from syft.service.queue.zmq_queue import MESSAGE
+from syft.service.queue.zmq_queue import QueuedMessage
+from syft.service.queue.zmq_queue import READY
 from syft.service.queue.zmq_queue import ZMQClient
 from syft.service.queue.zmq_queue import ZMQClientConfig
 from syft.service.queue.zmq_queue import ZMQConsumer
 from syft.service.queue.zmq_queue import ZMQProducer
 from syft.service.queue.zmq_queue import ZMQQueueConfig
 from syft.service.response import SyftError
+from syft.service.response import SyftNotReady
 from syft.service.response import SyftSuccess
+from syft.types.uid import UID
 
 
 def test_zmq_client():
@@ -200,3 +222,284 @@ def test_zmq_client_serde():
     deser = syft.deserialize(bytes_data, from_bytes=True)
 
     assert type(deser) == type(client)
+
+
+def test_queue_workers_keep_their_node(faker: Faker) -> None:
+    n_processes = 2
+    n_calls = 6
+    worker = syft.Worker.named(name=faker.name(), processes=n_processes, reset=True)
+    root_client = worker.root_client
+
+    items = [
+        root_client.api.services.dataset.get_all(blocking=False) for _ in range(n_calls)
+    ]
+    for item in items:
+        assert isinstance(item, QueueItem)
+        item.syft_client_verify_key = root_client.verify_key
+
+    deadline = time.time() + 60
+    while any([isinstance(item.resolve, SyftNotReady) for item in items]):
+        assert time.time() < deadline
+        # the consumers are greenlets of this thread
+        gevent.sleep(0.05)
+    assert all(item.status == Status.COMPLETED for item in items)
+
+    stats = worker.queue_manager.worker_stats(APICallMessageHandler.queue_name)
+    assert len(stats) == n_processes
+    assert sum(stat["handled"] for stat in stats) == n_calls
+    # a worker builds its node for the first call and keeps it
+    assert all(stat["node_builds"] <= 1 for stat in stats)
+
+    assert isinstance(worker.queue_manager.close(), SyftSuccess)
+    consumers = worker.queue_manager.consumers[APICallMessageHandler.queue_name]
+    assert all(not consumer.alive for consumer in consumers)
+    assert all(consumer.message_handler.worker.node is None for consumer in consumers)
+
+
+def test_wait_for_queue_items(faker: Faker) -> None:
+    worker = syft.Worker.named(name=faker.name(), processes=2, reset=True)
+    root_client = worker.root_client
+
+    items = [root_client.api.services.dataset.get_all(blocking=False) for _ in range(6)]
+    for item in items:
+        item.syft_client_verify_key = root_client.verify_key
+
+    first = wait_for_queue_items(items, timeout=60, return_when_all=False)
+    assert len(first) >= 1
+    done = wait_for_queue_items(items, timeout=60)
+    assert sorted(item.id for item in done) == sorted(item.id for item in items)
+    assert all(item.resolved and item.status == Status.COMPLETED for item in items)
+    assert items[0].wait().data == []
+
+    # an item nobody works on times out
+    never = QueueItem(id=UID(), node_uid=worker.id)
+    never.syft_client_verify_key = root_client.verify_key
+    worker.queue_stash.set_placeholder(worker.verify_key, never)
+    start = time.time()
+    assert isinstance(never.wait(timeout=0.2), SyftNotReady)
+    assert time.time() - start < 5
+
+    worker.queue_manager.close()
+
+
+def test_queue_wait_route(monkeypatch, worker) -> None:
+    # the app is reached through httpx, which comes with the http2 extra
+    pytest.importorskip("httpx")
+    # relative
+    from .transport_test import AppTransport
+
+    # keep the api of the http client out of the registry of the other tests
+    monkeypatch.setattr(APIRegistry, "__api_registry__", OrderedDict())
+    transport = AppTransport(make_app(worker.name, make_routes(worker)))
+    connection = HTTPConnection(url="http://testserver", transport_cache=transport)
+    client = SyftClient(connection=connection, credentials=worker.signing_key)
+    # fetching the api registers it for the items
+    assert client.api
+    n_requests = len(transport.requests)
+
+    items = [QueueItem(id=UID(), node_uid=worker.id) for _ in range(3)]
+    for item in items:
+        item.syft_client_verify_key = client.verify_key
+        worker.queue_stash.set_placeholder(worker.verify_key, item)
+
+    def resolve(item: QueueItem) -> None:
+        item = item.copy()
+        item.resolved = True
+        item.status = Status.COMPLETED
+        item.result = SyftSuccess(message="done")
+        worker.queue_stash.set_result(worker.verify_key, item)
+
+    timers = [
+        threading.Timer(0.1 * i, resolve, args=(item,)) for i, item in enumerate(items)
+    ]
+    for timer in timers:
+        timer.start()
+    # one request waits for all of them
+    done = wait_for_queue_items(items, timeout=30)
+    assert len(done) == len(items)
+    assert [item.resolve for item in items] == ["done"] * len(items)
+    assert len(transport.requests) == n_requests + 1
+    (response,) = [r for r in transport.responses if r.url.path.endswith("/queue_wait")]
+    assert response.status_code == 200
+
+    # bad arguments are answered with an error instead of failing the request
+    for kwargs in [{"uids": "all"}, {"uids": [], "timeout": "1"}, {"wait": True}]:
+        call = SyftAPICall(
+            node_uid=worker.id, path="queue_wait", args=[], kwargs=kwargs
+        )
+        result = connection.make_wait_call(call.sign(client.credentials))
+        assert isinstance(result.message.data, SyftError)
+
+
+def wait_for(condition, timeout: float = 10) -> None:
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        gevent.sleep(0.01)
+
+
+def test_zmq_queue_consumers_share_messages() -> None:
+    client = ZMQClient(config=ZMQClientConfig())
+    QueueName = "shared"
+    producer = client.add_producer(queue_name=QueueName)
+
+    received_messages = defaultdict(list)
+
+    def make_handler(name):
+        class Handler(AbstractMessageHandler):
+            queue_name = QueueName
+
+            @staticmethod
+            def handle_message(message: bytes):
+                received_messages[name].append(message)
+                # let the other consumer take the next message
+                gevent.sleep(0.01)
+
+        return Handler
+
+    for name in ["a", "b"]:
+        client.add_consumer(queue_name=QueueName, message_handler=make_handler(name))
+        client.consumers[QueueName][-1].run()
+
+    n_messages = 20
+    for i in range(n_messages):
+        assert client.send_message(message=[b"%d" % i, b"frame"], queue_name=QueueName)
+    wait_for(lambda: producer.get_stats()["acked"] == n_messages)
+
+    assert len(received_messages["a"]) > 0
+    assert len(received_messages["b"]) > 0
+    messages = received_messages["a"] + received_messages["b"]
+    assert sorted(int(message[0]) for message in messages) == list(range(n_messages))
+    assert all(bytes(message[1]) == b"frame" for message in messages)
+    stats = producer.get_stats()
+    assert stats["pending"] == stats["in_flight"] == stats["redelivered"] == 0
+
+    assert isinstance(client.close(), SyftSuccess)
+
+
+def test_zmq_producer_keeps_unsent_messages() -> None:
+    client = ZMQClient(config=ZMQClientConfig(max_attempts=1, max_dead_letters=2))
+    producer = client.add_producer(queue_name="unsent")
+    # dispatch by hand, on a socket that is full
+    producer.thread.kill()
+    producer.consumers[b"consumer"] = ConnectedConsumer()
+
+    class FullSocket:
+        def send_multipart(self, *args, **kwargs):
+            raise zmq.Again()
+
+    socket = producer._producer
+    producer._producer = FullSocket()
+    producer.send(b"message")
+    with pytest.raises(zmq.Again):
+        producer._dispatch()
+    producer._producer = socket
+    assert [message.frames for message in producer.pending] == [[b"message"]]
+    assert producer.in_flight == {}
+
+    # only the latest dead letters are kept
+    messages = [QueuedMessage([b"%d" % i]) for i in range(3)]
+    for message in messages:
+        message.attempts = 1
+        producer._retry(message)
+    assert list(producer.dead_letters) == messages[1:]
+    assert producer.get_stats()["dead_lettered"] == 3
+
+    assert isinstance(client.close(), SyftSuccess)
+
+
+def test_zmq_queue_redelivers_lost_messages() -> None:
+    config = ZMQClientConfig(heartbeat_liveness=1.0, max_attempts=2)
+    client = ZMQClient(config=config)
+    QueueName = "redelivery"
+    producer = client.add_producer(queue_name=QueueName)
+
+    # a consumer that takes a message and dies before acking it
+    dead_consumer = zmq.Context.instance().socket(zmq.DEALER)
+    dead_consumer.connect(producer.address)
+    dead_consumer.send_multipart([READY])
+    wait_for(lambda: len(producer.consumers) == 1)
+    client.send_message(message=b"lost", queue_name=QueueName)
+    assert dead_consumer.recv_multipart()[0] == MESSAGE
+    dead_consumer.close(linger=0)
+
+    received_messages = []
+
+    class MyMessageHandler(AbstractMessageHandler):
+        queue_name = QueueName
+
+        @staticmethod
+        def handle_message(message: bytes):
+            if message == b"poison":
+                raise ValueError("can't handle this")
+            received_messages.append(message)
+
+    consumer = client.add_consumer(
+        queue_name=QueueName, message_handler=MyMessageHandler
+    )
+    consumer.run()
+    wait_for(lambda: received_messages == [b"lost"])
+
+    # messages that keep failing end up with the dead letters
+    client.send_message(message=b"poison", queue_name=QueueName)
+    wait_for(lambda: len(producer.dead_letters) == 1)
+    assert producer.dead_letters[0].frames == [b"poison"]
+    stats = producer.get_stats()
+    assert stats["timed_out"] == 1
+    assert stats["nacked"] == 2
+    assert stats["acked"] == 1
+    assert consumer.alive
+
+    assert isinstance(client.close(), SyftSuccess)
+
+
+def test_zmq_queue_keeps_long_calls() -> None:
+    config = ZMQClientConfig(heartbeat_liveness=1.0)
+    client = ZMQClient(config=config)
+    QueueName = "long"
+    producer = client.add_producer(queue_name=QueueName)
+
+    received_messages = []
+
+    class BusyHandler(AbstractMessageHandler):
+        queue_name = QueueName
+
+        @staticmethod
+        def handle_message(message: bytes):
+            received_messages.append(message)
+            # holds on to the cpu for longer than the heartbeat liveness
+            end = time.monotonic() + 2 * config.heartbeat_liveness
+            while time.monotonic() < end:
+                pass
+
+    consumer = client.add_consumer(queue_name=QueueName, message_handler=BusyHandler)
+    consumer.run()
+    client.send_message(message=b"long", queue_name=QueueName)
+    wait_for(lambda: producer.get_stats()["acked"] == 1)
+
+    # the consumer kept sending heartbeats, so the call ran only once
+    assert received_messages == [b"long"]
+    stats = producer.get_stats()
+    assert stats["timed_out"] == stats["redelivered"] == 0
+
+    assert isinstance(client.close(), SyftSuccess)
+
+
+def test_zmq_queue_backpressure() -> None:
+    client = ZMQClient(config=ZMQClientConfig(max_queue_size=2))
+    QueueName = "full"
+    producer = client.add_producer(queue_name=QueueName)
+
+    for _ in range(2):
+        result = client.send_message(message=b"message", queue_name=QueueName)
+        assert isinstance(result, SyftSuccess)
+    result = client.send_message(message=b"message", queue_name=QueueName)
+    assert isinstance(result, SyftError)
+    assert producer.get_stats()["rejected"] == 1
+
+    assert isinstance(client.purge_queue(queue_name=QueueName), SyftSuccess)
+    assert producer.get_stats()["pending"] == 0
+    result = client.send_message(message=b"message", queue_name=QueueName)
+    assert isinstance(result, SyftSuccess)
+
+    assert isinstance(client.close(), SyftSuccess)